@@ -238,8 +238,10 @@ class ArenaAgent:
         start_time = time.time()
 
         try:
-            # Run the workflow (synchronous, we'll wrap in asyncio)
-            result = self.orchestrator.execute_workflow(
+            # Run the synchronous workflow in a worker thread so both arena
+            # agents actually run concurrently without blocking the event loop
+            result = await asyncio.to_thread(
+                self.orchestrator.execute_workflow,
                 user_request=user_request,
                 domain=self.domain,
                 csv_data=csv_data,
@@ -0,0 +1,413 @@
+"""
+Artifact Pre-Checks
+
+Fast local validation of generated artifacts before the LLM-based
+Pre-Submission Review. Clearly broken outputs (zero bytes, a blank image, a
+docx without text, a workbook without rows) go straight to regeneration, and
+clearly fine outputs of low-value tasks skip the LLM review entirely.
+
+Features:
+- Images: PNG structure, dimensions and pixel-data entropy (stdlib + numpy,
+  no image library needed)
+- DOCX: paragraphs, tables and embedded charts read from the document XML
+- XLSX: non-empty rows and charts via openpyxl
+- PDF: page count and text via PyPDF2
+- Expected chart counts taken from the user request ("three charts")
+
+Every check returns one of three verdicts: broken, fine or uncertain. Only
+uncertain (and fine, for high-value tasks) artifacts reach the LLM reviewer.
+Which tasks are high value is set per task with high_value_task_scope()
+(or activate_high_value_task()/reset_high_value_task()), like the deadline.
+
+Configured via ARTIFACT_PRECHECK_ENABLED and ARTIFACT_PRECHECK_SKIP_REVIEW.
+"""
+
+import io
+import re
+import struct
+import zipfile
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+from xml.etree import ElementTree
+
+import numpy as np
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+try:
+    import openpyxl
+
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+try:
+    from PyPDF2 import PdfReader
+
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+VERDICT_BROKEN = "broken"
+VERDICT_FINE = "fine"
+VERDICT_UNCERTAIN = "uncertain"
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Images smaller than this (either side, pixels) are not a usable chart
+MIN_IMAGE_SIDE = 50
+# Images at least this large can be judged fine without a review
+FINE_IMAGE_WIDTH = 300
+FINE_IMAGE_HEIGHT = 200
+
+# Entropy (bits per byte) of the PNG's filtered pixel data: a single-colour
+# image is close to 0, a chart with data, labels and axes well above 0.5
+BLANK_ENTROPY_BITS = 0.05
+FINE_ENTROPY_BITS = 0.5
+
+# Pixel data sampled for the entropy (bounds decompression of huge images)
+MAX_PIXEL_BYTES = 8 * 1024 * 1024
+
+# Text a document needs before it is judged fine without a review
+FINE_DOCUMENT_CHARS = 200
+
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+_NUMBER_WORDS = {
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+    "ten": 10,
+    "eleven": 11,
+    "twelve": 12,
+}
+
+# Chart kinds that may sit between the count and the noun ("three bar charts")
+_CHART_KINDS = (
+    "bar",
+    "line",
+    "pie",
+    "scatter",
+    "area",
+    "column",
+    "histogram",
+    "separate",
+    "different",
+)
+
+# A small cardinal (2-12) directly before the noun, so years and rankings
+# ("the 2023 revenue chart", "the top 10 sales charts") are not counts
+_CHART_COUNT_PATTERN = re.compile(
+    r"\b([2-9]|1[0-2]|" + "|".join(_NUMBER_WORDS) + r")\s+"
+    r"(?:(?:" + "|".join(_CHART_KINDS) + r")\s+)?"
+    r"(?:charts|graphs|plots|visuali[sz]ations)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class ArtifactCheck:
+    """Verdict of a local artifact check and the issues behind it."""
+
+    verdict: str
+    issues: List[str] = field(default_factory=list)
+
+    @property
+    def broken(self) -> bool:
+        """Whether the artifact is clearly unusable."""
+        return self.verdict == VERDICT_BROKEN
+
+    @property
+    def fine(self) -> bool:
+        """Whether the artifact is clearly usable."""
+        return self.verdict == VERDICT_FINE
+
+
+def _broken(*issues: str) -> ArtifactCheck:
+    return ArtifactCheck(VERDICT_BROKEN, list(issues))
+
+
+def _uncertain(*issues: str) -> ArtifactCheck:
+    return ArtifactCheck(VERDICT_UNCERTAIN, list(issues))
+
+
+def expected_chart_count(user_request: str) -> Optional[int]:
+    """
+    Number of charts a request asks for (e.g., "three bar charts" -> 3).
+
+    Returns:
+        The count, or None if the request names none
+    """
+    match = _CHART_COUNT_PATTERN.search(user_request or "")
+    if not match:
+        return None
+    count = match.group(1).lower()
+    return int(count) if count.isdigit() else _NUMBER_WORDS[count]
+
+
+def _entropy_bits(data: bytes) -> float:
+    """Shannon entropy of a byte string in bits per byte."""
+    if not data:
+        return 0.0
+    counts = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+    probabilities = counts[counts > 0] / len(data)
+    return float(-(probabilities * np.log2(probabilities)).sum())
+
+
+def check_image(data: bytes, expected_charts: Optional[int] = None) -> ArtifactCheck:
+    """
+    Check a PNG chart.
+
+    Args:
+        data: PNG bytes
+        expected_charts: Charts the request asks for, if known
+
+    Returns:
+        Broken for empty, non-PNG, tiny or blank images; fine for large
+        images with varied pixels; uncertain otherwise
+    """
+    if not data:
+        return _broken("The chart image is empty (0 bytes)")
+    if not data.startswith(PNG_SIGNATURE):
+        return _broken("The chart is not a valid PNG image")
+
+    width = height = None
+    compressed = []
+    offset = len(PNG_SIGNATURE)
+    while offset + 8 <= len(data):
+        length, chunk_type = struct.unpack(">I4s", data[offset : offset + 8])
+        chunk = data[offset + 8 : offset + 8 + length]
+        if chunk_type == b"IHDR" and len(chunk) >= 8:
+            width, height = struct.unpack(">II", chunk[:8])
+        elif chunk_type == b"IDAT":
+            compressed.append(chunk)
+        elif chunk_type == b"IEND":
+            break
+        offset += 12 + length
+
+    if width is None or not compressed:
+        return _broken("The chart PNG has no image data")
+    if width < MIN_IMAGE_SIDE or height < MIN_IMAGE_SIDE:
+        return _broken(f"The chart image is only {width}x{height} pixels")
+
+    try:
+        pixels = zlib.decompressobj().decompress(b"".join(compressed), MAX_PIXEL_BYTES)
+    except zlib.error:
+        return _broken("The chart PNG is corrupt")
+    entropy = _entropy_bits(pixels)
+    if entropy < BLANK_ENTROPY_BITS:
+        return _broken("The chart image is blank (a single colour)")
+
+    if expected_charts and expected_charts > 1:
+        # Subplots cannot be counted from the pixels
+        return _uncertain(f"The request asks for {expected_charts} charts")
+    if (
+        width >= FINE_IMAGE_WIDTH
+        and height >= FINE_IMAGE_HEIGHT
+        and entropy >= FINE_ENTROPY_BITS
+    ):
+        return ArtifactCheck(VERDICT_FINE)
+    return _uncertain(f"The chart image has little detail ({entropy:.2f} bits/byte)")
+
+
+def check_docx(data: bytes, expected_charts: Optional[int] = None) -> ArtifactCheck:
+    """
+    Check a Word document.
+
+    Args:
+        data: DOCX bytes
+        expected_charts: Charts the request asks for, if known
+
+    Returns:
+        Broken for empty, unreadable or contentless documents; uncertain for
+        documents with fewer charts than requested; fine for documents with
+        text
+    """
+    if not data:
+        return _broken("The document is empty (0 bytes)")
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            root = ElementTree.fromstring(archive.read("word/document.xml"))
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError):
+        return _broken("The document is not a valid DOCX file")
+
+    paragraphs = [
+        "".join(t.text or "" for t in p.iter(f"{_WORD_NS}t"))
+        for p in root.iter(f"{_WORD_NS}p")
+    ]
+    text_chars = sum(len(p.strip()) for p in paragraphs)
+    tables = sum(1 for _ in root.iter(f"{_WORD_NS}tbl"))
+    charts = sum(1 for _ in root.iter(f"{_WORD_NS}drawing"))
+
+    if text_chars == 0 and tables == 0 and charts == 0:
+        return _broken("The document has no paragraphs, tables or charts")
+    if expected_charts and charts < expected_charts:
+        return _uncertain(
+            f"The document has {charts} chart(s) but {expected_charts} were requested"
+        )
+    if text_chars >= FINE_DOCUMENT_CHARS:
+        return ArtifactCheck(VERDICT_FINE)
+    return _uncertain(f"The document has only {text_chars} characters of text")
+
+
+def check_xlsx(data: bytes, expected_charts: Optional[int] = None) -> ArtifactCheck:
+    """
+    Check an Excel workbook.
+
+    Args:
+        data: XLSX bytes
+        expected_charts: Charts the request asks for, if known
+
+    Returns:
+        Broken for empty, unreadable or rowless workbooks; uncertain for
+        workbooks with fewer charts than requested; fine for workbooks with
+        data rows
+    """
+    if not data:
+        return _broken("The workbook is empty (0 bytes)")
+    if not OPENPYXL_AVAILABLE:
+        return _uncertain("openpyxl is not installed")
+    try:
+        workbook = openpyxl.load_workbook(io.BytesIO(data))
+    except Exception:
+        return _broken("The workbook is not a valid XLSX file")
+
+    rows = 0
+    charts = 0
+    for sheet in workbook.worksheets:
+        rows += sum(
+            1
+            for row in sheet.iter_rows(values_only=True)
+            if any(value not in (None, "") for value in row)
+        )
+        charts += len(sheet._charts)
+
+    if rows == 0:
+        return _broken("The workbook has no rows")
+    if expected_charts and charts < expected_charts:
+        return _uncertain(
+            f"The workbook has {charts} chart(s) but {expected_charts} were requested"
+        )
+    if rows > 1:
+        return ArtifactCheck(VERDICT_FINE)
+    return _uncertain("The workbook has only a header row")
+
+
+def check_pdf(data: bytes, expected_charts: Optional[int] = None) -> ArtifactCheck:
+    """
+    Check a PDF document.
+
+    Args:
+        data: PDF bytes
+        expected_charts: Unused; charts in a PDF cannot be counted reliably
+
+    Returns:
+        Broken for empty, unreadable or pageless PDFs; fine for PDFs with
+        text; uncertain otherwise (e.g., image-only pages)
+    """
+    if not data:
+        return _broken("The PDF is empty (0 bytes)")
+    if not PYPDF2_AVAILABLE:
+        return _uncertain("PyPDF2 is not installed")
+    try:
+        pages = PdfReader(io.BytesIO(data)).pages
+        text_chars = sum(len((page.extract_text() or "").strip()) for page in pages)
+    except Exception:
+        return _broken("The PDF is not readable")
+
+    if len(pages) == 0:
+        return _broken("The PDF has no pages")
+    if text_chars >= FINE_DOCUMENT_CHARS:
+        return ArtifactCheck(VERDICT_FINE)
+    return _uncertain(f"The PDF has only {text_chars} characters of text")
+
+
+_CHECKS = {
+    "image": check_image,
+    "png": check_image,
+    "docx": check_docx,
+    "xlsx": check_xlsx,
+    "pdf": check_pdf,
+}
+
+
+def check_artifact(
+    output_format: str, data: bytes, user_request: str = ""
+) -> ArtifactCheck:
+    """
+    Check an artifact of any supported output format.
+
+    Args:
+        output_format: Output format (image, docx, xlsx, pdf)
+        data: Artifact bytes
+        user_request: The user's request (for the expected chart count)
+
+    Returns:
+        The check's verdict; uncertain for unsupported formats
+    """
+    check = _CHECKS.get(output_format)
+    if check is None:
+        return _uncertain(f"No pre-check for {output_format} artifacts")
+    result = check(data, expected_chart_count(user_request))
+    if result.broken:
+        logger.info(
+            f"[ARTIFACT_CHECK] Broken {output_format}: {'; '.join(result.issues)}"
+        )
+    return result
+
+
+# =============================================================================
+# PER-TASK VALUE
+# =============================================================================
+
+_high_value_task: ContextVar[bool] = ContextVar("high_value_task", default=False)
+
+
+def activate_high_value_task(high_value: bool = True) -> Token:
+    """
+    Mark the current context's task as high value (always reviewed by the LLM).
+
+    Returns:
+        Token for reset_high_value_task()
+    """
+    return _high_value_task.set(high_value)
+
+
+def reset_high_value_task(token: Token):
+    """Restore the value active before activate_high_value_task()."""
+    _high_value_task.reset(token)
+
+
+@contextmanager
+def high_value_task_scope(high_value: bool = True) -> Iterator[None]:
+    """Mark the task running inside the block as high value."""
+    token = activate_high_value_task(high_value)
+    try:
+        yield
+    finally:
+        reset_high_value_task(token)
+
+
+def skips_review(check: ArtifactCheck) -> bool:
+    """
+    Whether an artifact may skip the LLM review.
+
+    True for clearly fine artifacts of tasks not marked high value, when
+    ARTIFACT_PRECHECK_SKIP_REVIEW is on.
+    """
+    return (
+        check.fine
+        and not _high_value_task.get()
+        and bool(ConfigManager.get("ARTIFACT_PRECHECK_SKIP_REVIEW"))
+    )
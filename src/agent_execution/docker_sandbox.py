@@ -5,23 +5,58 @@ This module provides functionality for executing Python code in secure,
 ephemeral Docker containers. It serves as a cost-free alternative to E2B.
 
 Features:
-- Ephemeral containers: Each execution uses a fresh container
+- Warm pool: Runs go to a pre-started container with the libraries already
+  imported (see sandbox_pool.py), falling back to a fresh container
+- Ephemeral containers: Cold runs use a fresh container
+- Sessions: A task's retries share one warm container whose data is loaded
+  once (SandboxSession), torn down when the task ends
 - Pre-built image: Libraries pre-installed (no pip install overhead)
-- Timeout support: Configurable execution timeout
+- Timeout support: Configurable execution timeout, capped by the task deadline
 - Artifact support: Returns generated files (images, documents, etc.)
+- Input files: staged at input/<name> (read-only mount on cold runs), so
+  scripts read data from a file instead of carrying it inline
 - Automatic cleanup: Containers are removed after execution
+- Async API: run_code_async() runs in a bounded pool of sandbox slots off
+  the event loop; cancelling it (or its deadline passing) kills the container
+- Streamed output: lines reach an output listener while the code runs, and a
+  run that outlives a fatal traceback is stopped early (frees the slot for
+  the next fix attempt)
+- Cancel groups: runs started inside sandbox_cancel_scope() are cancelled
+  together (e.g., the losing speculative candidates)
 
 Usage:
     with LocalDockerSandbox() as sandbox:
         result = sandbox.run_code("print('Hello, World!')")
         print(result.logs)
+
+    result = await LocalDockerSandbox().run_code_async(code)
 """
 
+import asyncio
+import codecs
+import contextvars
 import os
 import tempfile
-from typing import Optional, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, List
 from dataclasses import dataclass
 
+from src.agent_execution.sandbox_pool import (
+    INPUT_DIR,
+    WORKSPACE,
+    FatalErrorDetector,
+    SandboxContainerPool,
+    WarmContainer,
+    WarmRunResult,
+    get_sandbox_pool,
+    stage_inputs,
+)
+from src.config.config_manager import ConfigManager
+from src.utils.deadline import current_deadline
+from src.utils.logger import get_logger
+
 # Docker SDK
 try:
     import docker
@@ -32,6 +67,8 @@ except ImportError:
     DOCKER_AVAILABLE = False
     DockerException = Exception
 
+logger = get_logger(__name__)
+
 
 # =============================================================================
 # CONFIGURATION
@@ -43,6 +80,12 @@ DEFAULT_IMAGE = os.environ.get("DOCKER_SANDBOX_IMAGE", "ai-sandbox-base")
 # Default timeout in seconds
 DEFAULT_TIMEOUT = int(os.environ.get("DOCKER_SANDBOX_TIMEOUT", "120"))
 
+# Extra seconds run_code_async() waits past the deadline before killing
+ASYNC_DEADLINE_GRACE_SECONDS = 5
+
+# Seconds to wait for a cold run's log stream to end after the container
+LOG_STREAM_DRAIN_SECONDS = 5
+
 
 # =============================================================================
 # DATA CLASSES
@@ -90,6 +133,199 @@ class SandboxResult:
         return f"SandboxResult(success={self.success}, logs={len(self.logs)}, artifacts={len(self.artifacts)})"
 
 
+# =============================================================================
+# OUTPUT STREAMING
+# =============================================================================
+
+# Receives each output line of a sandbox run while the code runs
+OutputListener = Callable[[SandboxLog], None]
+
+_output_listener: contextvars.ContextVar[Optional[OutputListener]] = (
+    contextvars.ContextVar("sandbox_output_listener", default=None)
+)
+
+
+def activate_output_listener(listener: Optional[OutputListener]) -> contextvars.Token:
+    """
+    Stream the output of sandbox runs started in this context to listener.
+
+    Like the task deadline, the listener follows asyncio tasks and
+    asyncio.to_thread(), so inner layers pick it up without passing it along.
+
+    Returns:
+        Token for reset_output_listener()
+    """
+    return _output_listener.set(listener)
+
+
+def reset_output_listener(token: contextvars.Token):
+    """Restore the output listener that was active before activation."""
+    _output_listener.reset(token)
+
+
+@contextmanager
+def sandbox_output_scope(listener: Optional[OutputListener]) -> Iterator[None]:
+    """Context manager form of activate_output_listener()."""
+    token = activate_output_listener(listener)
+    try:
+        yield
+    finally:
+        reset_output_listener(token)
+
+
+# =============================================================================
+# CANCELLATION GROUPS
+# =============================================================================
+
+
+class SandboxCancelGroup:
+    """
+    Sandboxes running code for one unit of work, cancelled together.
+
+    Every sandbox that runs code inside sandbox_cancel_scope(group) joins the
+    group, so work that starts sandboxes several layers down (e.g., through
+    the executor) can still be stopped from outside; sandboxes joining after
+    cancel() are cancelled at once.
+    """
+
+    def __init__(self):
+        self._sandboxes: List["LocalDockerSandbox"] = []
+        self._lock = threading.Lock()
+        self._cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancel() was called."""
+        return self._cancelled
+
+    def add(self, sandbox: "LocalDockerSandbox"):
+        """Add a sandbox, cancelling it if the group already is."""
+        with self._lock:
+            if sandbox not in self._sandboxes:
+                self._sandboxes.append(sandbox)
+            cancelled = self._cancelled
+        if cancelled:
+            sandbox.cancel()
+
+    def cancel(self):
+        """Cancel every sandbox of the group. Safe to call from any thread."""
+        with self._lock:
+            self._cancelled = True
+            sandboxes = list(self._sandboxes)
+        for sandbox in sandboxes:
+            sandbox.cancel()
+
+
+_cancel_group: contextvars.ContextVar[Optional[SandboxCancelGroup]] = (
+    contextvars.ContextVar("sandbox_cancel_group", default=None)
+)
+
+
+@contextmanager
+def sandbox_cancel_scope(group: SandboxCancelGroup) -> Iterator[SandboxCancelGroup]:
+    """Add the sandboxes that run code inside the block to group."""
+    token = _cancel_group.set(group)
+    try:
+        yield group
+    finally:
+        _cancel_group.reset(token)
+
+
+def _fatal_grace() -> Optional[float]:
+    """Seconds a run may outlive a fatal traceback, or None if never stopped."""
+    if not ConfigManager.get("SANDBOX_FATAL_STOP_ENABLED"):
+        return None
+    return float(ConfigManager.get("SANDBOX_FATAL_STOP_GRACE_SECONDS"))
+
+
+def _pool_output_callback(
+    listener: Optional[OutputListener],
+) -> Optional[Callable[[str, str], None]]:
+    """Adapt an output listener to the pool's (line, stream) callback."""
+    if listener is None:
+        return None
+    return lambda line, stream: listener(SandboxLog(text=line + "\n", stream=stream))
+
+
+class _ContainerLogStream:
+    """
+    Follows a cold run's container logs while it runs.
+
+    Lines go to the output listener; once a traceback ends in an exception
+    line, the container is killed if still running after the grace period.
+    """
+
+    def __init__(
+        self,
+        container: Any,
+        listener: Optional[OutputListener],
+        fatal_grace: Optional[float],
+    ):
+        self.container = container
+        self.listener = listener
+        self.fatal_grace = fatal_grace
+        self.detector = FatalErrorDetector()
+        self.stopped = False
+        self._chunks: List[bytes] = []
+        self._done = threading.Event()
+        threading.Thread(target=self._follow, daemon=True).start()
+
+    def _follow(self):
+        """Read the log stream until the container exits."""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        partial = ""
+        try:
+            for chunk in self.container.logs(stream=True, follow=True):
+                self._chunks.append(chunk)
+                lines = (partial + decoder.decode(chunk)).split("\n")
+                partial = lines.pop()
+                for line in lines:
+                    self._line(line)
+            if partial:
+                self._line(partial)
+        except Exception as e:
+            logger.debug(f"[SANDBOX] Log stream ended: {e}")
+        finally:
+            self._done.set()
+
+    def _line(self, line: str):
+        """Handle one output line."""
+        if self.listener is not None and line.strip():
+            log = LocalDockerSandbox._parse_logs(line)[0]
+            try:
+                self.listener(log)
+            except Exception as e:
+                logger.debug(f"[SANDBOX] Output listener failed: {e}")
+        if self.detector.feed(line) and self.fatal_grace is not None:
+            timer = threading.Timer(self.fatal_grace, self._stop)
+            timer.daemon = True
+            timer.start()
+
+    def _stop(self):
+        """Kill the container if the fatal error did not end it."""
+        try:
+            self.container.reload()
+            if self.container.status == "running":
+                self.stopped = True
+                self.container.kill()
+                logger.info(
+                    f"[SANDBOX] Stopped on fatal error: {self.detector.fatal_line}"
+                )
+        except Exception:
+            pass
+
+    def output(self) -> Optional[str]:
+        """
+        Full output once the stream has ended.
+
+        Returns:
+            The output, or None if the stream did not end in time
+        """
+        if not self._done.wait(LOG_STREAM_DRAIN_SECONDS):
+            return None
+        return b"".join(self._chunks).decode("utf-8", errors="replace")
+
+
 # =============================================================================
 # LOCAL DOCKER SANDBOX CLASS
 # =============================================================================
@@ -103,6 +339,7 @@ class LocalDockerSandbox:
     using local Docker containers instead of cloud-based execution.
 
     Features:
+    - Warm container pool for millisecond start-up (cold run as fallback)
     - Ephemeral containers for isolation and security
     - Pre-built images to avoid pip install overhead
     - Configurable timeout
@@ -121,6 +358,7 @@ class LocalDockerSandbox:
         timeout: int = DEFAULT_TIMEOUT,
         network_disabled: bool = True,
         memory_limit: str = "1g",
+        use_pool: bool = True,
     ):
         """
         Initialize the Local Docker Sandbox.
@@ -130,13 +368,19 @@ class LocalDockerSandbox:
             timeout: Maximum execution time in seconds
             network_disabled: Whether to disable network access in container
             memory_limit: Memory limit (e.g., "512m", "1g")
+            use_pool: Whether to run in a warm pooled container when one is idle
         """
         self.image = image
         self.timeout = timeout
         self.network_disabled = network_disabled
         self.memory_limit = memory_limit
+        self.use_pool = use_pool
 
         self._client = None
+        # Containers running this sandbox's code, killed by cancel()
+        self._active: List[Any] = []
+        self._active_lock = threading.Lock()
+        self._cancelled = False
 
     def _get_docker_client(self) -> "docker.DockerClient":
         """Get or create Docker client."""
@@ -205,6 +449,8 @@ class LocalDockerSandbox:
             "output.xlsx",
             "spreadsheet.xlsx",
             "data.xlsx",
+            "output.pptx",
+            "presentation.pptx",
         ]
 
         # MIME types mapping
@@ -215,6 +461,7 @@ class LocalDockerSandbox:
             ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
             ".pdf": "application/pdf",
             ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
         }
 
         try:
@@ -241,8 +488,188 @@ class LocalDockerSandbox:
 
         return artifacts
 
+    @staticmethod
+    def _parse_logs(output: str, stream: Optional[str] = None) -> List[SandboxLog]:
+        """
+        Split process output into log entries.
+
+        Args:
+            output: Captured output text
+            stream: Stream the output came from; None to guess per line
+                    (container logs interleave stdout and stderr)
+        """
+        logs = []
+        for line in output.split("\n"):
+            if line.strip():
+                line_stream = stream or (
+                    "stderr"
+                    if any(x in line for x in ["Error", "Exception", "Traceback"])
+                    else "stdout"
+                )
+                logs.append(SandboxLog(text=line + "\n", stream=line_stream))
+        return logs
+
+    @contextmanager
+    def _track(self, container: Any):
+        """Register a container as running this sandbox's code."""
+        with self._active_lock:
+            self._active.append(container)
+            cancelled = self._cancelled
+        if cancelled:
+            _kill_container(container)
+        try:
+            yield
+        finally:
+            with self._active_lock:
+                self._active.remove(container)
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancel() was called."""
+        return self._cancelled
+
+    def cancel(self):
+        """
+        Kill the containers running this sandbox's code.
+
+        Safe to call from any thread. Runs in progress return a cancelled
+        result and later runs do not start.
+        """
+        with self._active_lock:
+            self._cancelled = True
+            active = list(self._active)
+        for container in active:
+            _kill_container(container)
+        if active:
+            logger.info(f"[SANDBOX] Cancelled, killed {len(active)} container(s)")
+
+    def _bounded_timeout(self, timeout: Optional[int]) -> Optional[int]:
+        """
+        Effective run timeout, never past the task's deadline.
+
+        Returns:
+            Timeout in seconds, or None if the deadline has already passed
+        """
+        effective_timeout = timeout or self.timeout
+        deadline = current_deadline()
+        if deadline is not None:
+            if deadline.expired:
+                return None
+            effective_timeout = min(
+                effective_timeout, max(1, int(deadline.remaining()))
+            )
+        return effective_timeout
+
+    def _result_from_run(
+        self, run: WarmRunResult, workspace: str, timeout: int
+    ) -> Optional[SandboxResult]:
+        """
+        Convert a warm run into a SandboxResult.
+
+        Returns:
+            SandboxResult, or None if the worker was unusable
+        """
+        if run.worker_unavailable:
+            logger.warning(f"[SANDBOX_POOL] Worker unavailable: {run.stderr}")
+            return None
+        if run.timed_out:
+            return SandboxResult(
+                logs=[],
+                artifacts=[],
+                error=f"Execution timed out after {timeout} seconds",
+                timed_out=True,
+            )
+
+        logs = self._parse_logs(run.stdout, "stdout") + self._parse_logs(
+            run.stderr, "stderr"
+        )
+        artifacts = self._extract_artifacts(workspace)
+        error = None
+        if run.stopped:
+            error = _fatal_error(FatalErrorDetector.find(run.stderr))
+        elif run.exit_code != 0:
+            error = f"Process exited with code {run.exit_code}"
+        return SandboxResult(logs=logs, artifacts=artifacts, error=error)
+
+    def _run_warm(
+        self,
+        pool: SandboxContainerPool,
+        warm: WarmContainer,
+        code: str,
+        timeout: int,
+        input_files: Optional[Dict[str, bytes]] = None,
+    ) -> Optional[SandboxResult]:
+        """
+        Execute code in a warm pooled container.
+
+        Returns:
+            SandboxResult, or None if the container's worker was unusable
+            (the caller then falls back to a cold run)
+        """
+        contaminated = True
+        try:
+            stage_inputs(warm.workspace, input_files)
+            with self._track(warm.container):
+                run = warm.run_script(
+                    code,
+                    timeout,
+                    fatal_grace=_fatal_grace(),
+                    on_output=_pool_output_callback(_output_listener.get()),
+                )
+            if self._cancelled:
+                return _cancelled_result()
+            contaminated = run.contaminated
+            return self._result_from_run(run, warm.workspace, timeout)
+        except Exception as e:
+            if self._cancelled:
+                return _cancelled_result()
+            logger.warning(f"[SANDBOX_POOL] Warm run failed: {e}")
+            return None
+        finally:
+            pool.release(warm, contaminated=contaminated)
+
+    def open_session(
+        self, setup_code: str, input_files: Optional[Dict[str, bytes]] = None
+    ) -> "SandboxSession":
+        """
+        Open a session that runs setup_code once for several runs.
+
+        Never raises: without an idle warm container, or if the setup fails,
+        the session runs every script in full like run_code().
+
+        Args:
+            setup_code: Code every script of the session starts with
+                (e.g., loading the data)
+            input_files: Files staged for every run of the session
+
+        Returns:
+            SandboxSession; close it (or use it as a context manager)
+        """
+        pool = get_sandbox_pool(self.image) if self.use_pool else None
+        warm = pool.acquire() if pool else None
+        timeout = self._bounded_timeout(None)
+        if warm is None or timeout is None:
+            if warm is not None:
+                pool.release(warm)
+            return SandboxSession(self, setup_code, input_files)
+
+        try:
+            stage_inputs(warm.workspace, input_files)
+            session = warm.start_session(setup_code, timeout)
+        except Exception as e:
+            logger.warning(f"[SANDBOX_POOL] Could not start session: {e}")
+            session = None
+        if session is None:
+            pool.release(warm, contaminated=True)
+            return SandboxSession(self, setup_code, input_files)
+        return SandboxSession(self, setup_code, input_files, pool, warm, session)
+
     def run_code(
-        self, code: str, timeout: Optional[int] = None, output_format: str = "image"
+        self,
+        code: str,
+        timeout: Optional[int] = None,
+        output_format: str = "image",
+        input_files: Optional[Dict[str, bytes]] = None,
     ) -> SandboxResult:
         """
         Execute Python code in the sandbox.
@@ -251,11 +678,32 @@ class LocalDockerSandbox:
             code: Python code to execute
             timeout: Override default timeout (in seconds)
             output_format: Expected output format for artifact extraction
+            input_files: File name -> content, readable by the code at
+                input/<name> (relative to its working directory)
 
         Returns:
             SandboxResult object containing logs and artifacts
         """
-        effective_timeout = timeout or self.timeout
+        group = _cancel_group.get()
+        if group is not None:
+            group.add(self)
+        if self._cancelled:
+            return _cancelled_result()
+
+        # Never run past the task's deadline
+        effective_timeout = self._bounded_timeout(timeout)
+        if effective_timeout is None:
+            return _deadline_exceeded_result()
+
+        # Fast path: an idle warm container from the pool
+        pool = get_sandbox_pool(self.image) if self.use_pool else None
+        warm = pool.acquire() if pool else None
+        if warm is not None:
+            result = self._run_warm(
+                pool, warm, code, effective_timeout, input_files
+            )
+            if result is not None:
+                return result
 
         # Ensure image exists
         if not self._ensure_image_exists():
@@ -268,30 +716,51 @@ class LocalDockerSandbox:
         client = self._get_docker_client()
 
         # Use context manager for automatic cleanup
-        with tempfile.TemporaryDirectory() as host_dir:
+        with (
+            tempfile.TemporaryDirectory() as host_dir,
+            tempfile.TemporaryDirectory() as inputs_dir,
+        ):
             # Write Python script to host directory
             script_path = os.path.join(host_dir, "script.py")
             with open(script_path, "w") as f:
                 f.write(code)
 
+            # Input files are mounted read-only below the workspace
+            volumes = {host_dir: {"bind": WORKSPACE, "mode": "rw"}}
+            if input_files:
+                stage_inputs(inputs_dir, input_files)
+                volumes[os.path.join(inputs_dir, INPUT_DIR)] = {
+                    "bind": f"{WORKSPACE}/{INPUT_DIR}",
+                    "mode": "ro",
+                }
+
             # Run container with the script
             try:
                 container = client.containers.run(
                     self.image,
                     command="python script.py",
-                    volumes={host_dir: {"bind": "/workspace", "mode": "rw"}},
-                    working_dir="/workspace",
+                    volumes=volumes,
+                    working_dir=WORKSPACE,
                     network_mode="none" if self.network_disabled else "bridge",
                     mem_limit=self.memory_limit,
                     detach=True,
                     remove=False,  # We'll handle removal ourselves
                 )
 
+                # Stream the output while the code runs
+                stream = _ContainerLogStream(
+                    container, _output_listener.get(), _fatal_grace()
+                )
+
                 # Wait for container with timeout
                 try:
-                    result = container.wait(timeout=effective_timeout)
+                    with self._track(container):
+                        result = container.wait(timeout=effective_timeout)
                     exit_code = result.get("StatusCode", 0)
                 except Exception as e:
+                    if self._cancelled:
+                        _kill_container(container)
+                        return _cancelled_result()
                     # Check if it's a timeout
                     # Use remove(force=True) directly instead of stop() to avoid hanging
                     # on infinite loops - SIGKILL destroys the container instantly
@@ -305,22 +774,17 @@ class LocalDockerSandbox:
                         )
                     raise
 
-                # Get logs
-                logs_output = container.logs().decode("utf-8", errors="replace")
+                if self._cancelled:
+                    _kill_container(container)
+                    return _cancelled_result()
+
+                # Get logs (streamed, or read again if the stream lagged)
+                logs_output = stream.output()
+                if logs_output is None:
+                    logs_output = container.logs().decode("utf-8", errors="replace")
 
                 # Parse logs
-                logs = []
-                for line in logs_output.split("\n"):
-                    if line.strip():
-                        # Determine stream based on content
-                        stream = (
-                            "stderr"
-                            if any(
-                                x in line for x in ["Error", "Exception", "Traceback"]
-                            )
-                            else "stdout"
-                        )
-                        logs.append(SandboxLog(text=line + "\n", stream=stream))
+                logs = self._parse_logs(logs_output)
 
                 # Extract artifacts from mounted directory
                 artifacts = self._extract_artifacts(host_dir)
@@ -333,7 +797,9 @@ class LocalDockerSandbox:
 
                 # Check for errors
                 error = None
-                if exit_code != 0:
+                if stream.stopped:
+                    error = _fatal_error(stream.detector.fatal_line)
+                elif exit_code != 0:
                     error = f"Process exited with code {exit_code}"
 
                 return SandboxResult(
@@ -349,6 +815,57 @@ class LocalDockerSandbox:
                     logs=[], artifacts=[], error=f"Execution error: {str(e)}"
                 )
 
+    async def run_code_async(
+        self,
+        code: str,
+        timeout: Optional[int] = None,
+        output_format: str = "image",
+        input_files: Optional[Dict[str, bytes]] = None,
+    ) -> SandboxResult:
+        """
+        Execute Python code in the sandbox without blocking the event loop.
+
+        The run takes one of the SANDBOX_ASYNC_SLOTS sandbox slots (waiting
+        for a free one) and keeps the caller's context, so the task deadline
+        still applies. Cancelling the awaiting task kills the container; so
+        does the deadline passing, in which case a DEADLINE_EXCEEDED result
+        is returned.
+
+        Args:
+            code: Python code to execute
+            timeout: Override default timeout (in seconds)
+            output_format: Expected output format for artifact extraction
+            input_files: File name -> content, staged as in run_code()
+
+        Returns:
+            SandboxResult object containing logs and artifacts
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        future = loop.run_in_executor(
+            _get_async_executor(),
+            context.run,
+            self.run_code,
+            code,
+            timeout,
+            output_format,
+            input_files,
+        )
+
+        deadline = current_deadline()
+        wait_seconds = None
+        if deadline is not None:
+            wait_seconds = deadline.remaining() + ASYNC_DEADLINE_GRACE_SECONDS
+
+        try:
+            return await asyncio.wait_for(future, wait_seconds)
+        except asyncio.TimeoutError:
+            self.cancel()
+            return _deadline_exceeded_result()
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+
     # =========================================================================
     # CONTEXT MANAGER SUPPORT
     # =========================================================================
@@ -372,6 +889,7 @@ class LocalDockerSandbox:
         image: str = DEFAULT_IMAGE,
         timeout: int = DEFAULT_TIMEOUT,
         output_format: str = "image",
+        input_files: Optional[Dict[str, bytes]] = None,
     ) -> SandboxResult:
         """
         Execute code in a temporary sandbox (convenience method).
@@ -384,12 +902,239 @@ class LocalDockerSandbox:
             image: Docker image to use
             timeout: Maximum execution time in seconds
             output_format: Expected output format
+            input_files: File name -> content, staged as in run_code()
 
         Returns:
             SandboxResult object
         """
         with LocalDockerSandbox(image=image, timeout=timeout) as sandbox:
-            return sandbox.run_code(code, output_format=output_format)
+            return sandbox.run_code(
+                code, output_format=output_format, input_files=input_files
+            )
+
+    @staticmethod
+    async def execute_async(
+        code: str,
+        image: str = DEFAULT_IMAGE,
+        timeout: int = DEFAULT_TIMEOUT,
+        output_format: str = "image",
+        input_files: Optional[Dict[str, bytes]] = None,
+    ) -> SandboxResult:
+        """
+        Async version of execute() (see run_code_async()).
+
+        Args:
+            code: Python code to execute
+            image: Docker image to use
+            timeout: Maximum execution time in seconds
+            output_format: Expected output format
+            input_files: File name -> content, staged as in run_code()
+
+        Returns:
+            SandboxResult object
+        """
+        with LocalDockerSandbox(image=image, timeout=timeout) as sandbox:
+            return await sandbox.run_code_async(
+                code, output_format=output_format, input_files=input_files
+            )
+
+
+# =============================================================================
+# ASYNC EXECUTION SLOTS
+# =============================================================================
+
+# Threads that run sandboxes for run_code_async(); one per concurrent run
+_async_executor: Optional[ThreadPoolExecutor] = None
+_async_executor_lock = threading.Lock()
+
+
+def _get_async_executor() -> ThreadPoolExecutor:
+    """Get or create the executor holding SANDBOX_ASYNC_SLOTS threads."""
+    global _async_executor
+    with _async_executor_lock:
+        if _async_executor is None:
+            _async_executor = ThreadPoolExecutor(
+                max_workers=max(1, ConfigManager.get("SANDBOX_ASYNC_SLOTS")),
+                thread_name_prefix="sandbox-slot",
+            )
+        return _async_executor
+
+
+def shutdown_async_executor():
+    """Stop the async sandbox slots (application shutdown)."""
+    global _async_executor
+    with _async_executor_lock:
+        executor, _async_executor = _async_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _kill_container(container: Any):
+    """Kill and remove a container, ignoring one that is already gone."""
+    try:
+        container.remove(force=True)
+    except Exception:
+        pass
+
+
+# =============================================================================
+# PERSISTENT SESSION
+# =============================================================================
+
+
+def _deadline_exceeded_result() -> SandboxResult:
+    """Result for a run the task deadline left no time for."""
+    return SandboxResult(
+        logs=[],
+        artifacts=[],
+        error="DEADLINE_EXCEEDED: Task deadline passed before execution",
+    )
+
+
+def _fatal_error(fatal_line: Optional[str]) -> str:
+    """Error for a run stopped early on a fatal traceback."""
+    return f"Stopped on fatal error: {fatal_line or 'traceback in output'}"
+
+
+def _cancelled_result() -> SandboxResult:
+    """Result for a run stopped by LocalDockerSandbox.cancel()."""
+    return SandboxResult(
+        logs=[], artifacts=[], error="CANCELLED: Sandbox execution was cancelled"
+    )
+
+
+class SandboxSession:
+    """
+    Sandbox state kept across a task's generate/fix/review retries.
+
+    The session's setup code (the data) runs once in a warm container; each
+    later script that starts with it runs only the rest, forked from the
+    set-up state, so retries neither re-parse the data nor share state with
+    each other. Scripts that do not start with the setup code, and every
+    script when no warm container was available, run in full through the
+    sandbox's run_code().
+
+    Example:
+        with sandbox.open_session(preamble) as session:
+            result = session.run_code(preamble + code)
+    """
+
+    def __init__(
+        self,
+        sandbox: LocalDockerSandbox,
+        setup_code: str,
+        input_files: Optional[Dict[str, bytes]] = None,
+        pool: Optional[SandboxContainerPool] = None,
+        warm: Optional[WarmContainer] = None,
+        socket_path: Optional[str] = None,
+    ):
+        """
+        Initialize the session (use LocalDockerSandbox.open_session()).
+
+        Args:
+            sandbox: Sandbox used for full runs
+            setup_code: Code already run in the session
+            input_files: Files staged for every run
+            pool: Pool the warm container belongs to
+            warm: Container holding the session
+            socket_path: Session socket inside the container
+        """
+        self.sandbox = sandbox
+        self.setup_code = setup_code
+        self.input_files = input_files
+        self.runs = 0
+        self._pool = pool
+        self._warm = warm
+        self._socket_path = socket_path
+
+    @property
+    def persistent(self) -> bool:
+        """Whether runs reuse the set-up state."""
+        return self._warm is not None
+
+    def run_code(
+        self, code: str, timeout: Optional[int] = None, output_format: str = "image"
+    ) -> SandboxResult:
+        """
+        Execute code, reusing the session state when code starts with it.
+
+        Args:
+            code: Full Python code, normally setup_code plus the attempt
+            timeout: Override default timeout (in seconds)
+            output_format: Expected output format for artifact extraction
+
+        Returns:
+            SandboxResult object containing logs and artifacts
+        """
+        if self.persistent and code.startswith(self.setup_code):
+            effective_timeout = self.sandbox._bounded_timeout(timeout)
+            if effective_timeout is None:
+                return _deadline_exceeded_result()
+
+            warm = self._warm
+            result = None
+            try:
+                # Drop the previous attempt's artifacts
+                if warm.reset_workspace():
+                    stage_inputs(warm.workspace, self.input_files)
+                    with self.sandbox._track(warm.container):
+                        run = warm.run_script(
+                            code[len(self.setup_code) :],
+                            effective_timeout,
+                            session=self._socket_path,
+                            fatal_grace=_fatal_grace(),
+                            on_output=_pool_output_callback(_output_listener.get()),
+                        )
+                    if self.sandbox.cancelled:
+                        self._end(contaminated=True)
+                        return _cancelled_result()
+                    result = self.sandbox._result_from_run(
+                        run, warm.workspace, effective_timeout
+                    )
+                    if run.contaminated:
+                        self._end(contaminated=True)
+            except Exception as e:
+                logger.warning(f"[SANDBOX_POOL] Session run failed: {e}")
+                self._end(contaminated=True)
+            if result is not None:
+                self.runs += 1
+                return result
+            # The session is gone; the script still runs in full
+            self._end(contaminated=True)
+
+        return self.sandbox.run_code(
+            code,
+            timeout=timeout,
+            output_format=output_format,
+            input_files=self.input_files,
+        )
+
+    def _end(self, contaminated: bool):
+        """Give the container back to the pool."""
+        if self._warm is None:
+            return
+        warm, self._warm = self._warm, None
+        self._pool.release(warm, contaminated=contaminated)
+
+    def close(self):
+        """Stop the session worker and release its container."""
+        if self._warm is None:
+            return
+        try:
+            closed = self._warm.close_session(self._socket_path)
+        except Exception as e:
+            logger.warning(f"[SANDBOX_POOL] Could not close session: {e}")
+            closed = False
+        self._end(contaminated=not closed)
+
+    def __enter__(self):
+        """Enter context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Close the session."""
+        self.close()
+        return False
 
 
 # =============================================================================
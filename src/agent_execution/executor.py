@@ -11,15 +11,39 @@ Features:
 - Pre-Submission Review: Agent self-evaluates artifact against user description before sandbox closes
 - Up to 2 review/regeneration attempts to ensure quality
 - Detailed error tracking for debugging
+- Streamed code generation that stops at the closing code fence and aborts on refusals
+- Task deadline: sandbox timeouts are capped by the remaining budget and retries
+  stop once another attempt would not fit
+- Speculative mode: several diverse visualization candidates are generated and
+  run at once; the first acceptable one wins and the rest are cancelled
+- Artifact pre-checks: clearly broken artifacts skip the LLM review and go
+  straight to regeneration; clearly fine ones of low-value tasks skip it too
+- Fix cache: known fixes for recurring errors are applied before the LLM is
+  asked, and LLM fixes that work are learned
+- Combined reports: the figure and report code are generated concurrently and
+  assembled at the end
 """
 
 import os
 import base64
+import concurrent.futures
+import contextvars
 import json
 import re
-from typing import Optional, List, Any
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Optional, List, Any, Dict, Iterator
 from datetime import datetime
 
+from src.agent_execution.artifact_checks import (
+    PNG_SIGNATURE,
+    check_artifact,
+    skips_review,
+)
+from src.agent_execution.fix_cache import error_signature, get_fix_cache
+from src.config.config_manager import ConfigManager
+
 # Import error categorization (Issue #37)
 
 # E2B Code Interpreter SDK (fallback)
@@ -40,16 +64,35 @@ from traceloop.sdk.decorators import task
 # Import file parser for different file types
 from src.agent_execution.file_parser import parse_file, FileType, detect_file_type
 
+# Keeps data context in prompts within each model's token budget
+from src.agent_execution.prompt_budget import PromptBudgeter, profile_csv
+
 # Import logger for proper logging with rotating files
 # (Must be before any modules that use logging for import warnings)
 from src.utils.logger import get_logger
 
+# Per-task deadline shared by LLM calls, sandbox runs and retries
+from src.utils.deadline import Deadline, current_deadline, deadline_scope
+from src.utils.task_graph import GraphStep, run_task_graph
+
+# Prebuilt sandbox image (Docker) or template (E2B) per output format
+from src.agent_execution.sandbox_images import e2b_template, select_image
+
 # Docker Sandbox (primary - for cost savings)
 try:
     from src.agent_execution.docker_sandbox import (
         LocalDockerSandbox,
+        SandboxCancelGroup,
         SandboxResult,
+        SandboxSession,
+        sandbox_cancel_scope,
+    )
+    from src.agent_execution.sandbox_cache import (
+        digest_inputs,
+        get_sandbox_cache,
+        image_version,
     )
+    from src.agent_execution.sandbox_scheduler import admit_sandbox_run
 
     DOCKER_SANDBOX_AVAILABLE = True
 except ImportError:
@@ -97,6 +140,21 @@ USE_DOCKER_SANDBOX = os.environ.get("USE_DOCKER_SANDBOX", "true").lower() == "tr
 DOCKER_SANDBOX_IMAGE = os.environ.get("DOCKER_SANDBOX_IMAGE", "ai-sandbox-base")
 DOCKER_SANDBOX_TIMEOUT = int(os.environ.get("DOCKER_SANDBOX_TIMEOUT", "120"))
 
+# Uploaded data is staged into the sandbox as a file instead of being inlined
+# in the script; generated code starts with DATA_PREAMBLE, which sets
+# data_path (and csv_data, for code that reads the data from a string)
+SANDBOX_DATA_PATH = "input/data.csv"
+DATA_PREAMBLE = (
+    f'data_path = "{SANDBOX_DATA_PATH}"\n'
+    'with open(data_path, encoding="utf-8") as _data_file:\n'
+    "    csv_data = _data_file.read()\n\n"
+)
+
+
+def _data_inputs(csv_data: str) -> Dict[str, bytes]:
+    """Input files for a sandbox run reading csv_data via DATA_PREAMBLE."""
+    return {os.path.basename(SANDBOX_DATA_PATH): csv_data.encode("utf-8")}
+
 # Flag to enable/disable distillation capture (can be disabled to save storage)
 ENABLE_DISTILLATION_CAPTURE = (
     os.environ.get("ENABLE_DISTILLATION_CAPTURE", "true").lower() == "true"
@@ -131,6 +189,7 @@ class OutputFormat:
     DOCX = "docx"  # Word documents
     XLSX = "xlsx"  # Excel spreadsheets
     PDF = "pdf"  # PDF documents
+    PPTX = "pptx"  # PowerPoint decks
 
 
 # =============================================================================
@@ -140,6 +199,7 @@ class OutputFormat:
 # Import template registry for JSON-based document generation
 try:
     from src.templates import TemplateRegistry  # noqa: F401
+    from src.templates.renderer import render_document, render_fast_path
 
     TEMPLATES_AVAILABLE = True
 except ImportError:
@@ -337,6 +397,14 @@ class TaskRouter:
             f"TaskRouter: domain={domain}, task_type={detected_task_type}, output_format={detected_format}"
         )
 
+        # Common document orders are filled straight from the data
+        if detected_format == OutputFormat.DOCX:
+            fast_result = self._render_template_fast_path(
+                domain, user_request, csv_data
+            )
+            if fast_result:
+                return fast_result
+
         # Check if it's a report request
         is_report = any(word in user_request.lower() for word in ["report", "summary", "analysis", "executive"])
 
@@ -381,6 +449,45 @@ class TaskRouter:
                 domain=domain, user_request=user_request, csv_data=csv_data, **kwargs
             )
 
+    def _render_template_fast_path(
+        self, domain: str, user_request: str, csv_data: str
+    ) -> Optional[dict]:
+        """
+        Render a known document type in-process, skipping codegen and the sandbox.
+
+        Args:
+            domain: The domain
+            user_request: The user's request
+            csv_data: CSV data
+
+        Returns:
+            Document generation result, or None to use the regular path
+        """
+        if not TEMPLATES_AVAILABLE or not ConfigManager.get(
+            "TEMPLATE_FAST_PATH_ENABLED"
+        ):
+            return None
+
+        started = time.monotonic()
+        rendered = render_fast_path(domain, user_request, csv_data)
+        if rendered is None:
+            return None
+
+        error = _document_precheck_error(
+            OutputFormat.DOCX, rendered["data"], user_request
+        )
+        if error:
+            logger.warning(f"[TEMPLATE] Fast path rejected, falling back: {error}")
+            return None
+
+        logger.info(
+            f"[TEMPLATE] Rendered {rendered['template_type']} in-process in "
+            f"{time.monotonic() - started:.3f}s"
+        )
+        return _template_document_result(
+            rendered["data"], OutputFormat.DOCX, "template_fast_path"
+        )
+
     def _handle_visualization(
         self, 
         domain: str, 
@@ -535,15 +642,19 @@ Return ONLY the Python code, no markdown."""
             if code_match:
                 code = code_match.group(1).strip()
 
-            # Wrap with CSV data
-            code_with_csv = f'csv_data = """{csv_data}"""\n\n' + code
+            # Read the staged CSV data
+            code_with_csv = DATA_PREAMBLE + code
 
             # Execute in sandbox
             e2b_api_key = kwargs.get("api_key") or os.environ.get("E2B_API_KEY")
             sandbox_timeout = kwargs.get("sandbox_timeout", 120)
 
             success, sandbox_result, _, artifacts = _execute_code_in_sandbox(
-                code_with_csv, e2b_api_key, sandbox_timeout, output_format
+                code_with_csv,
+                e2b_api_key,
+                sandbox_timeout,
+                output_format,
+                input_files=_data_inputs(csv_data),
             )
 
             if success and artifacts:
@@ -932,8 +1043,9 @@ Return ONLY valid JSON, no markdown formatting, no explanations."""
 
         Instead of asking the LLM to generate Python code from scratch, this method:
         1. Asks the LLM to generate structured JSON content
-        2. Injects that JSON into a pre-tested template
-        3. Executes the template in the sandbox
+        2. Fills the pre-tested template in-process (DOCX)
+        3. Otherwise injects that JSON into the template code and executes it
+           in the sandbox
 
         This guarantees formatting won't throw Python errors and heavily reduces token usage.
 
@@ -985,7 +1097,23 @@ Return ONLY valid JSON, no markdown formatting, no explanations."""
             f"Generated JSON content with {len(content_json)} keys for template: {template_type}"
         )
 
-        # Step 2: Get template code with injected JSON
+        # Step 2: Fill the template in-process when it renders to DOCX
+        if output_format == OutputFormat.DOCX:
+            try:
+                data = render_document(template_type, content_json, csv_data)
+            except Exception as e:
+                logger.warning(
+                    f"[TEMPLATE] In-process render failed, using sandbox: {e}"
+                )
+            else:
+                error = _document_precheck_error(output_format, data, user_request)
+                if not error:
+                    return _template_document_result(
+                        data, output_format, "template_json"
+                    )
+                logger.warning(f"[TEMPLATE] {error}, using sandbox")
+
+        # Step 3: Get template code with injected JSON
         try:
             if template_type == "legal_contract":
                 from src.templates.legal_contract import get_legal_template_code
@@ -1013,7 +1141,7 @@ Return ONLY valid JSON, no markdown formatting, no explanations."""
                 **kwargs,
             )
 
-        # Step 3: Execute in sandbox
+        # Step 4: Execute in sandbox
         try:
             e2b_api_key = kwargs.get("api_key") or os.environ.get("E2B_API_KEY")
             sandbox_timeout = kwargs.get("sandbox_timeout", 120)
@@ -1026,6 +1154,21 @@ Return ONLY valid JSON, no markdown formatting, no explanations."""
                 for artifact in artifacts:
                     if hasattr(artifact, "data") and hasattr(artifact, "name"):
                         if artifact.name.endswith(f".{output_format}"):
+                            error = _document_precheck_error(
+                                output_format, artifact.data, user_request
+                            )
+                            if error:
+                                # Regenerate through the code generation path
+                                logger.warning(
+                                    f"[TEMPLATE] {error}, falling back to code generation"
+                                )
+                                return self._handle_document_generation(
+                                    domain=domain,
+                                    user_request=user_request,
+                                    csv_data=csv_data,
+                                    output_format=output_format,
+                                    **kwargs,
+                                )
                             return {
                                 "success": True,
                                 "file_url": f"data:application/{output_format};base64,{base64.b64encode(artifact.data).decode('utf-8')}",
@@ -1070,6 +1213,52 @@ Return ONLY valid JSON, no markdown formatting, no explanations."""
             }
 
 
+def _template_document_result(
+    data: bytes, output_format: str, generation_method: str
+) -> dict:
+    """
+    Build the result for a document rendered from a template.
+
+    Args:
+        data: Document bytes
+        output_format: Document format
+        generation_method: How the document was produced
+
+    Returns:
+        Dictionary with document generation results
+    """
+    return {
+        "success": True,
+        "file_url": f"data:application/{output_format};base64,{base64.b64encode(data).decode('utf-8')}",
+        "file_name": f"output.{output_format}",
+        "output_format": output_format,
+        "message": f"{output_format.upper()} document generated successfully using template",
+        "generation_method": generation_method,
+    }
+
+
+def _document_precheck_error(
+    output_format: str, data: bytes, user_request: str = ""
+) -> Optional[str]:
+    """
+    Run the local pre-check on a generated document.
+
+    Args:
+        output_format: Document format (docx, xlsx, pdf)
+        data: Document bytes
+        user_request: The user's request (for the expected chart count)
+
+    Returns:
+        Error message if the document is clearly broken, otherwise None
+    """
+    if not ConfigManager.get("ARTIFACT_PRECHECK_ENABLED"):
+        return None
+    check = check_artifact(output_format, data, user_request)
+    if not check.broken:
+        return None
+    return f"Generated {output_format} failed pre-check: {'; '.join(check.issues)}"
+
+
 def execute_task(
     domain: str,
     user_request: str,
@@ -1077,6 +1266,7 @@ def execute_task(
     task_type: Optional[str] = None,
     output_format: Optional[str] = None,
     few_shot_examples: Optional[List[Any]] = None,
+    deadline: Optional[Deadline] = None,
     **kwargs,
 ) -> dict:
     """
@@ -1092,21 +1282,24 @@ def execute_task(
         task_type: Optional explicit task type (visualization, document, spreadsheet)
         output_format: Optional explicit output format (image, docx, xlsx, pdf)
         few_shot_examples: Pre-fetched few-shot examples (Issue #6)
+        deadline: Task deadline bounding LLM calls, sandbox runs and retries
+            (defaults to the caller's current deadline, if any)
         **kwargs: Additional arguments passed to handler
 
     Returns:
         Dictionary with execution results
     """
     router = TaskRouter(llm_service=kwargs.get("llm_service"))
-    return router.route(
-        domain=domain,
-        user_request=user_request,
-        csv_data=csv_data,
-        task_type=task_type,
-        output_format=output_format,
-        few_shot_examples=few_shot_examples,
-        **kwargs,
-    )
+    with deadline_scope(deadline):
+        return router.route(
+            domain=domain,
+            user_request=user_request,
+            csv_data=csv_data,
+            task_type=task_type,
+            output_format=output_format,
+            few_shot_examples=few_shot_examples,
+            **kwargs,
+        )
 
 
 # =============================================================================
@@ -1177,21 +1370,23 @@ Return ONLY the Python code, no markdown."""
 
         try:
             # Generate code using LLM
-            result = self.llm.complete(
-                prompt=prompt,
-                temperature=0.3,
-                max_tokens=2000,
-                system_prompt=system_prompt,
-            )
-
-            code = result["content"].strip()
-            # Extract code from markdown if present
-            code_match = re.search(r"```python\s*([\s\S]*?)\s*```", code)
-            if code_match:
-                code = code_match.group(1).strip()
+            code = self._generate_code(prompt, system_prompt)
 
             # Execute the generation
-            return self._execute_generation(code, csv_data, **kwargs)
+            result = self._execute_generation(code, csv_data, **kwargs)
+
+            # A clearly broken document is regenerated once, with the issues
+            precheck_error = result.pop("precheck_error", None)
+            if precheck_error:
+                logger.warning(f"[DOCUMENT] {precheck_error}, regenerating")
+                retry_prompt = f"""{prompt}
+
+The previous code produced a broken document: {precheck_error}
+Fix the code so the saved document contains the requested content."""
+                code = self._generate_code(retry_prompt, system_prompt)
+                result = self._execute_generation(code, csv_data, **kwargs)
+                result.pop("precheck_error", None)
+            return result
 
         except Exception as e:
             return {
@@ -1201,6 +1396,31 @@ Return ONLY the Python code, no markdown."""
                 "document_type": "document",
             }
 
+    def _generate_code(self, prompt: str, system_prompt: str) -> str:
+        """
+        Generate document code with the LLM.
+
+        Args:
+            prompt: User prompt
+            system_prompt: System prompt
+
+        Returns:
+            Python code, without markdown fences
+        """
+        result = self.llm.complete(
+            prompt=prompt,
+            temperature=0.3,
+            max_tokens=2000,
+            system_prompt=system_prompt,
+        )
+
+        code = result["content"].strip()
+        # Extract code from markdown if present
+        code_match = re.search(r"```python\s*([\s\S]*?)\s*```", code)
+        if code_match:
+            code = code_match.group(1).strip()
+        return code
+
     def _build_system_prompt(self) -> str:
         """
         Build domain-specific system prompt for document generation.
@@ -1279,8 +1499,8 @@ Return ONLY Python code, no markdown."""
         Returns:
             Dictionary with execution results
         """
-        # Wrap with CSV data
-        code_with_csv = f'csv_data = """{csv_data}"""\n\n' + code
+        # Read the staged CSV data
+        code_with_csv = DATA_PREAMBLE + code
 
         # Get execution parameters
         e2b_api_key = kwargs.get("api_key") or os.environ.get("E2B_API_KEY")
@@ -1288,7 +1508,11 @@ Return ONLY Python code, no markdown."""
 
         # Execute in sandbox
         success, sandbox_result, _, artifacts = _execute_code_in_sandbox(
-            code_with_csv, e2b_api_key, sandbox_timeout, self.output_format
+            code_with_csv,
+            e2b_api_key,
+            sandbox_timeout,
+            self.output_format,
+            input_files=_data_inputs(csv_data),
         )
 
         # Parse result
@@ -1311,6 +1535,17 @@ Return ONLY Python code, no markdown."""
             for artifact in artifacts:
                 if hasattr(artifact, "data") and hasattr(artifact, "name"):
                     if artifact.name.endswith(f".{self.output_format}"):
+                        error = _document_precheck_error(
+                            self.output_format, artifact.data
+                        )
+                        if error:
+                            return {
+                                "success": False,
+                                "message": error,
+                                "output_format": self.output_format,
+                                "document_type": "document",
+                                "precheck_error": error,
+                            }
                         mime_type = (
                             "pdf"
                             if self.output_format == "pdf"
@@ -1453,13 +1688,17 @@ Return ONLY the Python code, no markdown."""
             if code_match:
                 code = code_match.group(1).strip()
 
-            code_with_csv = f'csv_data = """{csv_data}"""\n\n' + code
+            code_with_csv = DATA_PREAMBLE + code
 
             e2b_api_key = kwargs.get("api_key") or os.environ.get("E2B_API_KEY")
             sandbox_timeout = kwargs.get("sandbox_timeout", 120)
 
             success, sandbox_result, _, artifacts = _execute_code_in_sandbox(
-                code_with_csv, e2b_api_key, sandbox_timeout, "docx"
+                code_with_csv,
+                e2b_api_key,
+                sandbox_timeout,
+                "docx",
+                input_files=_data_inputs(csv_data),
             )
 
             return self._parse_result(success, sandbox_result, artifacts, "summary")
@@ -1522,13 +1761,17 @@ Return ONLY the Python code, no markdown."""
             if code_match:
                 code = code_match.group(1).strip()
 
-            code_with_csv = f'csv_data = """{csv_data}"""\n\n' + code
+            code_with_csv = DATA_PREAMBLE + code
 
             e2b_api_key = kwargs.get("api_key") or os.environ.get("E2B_API_KEY")
             sandbox_timeout = kwargs.get("sandbox_timeout", 120)
 
             success, sandbox_result, _, artifacts = _execute_code_in_sandbox(
-                code_with_csv, e2b_api_key, sandbox_timeout, "docx"
+                code_with_csv,
+                e2b_api_key,
+                sandbox_timeout,
+                "docx",
+                input_files=_data_inputs(csv_data),
             )
 
             return self._parse_result(success, sandbox_result, artifacts, "detailed")
@@ -1561,7 +1804,36 @@ Return ONLY the Python code, no markdown."""
         first_line = csv_data.strip().split("\n")[0]
         csv_headers = [h.strip() for h in first_line.split(",")]
 
-        # Build system prompt for combined report
+        try:
+            code = self._generate_combined_code(
+                user_request, csv_headers, len(visualizations)
+            )
+            return self._execute_combined_code(
+                code, csv_data, visualizations, **kwargs
+            )
+
+        except Exception as e:
+            return self._combined_error(e)
+
+    def _generate_combined_code(
+        self, user_request: str, csv_headers: list, figure_count: int
+    ) -> str:
+        """
+        Generate the code that assembles a combined report.
+
+        Only the number of figures goes into the prompt, so the code can be
+        generated while the figures are still being rendered. Figures that
+        fail to render are left out of the list, so the prompt asks for code
+        that loops over whatever the list holds instead of indexing it.
+
+        Args:
+            user_request: The user's request
+            csv_headers: CSV column headers
+            figure_count: Number of visualizations planned for the report
+
+        Returns:
+            Python code that reads the figures from a 'visualizations' list
+        """
         system_prompt = """You are an expert report generator. Create a comprehensive report
 that combines text analysis with embedded visualizations.
 
@@ -1580,62 +1852,78 @@ The code must:
 
 Return ONLY Python code, no markdown."""
 
-        # Prepare visualization data for the prompt
-        viz_info = []
-        for i, viz in enumerate(visualizations):
-            viz_info.append(
-                f"Visualization {i + 1}: {viz[:100]}..."
-            )  # Truncate for prompt
-
         prompt = f"""CSV Headers: {csv_headers}
 User Request: {user_request}
 Domain: {self.domain}
-Visualizations to include: {len(visualizations)} charts
+Visualizations to include: up to {figure_count} charts
 
 Generate Python code to create a comprehensive report with visualizations.
 The code should:
 1. Read the CSV data using pandas
 2. Create sections with analysis text
-3. Embed the provided visualizations (base64 encoded images)
+3. Embed every image in the predefined 'visualizations' list of base64 data
+   URLs. Iterate over the list (for viz in visualizations) and do not index
+   it by position: it may hold fewer charts than planned, or none
 4. Save it to 'output.docx'
 5. Print a JSON result with keys: file_path, success
 
 Return ONLY the Python code, no markdown."""
 
-        try:
-            result = self.llm.complete(
-                prompt=prompt,
-                temperature=0.3,
-                max_tokens=2500,
-                system_prompt=system_prompt,
-            )
+        result = self.llm.complete(
+            prompt=prompt,
+            temperature=0.3,
+            max_tokens=2500,
+            system_prompt=system_prompt,
+        )
 
-            code = result["content"].strip()
-            code_match = re.search(r"```python\s*([\s\S]*?)\s*```", code)
-            if code_match:
-                code = code_match.group(1).strip()
+        code = result["content"].strip()
+        code_match = re.search(r"```python\s*([\s\S]*?)\s*```", code)
+        if code_match:
+            code = code_match.group(1).strip()
+        return code
 
-            # Add visualization data to code
-            viz_code = f"visualizations = {visualizations}\n\n"
-            code_with_csv = f'csv_data = """{csv_data}"""\n\n' + viz_code + code
+    def _execute_combined_code(
+        self, code: str, csv_data: str, visualizations: list, **kwargs
+    ) -> dict:
+        """
+        Run the combined report code with the rendered figures.
 
-            e2b_api_key = kwargs.get("api_key") or os.environ.get("E2B_API_KEY")
-            sandbox_timeout = kwargs.get("sandbox_timeout", 120)
+        Args:
+            code: Code from _generate_combined_code()
+            csv_data: CSV data as string
+            visualizations: List of visualization base64 data URLs
+            **kwargs: Additional arguments (api_key, sandbox_timeout)
 
-            success, sandbox_result, _, artifacts = _execute_code_in_sandbox(
-                code_with_csv, e2b_api_key, sandbox_timeout, "docx"
-            )
+        Returns:
+            Dictionary with combined report results
+        """
+        # Add visualization data to code
+        viz_code = f"visualizations = {visualizations}\n\n"
+        code_with_csv = DATA_PREAMBLE + viz_code + code
 
-            return self._parse_result(success, sandbox_result, artifacts, "combined")
+        e2b_api_key = kwargs.get("api_key") or os.environ.get("E2B_API_KEY")
+        sandbox_timeout = kwargs.get("sandbox_timeout", 120)
 
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Combined report generation error: {str(e)}",
-                "output_format": "docx",
-                "document_type": "report",
-                "report_type": "combined",
-            }
+        success, sandbox_result, _, artifacts = _execute_code_in_sandbox(
+            code_with_csv,
+            e2b_api_key,
+            sandbox_timeout,
+            "docx",
+            input_files=_data_inputs(csv_data),
+        )
+
+        return self._parse_result(success, sandbox_result, artifacts, "combined")
+
+    @staticmethod
+    def _combined_error(error: Exception) -> dict:
+        """Result of a combined report that failed with an exception."""
+        return {
+            "success": False,
+            "message": f"Combined report generation error: {str(error)}",
+            "output_format": "docx",
+            "document_type": "report",
+            "report_type": "combined",
+        }
 
     def _create_combined_report(
         self, user_request: str, csv_data: str, **kwargs
@@ -1643,6 +1931,12 @@ Return ONLY the Python code, no markdown."""
         """
         Internal method to create a combined report with visualizations.
 
+        The report is built as a dependency graph: the figure and the
+        report's assembly code are generated concurrently (within the global
+        LLM and sandbox limits), and the report is assembled once both are
+        done, so latency follows the slower step rather than their sum. Set
+        REPORT_PARALLEL_ENABLED to False to run the steps one after another.
+
         Args:
             user_request: The user's request
             csv_data: CSV data as string
@@ -1651,22 +1945,45 @@ Return ONLY the Python code, no markdown."""
         Returns:
             Dictionary with combined report results
         """
-        # First generate visualizations
-        viz_result = execute_data_visualization(
-            csv_data=csv_data, user_request=user_request, llm_service=self.llm, **kwargs
-        )
-
-        visualizations = []
-        if viz_result.get("success") and viz_result.get("image_url"):
-            visualizations.append(viz_result["image_url"])
+        first_line = csv_data.strip().split("\n")[0]
+        csv_headers = [h.strip() for h in first_line.split(",")]
 
-        # Then combine with report
-        return self.combine_with_visualizations(
-            user_request=user_request,
-            csv_data=csv_data,
-            visualizations=visualizations,
-            **kwargs,
-        )
+        def render_figure(_) -> Optional[str]:
+            viz_result = execute_data_visualization(
+                csv_data=csv_data,
+                user_request=user_request,
+                llm_service=self.llm,
+                **kwargs,
+            )
+            if viz_result.get("success") and viz_result.get("image_url"):
+                return viz_result["image_url"]
+            return None
+
+        steps = [
+            GraphStep("figure", render_figure),
+            GraphStep(
+                "code",
+                lambda _: self._generate_combined_code(user_request, csv_headers, 1),
+            ),
+            GraphStep(
+                "report",
+                lambda results: self._execute_combined_code(
+                    results["code"],
+                    csv_data,
+                    [results["figure"]] if results["figure"] else [],
+                    **kwargs,
+                ),
+                depends_on=("figure", "code"),
+            ),
+        ]
+
+        max_workers = ConfigManager.get("REPORT_MAX_CONCURRENCY")
+        if not ConfigManager.get("REPORT_PARALLEL_ENABLED"):
+            max_workers = 1
+        try:
+            return run_task_graph(steps, max_workers=max_workers)["report"]
+        except Exception as e:
+            return self._combined_error(e)
 
     def _build_summary_system_prompt(self) -> str:
         """
@@ -1909,7 +2226,7 @@ I will provide you with:
 2. The user's visualization request
 
 Your task is to generate ONLY valid Python code (not JSON) that:
-- Uses pandas to read data from a variable named 'csv_data' (a string containing CSV-formatted data)
+- Uses pandas to read the CSV data file whose path is in a variable named 'data_path'
 - Uses matplotlib to create an appropriate visualization suitable for legal context
 - Uses professional, clear styling appropriate for legal documents
 - Saves the figure to a base64-encoded PNG string in a variable named 'img_base64'
@@ -1922,7 +2239,7 @@ Visualization guidelines for legal data:
 - Consider confidentiality in how data is presented
 
 The code MUST:
-1. Read data using: df = pd.read_csv(io.StringIO(csv_data))
+1. Read data using: df = pd.read_csv(data_path)
 2. Create appropriate matplotlib chart based on user's request
 3. Save to base64: img_base64 = base64.b64encode(buf.read()).decode('utf-8')
 4. Print: print(json.dumps({{'image_url': f'data:image/png;base64,{{img_base64}}', 'chart_type': '...', 'columns': [...], 'success': True}}))
@@ -1948,7 +2265,7 @@ I will provide you with:
 2. The user's visualization request
 
 Your task is to generate ONLY valid Python code (not JSON) that:
-- Uses pandas to read data from a variable named 'csv_data' (a string containing CSV-formatted data)
+- Uses pandas to read the CSV data file whose path is in a variable named 'data_path'
 - Uses matplotlib to create appropriate financial visualizations
 - Uses professional styling suitable for financial reports and presentations
 - Saves the figure to a base64-encoded PNG string in a variable named 'img_base64'
@@ -1962,7 +2279,7 @@ Visualization guidelines for accounting data:
 - Consider creating comparative charts (period over period, budget vs actual)
 
 The code MUST:
-1. Read data using: df = pd.read_csv(io.StringIO(csv_data))
+1. Read data using: df = pd.read_csv(data_path)
 2. Create appropriate matplotlib chart based on user's request
 3. Save to base64: img_base64 = base64.b64encode(buf.read()).decode('utf-8')
 4. Print: print(json.dumps({{'image_url': f'data:image/png;base64,{{img_base64}}', 'chart_type': '...', 'columns': [...], 'success': True}}))
@@ -1978,13 +2295,13 @@ I will provide you with:
 2. The user's visualization request
 
 Your task is to generate ONLY valid Python code (not JSON) that:
-- Uses pandas to read data from a variable named 'csv_data' (a string containing CSV-formatted data)
+- Uses pandas to read the CSV data file whose path is in a variable named 'data_path'
 - Uses matplotlib to create an appropriate visualization
 - Saves the figure to a base64-encoded PNG string in a variable named 'img_base64'
 - Prints a JSON result with these exact keys: image_url, chart_type, columns, success
 
 The code MUST:
-1. Read data using: df = pd.read_csv(io.StringIO(csv_data))
+1. Read data using: df = pd.read_csv(data_path)
 2. Create appropriate matplotlib chart based on user's request
 3. Save to base64: img_base64 = base64.b64encode(buf.read()).decode('utf-8')
 4. Print: print(json.dumps({{'image_url': f'data:image/png;base64,{{img_base64}}', 'chart_type': '...', 'columns': [...], 'success': True}}))
@@ -1992,6 +2309,111 @@ The code MUST:
 Return ONLY the Python code, no explanations or markdown. The code should be complete and ready to execute."""
 
 
+# =============================================================================
+# STREAMED CODE GENERATION
+# =============================================================================
+
+# Openings that mean the model declined instead of writing code
+REFUSAL_PATTERN = re.compile(
+    r"^\s*(I'm sorry|I am sorry|I apologi[sz]e|I can't|I cannot|I can not|"
+    r"I'm unable|I am unable|I won't|As an AI)",
+    re.IGNORECASE,
+)
+
+# Characters of leading text inspected for a refusal
+REFUSAL_CHECK_CHARS = 60
+
+
+class CodeGenerationAborted(Exception):
+    """Raised when a streamed code completion is refused or empty."""
+
+    pass
+
+
+def _stream_code_completion(
+    llm: LLMService,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    system_prompt: str,
+) -> str:
+    """
+    Stream a code-generation completion and stop as soon as the code is in.
+
+    Consumes the stream incrementally instead of waiting for the whole
+    completion:
+    - Once a fenced code block closes, the stream is closed, so trailing
+      prose after the code is never generated
+    - A response that opens with a refusal is aborted after a few tokens
+
+    The stream goes through llm.complete_streaming_collected(), so it is
+    cached and shared with concurrent identical requests, like complete().
+
+    Args:
+        llm: LLMService to stream from
+        prompt: The user prompt
+        temperature: Sampling temperature
+        max_tokens: Maximum tokens to generate
+        system_prompt: The system prompt
+
+    Returns:
+        The streamed response text, ending at the closing code fence if any
+
+    Raises:
+        CodeGenerationAborted: If the model refuses or returns nothing
+    """
+    return llm.complete_streaming_collected(
+        prompt=prompt,
+        collect=_collect_code_stream,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        system_prompt=system_prompt,
+    )
+
+
+def _collect_code_stream(stream: Iterator[str]) -> str:
+    """
+    Read a code-generation stream up to the closing code fence.
+
+    Args:
+        stream: Chunks from complete_streaming()
+
+    Returns:
+        The streamed response text, ending at the closing code fence if any
+
+    Raises:
+        CodeGenerationAborted: If the model refuses or returns nothing
+    """
+    text = ""
+    refusal_checked = False
+    try:
+        for chunk in stream:
+            text += chunk
+
+            if not refusal_checked and len(text.lstrip()) >= REFUSAL_CHECK_CHARS:
+                refusal_checked = True
+                if REFUSAL_PATTERN.match(text):
+                    raise CodeGenerationAborted(f"LLM refused: {text.strip()}")
+
+            opening = text.find("```")
+            if opening != -1 and text.find("```", opening + 3) != -1:
+                logger.debug(
+                    f"[CODEGEN] Closing code fence after {len(text)} chars, "
+                    f"stopping stream"
+                )
+                break
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+
+    if not text.strip():
+        raise CodeGenerationAborted("LLM returned an empty response")
+    if not refusal_checked and REFUSAL_PATTERN.match(text):
+        raise CodeGenerationAborted(f"LLM refused: {text.strip()}")
+    return text
+
+
 class ArtifactReviewer:
     """
     Handles Pre-Submission Review: Self-evaluates the generated artifact
@@ -2028,7 +2450,34 @@ class ArtifactReviewer:
                 - feedback: Feedback for improvement if not approved
                 - issues: List of specific issues found
                 - success: Whether the review was performed
+                - precheck: Verdict of the local pre-check, if it decided
+                  without the LLM ("broken" or "fine")
         """
+        # Local pre-check: decide clear cases without an LLM round trip
+        if ConfigManager.get("ARTIFACT_PRECHECK_ENABLED"):
+            try:
+                image_data = base64.b64decode(image_base64 or "")
+            except ValueError:
+                image_data = b""
+            check = check_artifact("image", image_data, user_request)
+            if check.broken:
+                return {
+                    "approved": False,
+                    "feedback": "; ".join(check.issues),
+                    "issues": check.issues,
+                    "success": True,
+                    "precheck": check.verdict,
+                }
+            if skips_review(check):
+                logger.info("[ARTIFACT_CHECK] Chart passed pre-check, skipping review")
+                return {
+                    "approved": True,
+                    "feedback": "",
+                    "issues": [],
+                    "success": True,
+                    "precheck": check.verdict,
+                }
+
         system_prompt = """You are an expert data visualization reviewer. Your task is to evaluate
 whether a generated chart matches the user's request.
 
@@ -2069,6 +2518,7 @@ Return your review in JSON format."""
                 temperature=0.2,
                 max_tokens=1000,
                 system_prompt=system_prompt,
+                use_cache=True,  # Same request, chart type and code, same verdict
             )
 
             # Parse the LLM response
@@ -2139,13 +2589,13 @@ Return your review in JSON format."""
 
 Your task is to generate NEW Python code that addresses these issues.
 The code should:
-- Use pandas to read CSV data from a variable named 'csv_data' (a string)
+- Use pandas to read the CSV data file whose path is in a variable named 'data_path'
 - Use matplotlib to create an appropriate visualization that addresses the feedback
 - Save the figure to a base64-encoded PNG string in a variable named 'img_base64'
 - Print a JSON result with these exact keys: image_url, chart_type, columns, success
 
 The code MUST:
-1. Read CSV using: df = pd.read_csv(io.StringIO(csv_data))
+1. Read CSV using: df = pd.read_csv(data_path)
 2. Create appropriate matplotlib chart based on user's request AND feedback
 3. Save to base64: img_base64 = base64.b64encode(buf.read()).decode('utf-8')
 4. Print: print(json.dumps({{'image_url': f'data:image/png;base64,{{img_base64}}', 'chart_type': '...', 'columns': [...], 'success': True}}))
@@ -2159,14 +2609,13 @@ Requested Chart Type: {chart_type}
 Please generate new code that addresses the feedback. Return only the code, no markdown formatting."""
 
         try:
-            result = self.llm.complete(
+            response_content = _stream_code_completion(
+                self.llm,
                 prompt=prompt,
                 temperature=0.3,
                 max_tokens=2000,
                 system_prompt=system_prompt,
-            )
-
-            response_content = result["content"].strip()
+            ).strip()
             code = self._extract_python_code(response_content)
 
             return {"code": code, "success": True}
@@ -2203,7 +2652,10 @@ class CodeFixer:
     Handles retry logic for fixing failed code by feeding errors back to the LLM.
 
     When the E2B sandbox fails to execute code, this class generates a prompt
-    that includes the error message and asks the LLM to fix the code.
+    that includes the error message and asks the LLM to fix the code. Known
+    fixes for the same error (see fix_cache) are applied first, without the LLM.
+    Each error signature gets one known fix per fixer; if the error comes back,
+    the LLM is asked instead of reapplying the same patch.
     """
 
     def __init__(self, llm_service: Optional[LLMService] = None):
@@ -2215,6 +2667,7 @@ class CodeFixer:
                         creates one with default settings.
         """
         self.llm = llm_service or LLMService()
+        self._known_fix_signatures: set = set()
 
     def fix_code(
         self, failed_code: str, error_message: str, csv_headers: list, user_request: str
@@ -2233,12 +2686,32 @@ class CodeFixer:
                 - code: Fixed Python code
                 - success: Whether the fix was generated
                 - error: Any error during the fix attempt
+                - source: "fix_cache" or "llm"
+                - known_fix: The cache entry used (fix_cache only)
         """
+        fix_cache = get_fix_cache()
+        signature = error_signature(error_message)
+        if fix_cache is not None and signature not in self._known_fix_signatures:
+            known_fix = fix_cache.lookup(failed_code, error_message, csv_headers)
+            if known_fix is not None:
+                self._known_fix_signatures.add(signature)
+                logger.info(
+                    f"[FIX_CACHE] Applying known {known_fix.source} fix for "
+                    f"{known_fix.signature}"
+                )
+                return {
+                    "code": known_fix.code,
+                    "success": True,
+                    "error": None,
+                    "source": "fix_cache",
+                    "known_fix": known_fix,
+                }
+
         system_prompt = """You are an expert Python developer. The user's code failed to execute.
 
 Your task is to fix the code and return ONLY the corrected Python code (not JSON).
 The code should:
-- Use pandas to read CSV data from a variable named 'csv_data' (a string)
+- Use pandas to read the CSV data file whose path is in a variable named 'data_path'
 - Use matplotlib to create an appropriate visualization
 - Save the figure to a base64-encoded PNG string in a variable named 'img_base64'
 - Print a JSON result with these exact keys: image_url, chart_type, columns, success
@@ -2252,7 +2725,7 @@ Common errors to fix:
 - ValueError: Check value types and conversions
 
 The code MUST:
-1. Read CSV using: df = pd.read_csv(io.StringIO(csv_data))
+1. Read CSV using: df = pd.read_csv(data_path)
 2. Create appropriate matplotlib chart based on user's request
 3. Save to base64: img_base64 = base64.b64encode(buf.read()).decode('utf-8')
 4. Print: print(json.dumps({'image_url': f'data:image/png;base64,{img_base64}', 'chart_type': '...', 'columns': [...], 'success': True}}))
@@ -2273,21 +2746,52 @@ Failed code:
 Please fix the code and return ONLY the corrected Python code. No markdown formatting, no explanations."""
 
         try:
-            result = self.llm.complete(
+            response_content = _stream_code_completion(
+                self.llm,
                 prompt=prompt,
                 temperature=0.3,
                 max_tokens=2000,
                 system_prompt=system_prompt,
-            )
+            ).strip()
 
             # Extract Python code from response
-            response_content = result["content"].strip()
             code = self._extract_python_code(response_content)
 
-            return {"code": code, "success": True, "error": None}
+            return {"code": code, "success": True, "error": None, "source": "llm"}
 
         except Exception as e:
-            return {"code": "", "success": False, "error": str(e)}
+            return {"code": "", "success": False, "error": str(e), "source": "llm"}
+
+    def record_outcome(
+        self,
+        fix_result: dict,
+        failed_code: str,
+        error_message: str,
+        new_error: Optional[str],
+    ):
+        """
+        Report how a fix ran, so the fix cache can learn from it.
+
+        A fix counts as working if the run succeeded or failed with a
+        different error. Working LLM fixes are learned; known fixes have
+        their success or failure recorded.
+
+        Args:
+            fix_result: Result of fix_code()
+            failed_code: Code that was passed to fix_code()
+            error_message: Error that was passed to fix_code()
+            new_error: Error of the fixed code's run, or None if it succeeded
+        """
+        fix_cache = get_fix_cache()
+        if fix_cache is None or not fix_result.get("success"):
+            return
+        fixed = new_error is None or error_signature(new_error) != error_signature(
+            error_message
+        )
+        if fix_result.get("source") == "fix_cache":
+            fix_cache.record_outcome(fix_result["known_fix"], fixed)
+        elif fixed:
+            fix_cache.learn(error_message, failed_code, fix_result["code"])
 
     def _extract_python_code(self, response: str) -> str:
         """
@@ -2387,6 +2891,9 @@ class AIResponseGenerator:
         domain: Optional[str] = None,
         file_type: Optional[str] = None,
         enable_few_shot: Optional[bool] = None,
+        data_profile: Optional[dict] = None,
+        temperature: float = 0.3,
+        prompt_hint: Optional[str] = None,
     ) -> dict:
         """
         Generate Python code for data visualization using LLM.
@@ -2398,6 +2905,12 @@ class AIResponseGenerator:
                     If not provided, uses the domain set during initialization
             file_type: Optional file type (csv, excel, pdf)
             enable_few_shot: Optional override for few-shot learning (default: use class setting)
+            data_profile: Optional profile of the data (see prompt_budget); its
+                          column types and ranges are added to the prompt
+                          within the model's token budget
+            temperature: Sampling temperature
+            prompt_hint: Optional extra instruction (e.g., for a speculative
+                         candidate that should take a different approach)
 
         Returns:
             Dictionary containing:
@@ -2432,22 +2945,30 @@ class AIResponseGenerator:
         else:
             system_prompt = base_system_prompt
 
+        # Column types and ranges help the model pick columns and parse them
+        data_section = ""
+        if data_profile:
+            data_section = (
+                f"\n{PromptBudgeter.for_llm(self.llm).fit_profile(data_profile)}"
+            )
+
+        hint_section = f"\nApproach: {prompt_hint}" if prompt_hint else ""
+
         # Build user prompt with CSV headers and user request
-        prompt = f"""CSV Headers: {csv_headers}
-User Request: {user_request}
+        prompt = f"""CSV Headers: {csv_headers}{data_section}
+User Request: {user_request}{hint_section}
 
 Generate the Python code now. Return only the code, no markdown formatting."""
 
         try:
-            result = self.llm.complete(
+            # Stream the response so generation stops at the closing fence
+            response_content = _stream_code_completion(
+                self.llm,
                 prompt=prompt,
-                temperature=0.3,
+                temperature=temperature,
                 max_tokens=2000,
                 system_prompt=system_prompt,
-            )
-
-            # Parse the LLM response to extract Python code
-            response_content = result["content"].strip()
+            ).strip()
 
             # Try to extract Python code from the response
             code = self._extract_python_code(response_content)
@@ -2553,7 +3074,7 @@ import base64
 import json
 
 # Read CSV data
-df = pd.read_csv(io.StringIO(csv_data))
+df = pd.read_csv(data_path)
 
 # Get columns
 columns = df.columns.tolist()
@@ -2633,6 +3154,8 @@ def _execute_code_in_sandbox(
     sandbox_timeout: int,
     output_format: str = "image",
     is_complex_task: bool = False,
+    session: Optional["SandboxSession"] = None,
+    input_files: Optional[Dict[str, bytes]] = None,
 ) -> tuple:
     """
     Execute Python code in a sandbox (Docker or E2B) and return the result.
@@ -2646,6 +3169,9 @@ def _execute_code_in_sandbox(
         sandbox_timeout: Timeout in seconds
         output_format: The required output format (image, docx, pdf, xlsx)
         is_complex_task: Whether this is a complex task that may need longer timeout
+        session: Optional task session from _open_sandbox_session()
+        input_files: File name -> content, readable by the code at
+            input/<name> (see DATA_PREAMBLE)
 
     Returns:
         Tuple of (success, result/error_message, logs, artifacts)
@@ -2660,18 +3186,72 @@ def _execute_code_in_sandbox(
             f"Complex task detected, using extended timeout: {effective_timeout}s"
         )
 
+    # Size the run from the task's remaining budget
+    deadline = current_deadline()
+    if deadline is not None:
+        if deadline.expired:
+            return (
+                False,
+                "DEADLINE_EXCEEDED: Task deadline passed before execution",
+                None,
+                None,
+            )
+        effective_timeout = min(effective_timeout, max(1, int(deadline.remaining())))
+
     # Try Docker sandbox first (for cost savings)
     if USE_DOCKER_SANDBOX and DOCKER_SANDBOX_AVAILABLE:
         logger.info("Using Docker Sandbox for execution (cost: $0)")
-        return _execute_code_in_docker(code, effective_timeout, output_format)
+        return _execute_code_in_docker(
+            code,
+            effective_timeout,
+            output_format,
+            session=session,
+            input_files=input_files,
+        )
 
     # Fall back to E2B
     logger.info("Using E2B Sandbox for execution")
-    return _execute_code_in_e2b(code, e2b_api_key, effective_timeout, output_format)
+    return _execute_code_in_e2b(
+        code, e2b_api_key, effective_timeout, output_format, input_files
+    )
+
+
+def _open_sandbox_session(
+    setup_code: str,
+    input_files: Optional[Dict[str, bytes]] = None,
+    output_format: str = "image",
+) -> Optional["SandboxSession"]:
+    """
+    Open a persistent sandbox session for one task's attempts.
+
+    The setup code (loading the data) runs once; every attempt that
+    starts with it then only runs its own code. Close the session when the
+    task is done.
+
+    Args:
+        setup_code: Code all of the task's attempts start with
+        input_files: Files staged for every attempt
+        output_format: Output format of the attempts (selects the image)
+
+    Returns:
+        SandboxSession, or None when runs do not go to the Docker sandbox
+    """
+    if not (USE_DOCKER_SANDBOX and DOCKER_SANDBOX_AVAILABLE):
+        return None
+    try:
+        image = select_image(output_format, DOCKER_SANDBOX_IMAGE)
+        return LocalDockerSandbox(image=image).open_session(setup_code, input_files)
+    except Exception as e:
+        logger.warning(f"Could not open sandbox session: {e}")
+        return None
 
 
 def _execute_code_in_docker(
-    code: str, timeout: int, output_format: str = "image"
+    code: str,
+    timeout: int,
+    output_format: str = "image",
+    session: Optional["SandboxSession"] = None,
+    input_files: Optional[Dict[str, bytes]] = None,
 ) -> tuple:
     """
     Execute Python code in Docker sandbox.
@@ -2680,18 +3260,57 @@ def _execute_code_in_docker(
         code: The Python code to execute
         timeout: Timeout in seconds
         output_format: The required output format (image, docx, pdf, xlsx)
+        session: Optional task session to run the code in
+        input_files: File name -> content staged for the code (a session
+            stages its own)
 
     Returns:
         Tuple of (success, result/error_message, logs, artifacts)
     """
     try:
-        # Use LocalDockerSandbox to execute code
-        result: SandboxResult = LocalDockerSandbox.execute(
-            code=code,
-            image=DOCKER_SANDBOX_IMAGE,
-            timeout=timeout,
-            output_format=output_format,
-        )
+        # The format's prebuilt image (the generic one if it is not built)
+        image = select_image(output_format, DOCKER_SANDBOX_IMAGE)
+
+        # Identical code on identical data gives the stored outcome back
+        cache = get_sandbox_cache()
+        cache_key = None
+        result: Optional[SandboxResult] = None
+        if cache is not None:
+            cache_key = cache.make_key(
+                code,
+                image_version(image),
+                output_format,
+                digest_inputs(input_files or {}),
+            )
+            result = cache.get(cache_key)
+            if result is not None:
+                logger.info("[SANDBOX_CACHE] Hit, skipping container run")
+
+        if result is None:
+            # Wait for a share of the host's sandbox CPU and memory budget
+            with admit_sandbox_run() as admitted:
+                if not admitted:
+                    return (
+                        False,
+                        "SANDBOX_BUSY: No sandbox capacity freed up in time",
+                        None,
+                        None,
+                    )
+                if session is not None:
+                    result = session.run_code(
+                        code, timeout=timeout, output_format=output_format
+                    )
+                else:
+                    # Use LocalDockerSandbox to execute code
+                    result = LocalDockerSandbox.execute(
+                        code=code,
+                        image=image,
+                        timeout=timeout,
+                        output_format=output_format,
+                        input_files=input_files,
+                    )
+            if cache_key is not None:
+                cache.set(cache_key, result)
 
         # Convert Docker result to E2B-compatible format
         # Create a mock result object with logs and artifacts
@@ -2729,7 +3348,9 @@ def _execute_code_in_docker(
 
         # Get E2B API key from environment
         e2b_api_key = os.environ.get("E2B_API_KEY")
-        return _execute_code_in_e2b(code, e2b_api_key, timeout, output_format)
+        return _execute_code_in_e2b(
+            code, e2b_api_key, timeout, output_format, input_files
+        )
 
 
 def _execute_code_in_e2b(
@@ -2737,6 +3358,7 @@ def _execute_code_in_e2b(
     e2b_api_key: Optional[str],
     sandbox_timeout: int,
     output_format: str = "image",
+    input_files: Optional[Dict[str, bytes]] = None,
 ) -> tuple:
     """
     Execute Python code in E2B sandbox (fallback).
@@ -2746,6 +3368,7 @@ def _execute_code_in_e2b(
         e2b_api_key: E2B API key
         sandbox_timeout: Timeout in seconds
         output_format: The required output format (image, docx, pdf, xlsx)
+        input_files: File name -> content, uploaded to input/<name>
 
     Returns:
         Tuple of (success, result/error_message, logs, artifacts)
@@ -2759,14 +3382,28 @@ def _execute_code_in_e2b(
         )
 
     try:
-        with Sandbox(api_key=e2b_api_key) as sandbox:
+        # A prebuilt template already has the format's libraries
+        template = e2b_template(output_format)
+        sandbox_opts = {"template": template} if template else {}
+
+        with Sandbox(api_key=e2b_api_key, **sandbox_opts) as sandbox:
             # Pre-install dependencies based on the required output format
-            if output_format == "docx":
-                sandbox.commands.run("pip install python-docx pandas")
-            elif output_format == "pdf":
-                sandbox.commands.run("pip install reportlab pandas")
-            elif output_format == "xlsx":
-                sandbox.commands.run("pip install openpyxl pandas")
+            if template is None:
+                if output_format == "docx":
+                    sandbox.commands.run("pip install python-docx pandas")
+                elif output_format == "pdf":
+                    sandbox.commands.run("pip install reportlab pandas")
+                elif output_format == "xlsx":
+                    sandbox.commands.run("pip install openpyxl pandas")
+                elif output_format == "pptx":
+                    sandbox.commands.run("pip install python-pptx pandas")
+
+            # Upload input files next to the code's working directory
+            for name, data in (input_files or {}).items():
+                sandbox.files.write(
+                    f"{os.path.dirname(SANDBOX_DATA_PATH)}/{os.path.basename(name)}",
+                    data,
+                )
 
             result = sandbox.run_code(code, timeout=sandbox_timeout)
             # Extract artifacts from the result
@@ -3053,6 +3690,186 @@ def _should_retry_execution(error_message: str) -> bool:
     return False
 
 
+# Speculative candidates: (temperature, approach hint), in priority order
+SPECULATIVE_VARIANTS = [
+    (0.3, None),
+    (
+        0.7,
+        "Keep it simple: one chart of the most relevant columns; convert "
+        "numeric columns with pd.to_numeric(errors='coerce') and drop missing values.",
+    ),
+    (
+        0.9,
+        "Expect messy data: strip column names, parse dates with "
+        "errors='coerce', and aggregate before plotting when there are many rows.",
+    ),
+    (
+        0.5,
+        "Plot at most the top 20 categories by value and label the axes from "
+        "the column names.",
+    ),
+]
+
+# Smallest PNG accepted as a real chart by the cheap candidate check
+MIN_CHART_BYTES = 1024
+
+
+@dataclass
+class _SpeculativeCandidate:
+    """One speculative visualization attempt and its sandbox outcome."""
+
+    index: int
+    code: str
+    chart_type: str
+    success: bool = False
+    result_or_error: Any = None
+    seconds: float = 0.0
+    acceptable: bool = False
+
+
+def _is_acceptable_visualization(parsed_result: dict) -> bool:
+    """
+    Cheap check that a run produced a usable chart (no LLM review).
+
+    Args:
+        parsed_result: Result of _parse_sandbox_result()
+
+    Returns:
+        True if the result carries a decodable, non-trivial PNG
+    """
+    prefix = "data:image/png;base64,"
+    image_url = parsed_result.get("image_url") or ""
+    if not parsed_result.get("success") or not image_url.startswith(prefix):
+        return False
+    try:
+        data = base64.b64decode(image_url[len(prefix) :], validate=True)
+    except ValueError:
+        return False
+    return data.startswith(PNG_SIGNATURE) and len(data) >= MIN_CHART_BYTES
+
+
+def _run_speculative_candidates(
+    ai_generator: "AIResponseGenerator",
+    csv_headers: list,
+    user_request: str,
+    domain: Optional[str],
+    file_type: str,
+    data_profile: dict,
+    input_files: Dict[str, bytes],
+    e2b_api_key: Optional[str],
+    sandbox_timeout: int,
+    candidates: int,
+) -> Optional[_SpeculativeCandidate]:
+    """
+    Generate and run several diverse visualization candidates at once.
+
+    Each candidate uses its own temperature and approach hint (see
+    SPECULATIVE_VARIANTS) and runs in its own sandbox. The first candidate
+    whose chart passes _is_acceptable_visualization() wins and the sandboxes
+    of the others are cancelled.
+
+    Args:
+        ai_generator: Generator for the candidates' code
+        csv_headers: CSV column headers
+        user_request: The user's visualization request
+        domain: Domain for the system prompt
+        file_type: Type of the uploaded file
+        data_profile: Profile of the data (see prompt_budget)
+        input_files: Input files for the sandbox runs
+        e2b_api_key: E2B API key (used for fallback)
+        sandbox_timeout: Timeout for each run in seconds
+        candidates: Number of candidates (at most len(SPECULATIVE_VARIANTS))
+
+    Returns:
+        The winning candidate; without one, the first candidate that produced
+        code (so the fix loop can continue from it); None if none did
+    """
+    variants = SPECULATIVE_VARIANTS[: max(1, candidates)]
+    groups = [
+        SandboxCancelGroup() if DOCKER_SANDBOX_AVAILABLE else None for _ in variants
+    ]
+
+    def attempt(index: int) -> _SpeculativeCandidate:
+        temperature, hint = variants[index]
+        started = time.monotonic()
+        llm_result = ai_generator.generate_visualization_code(
+            csv_headers,
+            user_request,
+            domain=domain,
+            file_type=file_type,
+            data_profile=data_profile,
+            temperature=temperature,
+            prompt_hint=hint,
+        )
+        candidate = _SpeculativeCandidate(
+            index=index,
+            code=llm_result.get("code", ""),
+            chart_type=llm_result.get("chart_type", "bar"),
+        )
+        group = groups[index]
+        if not candidate.code or (group is not None and group.cancelled):
+            return candidate
+
+        with sandbox_cancel_scope(group) if group is not None else nullcontext():
+            success, result_or_error, _, _ = _execute_code_in_sandbox(
+                DATA_PREAMBLE + candidate.code,
+                e2b_api_key,
+                sandbox_timeout,
+                input_files=input_files,
+            )
+        candidate.success = success
+        candidate.result_or_error = result_or_error
+        candidate.seconds = time.monotonic() - started
+        candidate.acceptable = success and _is_acceptable_visualization(
+            _parse_sandbox_result(result_or_error, candidate.chart_type)
+        )
+        return candidate
+
+    # Candidates keep the task's deadline, sandbox client and output listener
+    pool = concurrent.futures.ThreadPoolExecutor(
+        max_workers=len(variants), thread_name_prefix="speculative"
+    )
+    futures = [
+        pool.submit(contextvars.copy_context().run, attempt, index)
+        for index in range(len(variants))
+    ]
+    deadline = current_deadline()
+    finished: List[_SpeculativeCandidate] = []
+    winner = None
+    try:
+        for future in concurrent.futures.as_completed(
+            futures, timeout=deadline.remaining() if deadline else None
+        ):
+            try:
+                candidate = future.result()
+            except Exception as e:
+                logger.warning(f"[SPECULATIVE] Candidate failed: {e}")
+                continue
+            finished.append(candidate)
+            if candidate.acceptable:
+                winner = candidate
+                break
+    except concurrent.futures.TimeoutError:
+        logger.warning("[SPECULATIVE] Task deadline passed while candidates ran")
+    finally:
+        # Stop the losers' sandboxes; their threads end on their own
+        for group in groups:
+            if group is not None:
+                group.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    if winner is not None:
+        logger.info(
+            f"[SPECULATIVE] Candidate {winner.index + 1}/{len(variants)} won "
+            f"after {winner.seconds:.1f}s"
+        )
+        return winner
+
+    with_code = sorted((c for c in finished if c.code), key=lambda c: c.index)
+    logger.info(f"[SPECULATIVE] No acceptable candidate of {len(variants)}")
+    return with_code[0] if with_code else None
+
+
 def execute_data_visualization(
     csv_data: str,
     user_request: str,
@@ -3068,6 +3885,7 @@ def execute_data_visualization(
     filename: Optional[str] = None,
     force_cloud: bool = False,
     few_shot_examples: Optional[List[Any]] = None,
+    speculative: Optional[bool] = None,
 ) -> dict:
     """
     Execute data visualization in a secure E2B sandbox with retry logic
@@ -3098,6 +3916,8 @@ def execute_data_visualization(
         filename: Original filename for detecting file type
         force_cloud: Force using cloud model even for basic tasks (default: False)
         few_shot_examples: Pre-fetched few-shot examples (Issue #6)
+        speculative: Generate SPECULATIVE_CANDIDATES candidates at once and
+            keep the first acceptable one (default: SPECULATIVE_VISUALIZATION_ENABLED)
 
     Returns:
         Dictionary containing:
@@ -3172,13 +3992,42 @@ def execute_data_visualization(
         domain=domain, 
         few_shot_examples=few_shot_examples
     )
-    llm_result = ai_generator.generate_visualization_code(
-        csv_headers, user_request, domain=domain, file_type=effective_file_type
-    )
+    data_profile = profile_csv(csv_data)
+    input_files = _data_inputs(csv_data)
+
+    # Speculative mode: several candidates at once instead of serial retries
+    if speculative is None:
+        speculative = ConfigManager.get("SPECULATIVE_VISUALIZATION_ENABLED")
+    speculation = None
+    if speculative:
+        speculation = _run_speculative_candidates(
+            ai_generator,
+            csv_headers,
+            user_request,
+            domain,
+            effective_file_type,
+            data_profile,
+            input_files,
+            e2b_api_key,
+            sandbox_timeout,
+            ConfigManager.get("SPECULATIVE_CANDIDATES"),
+        )
 
-    # Get the generated code
-    code = llm_result.get("code", "")
-    chart_type = llm_result.get("chart_type", "bar")
+    if speculation is not None:
+        code = speculation.code
+        chart_type = speculation.chart_type
+    else:
+        llm_result = ai_generator.generate_visualization_code(
+            csv_headers,
+            user_request,
+            domain=domain,
+            file_type=effective_file_type,
+            data_profile=data_profile,
+        )
+
+        # Get the generated code
+        code = llm_result.get("code", "")
+        chart_type = llm_result.get("chart_type", "bar")
 
     if not code:
         # Fallback if no code was generated
@@ -3194,147 +4043,192 @@ def execute_data_visualization(
             "last_error": "LLM failed to generate code",
         }
 
-    # Wrap the generated code with CSV data
-    code_with_csv = f'csv_data = """{csv_data}"""\n\n' + code
+    # Read the CSV data from the staged input file; the script stays the
+    # same size however large the data is
+    code_with_csv = DATA_PREAMBLE + code
 
     # Initialize retry tracking
     retry_count = 0
     review_attempts = 0
     last_error = None
     current_code = code_with_csv
+    deadline = current_deadline()
 
-    # Retry loop: attempt execution with potential fixes
-    while retry_count <= max_retries:
-        # Execute code in sandbox
-        success, result_or_error, _, _ = _execute_code_in_sandbox(
-            current_code, e2b_api_key, sandbox_timeout
-        )
+    # Fix applied before the current attempt, reported once it has run
+    code_fixer = None
+    pending_fix = None
 
-        if success:
-            # Parse successful result
-            parsed_result = _parse_sandbox_result(result_or_error, chart_type)
-
-            # Extract code for review (without csv_data assignment)
-            code_for_review = code_with_csv.replace(
-                f'csv_data = """{csv_data}"""\n\n', "", 1
-            )
-
-            # Pre-Submission Review: Validate artifact against user request
-            if enable_pre_submission_review and parsed_result.get("image_url"):
-                approved, feedback, issues = _perform_pre_submission_review(
-                    parsed_result, user_request, code_for_review, llm_service
+    # Attempts share one sandbox session: the data is loaded once and each
+    # attempt only runs its own code
+    session = _open_sandbox_session(DATA_PREAMBLE, input_files)
+    try:
+        # Retry loop: attempt execution with potential fixes
+        while retry_count <= max_retries:
+            if speculation is not None:
+                # The speculative candidate already ran
+                success = speculation.success
+                result_or_error = speculation.result_or_error
+                attempt_seconds = speculation.seconds
+                speculation = None
+            else:
+                # Execute code in sandbox
+                attempt_start = datetime.now()
+                success, result_or_error, _, _ = _execute_code_in_sandbox(
+                    current_code,
+                    e2b_api_key,
+                    sandbox_timeout,
+                    session=session,
+                    input_files=input_files,
                 )
+                # Another attempt is expected to take about as long as this one
+                attempt_seconds = (datetime.now() - attempt_start).total_seconds()
 
-                if not approved:
-                    # Review failed - try to regenerate with feedback
-                    review_attempts += 1
-                    logger.warning(f"Pre-Submission Review failed: {feedback}")
-                    logger.warning(f"Issues found: {issues}")
-
-                    if review_attempts <= max_review_attempts:
-                        logger.info(
-                            f"Regenerating code based on review feedback (attempt {review_attempts}/{max_review_attempts})..."
-                        )
-
-                        # Regenerate code with feedback
-                        reviewer = ArtifactReviewer(llm_service)
-                        regen_result = reviewer.regenerate_with_feedback(
-                            csv_headers=csv_headers,
-                            user_request=user_request,
-                            feedback=feedback,
-                            chart_type=chart_type,
-                        )
-
-                        if regen_result["success"] and regen_result["code"]:
-                            # Update code and retry execution
-                            current_code = (
-                                f'csv_data = """{csv_data}"""\n\n'
-                                + regen_result["code"]
-                            )
-                            chart_type = (
-                                ai_generator._extract_chart_type(regen_result["code"])
-                                or chart_type
-                            )
-                            continue  # Retry execution with new code
-                        else:
+            if pending_fix is not None:
+                code_fixer.record_outcome(
+                    *pending_fix, None if success else str(result_or_error)
+                )
+                pending_fix = None
+
+            if success:
+                # Parse successful result
+                parsed_result = _parse_sandbox_result(result_or_error, chart_type)
+
+                # Review the code that produced this chart (without the
+                # data preamble), not the first attempt's code
+                code_for_review = current_code.replace(DATA_PREAMBLE, "", 1)
+
+                # Pre-Submission Review: Validate artifact against user request
+                if enable_pre_submission_review and parsed_result.get("image_url"):
+                    approved, feedback, issues = _perform_pre_submission_review(
+                        parsed_result, user_request, code_for_review, llm_service
+                    )
+
+                    if not approved:
+                        # Review failed - try to regenerate with feedback
+                        review_attempts += 1
+                        logger.warning(f"Pre-Submission Review failed: {feedback}")
+                        logger.warning(f"Issues found: {issues}")
+
+                        if deadline is not None and not deadline.allows(
+                            attempt_seconds
+                        ):
                             logger.warning(
-                                f"Failed to regenerate code: {regen_result.get('error', 'Unknown error')}"
+                                f"[DEADLINE] Skipping review regeneration, {deadline}"
+                            )
+                        elif review_attempts <= max_review_attempts:
+                            logger.info(
+                                f"Regenerating code based on review feedback (attempt {review_attempts}/{max_review_attempts})..."
                             )
-                            # Continue to return current result even if review regeneration failed
-
-                    # Either exhausted review attempts or regeneration failed
-                    # Return what we have, but note the review failure
-                    execution_time = (datetime.now() - start_time).total_seconds()
-                    return {
-                        "success": parsed_result["success"],
-                        "image_url": parsed_result["image_url"],
-                        "chart_type": parsed_result["chart_type"],
-                        "message": f"Visualization generated but review feedback: {feedback}",
-                        "execution_time": execution_time,
-                        "retry_count": retry_count,
-                        "review_attempts": review_attempts,
-                        "last_error": None,
-                        "review_feedback": feedback,
-                        "review_issues": issues,
-                    }
-
-            # Return successful result
-            execution_time = (datetime.now() - start_time).total_seconds()
-            return {
-                "success": parsed_result["success"],
-                "image_url": parsed_result["image_url"],
-                "chart_type": parsed_result["chart_type"],
-                "message": parsed_result["message"],
-                "execution_time": execution_time,
-                "retry_count": retry_count,
-                "review_attempts": review_attempts,
-                "last_error": None,
-            }
-        else:
-            # Execution failed - this is an error we can potentially fix
-            last_error = result_or_error
-            retry_count += 1
-
-            # Smart retry: Only retry if error is transient or LLM-fixable (Issue #37)
-            if not _should_retry_execution(last_error):
-                logger.warning(
-                    f"Code execution failed with non-retryable error: {last_error}"
-                )
-                break
-
-            # If we've exhausted retries, break out
-            if retry_count > max_retries:
-                break
-
-            # Try to fix the code using the LLM
-            logger.warning(
-                f"Code execution failed (attempt {retry_count}/{max_retries}): {last_error}"
-            )
-            logger.info("Attempting to fix code with LLM...")
 
-            # Extract just the user code (without csv_data assignment)
-            user_code_only = code_with_csv.replace(
-                f'csv_data = """{csv_data}"""\n\n', "", 1
-            )
+                            # Regenerate code with feedback
+                            reviewer = ArtifactReviewer(llm_service)
+                            regen_result = reviewer.regenerate_with_feedback(
+                                csv_headers=csv_headers,
+                                user_request=user_request,
+                                feedback=feedback,
+                                chart_type=chart_type,
+                            )
 
-            code_fixer = CodeFixer(llm_service)
-            fix_result = code_fixer.fix_code(
-                failed_code=user_code_only,
-                error_message=last_error,
-                csv_headers=csv_headers,
-                user_request=user_request,
-            )
+                            if regen_result["success"] and regen_result["code"]:
+                                # Update code and retry execution
+                                current_code = DATA_PREAMBLE + regen_result["code"]
+                                chart_type = (
+                                    ai_generator._extract_chart_type(
+                                        regen_result["code"]
+                                    )
+                                    or chart_type
+                                )
+                                continue  # Retry execution with new code
+                            else:
+                                logger.warning(
+                                    f"Failed to regenerate code: {regen_result.get('error', 'Unknown error')}"
+                                )
+                                # Continue to return current result even if review regeneration failed
+
+                        # Either exhausted review attempts or regeneration failed
+                        # Return what we have, but note the review failure
+                        execution_time = (datetime.now() - start_time).total_seconds()
+                        return {
+                            "success": parsed_result["success"],
+                            "image_url": parsed_result["image_url"],
+                            "chart_type": parsed_result["chart_type"],
+                            "message": f"Visualization generated but review feedback: {feedback}",
+                            "execution_time": execution_time,
+                            "retry_count": retry_count,
+                            "review_attempts": review_attempts,
+                            "last_error": None,
+                            "review_feedback": feedback,
+                            "review_issues": issues,
+                        }
 
-            if fix_result["success"] and fix_result["code"]:
-                # Wrap fixed code with CSV data
-                current_code = f'csv_data = """{csv_data}"""\n\n' + fix_result["code"]
-                logger.info("LLM generated fix, retrying...")
+                # Return successful result
+                execution_time = (datetime.now() - start_time).total_seconds()
+                return {
+                    "success": parsed_result["success"],
+                    "image_url": parsed_result["image_url"],
+                    "chart_type": parsed_result["chart_type"],
+                    "message": parsed_result["message"],
+                    "execution_time": execution_time,
+                    "retry_count": retry_count,
+                    "review_attempts": review_attempts,
+                    "last_error": None,
+                }
             else:
-                # LLM failed to generate a fix
+                # Execution failed - this is an error we can potentially fix
+                last_error = result_or_error
+                retry_count += 1
+
+                # Smart retry: Only retry if error is transient or LLM-fixable (Issue #37)
+                if not _should_retry_execution(last_error):
+                    logger.warning(
+                        f"Code execution failed with non-retryable error: {last_error}"
+                    )
+                    break
+
+                # If we've exhausted retries, break out
+                if retry_count > max_retries:
+                    break
+
+                # Stop when another attempt would not finish within the task deadline
+                if deadline is not None and not deadline.allows(attempt_seconds):
+                    logger.warning(
+                        f"[DEADLINE] No time left for another attempt, {deadline}"
+                    )
+                    last_error = f"DEADLINE_EXCEEDED: {last_error}"
+                    break
+
+                # Try to fix the code using the LLM
                 logger.warning(
-                    f"LLM failed to generate fix: {fix_result.get('error', 'Unknown error')}"
+                    f"Code execution failed (attempt {retry_count}/{max_retries}): {last_error}"
                 )
-                break
+                logger.info("Attempting to fix code with LLM...")
+
+                # Extract just the user code (without csv_data assignment)
+                user_code_only = code_with_csv.replace(DATA_PREAMBLE, "", 1)
+
+                if code_fixer is None:
+                    code_fixer = CodeFixer(llm_service)
+                fix_result = code_fixer.fix_code(
+                    failed_code=user_code_only,
+                    error_message=last_error,
+                    csv_headers=csv_headers,
+                    user_request=user_request,
+                )
+
+                if fix_result["success"] and fix_result["code"]:
+                    pending_fix = (fix_result, user_code_only, last_error)
+                    # Wrap fixed code with CSV data
+                    current_code = DATA_PREAMBLE + fix_result["code"]
+                    logger.info("LLM generated fix, retrying...")
+                else:
+                    # LLM failed to generate a fix
+                    logger.warning(
+                        f"LLM failed to generate fix: {fix_result.get('error', 'Unknown error')}"
+                    )
+                    break
+    finally:
+        if session is not None:
+            session.close()
 
     # All retries exhausted
     execution_time = (datetime.now() - start_time).total_seconds()
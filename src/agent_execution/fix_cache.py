@@ -0,0 +1,431 @@
+"""
+Error-Signature Fix Cache
+
+Persistent store of known fixes for failed sandbox code. The same failures
+recur across tasks (a deprecated matplotlib/seaborn API, a wrong to_excel
+engine, a misspelled column), so CodeFixer consults this cache before the
+LLM: a known fix is applied deterministically in milliseconds, and only
+unknown failures cost an LLM round trip.
+
+How fixes are learned:
+- A failure's signature is its normalized final traceback line (numbers,
+  paths and addresses removed)
+- When an LLM fix makes the failure go away, the diff between the failed
+  and the fixed code is reduced to a few text replacements (the changed
+  fragment of each changed line) and stored under the signature
+- A stored patch applies to new code only if every fragment it replaces
+  occurs in it and the result still parses; patches that keep failing are
+  retired
+
+Features:
+- Built-in fix for missing columns (KeyError on a name close to a header)
+- Optional SQLite file that survives restarts
+- Hit-rate and known-fix success metrics for observability
+
+Configured via FIX_CACHE_ENABLED and FIX_CACHE_DISK_PATH.
+"""
+
+import ast
+import difflib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Patches with more edits are too task-specific to reuse
+MAX_PATCH_EDITS = 5
+
+# Replaced fragments shorter than this are widened to the whole line
+MIN_FRAGMENT_CHARS = 4
+
+# Patches kept per signature (the least successful are dropped)
+MAX_PATCHES_PER_SIGNATURE = 5
+
+# A patch failing this often, and more often than it worked, is retired
+RETIRE_AFTER_FAILURES = 3
+
+SOURCE_LEARNED = "learned"
+SOURCE_MISSING_COLUMN = "missing_column"
+
+_EXCEPTION_LINE = re.compile(
+    r"^\s*((?:\w+\.)*\w*(?:Error|Exception|Warning))\b:?(.*)$"
+)
+_KEY_ERROR = re.compile(r"KeyError:\s*['\"](.+?)['\"]")
+
+
+def error_signature(error_message: str) -> str:
+    """
+    Normalize an error message to the signature fixes are stored under.
+
+    The final exception line of a traceback is kept; numbers, file paths and
+    memory addresses are replaced so the same failure in different code or
+    data maps to the same signature.
+
+    Args:
+        error_message: Error output of the failed run
+
+    Returns:
+        The signature (empty string for an empty message)
+    """
+    lines = [line for line in (error_message or "").splitlines() if line.strip()]
+    last = lines[-1].strip() if lines else ""
+    for line in reversed(lines):
+        match = _EXCEPTION_LINE.match(line)
+        if match:
+            last = f"{match.group(1)}:{match.group(2)}".strip()
+            break
+
+    last = re.sub(r"0x[0-9a-fA-F]+", "<addr>", last)
+    last = re.sub(r"(?:/[\w.-]+)+", "<path>", last)
+    last = re.sub(r"\b\d+(?:\.\d+)?\b", "<num>", last)
+    return last
+
+
+def _changed_fragment(old: str, new: str) -> Tuple[str, str]:
+    """
+    Reduce a changed line to the fragment that changed.
+
+    The common prefix and suffix are trimmed, then the fragment is widened
+    to whole identifiers; fragments too short to be specific are widened to
+    the whole line.
+    """
+    start = 0
+    while start < min(len(old), len(new)) and old[start] == new[start]:
+        start += 1
+    end = 0
+    while (
+        end < min(len(old), len(new)) - start
+        and old[len(old) - 1 - end] == new[len(new) - 1 - end]
+    ):
+        end += 1
+
+    def is_word(char: str) -> bool:
+        return char.isalnum() or char == "_"
+
+    while start > 0 and is_word(old[start - 1]):
+        start -= 1
+    while end > 0 and is_word(old[len(old) - end]):
+        end -= 1
+
+    old_fragment = old[start : len(old) - end]
+    new_fragment = new[start : len(new) - end]
+    if len(old_fragment) < MIN_FRAGMENT_CHARS or not any(
+        is_word(c) for c in old_fragment
+    ):
+        return old.strip(), new.strip()
+    return old_fragment, new_fragment
+
+
+def extract_patch(failed_code: str, fixed_code: str) -> Optional[List[List[str]]]:
+    """
+    Reduce an LLM fix to reusable text replacements.
+
+    Only fixes that change lines in place are reduced; fixes that add or
+    remove lines, or change more than MAX_PATCH_EDITS lines, depend too much
+    on the surrounding code.
+
+    Args:
+        failed_code: Code that failed
+        fixed_code: Code that no longer fails
+
+    Returns:
+        List of [old fragment, new fragment], or None if not reusable
+    """
+    old_lines = [line.rstrip() for line in failed_code.splitlines()]
+    new_lines = [line.rstrip() for line in fixed_code.splitlines()]
+    matcher = difflib.SequenceMatcher(a=old_lines, b=new_lines, autojunk=False)
+
+    edits: List[List[str]] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        if tag != "replace" or i2 - i1 != j2 - j1:
+            return None
+        for old, new in zip(old_lines[i1:i2], new_lines[j1:j2]):
+            edit = list(_changed_fragment(old, new))
+            if edit not in edits:
+                edits.append(edit)
+
+    if not edits or len(edits) > MAX_PATCH_EDITS:
+        return None
+    return edits
+
+
+def apply_patch(code: str, patch: List[List[str]]) -> Optional[str]:
+    """
+    Apply stored text replacements to code.
+
+    Returns:
+        The patched code, or None if a fragment is missing, nothing changed
+        or the result does not parse
+    """
+    patched = code
+    for old, new in patch:
+        if old not in patched:
+            return None
+        patched = patched.replace(old, new)
+    if patched == code:
+        return None
+    try:
+        ast.parse(patched)
+    except SyntaxError:
+        return None
+    return patched
+
+
+def fix_missing_column(
+    code: str, error_message: str, csv_headers: List[str]
+) -> Optional[str]:
+    """
+    Fix a KeyError on a column name that is close to an actual header.
+
+    Catches case, whitespace and small spelling differences (e.g., 'revenue'
+    for 'Revenue ').
+
+    Returns:
+        The fixed code, or None if the error is not such a KeyError
+    """
+    match = _KEY_ERROR.search(error_message or "")
+    if not match or not csv_headers:
+        return None
+    missing = match.group(1)
+    headers = [str(h) for h in csv_headers]
+    if missing in headers:
+        return None
+
+    by_folded = {h.strip().lower(): h for h in headers}
+    column = by_folded.get(missing.strip().lower())
+    if column is None:
+        close = difflib.get_close_matches(missing, headers, n=1, cutoff=0.8)
+        if not close:
+            return None
+        column = close[0]
+
+    patched = code
+    for quote in ("'", '"'):
+        patched = patched.replace(f"{quote}{missing}{quote}", f"{quote}{column}{quote}")
+    return patched if patched != code else None
+
+
+@dataclass
+class KnownFix:
+    """A fix found in the cache, to be reported back with record_outcome()."""
+
+    code: str
+    signature: str
+    source: str
+    patch: Optional[str] = None  # Serialized patch (learned fixes only)
+
+
+class FixCache:
+    """
+    Maps error signatures to patches that fixed them before.
+
+    Patches live in SQLite (in memory unless a disk path is given) and are
+    tried most successful first.
+    """
+
+    def __init__(self, disk_path: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            disk_path: Optional path to a SQLite file that survives restarts
+        """
+        self.disk_path = disk_path
+        self._lock = threading.Lock()
+
+        if disk_path:
+            directory = os.path.dirname(disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(disk_path or ":memory:", check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS fix_patches ("
+            "signature TEXT NOT NULL, patch TEXT NOT NULL, "
+            "successes INTEGER NOT NULL DEFAULT 0, "
+            "failures INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, used_at REAL NOT NULL, "
+            "PRIMARY KEY (signature, patch))"
+        )
+        self._db.commit()
+        if disk_path:
+            logger.info(f"[FIX_CACHE] Persistent store at {disk_path}")
+
+        self._metrics = {
+            "lookups": 0,
+            "hits": 0,
+            "misses": 0,
+            "learned": 0,
+            "retired": 0,
+            "known_fix_successes": 0,
+            "known_fix_failures": 0,
+        }
+
+    def lookup(
+        self, failed_code: str, error_message: str, csv_headers: List[str]
+    ) -> Optional[KnownFix]:
+        """
+        Find a known fix for a failure.
+
+        Args:
+            failed_code: Code that failed
+            error_message: Error output of the failed run
+            csv_headers: CSV column headers of the task's data
+
+        Returns:
+            The fix, or None if no stored patch applies
+        """
+        signature = error_signature(error_message)
+        with self._lock:
+            self._metrics["lookups"] += 1
+
+            fixed = fix_missing_column(failed_code, error_message, csv_headers)
+            if fixed is not None:
+                self._metrics["hits"] += 1
+                return KnownFix(fixed, signature, SOURCE_MISSING_COLUMN)
+
+            rows = self._db.execute(
+                "SELECT patch FROM fix_patches WHERE signature = ? "
+                "ORDER BY successes - failures DESC, used_at DESC",
+                (signature,),
+            ).fetchall()
+            for (serialized,) in rows:
+                fixed = apply_patch(failed_code, json.loads(serialized))
+                if fixed is None:
+                    continue
+                self._db.execute(
+                    "UPDATE fix_patches SET used_at = ? "
+                    "WHERE signature = ? AND patch = ?",
+                    (time.time(), signature, serialized),
+                )
+                self._db.commit()
+                self._metrics["hits"] += 1
+                return KnownFix(fixed, signature, SOURCE_LEARNED, serialized)
+
+            self._metrics["misses"] += 1
+            return None
+
+    def learn(self, error_message: str, failed_code: str, fixed_code: str) -> bool:
+        """
+        Store the patch of a fix that worked.
+
+        Args:
+            error_message: Error output of the failed run
+            failed_code: Code that failed
+            fixed_code: Code that no longer fails with that error
+
+        Returns:
+            True if a reusable patch was stored
+        """
+        signature = error_signature(error_message)
+        patch = extract_patch(failed_code, fixed_code)
+        if not signature or patch is None:
+            return False
+        serialized = json.dumps(patch)
+        now = time.time()
+
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO fix_patches "
+                "(signature, patch, successes, failures, created_at, used_at) "
+                "VALUES (?, ?, 1, 0, ?, ?) "
+                "ON CONFLICT (signature, patch) DO UPDATE SET "
+                "successes = successes + 1, used_at = excluded.used_at",
+                (signature, serialized, now, now),
+            )
+            # Keep the most successful patches per signature
+            self._db.execute(
+                "DELETE FROM fix_patches WHERE signature = ? AND patch NOT IN ("
+                "SELECT patch FROM fix_patches WHERE signature = ? "
+                "ORDER BY successes - failures DESC, used_at DESC LIMIT ?)",
+                (signature, signature, MAX_PATCHES_PER_SIGNATURE),
+            )
+            self._db.commit()
+            self._metrics["learned"] += 1
+        logger.info(f"[FIX_CACHE] Learned {len(patch)}-edit fix for {signature}")
+        return True
+
+    def record_outcome(self, fix: KnownFix, fixed: bool):
+        """
+        Record whether a known fix made its failure go away.
+
+        Args:
+            fix: The fix returned by lookup()
+            fixed: True if the failure did not recur
+        """
+        with self._lock:
+            key = "known_fix_successes" if fixed else "known_fix_failures"
+            self._metrics[key] += 1
+            if fix.patch is None:
+                return
+
+            column = "successes" if fixed else "failures"
+            self._db.execute(
+                f"UPDATE fix_patches SET {column} = {column} + 1 "
+                "WHERE signature = ? AND patch = ?",
+                (fix.signature, fix.patch),
+            )
+            retired = self._db.execute(
+                "DELETE FROM fix_patches WHERE signature = ? AND patch = ? "
+                "AND failures >= ? AND failures > successes",
+                (fix.signature, fix.patch, RETIRE_AFTER_FAILURES),
+            ).rowcount
+            self._db.commit()
+            if retired:
+                self._metrics["retired"] += 1
+                logger.info(f"[FIX_CACHE] Retired a failing fix for {fix.signature}")
+
+    def clear(self):
+        """Remove all stored patches."""
+        with self._lock:
+            self._db.execute("DELETE FROM fix_patches")
+            self._db.commit()
+
+    def close(self):
+        """Close the SQLite connection."""
+        with self._lock:
+            self._db.close()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get cache metrics (lookups, hits, hit rate, known-fix outcomes)."""
+        with self._lock:
+            patches = self._db.execute(
+                "SELECT COUNT(*) FROM fix_patches"
+            ).fetchone()[0]
+            lookups = self._metrics["lookups"]
+            return {
+                **self._metrics,
+                "patches": patches,
+                "hit_rate": self._metrics["hits"] / lookups if lookups else 0.0,
+                "disk_enabled": self.disk_path is not None,
+            }
+
+
+# Global cache instance
+_global_fix_cache: Optional[FixCache] = None
+_global_fix_cache_lock = threading.Lock()
+
+
+def get_fix_cache() -> Optional[FixCache]:
+    """
+    Get the global fix cache, or None if it is disabled.
+
+    Configured via FIX_CACHE_ENABLED and FIX_CACHE_DISK_PATH.
+    """
+    global _global_fix_cache
+    if not ConfigManager.get("FIX_CACHE_ENABLED"):
+        return None
+    with _global_fix_cache_lock:
+        if _global_fix_cache is None:
+            _global_fix_cache = FixCache(ConfigManager.get("FIX_CACHE_DISK_PATH"))
+        return _global_fix_cache
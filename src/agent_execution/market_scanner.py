@@ -598,12 +598,13 @@ Job Description: {description}
 Evaluate this job posting and return JSON."""
 
         try:
-            # Use the LLM service
-            result = self.llm.complete(
+            # Use the LLM service (async so scans don't block the event loop)
+            result = await self.llm.complete_async(
                 prompt=prompt,
                 system_prompt=system_prompt,
                 temperature=0.3,
                 max_tokens=500,
+                use_cache=True,  # Postings are re-evaluated on every scan
             )
 
             # Parse the response
@@ -24,6 +24,8 @@ from datetime import datetime, timezone
 
 from src.llm_service import LLMService
 from src.agent_execution.file_parser import parse_file, detect_file_type
+from src.agent_execution.prompt_budget import PromptBudgeter, build_data_profile
+from src.utils.deadline import Deadline, current_deadline, deadline_scope
 
 # Import Traceloop decorators for OpenTelemetry observability
 from traceloop.sdk.decorators import workflow, task
@@ -487,6 +489,16 @@ class ContextExtractor:
                 context["raw_data"] = parsed.get("data_as_csv", "")
                 context["extraction_success"] = True
 
+                if parsed.get("data"):
+                    try:
+                        import pandas as pd
+
+                        context["data_summary"]["profile"] = build_data_profile(
+                            pd.DataFrame(parsed["data"])
+                        )
+                    except Exception as e:
+                        context["profile_error"] = str(e)
+
                 # Extract additional text from PDF if available
                 if parsed.get("extracted_text"):
                     context["extracted_text"] = parsed["extracted_text"]
@@ -518,6 +530,7 @@ class ContextExtractor:
                         include=["object"]
                     ).columns.tolist(),
                     "sample_data": df.head(5).to_dict("records"),
+                    "profile": build_data_profile(df),
                 }
                 context["raw_data"] = csv_data
                 context["extraction_success"] = True
@@ -573,7 +586,11 @@ class ContextExtractor:
             return {}
 
         headers = context.get("data_summary", {}).get("headers", [])
-        sample_data = context.get("data_summary", {}).get("sample_data", [])
+        profile = context.get("data_summary", {}).get("profile")
+        # Raw rows when they fit the budget, the stored profile otherwise
+        data_text = PromptBudgeter.for_llm(self.llm).fit(
+            csv_data=context.get("raw_data"), profile=profile
+        )
 
         system_prompt = f"""You are an expert data analyst specializing in {domain or "general"} data.
 Analyze the provided data structure and provide key insights that would help
@@ -586,7 +603,8 @@ Focus on:
 4. Important considerations for the domain"""
 
         prompt = f"""Data Headers: {headers}
-Sample Data (first 5 rows): {sample_data}
+Data:
+{data_text}
 
 Provide a brief analysis (2-3 sentences) and list 3-5 key insights about this data
 that would inform a work plan. Return JSON with keys: analysis, key_insights."""
@@ -765,6 +783,12 @@ Generate the work plan as JSON."""
                 f"Categorical Columns: {', '.join(data_summary['categorical_columns'])}"
             )
 
+        # Column types, ranges and samples, within the model's token budget
+        if data_summary.get("profile"):
+            parts.append(
+                PromptBudgeter.for_llm(self.llm).fit_profile(data_summary["profile"])
+            )
+
         # Key insights
         insights = context.get("key_insights", [])
         if insights:
@@ -1175,6 +1199,21 @@ class ResearchAndPlanOrchestrator:
         self.plan_executor = PlanExecutor(self.llm)
         self.plan_reviewer = PlanReviewer(self.llm)
 
+    def _deadline_passed(self, workflow_result: Dict[str, Any], step: str) -> bool:
+        """
+        Record a deadline failure for step if the task deadline has passed.
+
+        Returns:
+            True if the workflow should stop before step
+        """
+        deadline = current_deadline()
+        if deadline is None or not deadline.expired:
+            return False
+        print(f"Task deadline exceeded, skipping {step}")
+        workflow_result["failed_at"] = step
+        workflow_result["error"] = f"Deadline exceeded before {step}"
+        return True
+
     @workflow(name="research_and_plan_workflow")
     def execute_workflow(
         self,
@@ -1189,6 +1228,7 @@ class ResearchAndPlanOrchestrator:
         task_type: Optional[str] = None,
         output_format: Optional[str] = None,
         max_review_attempts: int = 2,
+        deadline: Optional[Deadline] = None,
     ) -> Dict[str, Any]:
         """
         Execute the complete Research & Plan workflow.
@@ -1205,10 +1245,42 @@ class ResearchAndPlanOrchestrator:
             task_type: Optional task type
             output_format: Optional output format
             max_review_attempts: Maximum review attempts
+            deadline: Task deadline; steps that start after it has passed are
+                skipped (defaults to the caller's current deadline, if any)
 
         Returns:
             Dictionary with complete workflow results
         """
+        with deadline_scope(deadline):
+            return self._run_workflow(
+                user_request=user_request,
+                domain=domain,
+                csv_data=csv_data,
+                file_content=file_content,
+                filename=filename,
+                file_type=file_type,
+                api_key=api_key,
+                sandbox_timeout=sandbox_timeout,
+                task_type=task_type,
+                output_format=output_format,
+                max_review_attempts=max_review_attempts,
+            )
+
+    def _run_workflow(
+        self,
+        user_request: str,
+        domain: str,
+        csv_data: Optional[str],
+        file_content: Optional[str],
+        filename: Optional[str],
+        file_type: Optional[str],
+        api_key: Optional[str],
+        sandbox_timeout: int,
+        task_type: Optional[str],
+        output_format: Optional[str],
+        max_review_attempts: int,
+    ) -> Dict[str, Any]:
+        """Run the workflow steps under the deadline set by execute_workflow()."""
         workflow_result = {
             "workflow": "research_and_plan",
             "started_at": datetime.now(timezone.utc).isoformat(),
@@ -1229,6 +1301,9 @@ class ResearchAndPlanOrchestrator:
             "context": extracted_context,
         }
 
+        if self._deadline_passed(workflow_result, "plan_generation"):
+            return workflow_result
+
         # Step 2: Generate Work Plan
         print("Step 2: Creating work plan...")
         plan_result = self.plan_generator.create_work_plan(
@@ -1255,6 +1330,9 @@ class ResearchAndPlanOrchestrator:
         # Get CSV data for execution
         exec_csv_data = extracted_context.get("raw_data") or csv_data or ""
 
+        if self._deadline_passed(workflow_result, "plan_execution"):
+            return workflow_result
+
         # Step 3: Execute Plan
         print("Step 3: Executing work plan in E2B sandbox...")
         execution_result = self.plan_executor.execute_plan(
@@ -1301,6 +1379,8 @@ class ResearchAndPlanOrchestrator:
             current_feedback = review_result.get("feedback", "")
 
             if not approved and review_attempts < max_review_attempts:
+                if self._deadline_passed(workflow_result, "artifact_review"):
+                    break
                 print(
                     f"Review not approved, attempt {review_attempts + 1}/{max_review_attempts}"
                 )
@@ -0,0 +1,322 @@
+"""
+Prompt Token Budgeting for Data Context
+
+Keeps the data portion of LLM prompts inside a per-model token budget.
+Small datasets are passed through as raw CSV; once the raw rows would
+exceed the budget they are replaced by a compact data profile:
+
+- Column types and null counts
+- Min / max / mean for numeric and datetime columns
+- Top categories for text columns
+- A stratified sample of rows (spread across the main category, or
+  evenly across the file when there is none)
+
+Profiles are computed with vectorized pandas operations and contain only
+JSON-serializable values, so they can be stored with the task's
+extracted context.
+
+Used by ContextExtractor, WorkPlanGenerator and AIResponseGenerator.
+Budgets come from PROMPT_DATA_TOKEN_BUDGET (cloud models) and
+PROMPT_DATA_TOKEN_BUDGET_LOCAL (local models, which have smaller
+context windows).
+"""
+
+import io
+import math
+from typing import Any, Dict, List, Optional
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Average characters per token. OpenAI tokenizers average ~4 characters of
+# English/CSV text per token; Llama-family tokenizers are a little less
+# efficient on numbers and punctuation, so local models use a lower ratio.
+CHARS_PER_TOKEN_CLOUD = 4.0
+CHARS_PER_TOKEN_LOCAL = 3.5
+
+# Categorical columns with at most this many distinct values can stratify
+MAX_STRATA = 20
+
+
+def estimate_tokens(text: str, is_local: bool = False) -> int:
+    """
+    Estimate how many tokens a text costs for a model.
+
+    Args:
+        text: Prompt text
+        is_local: Whether the text is for a local (Llama-family) model
+
+    Returns:
+        Estimated token count
+    """
+    ratio = CHARS_PER_TOKEN_LOCAL if is_local else CHARS_PER_TOKEN_CLOUD
+    return math.ceil(len(text) / ratio)
+
+
+def _to_native(value: Any) -> Any:
+    """Convert numpy/pandas scalars to JSON-serializable Python values."""
+    import pandas as pd
+
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        return round(value, 4)
+    return value
+
+
+def _stratified_sample(df, sample_rows: int) -> List[Dict[str, Any]]:
+    """
+    Pick sample rows that cover the data instead of just its head.
+
+    Rows are spread across the values of the first low-cardinality text
+    column; without one, rows are taken at even intervals through the file.
+    """
+    if sample_rows <= 0 or df.empty:
+        return []
+    if len(df) <= sample_rows:
+        sample = df
+    else:
+        strata = None
+        text_columns = df.select_dtypes(include=["object", "string", "category"])
+        for col in text_columns.columns:
+            if 1 < df[col].nunique() <= MAX_STRATA:
+                strata = col
+                break
+
+        if strata is not None:
+            # Round-robin through the groups: first row of each, then second...
+            rank = df.groupby(strata, sort=False, dropna=False).cumcount()
+            sample = df.loc[rank.sort_values(kind="stable").index[:sample_rows]]
+            sample = sample.sort_index()
+        else:
+            step = (len(df) - 1) / (sample_rows - 1) if sample_rows > 1 else 0
+            positions = sorted({round(i * step) for i in range(sample_rows)})
+            sample = df.iloc[positions]
+
+    return [
+        {str(k): _to_native(v) for k, v in row.items()}
+        for row in sample.to_dict("records")
+    ]
+
+
+def build_data_profile(
+    df, max_categories: int = 5, sample_rows: int = 5
+) -> Dict[str, Any]:
+    """
+    Summarize a DataFrame compactly for use in prompts.
+
+    Args:
+        df: DataFrame to profile
+        max_categories: Number of top values kept per text column
+        sample_rows: Number of stratified sample rows
+
+    Returns:
+        Dictionary with row_count, column_count, per-column stats and sample
+    """
+    import pandas as pd
+
+    null_counts = df.isna().sum()
+    numeric = df.select_dtypes(include=["number"])
+    datetimes = df.select_dtypes(include=["datetime"])
+    numeric_stats = (
+        numeric.agg(["min", "max", "mean"]) if not numeric.empty else pd.DataFrame()
+    )
+    datetime_stats = (
+        datetimes.agg(["min", "max"]) if not datetimes.empty else pd.DataFrame()
+    )
+
+    columns: Dict[str, Dict[str, Any]] = {}
+    for col in df.columns:
+        stats: Dict[str, Any] = {
+            "type": str(df[col].dtype),
+            "nulls": int(null_counts[col]),
+        }
+        if col in numeric_stats.columns:
+            stats["min"] = _to_native(numeric_stats.at["min", col])
+            stats["max"] = _to_native(numeric_stats.at["max", col])
+            stats["mean"] = _to_native(numeric_stats.at["mean", col])
+        elif col in datetime_stats.columns:
+            stats["min"] = _to_native(datetime_stats.at["min", col])
+            stats["max"] = _to_native(datetime_stats.at["max", col])
+        elif max_categories > 0:
+            counts = df[col].value_counts().head(max_categories)
+            stats["distinct"] = int(df[col].nunique())
+            stats["top"] = {str(k): int(v) for k, v in counts.items()}
+        columns[str(col)] = stats
+
+    return {
+        "row_count": int(len(df)),
+        "column_count": int(len(df.columns)),
+        "columns": columns,
+        "sample": _stratified_sample(df, sample_rows),
+    }
+
+
+def profile_csv(csv_data: str, **kwargs) -> Optional[Dict[str, Any]]:
+    """
+    Parse CSV text and profile it.
+
+    Returns:
+        Profile from build_data_profile(), or None if the data can't be parsed
+    """
+    import pandas as pd
+
+    try:
+        df = pd.read_csv(io.StringIO(csv_data))
+    except Exception as e:
+        logger.warning(f"[BUDGET] Could not parse data for profile: {e}")
+        return None
+    return build_data_profile(df, **kwargs)
+
+
+def format_data_profile(profile: Dict[str, Any], max_columns: Optional[int] = None) -> str:
+    """
+    Render a data profile as compact prompt text.
+
+    Args:
+        profile: Profile from build_data_profile()
+        max_columns: Only describe the first N columns (None for all)
+
+    Returns:
+        Multi-line profile text
+    """
+    columns = list(profile.get("columns", {}).items())
+    lines = [
+        f"Data profile: {profile.get('row_count', 0)} rows x "
+        f"{profile.get('column_count', len(columns))} columns"
+    ]
+
+    shown = columns if max_columns is None else columns[:max_columns]
+    for name, stats in shown:
+        parts = [stats.get("type", "?")]
+        if stats.get("nulls"):
+            parts.append(f"{stats['nulls']} nulls")
+        if "min" in stats:
+            range_text = f"range {stats['min']}..{stats['max']}"
+            if stats.get("mean") is not None:
+                range_text += f", mean {stats['mean']}"
+            parts.append(range_text)
+        if stats.get("top"):
+            top = ", ".join(f"{k} ({v})" for k, v in stats["top"].items())
+            parts.append(f"{stats.get('distinct', '?')} distinct, top: {top}")
+        lines.append(f"- {name}: {'; '.join(parts)}")
+    if len(shown) < len(columns):
+        lines.append(f"- ... {len(columns) - len(shown)} more columns")
+
+    sample = profile.get("sample") or []
+    if sample:
+        lines.append("Sample rows:")
+        lines.extend(f"  {row}" for row in sample)
+
+    return "\n".join(lines)
+
+
+class PromptBudgeter:
+    """
+    Fits data context into a token budget for one model.
+
+    Usage:
+        budgeter = PromptBudgeter.for_llm(llm)
+        data_text = budgeter.fit(csv_data=csv_data)
+    """
+
+    def __init__(self, budget_tokens: int, is_local: bool = False):
+        """
+        Initialize the budgeter.
+
+        Args:
+            budget_tokens: Tokens available for the data portion of a prompt
+            is_local: Whether the target model is local (affects estimates)
+        """
+        self.budget_tokens = budget_tokens
+        self.is_local = is_local
+
+    @classmethod
+    def for_llm(cls, llm: Optional[Any] = None) -> "PromptBudgeter":
+        """Create a budgeter using the configured budget for llm's model."""
+        is_local = False
+        if llm is not None:
+            try:
+                is_local = bool(llm.is_local())
+            except Exception:
+                is_local = False
+        key = "PROMPT_DATA_TOKEN_BUDGET_LOCAL" if is_local else "PROMPT_DATA_TOKEN_BUDGET"
+        return cls(ConfigManager.get(key), is_local=is_local)
+
+    def fits(self, text: str) -> bool:
+        """Whether text fits in the budget."""
+        return estimate_tokens(text, self.is_local) <= self.budget_tokens
+
+    def fit_profile(self, profile: Dict[str, Any]) -> str:
+        """
+        Render a profile, dropping detail until it fits the budget.
+
+        Sample rows go first, then top categories, then trailing columns.
+        """
+        candidate = dict(profile)
+        text = format_data_profile(candidate)
+        if self.fits(text):
+            return text
+
+        for sample_size in (2, 0):
+            candidate["sample"] = (profile.get("sample") or [])[:sample_size]
+            text = format_data_profile(candidate)
+            if self.fits(text):
+                return text
+
+        candidate["columns"] = {
+            name: {k: v for k, v in stats.items() if k != "top"}
+            for name, stats in profile.get("columns", {}).items()
+        }
+        text = format_data_profile(candidate)
+        max_columns = len(candidate["columns"])
+        while not self.fits(text) and max_columns > 1:
+            max_columns //= 2
+            text = format_data_profile(candidate, max_columns=max_columns)
+        return text
+
+    def fit(
+        self,
+        csv_data: Optional[str] = None,
+        df=None,
+        profile: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Return the data context for a prompt within the budget.
+
+        Raw CSV is used when it fits; otherwise a profile (computed from
+        df or csv_data if not given) is rendered to fit.
+
+        Args:
+            csv_data: Raw CSV text
+            df: DataFrame of the same data (avoids re-parsing)
+            profile: Precomputed profile from build_data_profile()
+
+        Returns:
+            Prompt text describing the data ("" if there is no data)
+        """
+        if csv_data and self.fits(csv_data):
+            return csv_data.strip()
+
+        if profile is None:
+            if df is not None:
+                profile = build_data_profile(df)
+            elif csv_data:
+                profile = profile_csv(csv_data)
+            if profile is None:
+                return ""
+
+        text = self.fit_profile(profile)
+        logger.debug(
+            f"[BUDGET] Replaced {profile.get('row_count', 0)} raw rows with a "
+            f"{estimate_tokens(text, self.is_local)}-token profile"
+        )
+        return text
@@ -0,0 +1,390 @@
+"""
+Sandbox Result Cache
+
+Content-addressed cache for sandbox executions. Arena variants, retries that
+reproduce identical code and repeat orders for the same dataset run the same
+script on the same data again; a hit returns the stored stdout, artifacts and
+exit status without starting a container.
+
+Keys cover everything that decides a run's outcome:
+- The code, normalized (comments, blank lines and trailing whitespace do
+  not change the key)
+- Digests of the input files the code reads
+- The sandbox image digest and the expected output format
+
+Features:
+- In-memory LRU tier bounded by total bytes
+- Optional SQLite tier that survives restarts, bounded the same way
+- Only reproducible outcomes are stored: timeouts, cancellations, deadline
+  misses, fatal-error stops and Docker errors always run again
+- Hit/miss/byte metrics for observability
+
+Configured via SANDBOX_CACHE_ENABLED, SANDBOX_CACHE_MAX_BYTES,
+SANDBOX_CACHE_TTL_SECONDS and SANDBOX_CACHE_DISK_PATH.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+import tokenize
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from src.agent_execution.docker_sandbox import (
+    SandboxArtifact,
+    SandboxLog,
+    SandboxResult,
+)
+from src.agent_execution.sandbox_images import image_digest
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Errors of runs whose outcome depends only on the code and its inputs.
+# Runs stopped on a fatal traceback are left out: the stop comes a grace
+# period after any traceback line, even a caught one, so whether the run
+# finished first depends on timing.
+_REPRODUCIBLE_ERRORS = ("Process exited with code",)
+
+# Exit code of a container killed from outside (e.g., out of memory)
+_KILLED_EXIT_CODE = "Process exited with code 137"
+
+
+def normalize_code(code: str) -> str:
+    """
+    Normalize code for the cache key.
+
+    Comments, blank lines and trailing whitespace are dropped; code that
+    does not tokenize only has its lines stripped of trailing whitespace.
+    """
+    try:
+        tokens = [
+            (token.type, token.string)
+            for token in tokenize.generate_tokens(io.StringIO(code).readline)
+            if token.type not in (tokenize.COMMENT, tokenize.NL)
+        ]
+        return tokenize.untokenize(tokens)
+    except (tokenize.TokenError, SyntaxError):
+        lines = (line.rstrip() for line in code.replace("\r\n", "\n").split("\n"))
+        return "\n".join(line for line in lines if line)
+
+
+def digest_inputs(files: Dict[str, bytes]) -> Dict[str, str]:
+    """
+    SHA-256 digests of input files.
+
+    Args:
+        files: Input file name -> content
+
+    Returns:
+        File name -> hex digest
+    """
+    return {name: hashlib.sha256(data).hexdigest() for name, data in files.items()}
+
+
+def image_version(image: str) -> str:
+    """
+    Version of a sandbox image for cache keys.
+
+    Returns:
+        The image digest, or the image name if Docker cannot tell
+    """
+    return image_digest(image) or image
+
+
+def is_cacheable(result: SandboxResult) -> bool:
+    """Whether a result would come out the same if the run were repeated."""
+    if result.timed_out:
+        return False
+    if result.success:
+        return True
+    error = result.error or ""
+    return error.startswith(_REPRODUCIBLE_ERRORS) and error != _KILLED_EXIT_CODE
+
+
+def _serialize(result: SandboxResult) -> str:
+    """Encode a result as JSON (artifact data in base64)."""
+    return json.dumps(
+        {
+            "logs": [[log.text, log.stream] for log in result.logs],
+            "artifacts": [
+                [a.name, base64.b64encode(a.data).decode("ascii"), a.mime_type]
+                for a in result.artifacts
+            ],
+            "error": result.error,
+        }
+    )
+
+
+def _deserialize(serialized: str) -> SandboxResult:
+    """Decode a result stored by _serialize()."""
+    value = json.loads(serialized)
+    return SandboxResult(
+        logs=[SandboxLog(text=text, stream=stream) for text, stream in value["logs"]],
+        artifacts=[
+            SandboxArtifact(name=name, data=base64.b64decode(data), mime_type=mime)
+            for name, data, mime in value["artifacts"]
+        ],
+        error=value["error"],
+    )
+
+
+class SandboxResultCache:
+    """
+    Two-tier (memory LRU + optional SQLite) cache for sandbox results.
+
+    Both tiers are bounded by the total size of their entries; the least
+    recently used entries are evicted first.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: int = 86400,
+        disk_path: Optional[str] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Maximum total entry size per tier
+            ttl_seconds: Time-to-live for entries in both tiers (0 = forever)
+            disk_path: Optional path to a SQLite file for the persistent tier
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+
+        # key -> (stored_at, serialized result)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self._metrics = {
+            "hits": 0,
+            "misses": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "bytes_served": 0,
+        }
+
+        if disk_path:
+            self._open_disk_tier(disk_path)
+
+    def _open_disk_tier(self, disk_path: str):
+        """Open (and create if needed) the SQLite tier."""
+        directory = os.path.dirname(disk_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(disk_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sandbox_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "stored_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._db.commit()
+        logger.info(f"[SANDBOX_CACHE] Disk tier enabled at {disk_path}")
+
+    @staticmethod
+    def make_key(
+        code: str,
+        image_version: str,
+        output_format: str = "image",
+        input_digests: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """
+        Build the content-addressed key for a run.
+
+        Args:
+            code: Python code to run
+            image_version: Sandbox image version (see image_version())
+            output_format: Expected output format
+            input_digests: Input file name -> digest (see digest_inputs())
+
+        Returns:
+            Hex SHA-256 digest identifying the run
+        """
+        payload = json.dumps(
+            {
+                "code": normalize_code(code),
+                "image": image_version,
+                "output_format": output_format,
+                "inputs": input_digests or {},
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - stored_at > self.ttl_seconds
+
+    def _put_memory(self, key: str, stored_at: float, serialized: str):
+        """Insert into the memory tier, evicting LRU entries. Caller holds lock."""
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous[1])
+
+        self._memory[key] = (stored_at, serialized)
+        self._memory_bytes += len(serialized)
+
+        while self._memory_bytes > self.max_bytes and len(self._memory) > 1:
+            _, (_, evicted) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._metrics["evictions"] += 1
+
+    def _evict_disk(self):
+        """Delete LRU disk entries beyond max_bytes. Caller holds lock."""
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM sandbox_cache"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute(
+            "SELECT key, size FROM sandbox_cache ORDER BY used_at DESC"
+        ).fetchall()
+        kept = 0
+        for key, size in rows:
+            kept += size
+            if kept > self.max_bytes:
+                self._db.execute("DELETE FROM sandbox_cache WHERE key = ?", (key,))
+                self._metrics["evictions"] += 1
+
+    def get(self, key: str) -> Optional[SandboxResult]:
+        """
+        Look up a cached run.
+
+        Returns:
+            The stored SandboxResult, or None on a miss
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, serialized = entry
+                if self._is_expired(stored_at):
+                    del self._memory[key]
+                    self._memory_bytes -= len(serialized)
+                    self._metrics["expirations"] += 1
+                else:
+                    self._memory.move_to_end(key)
+                    self._metrics["hits"] += 1
+                    self._metrics["memory_hits"] += 1
+                    self._metrics["bytes_served"] += len(serialized)
+                    return _deserialize(serialized)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, stored_at FROM sandbox_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    serialized, stored_at = row
+                    if self._is_expired(stored_at):
+                        self._db.execute(
+                            "DELETE FROM sandbox_cache WHERE key = ?", (key,)
+                        )
+                        self._db.commit()
+                        self._metrics["expirations"] += 1
+                    else:
+                        self._db.execute(
+                            "UPDATE sandbox_cache SET used_at = ? WHERE key = ?",
+                            (time.time(), key),
+                        )
+                        self._db.commit()
+                        # Promote to the memory tier
+                        self._put_memory(key, stored_at, serialized)
+                        self._metrics["hits"] += 1
+                        self._metrics["disk_hits"] += 1
+                        self._metrics["bytes_served"] += len(serialized)
+                        return _deserialize(serialized)
+
+            self._metrics["misses"] += 1
+            return None
+
+    def set(self, key: str, result: SandboxResult) -> bool:
+        """
+        Store a result in every enabled tier, if it is reproducible.
+
+        Returns:
+            True if the result was stored
+        """
+        if not is_cacheable(result):
+            return False
+        serialized = _serialize(result)
+        if len(serialized) > self.max_bytes:
+            return False
+        stored_at = time.time()
+
+        with self._lock:
+            self._put_memory(key, stored_at, serialized)
+            self._metrics["stores"] += 1
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sandbox_cache "
+                    "(key, value, size, stored_at, used_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, serialized, len(serialized), stored_at, stored_at),
+                )
+                self._evict_disk()
+                self._db.commit()
+        return True
+
+    def clear(self):
+        """Remove all entries from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM sandbox_cache")
+                self._db.commit()
+
+    def close(self):
+        """Close the disk tier connection."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get cache metrics (hits, misses, bytes, hit rate)."""
+        with self._lock:
+            lookups = self._metrics["hits"] + self._metrics["misses"]
+            return {
+                **self._metrics,
+                "entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "hit_rate": self._metrics["hits"] / lookups if lookups else 0.0,
+                "disk_enabled": self._db is not None,
+            }
+
+
+# Global cache instance
+_global_sandbox_cache: Optional[SandboxResultCache] = None
+
+
+def get_sandbox_cache() -> Optional[SandboxResultCache]:
+    """
+    Get the global sandbox result cache, or None if caching is disabled.
+
+    Configured via SANDBOX_CACHE_ENABLED, SANDBOX_CACHE_MAX_BYTES,
+    SANDBOX_CACHE_TTL_SECONDS and SANDBOX_CACHE_DISK_PATH.
+    """
+    global _global_sandbox_cache
+    if not ConfigManager.get("SANDBOX_CACHE_ENABLED"):
+        return None
+    if _global_sandbox_cache is None:
+        _global_sandbox_cache = SandboxResultCache(
+            max_bytes=ConfigManager.get("SANDBOX_CACHE_MAX_BYTES"),
+            ttl_seconds=ConfigManager.get("SANDBOX_CACHE_TTL_SECONDS"),
+            disk_path=ConfigManager.get("SANDBOX_CACHE_DISK_PATH"),
+        )
+    return _global_sandbox_cache
@@ -0,0 +1,214 @@
+"""
+Sandbox Images
+
+Prebuilt sandbox images, one per output format, so no execution installs
+packages at run time. Each image is built from Dockerfile.sandbox with the
+format's pinned requirements in docker/sandbox/requirements-<profile>.txt
+(the declarative spec); wheels are compiled in a builder stage and only
+installed in the runtime image.
+
+Features:
+- Image per output format (charts, docx, xlsx, pdf, pptx), chosen by the
+  format TaskRouter.detect_output_format() returns
+- Falls back to the generic image while a format's image is not built
+- Image digests (local image IDs) for sandbox cache keys
+- Matching E2B templates, used instead of pip install when enabled
+
+Configured via SANDBOX_FORMAT_IMAGES_ENABLED and
+SANDBOX_E2B_TEMPLATES_ENABLED.
+
+Usage:
+    python -m src.agent_execution.sandbox_images            # build all
+    python -m src.agent_execution.sandbox_images docx pdf   # build some
+"""
+
+import argparse
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+try:
+    import docker
+
+    DOCKER_AVAILABLE = True
+except ImportError:
+    DOCKER_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+# Repository root (build context for Dockerfile.sandbox)
+REPO_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+DOCKERFILE = "Dockerfile.sandbox"
+SPEC_DIR = os.path.join(REPO_ROOT, "docker", "sandbox")
+
+# Generic image with every format's libraries
+DEFAULT_IMAGE = os.environ.get("DOCKER_SANDBOX_IMAGE", "ai-sandbox-base")
+
+# How long a looked-up image digest is trusted before asking Docker again
+IMAGE_DIGEST_TTL_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class SandboxImageSpec:
+    """A prebuilt sandbox image and the requirements it is built from."""
+
+    tag: str
+    profile: str  # docker/sandbox/requirements-<profile>.txt
+
+    @property
+    def requirements_path(self) -> str:
+        """Path of the pinned requirements file."""
+        return os.path.join(SPEC_DIR, f"requirements-{self.profile}.txt")
+
+
+# Output format -> image
+SANDBOX_IMAGES: Dict[str, SandboxImageSpec] = {
+    "image": SandboxImageSpec(tag="ai-sandbox-charts", profile="image"),
+    "docx": SandboxImageSpec(tag="ai-sandbox-docx", profile="docx"),
+    "xlsx": SandboxImageSpec(tag="ai-sandbox-xlsx", profile="xlsx"),
+    "pdf": SandboxImageSpec(tag="ai-sandbox-pdf", profile="pdf"),
+    "pptx": SandboxImageSpec(tag="ai-sandbox-pptx", profile="pptx"),
+}
+
+GENERIC_IMAGE = SandboxImageSpec(tag=DEFAULT_IMAGE, profile="all")
+
+
+_image_digests: Dict[str, Tuple[Optional[str], float]] = {}
+_image_digests_lock = threading.Lock()
+
+
+def image_digest(image: str) -> Optional[str]:
+    """
+    Digest (local image ID) of a sandbox image.
+
+    Returns:
+        The image ID, or None if the image is not built or Docker is
+        unavailable
+    """
+    with _image_digests_lock:
+        cached = _image_digests.get(image)
+        if cached and time.monotonic() - cached[1] < IMAGE_DIGEST_TTL_SECONDS:
+            return cached[0]
+
+    digest = None
+    if DOCKER_AVAILABLE:
+        try:
+            digest = docker.from_env().images.get(image).id
+        except Exception as e:
+            logger.debug(f"[SANDBOX_IMAGES] Image {image} unavailable: {e}")
+
+    with _image_digests_lock:
+        _image_digests[image] = (digest, time.monotonic())
+    return digest
+
+
+def select_image(output_format: str, default: str = DEFAULT_IMAGE) -> str:
+    """
+    Sandbox image for an output format.
+
+    Args:
+        output_format: Output format (see TaskRouter.detect_output_format())
+        default: Image used when the format has no built image
+
+    Returns:
+        The format's image if it is built, otherwise default
+    """
+    spec = SANDBOX_IMAGES.get(output_format)
+    if spec is None or not ConfigManager.get("SANDBOX_FORMAT_IMAGES_ENABLED"):
+        return default
+    if image_digest(spec.tag) is None:
+        logger.debug(
+            f"[SANDBOX_IMAGES] {spec.tag} not built, using {default} for {output_format}"
+        )
+        return default
+    return spec.tag
+
+
+def e2b_template(output_format: str) -> Optional[str]:
+    """
+    E2B template for an output format.
+
+    Templates are built from the same specs under the image tags.
+
+    Returns:
+        Template name, or None to use the default template (with pip install)
+    """
+    spec = SANDBOX_IMAGES.get(output_format)
+    if spec is None or not ConfigManager.get("SANDBOX_E2B_TEMPLATES_ENABLED"):
+        return None
+    return spec.tag
+
+
+def build_image(spec: SandboxImageSpec) -> str:
+    """
+    Build one sandbox image.
+
+    Args:
+        spec: Image to build
+
+    Returns:
+        The built image's digest
+    """
+    if not DOCKER_AVAILABLE:
+        raise RuntimeError("Docker SDK not installed. Run: pip install docker")
+    if not os.path.exists(spec.requirements_path):
+        raise FileNotFoundError(f"No requirements spec at {spec.requirements_path}")
+
+    logger.info(f"[SANDBOX_IMAGES] Building {spec.tag} ({spec.profile})")
+    image, _ = docker.from_env().images.build(
+        path=REPO_ROOT,
+        dockerfile=DOCKERFILE,
+        tag=spec.tag,
+        buildargs={"SANDBOX_PROFILE": spec.profile},
+        rm=True,
+    )
+    with _image_digests_lock:
+        _image_digests.pop(spec.tag, None)
+    logger.info(f"[SANDBOX_IMAGES] Built {spec.tag}: {image.id}")
+    return image.id
+
+
+def build_images(output_formats: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    Build the sandbox images for some or all output formats.
+
+    Args:
+        output_formats: Formats to build; None builds every format's image
+            and the generic image
+
+    Returns:
+        Image tag -> digest
+    """
+    if output_formats is None:
+        specs = list(SANDBOX_IMAGES.values()) + [GENERIC_IMAGE]
+    else:
+        unknown = [f for f in output_formats if f not in SANDBOX_IMAGES]
+        if unknown:
+            raise ValueError(f"Unknown output formats: {', '.join(unknown)}")
+        specs = [SANDBOX_IMAGES[f] for f in output_formats]
+    return {spec.tag: build_image(spec) for spec in specs}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the sandbox images")
+    parser.add_argument(
+        "formats",
+        nargs="*",
+        help=f"Output formats to build ({', '.join(SANDBOX_IMAGES)}; "
+        "default: all, plus the generic image)",
+    )
+    args = parser.parse_args()
+
+    try:
+        built = build_images(args.formats or None)
+    except ValueError as e:
+        parser.error(str(e))
+    for tag, digest in built.items():
+        print(f"{tag}\t{digest}")
@@ -0,0 +1,959 @@
+"""
+Warm Sandbox Container Pool
+
+Keeps a few sandbox containers started ahead of time so LocalDockerSandbox
+does not pay container create/start and interpreter startup (plus the
+pandas/matplotlib import) on every execution and retry.
+
+Each warm container runs a small fork server that imports the data-science
+libraries once and then waits on a Unix socket. A run is an exec of a tiny
+client that hands the exec's stdin/stdout/stderr to the server; the server
+forks a child that runs the script in a fresh namespace, so runs never see
+each other's Python state.
+
+Features:
+- Pre-started, resource-limited containers (memory, CPU, pids, no network)
+- Exec channel: code runs in a forked child of the warm interpreter
+- Per-run reset: workspace and /tmp are cleared between runs
+- Input files: staged into the workspace's input/ directory per run
+- Fatal-error stop: a run whose traceback ends in an exception line but
+  keeps running is stopped after a short grace period
+- Streaming: run output can be passed to a callback line by line
+- Sessions: a setup script (e.g., loading the task's data) runs once and
+  later runs fork from its state, until the session is closed
+- Recycling after SANDBOX_POOL_MAX_USES runs, or at once on contamination
+  (timeout, dead worker, failed reset)
+- Background refill so acquire() never waits for a container to start
+- One pool per image, sized by SANDBOX_POOL_SIZE
+
+Usage:
+    pool = get_sandbox_pool(image)
+    container = pool.acquire() if pool else None
+    if container:
+        result = container.run_script("print('hi')", timeout=30)
+        pool.release(container, contaminated=result.contaminated)
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+try:
+    import docker
+    from docker.errors import DockerException
+
+    DOCKER_AVAILABLE = True
+except ImportError:
+    DOCKER_AVAILABLE = False
+    DockerException = Exception
+
+logger = get_logger(__name__)
+
+WORKSPACE = "/workspace"
+# Input files are staged here, relative to the workspace (the working directory)
+INPUT_DIR = "input"
+WORKER_DIR = "/tmp/sandbox-worker"
+WORKER_READY = "SANDBOX_WORKER_READY"
+
+# Exit codes reported by the exec client
+EXIT_STOPPED = 123
+EXIT_TIMEOUT = 124
+EXIT_WORKER_UNAVAILABLE = 125
+
+# A traceback in the output is fatal once it ends in an unindented line
+# naming the exception
+TRACEBACK_HEADER = "Traceback (most recent call last)"
+FATAL_ERROR_PATTERN = r"[A-Za-z_][\w.]*(?:Error|Exception)\b"
+
+# Extra time the host waits for an exec beyond the in-container timeout
+EXEC_GRACE_SECONDS = 5
+
+# Wait before retrying after a container failed to start
+START_RETRY_SECONDS = 30
+
+# Fork server run as the container's main process. Imports the libraries
+# once, then forks a child per request with the client's stdio attached:
+# - run: execute a script in a fresh namespace
+# - session: execute a setup script, then keep its namespace and serve runs
+#   on a session socket, each forked from that state (see SandboxSession)
+# - close: stop serving (ends a session)
+# A run is killed when the client sends "stop" or hangs up.
+_WORKER_SERVER_TEMPLATE = r"""
+import json, os, select, shutil, signal, socket, sys, time, traceback
+
+for name in ("numpy", "pandas", "matplotlib", "seaborn", "docx", "openpyxl", "reportlab"):
+    try:
+        __import__(name)
+    except Exception:
+        pass
+try:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot
+except Exception:
+    pass
+
+WORKER_DIR = "%(worker_dir)s"
+SCRATCH_DIR = "%(scratch_dir)s"
+
+
+def listen(path):
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(8)
+    return listener
+
+
+def attach(fds, cwd):
+    os.setsid()
+    for target, fd in zip((0, 1, 2), fds):
+        os.dup2(fd, target)
+    for fd in fds:
+        if fd > 2:
+            os.close(fd)
+    os.chdir(cwd)
+
+
+def execute(script, namespace):
+    sys.argv = [script]
+    code = 0
+    try:
+        if namespace is None:
+            import runpy
+            runpy.run_path(script, run_name="__main__")
+        else:
+            with open(script) as f:
+                source = f.read()
+            exec(compile(source, script, "exec"), namespace)
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    except Exception:
+        pass
+    return code
+
+
+def kill(pid):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    os.waitpid(pid, 0)
+
+
+def wait(pid, timeout, conn):
+    # Returns (exit code, "timed_out" / "stopped" / None)
+    deadline = time.monotonic() + timeout
+    while True:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            return os.waitstatus_to_exitcode(status), None
+        if time.monotonic() >= deadline:
+            kill(pid)
+            return None, "timed_out"
+        # The client only writes to ask for a stop; EOF means it is gone
+        readable, _, _ = select.select([conn], [], [], 0.005)
+        if readable:
+            kill(pid)
+            return None, "stopped"
+
+
+def reap():
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+
+
+def reset_scratch():
+    for entry in os.listdir(SCRATCH_DIR):
+        path = os.path.join(SCRATCH_DIR, entry)
+        if path == WORKER_DIR:
+            continue
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def reply(conn, code, outcome=None):
+    status = {
+        "code": code,
+        "timed_out": outcome == "timed_out",
+        "stopped": outcome == "stopped",
+    }
+    try:
+        conn.sendall((json.dumps(status) + "\n").encode())
+    except OSError:
+        pass
+    conn.close()
+
+
+def start_session(conn, request):
+    # Runs in the forked child: set up the namespace, then serve runs from it
+    namespace = {"__name__": "__main__", "__builtins__": __builtins__}
+    signal.alarm(max(1, int(request["timeout"])))
+    code = execute(request["script"], namespace)
+    signal.alarm(0)
+    if code != 0:
+        reply(conn, code)
+        os._exit(0)
+    listener = listen(request["session_socket"])
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    reply(conn, 0)
+    serve(listener, namespace)
+    listener.close()
+    os.unlink(request["session_socket"])
+    os._exit(0)
+
+
+def serve(listener, namespace):
+    while True:
+        reap()
+        conn, _ = listener.accept()
+        try:
+            message, fds, _, _ = socket.recv_fds(conn, 65536, 3)
+            request = json.loads(message)
+        except Exception:
+            conn.close()
+            continue
+        op = request.get("op", "run")
+        if op == "close":
+            for fd in fds:
+                os.close(fd)
+            reply(conn, 0)
+            return
+
+        pid = os.fork()
+        if pid == 0:
+            listener.close()
+            attach(fds, request["cwd"])
+            if op == "session":
+                start_session(conn, request)
+            conn.close()
+            os._exit(execute(request["script"], namespace))
+        for fd in fds:
+            os.close(fd)
+        if op == "session":
+            conn.close()
+            continue
+
+        code, outcome = wait(pid, request["timeout"], conn)
+        reset_scratch()
+        reply(conn, code, outcome)
+
+
+os.makedirs(WORKER_DIR, exist_ok=True)
+main_listener = listen("%(socket)s")
+print("%(ready)s", flush=True)
+serve(main_listener, None)
+"""
+
+# Exec client: passes its stdio to the worker listening on argv[1] with the
+# JSON request in argv[2], and exits with the run's code. With a "fatal"
+# entry in the request it relays the run's output through pipes instead and
+# asks the worker to stop the run if it outlives a fatal traceback by the
+# grace period.
+WORKER_CLIENT = r"""
+import json, os, re, select, socket, sys, time
+try:
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.connect(sys.argv[1])
+except OSError as e:
+    print("sandbox worker unavailable: %%s" %% e, file=sys.stderr)
+    sys.exit(%(unavailable)d)
+fatal = json.loads(sys.argv[2]).get("fatal")
+if not fatal:
+    socket.send_fds(conn, [sys.argv[2].encode()], [0, 1, 2])
+else:
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    socket.send_fds(conn, [sys.argv[2].encode()], [0, out_w, err_w])
+    os.close(out_w)
+    os.close(err_w)
+    pattern = re.compile(fatal["pattern"])
+    sinks = {out_r: sys.stdout.buffer, err_r: sys.stderr.buffer}
+    partial, in_traceback, stop_at, stop_sent = b"", False, None, False
+    while True:
+        wait = None
+        if stop_at is not None and not stop_sent:
+            wait = max(0.0, stop_at - time.monotonic())
+        ready, _, _ = select.select(list(sinks) + [conn], [], [], wait)
+        if not ready:
+            conn.sendall(b"stop\n")
+            stop_sent = True
+            continue
+        if conn in ready:
+            break
+        for fd in ready:
+            data = os.read(fd, 65536)
+            if not data:
+                del sinks[fd]
+                continue
+            sinks[fd].write(data)
+            sinks[fd].flush()
+            if fd != err_r or stop_at is not None:
+                continue
+            lines = (partial + data).split(b"\n")
+            partial = lines.pop()
+            for line in lines:
+                text = line.decode("utf-8", "replace")
+                if text.startswith("%(traceback)s"):
+                    in_traceback = True
+                elif in_traceback and pattern.match(text):
+                    stop_at = time.monotonic() + fatal["grace"]
+                    break
+    # Output written before the reply may still be in the pipes
+    for fd, sink in sinks.items():
+        while select.select([fd], [], [], 0)[0]:
+            data = os.read(fd, 65536)
+            if not data:
+                break
+            sink.write(data)
+        sink.flush()
+reply = b""
+while not reply.endswith(b"\n"):
+    chunk = conn.recv(4096)
+    if not chunk:
+        sys.exit(%(unavailable)d)
+    reply += chunk
+status = json.loads(reply)
+if status["timed_out"]:
+    sys.exit(%(timeout)d)
+if status.get("stopped"):
+    sys.exit(%(stopped)d)
+code = status["code"]
+sys.exit(code if code >= 0 else 128 - code)
+""" % {
+    "unavailable": EXIT_WORKER_UNAVAILABLE,
+    "timeout": EXIT_TIMEOUT,
+    "stopped": EXIT_STOPPED,
+    "traceback": TRACEBACK_HEADER,
+}
+
+
+def build_worker_server(worker_dir: str = WORKER_DIR, scratch_dir: str = "/tmp") -> str:
+    """
+    Source of the fork server.
+
+    Args:
+        worker_dir: Directory holding the worker's sockets
+        scratch_dir: Directory emptied after every run (except worker_dir)
+    """
+    return _WORKER_SERVER_TEMPLATE % {
+        "worker_dir": worker_dir,
+        "scratch_dir": scratch_dir,
+        "socket": worker_socket(worker_dir),
+        "ready": WORKER_READY,
+    }
+
+
+def worker_socket(worker_dir: str = WORKER_DIR) -> str:
+    """Path of the main worker socket."""
+    return f"{worker_dir}/worker.sock"
+
+
+WORKER_SERVER = build_worker_server()
+
+
+def stage_inputs(directory: str, input_files: Optional[Dict[str, bytes]]):
+    """
+    Write input files into directory/INPUT_DIR.
+
+    Args:
+        directory: Host directory (a workspace or a mount source)
+        input_files: File name -> content; names are reduced to their base
+            name so files always land in the input directory
+    """
+    if not input_files:
+        return
+    input_dir = os.path.join(directory, INPUT_DIR)
+    os.makedirs(input_dir, exist_ok=True)
+    for name, data in input_files.items():
+        with open(os.path.join(input_dir, os.path.basename(name)), "wb") as f:
+            f.write(data)
+
+
+class FatalErrorDetector:
+    """
+    Spots the exception line that ends a traceback in a run's output.
+
+    Fed line by line; the host-side twin of the exec client's check, used
+    for cold runs and to name the error of a stopped warm run.
+    """
+
+    def __init__(self, pattern: str = FATAL_ERROR_PATTERN):
+        """
+        Initialize the detector.
+
+        Args:
+            pattern: Regex an exception line starts with
+        """
+        self._pattern = re.compile(pattern)
+        self._in_traceback = False
+        self.fatal_line: Optional[str] = None
+
+    def feed(self, line: str) -> bool:
+        """
+        Check one output line.
+
+        Returns:
+            True for the first fatal exception line
+        """
+        if self.fatal_line is not None:
+            return False
+        if line.startswith(TRACEBACK_HEADER):
+            self._in_traceback = True
+        elif self._in_traceback and self._pattern.match(line):
+            self.fatal_line = line.strip()
+            return True
+        return False
+
+    @classmethod
+    def find(cls, output: str) -> Optional[str]:
+        """First fatal exception line in output, if any."""
+        detector = cls()
+        for line in output.splitlines():
+            if detector.feed(line):
+                break
+        return detector.fatal_line
+
+
+# Receives (line, stream) for each output line of a streamed run
+OutputCallback = Callable[[str, str], None]
+
+
+@dataclass
+class WarmRunResult:
+    """Outcome of one run in a warm container."""
+
+    exit_code: int
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+    worker_unavailable: bool = False
+    stopped: bool = False  # Stopped on a fatal error; the container is fine
+
+    @property
+    def contaminated(self) -> bool:
+        """Whether the container should be recycled instead of reused."""
+        return self.timed_out or self.worker_unavailable
+
+
+class WarmContainer:
+    """A started sandbox container with its host workspace directory."""
+
+    def __init__(self, container: Any, workspace: str):
+        """
+        Initialize the warm container.
+
+        Args:
+            container: docker Container running the fork server
+            workspace: Host directory mounted at /workspace
+        """
+        self.container = container
+        self.workspace = workspace
+        self.uses = 0
+        self.created_at = time.monotonic()
+
+    def reset_workspace(self) -> bool:
+        """
+        Remove every file from the workspace.
+
+        Returns:
+            True if the workspace is empty afterwards
+        """
+        try:
+            for entry in os.listdir(self.workspace):
+                path = os.path.join(self.workspace, entry)
+                if os.path.isdir(path) and not os.path.islink(path):
+                    shutil.rmtree(path)
+                else:
+                    os.unlink(path)
+            return True
+        except OSError as e:
+            logger.warning(f"[SANDBOX_POOL] Could not reset workspace: {e}")
+            return False
+
+    def _exec_streaming(self, command: List[str], on_output: OutputCallback):
+        """
+        Exec a command, passing its output to on_output line by line.
+
+        Returns:
+            (exit_code, (stdout, stderr)) like Container.exec_run(demux=True)
+        """
+        api = self.container.client.api
+        exec_id = api.exec_create(self.container.id, command, workdir=WORKSPACE)["Id"]
+        output = {"stdout": [], "stderr": []}
+        partial = {"stdout": b"", "stderr": b""}
+
+        def emit(stream: str, data: bytes):
+            lines = (partial[stream] + data).split(b"\n")
+            partial[stream] = lines.pop()
+            for line in lines:
+                _notify(on_output, line.decode("utf-8", errors="replace"), stream)
+
+        for stdout, stderr in api.exec_start(exec_id, stream=True, demux=True):
+            for stream, data in (("stdout", stdout), ("stderr", stderr)):
+                if data:
+                    output[stream].append(data)
+                    emit(stream, data)
+        for stream, rest in partial.items():
+            if rest:
+                _notify(on_output, rest.decode("utf-8", errors="replace"), stream)
+
+        exit_code = api.exec_inspect(exec_id)["ExitCode"]
+        return exit_code, (b"".join(output["stdout"]), b"".join(output["stderr"]))
+
+    def _exec_client(
+        self,
+        socket_path: str,
+        request: Dict[str, Any],
+        timeout: float,
+        on_output: Optional[OutputCallback] = None,
+    ) -> WarmRunResult:
+        """
+        Exec the worker client in the container and wait for its reply.
+
+        Args:
+            socket_path: Worker socket inside the container
+            request: Request sent to the worker
+            timeout: Run time the worker enforces; the host waits a grace
+                period longer before treating the exec as hung
+            on_output: Optional callback streamed the output line by line
+
+        Returns:
+            WarmRunResult with the exit code and output streams
+        """
+        command = [
+            "python",
+            "-S",
+            "-c",
+            WORKER_CLIENT,
+            socket_path,
+            json.dumps(request),
+        ]
+        outcome: Dict[str, Any] = {}
+
+        def exec_in_container():
+            try:
+                if on_output is not None:
+                    outcome["result"] = self._exec_streaming(command, on_output)
+                else:
+                    outcome["result"] = self.container.exec_run(
+                        command, demux=True, workdir=WORKSPACE
+                    )
+            except Exception as e:
+                outcome["error"] = e
+
+        thread = threading.Thread(target=exec_in_container, daemon=True)
+        thread.start()
+        thread.join(timeout + EXEC_GRACE_SECONDS)
+
+        if thread.is_alive():
+            return WarmRunResult(
+                exit_code=EXIT_TIMEOUT, stdout="", stderr="", timed_out=True
+            )
+        if "error" in outcome:
+            logger.warning(f"[SANDBOX_POOL] Exec failed: {outcome['error']}")
+            return WarmRunResult(
+                exit_code=EXIT_WORKER_UNAVAILABLE,
+                stdout="",
+                stderr=str(outcome["error"]),
+                worker_unavailable=True,
+            )
+
+        exit_code, (stdout, stderr) = outcome["result"]
+        return WarmRunResult(
+            exit_code=exit_code,
+            stdout=(stdout or b"").decode("utf-8", errors="replace"),
+            stderr=(stderr or b"").decode("utf-8", errors="replace"),
+            timed_out=exit_code == EXIT_TIMEOUT,
+            worker_unavailable=exit_code == EXIT_WORKER_UNAVAILABLE,
+            stopped=exit_code == EXIT_STOPPED,
+        )
+
+    def _write_script(self, code: str, script_name: str):
+        """Write code into the workspace."""
+        with open(os.path.join(self.workspace, script_name), "w") as f:
+            f.write(code)
+
+    def run_script(
+        self,
+        code: str,
+        timeout: float,
+        script_name: str = "script.py",
+        session: Optional[str] = None,
+        fatal_grace: Optional[float] = None,
+        on_output: Optional[OutputCallback] = None,
+    ) -> WarmRunResult:
+        """
+        Run code as a script in the container's workspace.
+
+        The caller reads artifacts from self.workspace afterwards and must
+        release the container back to its pool.
+
+        Args:
+            code: Python source to run
+            timeout: Maximum run time in seconds
+            script_name: File name for the script inside the workspace
+            session: Session socket from start_session(); the script then
+                runs on top of the session's state instead of a fresh one
+            fatal_grace: Seconds a run may outlive a fatal traceback before
+                it is stopped; None never stops it early
+            on_output: Optional callback streamed the output line by line
+
+        Returns:
+            WarmRunResult with the exit code and output streams
+        """
+        self.uses += 1
+        self._write_script(code, script_name)
+        request: Dict[str, Any] = {
+            "op": "run",
+            "script": script_name,
+            "cwd": WORKSPACE,
+            "timeout": timeout,
+        }
+        if fatal_grace is not None:
+            request["fatal"] = {"pattern": FATAL_ERROR_PATTERN, "grace": fatal_grace}
+        return self._exec_client(
+            session or worker_socket(), request, timeout, on_output=on_output
+        )
+
+    def start_session(
+        self, setup_code: str, timeout: float, script_name: str = "setup.py"
+    ) -> Optional[str]:
+        """
+        Start a session whose state later runs start from.
+
+        The setup code runs once in a forked worker that keeps its globals
+        and serves runs on its own socket until close_session().
+
+        Args:
+            setup_code: Python source run once (e.g., loading the data)
+            timeout: Maximum setup time in seconds
+
+        Returns:
+            The session socket, or None if the setup failed
+        """
+        self.uses += 1
+        self._write_script(setup_code, script_name)
+        socket_path = f"{WORKER_DIR}/session-{uuid.uuid4().hex[:12]}.sock"
+        result = self._exec_client(
+            worker_socket(),
+            {
+                "op": "session",
+                "script": script_name,
+                "cwd": WORKSPACE,
+                "timeout": timeout,
+                "session_socket": socket_path,
+            },
+            timeout,
+        )
+        if result.exit_code != 0:
+            logger.warning(
+                f"[SANDBOX_POOL] Session setup failed ({result.exit_code}): "
+                f"{result.stderr[-500:]}"
+            )
+            return None
+        return socket_path
+
+    def close_session(self, session: str) -> bool:
+        """
+        Stop a session's worker.
+
+        Args:
+            session: Session socket from start_session()
+
+        Returns:
+            True if the session worker acknowledged and exited
+        """
+        result = self._exec_client(session, {"op": "close"}, EXEC_GRACE_SECONDS)
+        return result.exit_code == 0
+
+    def remove(self):
+        """Kill the container and delete its workspace."""
+        try:
+            self.container.remove(force=True)
+        except Exception:
+            pass
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+
+def _notify(on_output: OutputCallback, line: str, stream: str):
+    """Pass a line to an output callback; its errors never fail the run."""
+    try:
+        on_output(line, stream)
+    except Exception as e:
+        logger.debug(f"[SANDBOX_POOL] Output callback failed: {e}")
+
+
+class SandboxContainerPool:
+    """
+    Pool of warm sandbox containers for one image.
+
+    acquire() hands out an idle container (or None if there is none, so
+    the caller can fall back to a cold run); release() resets it for the
+    next run or recycles it. A background thread replaces recycled
+    containers so the pool holds `size` containers in total.
+    """
+
+    def __init__(
+        self,
+        image: str,
+        size: int = 2,
+        max_uses: int = 50,
+        memory_limit: str = "1g",
+        cpu_limit: float = 1.0,
+        pids_limit: int = 128,
+        network_disabled: bool = True,
+        ready_timeout: float = 60.0,
+        client: Optional[Any] = None,
+    ):
+        """
+        Initialize the pool (containers start on start()).
+
+        Args:
+            image: Sandbox image
+            size: Number of warm containers (idle plus in use)
+            max_uses: Runs per container before it is recycled
+            memory_limit: Container memory limit (e.g., "1g")
+            cpu_limit: CPUs per container
+            pids_limit: Maximum processes per container
+            network_disabled: Whether containers get no network
+            ready_timeout: Seconds to wait for a new container's worker
+            client: Optional docker client
+        """
+        self.image = image
+        self.size = size
+        self.max_uses = max_uses
+        self.memory_limit = memory_limit
+        self.cpu_limit = cpu_limit
+        self.pids_limit = pids_limit
+        self.network_disabled = network_disabled
+        self.ready_timeout = ready_timeout
+
+        self._client = client
+        self._idle: List[WarmContainer] = []
+        self._in_use = 0
+        self._starting = 0
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._cond = threading.Condition()
+        self._stats = {"hits": 0, "misses": 0, "started": 0, "recycled": 0}
+
+    def _docker(self):
+        """Get or create the docker client."""
+        if self._client is None:
+            self._client = docker.from_env()
+        return self._client
+
+    def _start_container(self) -> WarmContainer:
+        """Start one container and wait until its worker is listening."""
+        workspace = tempfile.mkdtemp(prefix="sandbox-pool-")
+        container = self._docker().containers.run(
+            self.image,
+            command=["python", "-c", WORKER_SERVER],
+            name=f"sandbox-pool-{uuid.uuid4().hex[:12]}",
+            volumes={workspace: {"bind": WORKSPACE, "mode": "rw"}},
+            working_dir=WORKSPACE,
+            network_mode="none" if self.network_disabled else "bridge",
+            mem_limit=self.memory_limit,
+            nano_cpus=int(self.cpu_limit * 1e9),
+            pids_limit=self.pids_limit,
+            labels={"arbitrage.sandbox-pool": self.image},
+            detach=True,
+        )
+        warm = WarmContainer(container, workspace)
+
+        deadline = time.monotonic() + self.ready_timeout
+        while time.monotonic() < deadline:
+            if WORKER_READY.encode() in container.logs():
+                return warm
+            container.reload()
+            if container.status == "exited":
+                break
+            time.sleep(0.1)
+
+        warm.remove()
+        raise RuntimeError(f"Sandbox worker in {self.image} did not become ready")
+
+    def _needed(self) -> int:
+        """Containers to start to get back to size. Holds the lock."""
+        return self.size - len(self._idle) - self._in_use - self._starting
+
+    def _fill_loop(self):
+        """Keep `size` containers running until shutdown."""
+        while True:
+            with self._cond:
+                while not self._stopped and self._needed() <= 0:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                self._starting += 1
+
+            try:
+                warm = self._start_container()
+            except Exception as e:
+                logger.warning(f"[SANDBOX_POOL] Could not start container: {e}")
+                with self._cond:
+                    self._starting -= 1
+                    self._cond.wait(START_RETRY_SECONDS)
+                continue
+
+            with self._cond:
+                self._starting -= 1
+                if self._stopped:
+                    warm.remove()
+                    return
+                self._idle.append(warm)
+                self._stats["started"] += 1
+                self._cond.notify_all()
+
+    def start(self):
+        """Start the background refill thread."""
+        with self._cond:
+            if self._thread is not None or self._stopped:
+                return
+            self._thread = threading.Thread(
+                target=self._fill_loop, name=f"sandbox-pool-{self.image}", daemon=True
+            )
+        self._thread.start()
+        logger.info(
+            f"[SANDBOX_POOL] Warming {self.size} containers of image {self.image}"
+        )
+
+    def acquire(self) -> Optional[WarmContainer]:
+        """
+        Take an idle warm container.
+
+        Returns:
+            A WarmContainer, or None if none is idle right now
+        """
+        with self._cond:
+            if not self._idle:
+                self._stats["misses"] += 1
+                return None
+            warm = self._idle.pop()
+            self._in_use += 1
+            self._stats["hits"] += 1
+            self._cond.notify_all()
+            return warm
+
+    def release(self, warm: WarmContainer, contaminated: bool = False):
+        """
+        Return a container after a run.
+
+        It is reset and made idle again, or removed (and replaced in the
+        background) when contaminated, worn out, or the pool is full.
+
+        Args:
+            warm: Container from acquire()
+            contaminated: Whether the run left it in an unknown state
+        """
+        reusable = (
+            not contaminated and warm.uses < self.max_uses and warm.reset_workspace()
+        )
+        with self._cond:
+            self._in_use -= 1
+            if reusable and not self._stopped:
+                self._idle.append(warm)
+                warm = None
+            else:
+                self._stats["recycled"] += 1
+            self._cond.notify_all()
+        if warm is not None:
+            threading.Thread(target=warm.remove, daemon=True).start()
+
+    def shutdown(self):
+        """Stop refilling and remove idle containers."""
+        with self._cond:
+            self._stopped = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for warm in idle:
+            warm.remove()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool counters for monitoring."""
+        with self._cond:
+            return {
+                "image": self.image,
+                "size": self.size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "starting": self._starting,
+                **self._stats,
+            }
+
+
+# Global pools, one per image
+_global_sandbox_pools: Dict[str, SandboxContainerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_sandbox_pool(image: str) -> Optional[SandboxContainerPool]:
+    """
+    Get (and start) the warm pool for an image.
+
+    Returns:
+        The pool, or None when pooling is disabled or Docker is unavailable
+    """
+    if not DOCKER_AVAILABLE or not ConfigManager.get("SANDBOX_POOL_ENABLED"):
+        return None
+    size = ConfigManager.get("SANDBOX_POOL_SIZE")
+    if size <= 0:
+        return None
+
+    with _pools_lock:
+        pool = _global_sandbox_pools.get(image)
+        if pool is None:
+            pool = SandboxContainerPool(
+                image,
+                size=size,
+                max_uses=ConfigManager.get("SANDBOX_POOL_MAX_USES"),
+                memory_limit=ConfigManager.get("SANDBOX_POOL_MEMORY_LIMIT"),
+                cpu_limit=ConfigManager.get("SANDBOX_POOL_CPU_LIMIT"),
+                pids_limit=ConfigManager.get("SANDBOX_POOL_PIDS_LIMIT"),
+            )
+            _global_sandbox_pools[image] = pool
+    pool.start()
+    return pool
+
+
+def shutdown_sandbox_pools():
+    """Remove all warm containers (application shutdown)."""
+    with _pools_lock:
+        pools = list(_global_sandbox_pools.values())
+        _global_sandbox_pools.clear()
+    for pool in pools:
+        pool.shutdown()
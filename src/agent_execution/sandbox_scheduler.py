@@ -0,0 +1,360 @@
+"""
+Sandbox Admission Controller
+
+Process-wide scheduler for local sandbox runs. Each run reserves CPU and
+memory from a global budget before its container starts; when the budget
+is used up, runs queue and are admitted in weighted fair order, so an arena
+run or a burst from one client cannot starve everyone else or push every
+run toward its timeout.
+
+Features:
+- CPU and memory budgets (SANDBOX_SCHEDULER_CPU_BUDGET,
+  SANDBOX_SCHEDULER_MEMORY_BUDGET_MB; 0 = derive from the host)
+- Start-time fair queuing per client: a client with weight 2 is admitted
+  twice as often as one with weight 1 while both have runs queued
+- Queue waits bounded by the task deadline (or
+  SANDBOX_SCHEDULER_MAX_WAIT_SECONDS)
+- Queue-wait metrics (p50/p95/p99) and per-client admission counts
+
+The client a run is charged to is set per task with sandbox_client_scope()
+(or activate_sandbox_client()/reset_sandbox_client()), like the deadline.
+
+Usage:
+    with sandbox_client_scope(task.client_email, weight=2.0):
+        with admit_sandbox_run() as admitted:
+            if admitted:
+                run_the_container()
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from src.config.config_manager import ConfigManager
+from src.utils.deadline import current_deadline
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CLIENT = "default"
+
+# Memory budget when the host's memory cannot be read
+FALLBACK_MEMORY_BUDGET_MB = 4096
+
+# Queue waits kept for the percentile metrics
+WAIT_SAMPLES = 1000
+
+
+def parse_memory_mb(limit: str) -> int:
+    """
+    Convert a Docker memory limit (e.g., "512m", "1g") to megabytes.
+
+    Returns:
+        Megabytes, at least 1
+    """
+    units = {"k": 1 / 1024, "m": 1, "g": 1024}
+    value = str(limit).strip().lower().rstrip("b")
+    if value and value[-1] in units:
+        return max(1, int(float(value[:-1]) * units[value[-1]]))
+    return max(1, int(value) // (1024 * 1024))
+
+
+def _host_memory_mb() -> int:
+    """Total memory of the host in megabytes."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024**2)
+    except (ValueError, OSError, AttributeError):
+        return FALLBACK_MEMORY_BUDGET_MB
+
+
+@dataclass
+class _Request:
+    """A run waiting for admission."""
+
+    start_tag: float
+    seq: int
+    client: str
+    cpu: float
+    memory_mb: int
+
+    def __lt__(self, other: "_Request") -> bool:
+        return (self.start_tag, self.seq) < (other.start_tag, other.seq)
+
+
+class SandboxScheduler:
+    """
+    Admits sandbox runs within CPU and memory budgets, in fair order.
+
+    Runs are ordered by start-time fair queuing: a run's start tag is the
+    later of the current virtual time and its client's previous finish tag,
+    and its finish tag adds 1/weight. The run with the lowest start tag is
+    admitted as soon as its resources fit; later runs wait behind it, so
+    large runs are never starved by small ones.
+    """
+
+    def __init__(self, cpu_budget: float, memory_budget_mb: int):
+        """
+        Initialize the scheduler.
+
+        Args:
+            cpu_budget: CPUs that running sandboxes may reserve in total
+            memory_budget_mb: Memory (MB) running sandboxes may reserve
+        """
+        self.cpu_budget = cpu_budget
+        self.memory_budget_mb = memory_budget_mb
+
+        self._cond = threading.Condition()
+        self._queue: List[_Request] = []
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._finish_tags: Dict[str, float] = {}
+        self._cpu_used = 0.0
+        self._memory_used_mb = 0
+        self._running = 0
+
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self._admitted_by_client: Dict[str, int] = {}
+        self._metrics = {"admitted": 0, "queued": 0, "timeouts": 0}
+
+    def _fits(self, request: _Request) -> bool:
+        """Whether a request's resources fit the free budget."""
+        if self._running == 0:
+            # A run larger than the whole budget still runs, alone
+            return True
+        return (
+            self._cpu_used + request.cpu <= self.cpu_budget
+            and self._memory_used_mb + request.memory_mb <= self.memory_budget_mb
+        )
+
+    def acquire(
+        self,
+        client: str = DEFAULT_CLIENT,
+        weight: float = 1.0,
+        cpu: float = 1.0,
+        memory_mb: int = 1024,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Wait until a run may start and reserve its resources.
+
+        Args:
+            client: Client (or task) the run is charged to
+            weight: Client's share relative to other clients
+            cpu: CPUs the run reserves
+            memory_mb: Memory (MB) the run reserves
+            timeout: Maximum seconds to wait; None waits indefinitely
+
+        Returns:
+            True if admitted (call release() afterwards), False on timeout
+        """
+        enqueued_at = time.monotonic()
+        give_up_at = None if timeout is None else enqueued_at + timeout
+
+        with self._cond:
+            start_tag = max(self._virtual_time, self._finish_tags.get(client, 0.0))
+            self._finish_tags[client] = start_tag + 1.0 / max(weight, 1e-6)
+            request = _Request(start_tag, next(self._seq), client, cpu, memory_mb)
+            heapq.heappush(self._queue, request)
+
+            queued = False
+            while not (self._queue[0] is request and self._fits(request)):
+                if not queued:
+                    queued = True
+                    self._metrics["queued"] += 1
+                remaining = None
+                if give_up_at is not None:
+                    remaining = give_up_at - time.monotonic()
+                    if remaining <= 0:
+                        self._queue.remove(request)
+                        heapq.heapify(self._queue)
+                        self._metrics["timeouts"] += 1
+                        # The next request may fit now that this one left
+                        self._cond.notify_all()
+                        logger.warning(
+                            f"[SANDBOX_SCHEDULER] {client} gave up after "
+                            f"{timeout:.1f}s in queue"
+                        )
+                        return False
+                self._cond.wait(remaining)
+
+            heapq.heappop(self._queue)
+            self._virtual_time = request.start_tag
+            self._cpu_used += cpu
+            self._memory_used_mb += memory_mb
+            self._running += 1
+
+            waited = time.monotonic() - enqueued_at
+            self._waits.append(waited)
+            self._metrics["admitted"] += 1
+            self._admitted_by_client[client] = (
+                self._admitted_by_client.get(client, 0) + 1
+            )
+            # The next request may fit as well
+            self._cond.notify_all()
+
+        if queued:
+            logger.info(f"[SANDBOX_SCHEDULER] Admitted {client} after {waited:.2f}s")
+        return True
+
+    def release(self, cpu: float = 1.0, memory_mb: int = 1024):
+        """Return an admitted run's resources."""
+        with self._cond:
+            self._cpu_used -= cpu
+            self._memory_used_mb -= memory_mb
+            self._running -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def admission(
+        self,
+        client: str = DEFAULT_CLIENT,
+        weight: float = 1.0,
+        cpu: float = 1.0,
+        memory_mb: int = 1024,
+        timeout: Optional[float] = None,
+    ) -> Iterator[bool]:
+        """
+        Context manager around acquire()/release().
+
+        Yields:
+            True if the run was admitted, False if the wait timed out
+        """
+        admitted = self.acquire(client, weight, cpu, memory_mb, timeout)
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self.release(cpu, memory_mb)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get scheduler metrics (admissions, queue waits, budget use)."""
+        with self._cond:
+            waits = sorted(self._waits)
+
+            def percentile(p: float) -> float:
+                if not waits:
+                    return 0.0
+                return waits[min(len(waits) - 1, int(p * len(waits)))]
+
+            return {
+                **self._metrics,
+                "running": self._running,
+                "waiting": len(self._queue),
+                "cpu_used": self._cpu_used,
+                "cpu_budget": self.cpu_budget,
+                "memory_used_mb": self._memory_used_mb,
+                "memory_budget_mb": self.memory_budget_mb,
+                "wait_p50_seconds": percentile(0.50),
+                "wait_p95_seconds": percentile(0.95),
+                "wait_p99_seconds": percentile(0.99),
+                "admitted_by_client": dict(self._admitted_by_client),
+            }
+
+
+# =============================================================================
+# PER-TASK CLIENT
+# =============================================================================
+
+_sandbox_client: ContextVar[Optional[Tuple[str, float]]] = ContextVar(
+    "sandbox_client", default=None
+)
+
+
+def activate_sandbox_client(client: str, weight: float = 1.0) -> Token:
+    """
+    Charge the current context's sandbox runs to a client.
+
+    Returns:
+        Token for reset_sandbox_client()
+    """
+    return _sandbox_client.set((client or DEFAULT_CLIENT, weight))
+
+
+def reset_sandbox_client(token: Token):
+    """Restore the client active before activate_sandbox_client()."""
+    _sandbox_client.reset(token)
+
+
+@contextmanager
+def sandbox_client_scope(client: str, weight: float = 1.0) -> Iterator[None]:
+    """Charge the sandbox runs inside the block to a client."""
+    token = activate_sandbox_client(client, weight)
+    try:
+        yield
+    finally:
+        reset_sandbox_client(token)
+
+
+# =============================================================================
+# GLOBAL SCHEDULER
+# =============================================================================
+
+_global_scheduler: Optional[SandboxScheduler] = None
+_global_scheduler_lock = threading.Lock()
+
+
+def get_sandbox_scheduler() -> Optional[SandboxScheduler]:
+    """
+    Get the global sandbox scheduler, or None if admission is disabled.
+
+    Configured via SANDBOX_SCHEDULER_ENABLED, SANDBOX_SCHEDULER_CPU_BUDGET
+    and SANDBOX_SCHEDULER_MEMORY_BUDGET_MB.
+    """
+    global _global_scheduler
+    if not ConfigManager.get("SANDBOX_SCHEDULER_ENABLED"):
+        return None
+    with _global_scheduler_lock:
+        if _global_scheduler is None:
+            cpu_budget = ConfigManager.get("SANDBOX_SCHEDULER_CPU_BUDGET") or (
+                os.cpu_count() or 1
+            )
+            memory_budget_mb = ConfigManager.get(
+                "SANDBOX_SCHEDULER_MEMORY_BUDGET_MB"
+            ) or (_host_memory_mb() // 2)
+            _global_scheduler = SandboxScheduler(cpu_budget, memory_budget_mb)
+            logger.info(
+                f"[SANDBOX_SCHEDULER] Budget: {cpu_budget} CPUs, {memory_budget_mb} MB"
+            )
+        return _global_scheduler
+
+
+@contextmanager
+def admit_sandbox_run() -> Iterator[bool]:
+    """
+    Admit one local sandbox run through the global scheduler.
+
+    The run is charged to the context's client (see sandbox_client_scope())
+    and reserves SANDBOX_POOL_CPU_LIMIT CPUs and SANDBOX_POOL_MEMORY_LIMIT
+    memory. The wait ends with the task deadline, or after
+    SANDBOX_SCHEDULER_MAX_WAIT_SECONDS without one.
+
+    Yields:
+        True if the run may start, False if the wait ran out (always True
+        when admission is disabled)
+    """
+    scheduler = get_sandbox_scheduler()
+    if scheduler is None:
+        yield True
+        return
+
+    client, weight = _sandbox_client.get() or (DEFAULT_CLIENT, 1.0)
+    timeout = ConfigManager.get("SANDBOX_SCHEDULER_MAX_WAIT_SECONDS")
+    deadline = current_deadline()
+    if deadline is not None:
+        timeout = min(timeout, max(0.0, deadline.remaining()))
+
+    with scheduler.admission(
+        client,
+        weight,
+        cpu=ConfigManager.get("SANDBOX_POOL_CPU_LIMIT"),
+        memory_mb=parse_memory_mb(ConfigManager.get("SANDBOX_POOL_MEMORY_LIMIT")),
+        timeout=timeout,
+    ) as admitted:
+        yield admitted
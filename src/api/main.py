@@ -50,7 +50,38 @@ from ..utils.notifications import TelegramNotifier
 from ..agent_execution.market_scanner import run_single_scan
 
 # Import LLM Service for proposal generation
-from ..llm_service import LLMService
+from ..llm_service import LLMService, close_async_clients, close_clients
+
+# Import local model warm-up so background work never starts on a cold model
+from ..llm_warmup import get_warmup_manager, wait_for_warm_models
+
+# Import the warm sandbox pool and async sandbox slots to stop them on shutdown
+from ..agent_execution.sandbox_pool import shutdown_sandbox_pools
+from ..agent_execution.docker_sandbox import (
+    OutputListener,
+    activate_output_listener,
+    reset_output_listener,
+    shutdown_async_executor,
+)
+
+# Sandbox runs are admitted per client (fair share under contention)
+from ..agent_execution.sandbox_scheduler import (
+    activate_sandbox_client,
+    get_sandbox_scheduler,
+    reset_sandbox_client,
+)
+from ..agent_execution.sandbox_cache import get_sandbox_cache
+from ..agent_execution.fix_cache import get_fix_cache
+from ..agent_execution.artifact_checks import (
+    activate_high_value_task,
+    reset_high_value_task,
+)
+
+# Import the WebSocket manager to stream sandbox output to task subscribers
+from .websocket_manager import get_websocket_manager
+
+# Import task deadlines so every stage of a task shares one time budget
+from ..utils.deadline import Deadline, activate_deadline, reset_deadline
 
 # Import Bid model for tracking bids
 from .models import Bid, BidStatus
@@ -498,6 +529,16 @@ async def _escalate_task(db, task, reason: str, error_message: str = None):
         db.commit()
 
 
+def _sandbox_output_listener(task_id: str) -> Optional[OutputListener]:
+    """Forward a task's sandbox output lines to its WebSocket subscribers."""
+    try:
+        forward = get_websocket_manager().task_output_forwarder(task_id)
+    except Exception as e:
+        logger.debug(f"Sandbox output not forwarded for task {task_id}: {e}")
+        return None
+    return lambda log: forward(log.text)
+
+
 async def process_task_async(task_id: str, use_planning_workflow: bool = True):
     """
     Process a task asynchronously after payment is confirmed.
@@ -527,6 +568,19 @@ async def process_task_async(task_id: str, use_planning_workflow: bool = True):
     # Initialize logger
     logger = get_logger(__name__)
 
+    # Don't pay model-load time inside the task's request timeouts
+    if not await wait_for_warm_models():
+        logger.warning(f"Processing task {task_id} before local models are warm")
+
+    # One budget for planning, LLM calls, sandbox runs and retries
+    deadline = Deadline(ConfigManager.get("TASK_DEADLINE_SECONDS"))
+    deadline_token = activate_deadline(deadline)
+
+    # Stream sandbox output (progress, errors) to the task's subscribers
+    output_token = activate_output_listener(_sandbox_output_listener(task_id))
+
+    client_token = None
+    value_token = None
     db = SessionLocal()
     try:
         # Retrieve the task from the database
@@ -536,6 +590,14 @@ async def process_task_async(task_id: str, use_planning_workflow: bool = True):
             logger.error(f"Task {task_id} not found for processing")
             return
 
+        # Charge sandbox runs to the client; high-value tasks get a larger share
+        weight = 1.0
+        if task.is_high_value:
+            weight = ConfigManager.get("SANDBOX_HIGH_VALUE_WEIGHT")
+        client_token = activate_sandbox_client(task.client_email or task_id, weight)
+        # High-value artifacts are always reviewed by the LLM
+        value_token = activate_high_value_task(bool(task.is_high_value))
+
         if task.status != TaskStatus.PAID:
             logger.warning(
                 f"Task {task_id} is not in PAID status, current status: {task.status}"
@@ -745,7 +807,8 @@ Support,180"""
 
             # Execute the workflow
             orchestrator = ResearchAndPlanOrchestrator()
-            workflow_result = orchestrator.execute_workflow(
+            workflow_result = await asyncio.to_thread(
+                orchestrator.execute_workflow,
                 user_request=user_request,
                 domain=task.domain,
                 csv_data=csv_data,
@@ -753,6 +816,7 @@ Support,180"""
                 filename=task.filename,
                 file_type=task.file_type,
                 api_key=e2b_api_key,
+                deadline=deadline,
             )
 
             # Store execution log
@@ -933,8 +997,10 @@ Support,180"""
                 except Exception as rag_err:
                     logger.warning(f"Async RAG retrieval failed: {rag_err}")
 
-            # Call executor with pre-fetched examples
-            result = execute_task(
+            # Call executor with pre-fetched examples (in a worker thread so
+            # sandbox runs don't block the event loop)
+            result = await asyncio.to_thread(
+                execute_task,
                 domain=task.domain,
                 user_request=user_request,
                 csv_data=csv_data or "",
@@ -942,6 +1008,7 @@ Support,180"""
                 file_content=task.file_content,
                 filename=task.filename,
                 few_shot_examples=few_shot_examples,
+                deadline=deadline,
             )
 
             # Update the task with the result based on output format (diverse output types)
@@ -1026,6 +1093,12 @@ Support,180"""
         except Exception:
             pass
     finally:
+        if value_token is not None:
+            reset_high_value_task(value_token)
+        if client_token is not None:
+            reset_sandbox_client(client_token)
+        reset_output_listener(output_token)
+        reset_deadline(deadline_token)
         db.close()
 
 
@@ -1199,6 +1272,11 @@ async def lifespan(app: FastAPI):
             get_async_rag_service(vector_db)
             logger.info("Async RAG service initialized")
 
+    # Preload local models in the background (readiness on /api/v1/system/models)
+    warmup_manager = get_warmup_manager()
+    if warmup_manager:
+        warmup_manager.start()
+
     # Start autonomous scanning loop if enabled
     await start_autonomous_loop()
 
@@ -1209,6 +1287,17 @@ async def lifespan(app: FastAPI):
         await queue.stop()
         logger.info("Background job queue stopped")
 
+    if warmup_manager:
+        await warmup_manager.stop()
+
+    # Stop async sandbox slots and remove warm sandbox containers
+    shutdown_async_executor()
+    shutdown_sandbox_pools()
+
+    # Release pooled LLM connections
+    await close_async_clients()
+    close_clients()
+
 
 # Update your FastAPI initialization to use the lifespan
 app = FastAPI(title="ArbitrageAI API", lifespan=lifespan)
@@ -1994,6 +2083,27 @@ async def calculate_price_with_discount(
 # =============================================================================
 
 
+@app.get("/api/admin/sandbox-metrics")
+async def get_sandbox_metrics():
+    """
+    Get sandbox admission, result cache and fix cache metrics.
+
+    Returns:
+        - scheduler: Admissions, queue-wait percentiles and budget use
+          (None when admission control is disabled)
+        - cache: Result cache hits, misses and size (None when disabled)
+        - fix_cache: Known-fix hit rate and outcomes (None when disabled)
+    """
+    scheduler = get_sandbox_scheduler()
+    cache = get_sandbox_cache()
+    fix_cache = get_fix_cache()
+    return {
+        "scheduler": scheduler.get_metrics() if scheduler else None,
+        "cache": cache.get_metrics() if cache else None,
+        "fix_cache": fix_cache.get_metrics() if fix_cache else None,
+    }
+
+
 @app.get("/api/admin/metrics")
 async def get_admin_metrics(db: Session = Depends(get_db)):
     """
@@ -2407,6 +2517,7 @@ Keep it concise but professional. Around 150-200 words."""
             temperature=0.7,
             max_tokens=500,
             stealth_mode=True,  # Add human-like delay
+            use_cache=True,  # Reposted jobs reuse the earlier proposal
         )
 
         return result.get("content", "Proposal generation failed.")
@@ -2433,6 +2544,10 @@ async def run_autonomous_loop():
     # Initialize notifier
     notifier = TelegramNotifier()
 
+    # The first scan evaluates jobs with a local model; wait until it is loaded
+    if not await wait_for_warm_models():
+        logger.warning("[AUTONOMOUS] Starting scans before local models are warm")
+
     while True:
         try:
             logger.info("[AUTONOMOUS] Scanning marketplace for new jobs...")
@@ -2592,6 +2707,29 @@ async def start_autonomous_loop():
         )
 
 
+# =============================================================================
+# LOCAL MODEL READINESS
+# =============================================================================
+
+
+@app.get("/api/v1/system/models", response_model=dict)
+async def get_model_readiness():
+    """
+    Get warm-up status of the local models.
+
+    Response:
+        - enabled: Whether model warm-up is configured
+        - ready: True once every local model has loaded
+        - warmup_complete: True once every load attempt has finished
+        - models: Per model and endpoint status, load_time_ms and last_ping_at
+    """
+    warmup_manager = get_warmup_manager()
+    if warmup_manager is None:
+        return {"enabled": False, "ready": True, "models": []}
+
+    return {"enabled": True, **warmup_manager.get_status()}
+
+
 # =============================================================================
 # SYSTEM MODE ENDPOINTS (Issue #88: Training Mode Toggle)
 # =============================================================================
@@ -25,7 +25,7 @@ import asyncio
 import json
 import time
 from datetime import datetime
-from typing import Dict, List, Optional, Set, Any, Union
+from typing import Callable, Dict, List, Optional, Set, Any, Union
 from dataclasses import dataclass, asdict
 from enum import Enum as PyEnum
 from fastapi import WebSocket, WebSocketDisconnect
@@ -409,6 +409,30 @@ class WebSocketManager:
             progress=progress
         )
     
+    def task_output_forwarder(
+        self,
+        task_id: str,
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> Callable[[str], None]:
+        """
+        Build a callback that forwards a task's output lines to its subscribers.
+
+        The callback may be called from worker threads (e.g. a sandbox run);
+        each line is sent as a PROCESSING update on the event loop.
+        """
+        loop = loop or asyncio.get_running_loop()
+        
+        def forward(line: str):
+            line = line.rstrip()
+            if not line or not self.task_subscriptions.get(task_id):
+                return
+            asyncio.run_coroutine_threadsafe(
+                self.send_task_update(task_id, TaskStatus.PROCESSING, message=line),
+                loop
+            )
+        
+        return forward
+    
     async def send_task_completed(
         self, 
         task_id: str, 
@@ -51,6 +51,47 @@ class ConfigManager:
         # Sandbox Execution Timeouts
         "DOCKER_SANDBOX_TIMEOUT": 120,
         "SANDBOX_TIMEOUT_SECONDS": 600,
+        # Warm sandbox container pool (per image)
+        "SANDBOX_POOL_ENABLED": True,
+        "SANDBOX_POOL_SIZE": 2,
+        "SANDBOX_POOL_MAX_USES": 50,  # Runs before a container is recycled
+        "SANDBOX_POOL_MEMORY_LIMIT": "1g",
+        "SANDBOX_POOL_CPU_LIMIT": 1.0,
+        "SANDBOX_POOL_PIDS_LIMIT": 128,
+        # Concurrent LocalDockerSandbox.run_code_async() runs
+        "SANDBOX_ASYNC_SLOTS": 4,
+        # Stop a sandbox run that keeps going after a fatal traceback
+        "SANDBOX_FATAL_STOP_ENABLED": True,
+        "SANDBOX_FATAL_STOP_GRACE_SECONDS": 1.0,
+        # Reuse results of identical sandbox runs (same code, data and image)
+        "SANDBOX_CACHE_ENABLED": True,
+        "SANDBOX_CACHE_MAX_BYTES": 256 * 1024 * 1024,
+        "SANDBOX_CACHE_TTL_SECONDS": 86400,
+        "SANDBOX_CACHE_DISK_PATH": None,  # e.g. data/sandbox_cache.db
+        # Prebuilt image per output format (see sandbox_images.py)
+        "SANDBOX_FORMAT_IMAGES_ENABLED": True,
+        "SANDBOX_E2B_TEMPLATES_ENABLED": False,
+        # Admission control for local sandbox runs (0 = derive from the host)
+        "SANDBOX_SCHEDULER_ENABLED": True,
+        "SANDBOX_SCHEDULER_CPU_BUDGET": 0.0,
+        "SANDBOX_SCHEDULER_MEMORY_BUDGET_MB": 0,
+        "SANDBOX_SCHEDULER_MAX_WAIT_SECONDS": 300,
+        "SANDBOX_HIGH_VALUE_WEIGHT": 2.0,  # Fair-share weight of high-value tasks
+        # Generate several visualization candidates at once (costs more LLM calls)
+        "SPECULATIVE_VISUALIZATION_ENABLED": False,
+        "SPECULATIVE_CANDIDATES": 3,
+        # Local artifact checks before the LLM review
+        "ARTIFACT_PRECHECK_ENABLED": True,
+        "ARTIFACT_PRECHECK_SKIP_REVIEW": True,  # Clearly fine, low-value: no review
+        # Known fixes for recurring sandbox errors, tried before the LLM
+        "FIX_CACHE_ENABLED": True,
+        "FIX_CACHE_DISK_PATH": None,  # e.g. data/fix_cache.db
+        # Combined reports: render figures and report code concurrently
+        "REPORT_PARALLEL_ENABLED": True,
+        "REPORT_MAX_CONCURRENCY": 4,
+        # Known document types rendered in-process, without codegen or sandbox
+        # (opt-in: the content is built from the data alone, with no prose)
+        "TEMPLATE_FAST_PATH_ENABLED": False,
         "MAX_RETRY_ATTEMPTS": 3,
         # Delivery & Security Thresholds
         "DELIVERY_TOKEN_TTL_HOURS": 1,
@@ -74,6 +115,38 @@ class ConfigManager:
         "LLM_HEALTH_CHECK_MAX_DELAY_MS": 10000,
         # Circuit Breaker
         "URL_CIRCUIT_BREAKER_COOLDOWN_SECONDS": 300,
+        # LLM Response Cache (opt-in)
+        "LLM_CACHE_ENABLED": False,
+        "LLM_CACHE_MAX_ENTRIES": 1024,
+        "LLM_CACHE_TTL_SECONDS": 3600,
+        "LLM_CACHE_DISK_PATH": None,  # e.g. data/llm_cache.db
+        # LLM Single-Flight (coalesce concurrent identical requests)
+        "LLM_SINGLE_FLIGHT_ENABLED": True,
+        # LLM Hedged Requests (complete_with_fallback)
+        "LLM_HEDGING_ENABLED": False,
+        "LLM_HEDGE_MAX_IN_FLIGHT": 4,  # Budget of concurrent hedge requests
+        "LLM_HEDGE_DEFAULT_DELAY_MS": 5000,  # Until enough latency samples exist
+        # LLM Adaptive Concurrency Limit (per local endpoint)
+        "LLM_CONCURRENCY_LIMIT_ENABLED": True,
+        "LLM_CONCURRENCY_INITIAL_LIMIT": 4,
+        "LLM_CONCURRENCY_MAX_LIMIT": 16,
+        "LLM_CONCURRENCY_QUEUE_TIMEOUT_SECONDS": 30,
+        # Shared LLM HTTP connection pools (per base_url + api_key)
+        "LLM_HTTP_MAX_CONNECTIONS": 100,
+        "LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS": 20,
+        "LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS": 30,
+        # Local model warm-up and keep-alive (started by the API lifespan)
+        "LLM_WARMUP_ENABLED": True,
+        "LLM_WARMUP_MODELS": None,  # Comma-separated; defaults to configured models
+        "LLM_WARMUP_KEEP_ALIVE": "30m",  # Ollama keep_alive sent with each ping
+        "LLM_WARMUP_KEEPALIVE_INTERVAL_SECONDS": 240,
+        "LLM_WARMUP_LOAD_TIMEOUT_SECONDS": 300,
+        "LLM_WARMUP_READY_TIMEOUT_SECONDS": 600,  # Max wait before work starts
+        # Prompt token budget for data context (raw rows become a profile beyond it)
+        "PROMPT_DATA_TOKEN_BUDGET": 2000,
+        "PROMPT_DATA_TOKEN_BUDGET_LOCAL": 1000,
+        # Per-task deadline bounding LLM calls, sandbox runs and retries
+        "TASK_DEADLINE_SECONDS": 900,
         # General
         "ENV": "development",
         "DEBUG": False,
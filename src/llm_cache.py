@@ -0,0 +1,258 @@
+"""
+LLM Response Cache
+
+Content-addressed cache for LLM completions. Identical requests (same
+endpoint, model, prompts and sampling parameters) are served from cache
+instead of paying for another round trip.
+
+Features:
+- Bounded in-memory LRU tier with TTL
+- Optional SQLite tier that survives restarts
+- Hit/miss/byte metrics for observability
+
+The cache is opt-in: set LLM_CACHE_ENABLED=true to attach it to every
+LLMService, and LLM_CACHE_DISK_PATH to enable the persistent tier.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LLMResponseCache:
+    """
+    Two-tier (memory LRU + optional SQLite) cache for LLM responses.
+
+    Entries are keyed by a SHA-256 digest of the request parameters, so the
+    cache never stores prompts in its keys.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: int = 3600,
+        disk_path: Optional[str] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries held in memory
+            ttl_seconds: Time-to-live for entries in both tiers
+            disk_path: Optional path to a SQLite file for the persistent tier
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+
+        # key -> (stored_at, serialized value)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self._metrics = {
+            "hits": 0,
+            "misses": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "bytes_served": 0,
+        }
+
+        if disk_path:
+            self._open_disk_tier(disk_path)
+
+    def _open_disk_tier(self, disk_path: str):
+        """Open (and create if needed) the SQLite tier."""
+        directory = os.path.dirname(disk_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(disk_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._db.commit()
+        logger.info(f"[LLM_CACHE] Disk tier enabled at {disk_path}")
+
+    @staticmethod
+    def make_key(
+        base_url: str,
+        model: str,
+        system_prompt: Optional[str],
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Build the content-addressed key for a request.
+
+        Args:
+            base_url: Endpoint base URL
+            model: Model name
+            system_prompt: System prompt (may be None)
+            prompt: User prompt
+            temperature: Resolved sampling temperature
+            max_tokens: Resolved max tokens
+            extra: Additional API parameters that affect the output
+
+        Returns:
+            Hex SHA-256 digest identifying the request
+        """
+        payload = json.dumps(
+            {
+                "base_url": base_url,
+                "model": model,
+                "system_prompt": system_prompt,
+                "prompt": prompt,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "extra": extra or {},
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - stored_at > self.ttl_seconds
+
+    def _put_memory(self, key: str, stored_at: float, serialized: str):
+        """Insert into the memory tier, evicting LRU entries. Caller holds lock."""
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous[1])
+
+        self._memory[key] = (stored_at, serialized)
+        self._memory_bytes += len(serialized)
+
+        while len(self._memory) > self.max_entries:
+            _, (_, evicted) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._metrics["evictions"] += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Returns:
+            The cached response dict, or None on a miss
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, serialized = entry
+                if self._is_expired(stored_at):
+                    del self._memory[key]
+                    self._memory_bytes -= len(serialized)
+                    self._metrics["expirations"] += 1
+                else:
+                    self._memory.move_to_end(key)
+                    self._metrics["hits"] += 1
+                    self._metrics["memory_hits"] += 1
+                    self._metrics["bytes_served"] += len(serialized)
+                    return json.loads(serialized)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, stored_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    serialized, stored_at = row
+                    if self._is_expired(stored_at):
+                        self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                        self._db.commit()
+                        self._metrics["expirations"] += 1
+                    else:
+                        # Promote to the memory tier
+                        self._put_memory(key, stored_at, serialized)
+                        self._metrics["hits"] += 1
+                        self._metrics["disk_hits"] += 1
+                        self._metrics["bytes_served"] += len(serialized)
+                        return json.loads(serialized)
+
+            self._metrics["misses"] += 1
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store a response in every enabled tier."""
+        serialized = json.dumps(value, default=str)
+        stored_at = time.time()
+
+        with self._lock:
+            self._put_memory(key, stored_at, serialized)
+            self._metrics["stores"] += 1
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, stored_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, serialized, stored_at),
+                )
+                self._db.commit()
+
+    def clear(self):
+        """Remove all entries from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def close(self):
+        """Close the disk tier connection."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get cache metrics (hits, misses, bytes, hit rate)."""
+        with self._lock:
+            lookups = self._metrics["hits"] + self._metrics["misses"]
+            return {
+                **self._metrics,
+                "entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "hit_rate": self._metrics["hits"] / lookups if lookups else 0.0,
+                "disk_enabled": self._db is not None,
+            }
+
+
+# Global cache instance
+_global_llm_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    Get the global response cache, or None if caching is disabled.
+
+    Configured via LLM_CACHE_ENABLED, LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_TTL_SECONDS and LLM_CACHE_DISK_PATH.
+    """
+    global _global_llm_cache
+    if not ConfigManager.get("LLM_CACHE_ENABLED"):
+        return None
+    if _global_llm_cache is None:
+        _global_llm_cache = LLMResponseCache(
+            max_entries=ConfigManager.get("LLM_CACHE_MAX_ENTRIES"),
+            ttl_seconds=ConfigManager.get("LLM_CACHE_TTL_SECONDS"),
+            disk_path=ConfigManager.get("LLM_CACHE_DISK_PATH"),
+        )
+    return _global_llm_cache
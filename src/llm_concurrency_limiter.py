@@ -0,0 +1,300 @@
+"""
+Adaptive Concurrency Limiter for LLM Endpoints
+
+Caps how many requests hit an inference endpoint at once, and adapts the
+cap with AIMD (additive increase, multiplicative decrease) from observed
+latency and errors. Local Ollama instances lose throughput badly when
+oversubscribed; the limiter holds them near their best concurrency and
+queues the excess instead.
+
+Features:
+- Additive increase while latency stays near the endpoint's baseline
+- Baselines kept per request class (output length), compared per output
+  token, so long completions are not mistaken for congestion
+- Multiplicative decrease on latency inflation or errors
+- FIFO queue for excess callers, each with a deadline
+- Works from threads (acquire) and event loops (acquire_async)
+- Limit, in-flight and queue depth metrics
+
+One limiter is kept per endpoint registered with LLMHealthChecker.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ConcurrencyLimitTimeout(Exception):
+    """Raised when a caller's deadline passes while queued for a slot."""
+
+    pass
+
+
+class _Waiter:
+    """A queued caller, woken through an Event (sync) or a Future (async)."""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.granted = False
+        self.loop = loop
+        self.event: Optional[threading.Event] = None
+        self.future: Optional[asyncio.Future] = None
+        if loop is None:
+            self.event = threading.Event()
+        else:
+            self.future = loop.create_future()
+
+    def wake(self):
+        """Hand this waiter a slot. Caller holds the limiter lock."""
+        self.granted = True
+        if self.event is not None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(True)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limiter for a single endpoint.
+
+    Each completed request is reported with on_success() or on_failure().
+    Completion latency grows with output length, so successes are grouped
+    into classes by output tokens (powers of two) and measured in ms per
+    output token. A success within latency_tolerance times its class
+    baseline (a low percentile of the class's recent samples) grows the
+    limit by 1/limit, i.e. about +1 per limit's worth of requests. Slower
+    successes shrink it by backoff_ratio and failures by error_backoff_ratio.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        latency_tolerance: float = 2.0,
+        backoff_ratio: float = 0.9,
+        error_backoff_ratio: float = 0.5,
+        baseline_window: int = 100,
+        baseline_percentile: float = 0.1,
+        min_baseline_samples: int = 5,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            endpoint: Endpoint URL this limiter guards (for logging)
+            initial_limit: Starting concurrency limit
+            min_limit: Lower bound for the limit
+            max_limit: Upper bound for the limit
+            latency_tolerance: Latency inflation over baseline that counts
+                               as overload
+            backoff_ratio: Multiplier applied to the limit on overload
+            error_backoff_ratio: Multiplier applied to the limit on errors
+            baseline_window: Number of recent samples per class kept for
+                             the baseline
+            baseline_percentile: Percentile of a class's samples used as
+                                 its baseline
+            min_baseline_samples: Samples a class needs before its latency
+                                  can shrink the limit
+        """
+        self.endpoint = endpoint
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self.error_backoff_ratio = error_backoff_ratio
+        self.baseline_window = baseline_window
+        self.baseline_percentile = baseline_percentile
+        self.min_baseline_samples = min_baseline_samples
+
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._queue: Deque[_Waiter] = deque()
+        self._latencies: Dict[int, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+        self._metrics = {
+            "admitted": 0,
+            "queued": 0,
+            "timeouts": 0,
+            "increases": 0,
+            "decreases": 0,
+        }
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit."""
+        return int(self._limit)
+
+    def _try_admit(self) -> bool:
+        """Take a slot if one is free and nobody is queued. Caller holds lock."""
+        if not self._queue and self._in_flight < self.limit:
+            self._in_flight += 1
+            self._metrics["admitted"] += 1
+            return True
+        return False
+
+    def _wake_waiters(self):
+        """Hand free slots to queued callers in FIFO order. Caller holds lock."""
+        while self._queue and self._in_flight < self.limit:
+            waiter = self._queue.popleft()
+            self._in_flight += 1
+            self._metrics["admitted"] += 1
+            waiter.wake()
+
+    def _leave_queue(self, waiter: _Waiter) -> bool:
+        """
+        Take a timed-out or cancelled waiter out of the queue.
+
+        Returns True if a slot was granted just before it gave up, in which
+        case the caller owns that slot.
+        """
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._queue.remove(waiter)
+            return False
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        Block until a slot is free.
+
+        Args:
+            timeout: Seconds to wait in the queue (None waits forever)
+
+        Raises:
+            ConcurrencyLimitTimeout: If no slot frees up before the deadline
+        """
+        with self._lock:
+            if self._try_admit():
+                return
+            waiter = _Waiter()
+            self._queue.append(waiter)
+            self._metrics["queued"] += 1
+
+        if waiter.event.wait(timeout) or self._leave_queue(waiter):
+            return
+        self._raise_timeout(timeout)
+
+    async def acquire_async(self, timeout: Optional[float] = None):
+        """
+        Async version of acquire(); waits without blocking the event loop.
+
+        Raises:
+            ConcurrencyLimitTimeout: If no slot frees up before the deadline
+        """
+        with self._lock:
+            if self._try_admit():
+                return
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._queue.append(waiter)
+            self._metrics["queued"] += 1
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            if self._leave_queue(waiter):
+                return
+            self._raise_timeout(timeout)
+        except asyncio.CancelledError:
+            if self._leave_queue(waiter):
+                # The slot was handed over just as we were cancelled
+                self.release()
+            raise
+
+    def _raise_timeout(self, timeout: Optional[float]):
+        """Count a queue timeout and raise ConcurrencyLimitTimeout."""
+        with self._lock:
+            self._metrics["timeouts"] += 1
+        raise ConcurrencyLimitTimeout(
+            f"Timed out after {timeout}s waiting for a slot on {self.endpoint} "
+            f"(limit {self.limit})"
+        )
+
+    def release(self):
+        """Return a slot and admit the next queued caller."""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._wake_waiters()
+
+    @staticmethod
+    def _latency_class(output_tokens: Optional[int]) -> int:
+        """Bucket requests by output length: -1 if unknown, else log2 class."""
+        if not output_tokens or output_tokens < 0:
+            return -1
+        return int(output_tokens).bit_length()
+
+    def _baseline(self, samples: Deque[float]) -> Optional[float]:
+        """Low percentile of a class's samples, once there are enough."""
+        if len(samples) < self.min_baseline_samples:
+            return None
+        ordered: List[float] = sorted(samples)
+        return ordered[int((len(ordered) - 1) * self.baseline_percentile)]
+
+    def on_success(
+        self, response_time_ms: float, output_tokens: Optional[int] = None
+    ):
+        """
+        Adapt the limit after a successful request.
+
+        Args:
+            response_time_ms: End-to-end latency of the request
+            output_tokens: Completion tokens generated, if known
+        """
+        with self._lock:
+            if response_time_ms <= 0:
+                return
+            latency_class = self._latency_class(output_tokens)
+            if latency_class >= 0:
+                sample = response_time_ms / output_tokens
+            else:
+                sample = response_time_ms
+            samples = self._latencies.setdefault(
+                latency_class, deque(maxlen=self.baseline_window)
+            )
+            samples.append(sample)
+            baseline = self._baseline(samples)
+
+            if baseline is not None and sample > baseline * self.latency_tolerance:
+                self._decrease(self.backoff_ratio)
+            elif self._in_flight >= self.limit - 1:
+                # Only grow while the current limit is actually being used
+                previous = self.limit
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+                if self.limit > previous:
+                    self._metrics["increases"] += 1
+                    self._wake_waiters()
+
+    def on_failure(self):
+        """Adapt the limit after a failed request."""
+        with self._lock:
+            self._decrease(self.error_backoff_ratio)
+
+    def _decrease(self, ratio: float):
+        """Multiplicative decrease. Caller holds lock."""
+        previous = self.limit
+        self._limit = max(self.min_limit, self._limit * ratio)
+        if self.limit < previous:
+            self._metrics["decreases"] += 1
+            logger.debug(
+                f"[LIMITER] {self.endpoint} limit {previous} -> {self.limit}"
+            )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get limiter metrics (limit, in flight, queue depth, counters)."""
+        with self._lock:
+            return {
+                **self._metrics,
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "queue_depth": len(self._queue),
+            }
@@ -0,0 +1,154 @@
+"""
+Local Inference Endpoint Pool
+
+Load-balances requests across several interchangeable local inference
+endpoints (e.g. one Ollama or llama.cpp instance per port), so local
+throughput scales with the number of instances.
+
+Routing:
+- Endpoints whose circuit breaker is OPEN are skipped
+- Each endpoint is scored by expected wait: (outstanding + 1) x recent
+  average latency, using response times from LLMHealthChecker
+- Requests stick to the endpoint a model last used, so its weights stay
+  resident, unless another endpoint is clearly less loaded
+
+Configured with LOCAL_BASE_URLS (comma-separated) or by passing
+local_endpoints to LLMService.with_local() / for_task().
+"""
+
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.llm_health_check import get_health_checker
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Number of recent response times used for the latency weight
+LATENCY_WINDOW = 20
+
+
+class LocalEndpointPool:
+    """
+    Routes requests across a fixed set of local endpoints.
+
+    Callers take an endpoint with acquire(model) and must hand it back with
+    release(endpoint) when the request finishes, so outstanding counts stay
+    accurate.
+    """
+
+    def __init__(self, endpoints: Sequence[str], sticky_tolerance: float = 1.5):
+        """
+        Initialize the pool.
+
+        Args:
+            endpoints: Base URLs of the local endpoints
+            sticky_tolerance: How much worse (as a score ratio) a model's
+                              current endpoint may be than the best one
+                              before the model is moved
+        """
+        if not endpoints:
+            raise ValueError("LocalEndpointPool needs at least one endpoint")
+
+        self.endpoints: List[str] = list(dict.fromkeys(endpoints))
+        self.sticky_tolerance = sticky_tolerance
+        self._outstanding: Dict[str, int] = {e: 0 for e in self.endpoints}
+        self._sticky: Dict[str, str] = {}
+        self._routed: Dict[str, int] = {e: 0 for e in self.endpoints}
+        self._lock = threading.Lock()
+
+        health_checker = get_health_checker()
+        for endpoint in self.endpoints:
+            health_checker.register_endpoint(
+                endpoint, failure_threshold=3, recovery_timeout_seconds=60
+            )
+
+    def _average_latency_ms(self, endpoint: str) -> Optional[float]:
+        """Mean of the endpoint's recent response times, if any."""
+        samples = get_health_checker().get_health_status(endpoint).response_times
+        recent = samples[-LATENCY_WINDOW:]
+        if not recent:
+            return None
+        return sum(recent) / len(recent)
+
+    def _scores(self, candidates: List[str]) -> Dict[str, float]:
+        """Expected-wait score for each candidate (lower is better). Holds lock."""
+        latencies = {e: self._average_latency_ms(e) for e in candidates}
+        known = [ms for ms in latencies.values() if ms is not None]
+        # Endpoints without data are assumed to be as fast as the average
+        default_ms = sum(known) / len(known) if known else 1.0
+        return {
+            e: (self._outstanding[e] + 1) * (latencies[e] or default_ms)
+            for e in candidates
+        }
+
+    def acquire(self, model: str) -> str:
+        """
+        Pick the endpoint for a request and count it as outstanding.
+
+        Args:
+            model: Model the request is for (drives sticky routing)
+
+        Returns:
+            Base URL of the chosen endpoint
+        """
+        health_checker = get_health_checker()
+        healthy = [e for e in self.endpoints if health_checker.should_allow_request(e)]
+        # With every circuit open, let the request fail fast on its own breaker
+        candidates = healthy or self.endpoints
+
+        with self._lock:
+            scores = self._scores(candidates)
+            best = min(candidates, key=lambda e: scores[e])
+            chosen = best
+
+            sticky = self._sticky.get(model)
+            if (
+                sticky in scores
+                and scores[sticky] <= scores[best] * self.sticky_tolerance
+            ):
+                chosen = sticky
+
+            self._sticky[model] = chosen
+            self._outstanding[chosen] += 1
+            self._routed[chosen] += 1
+
+        if sticky is not None and chosen != sticky:
+            logger.debug(f"[POOL] Moving {model} from {sticky} to {chosen}")
+        return chosen
+
+    def release(self, endpoint: str):
+        """Mark a request to an endpoint as finished."""
+        with self._lock:
+            if self._outstanding.get(endpoint, 0) > 0:
+                self._outstanding[endpoint] -= 1
+
+    def get_metrics(self) -> Dict[str, Dict[str, object]]:
+        """Get per-endpoint outstanding and routed counts and sticky models."""
+        with self._lock:
+            return {
+                endpoint: {
+                    "outstanding": self._outstanding[endpoint],
+                    "routed": self._routed[endpoint],
+                    "models": sorted(
+                        m for m, e in self._sticky.items() if e == endpoint
+                    ),
+                }
+                for endpoint in self.endpoints
+            }
+
+
+# One pool per endpoint set, so every LLMService shares outstanding counts
+_endpoint_pools: Dict[Tuple[str, ...], LocalEndpointPool] = {}
+_endpoint_pools_lock = threading.Lock()
+
+
+def get_endpoint_pool(endpoints: Sequence[str]) -> LocalEndpointPool:
+    """Get or create the shared pool for a set of local endpoints."""
+    key = tuple(dict.fromkeys(endpoints))
+    with _endpoint_pools_lock:
+        pool = _endpoint_pools.get(key)
+        if pool is None:
+            pool = LocalEndpointPool(key)
+            _endpoint_pools[key] = pool
+        return pool
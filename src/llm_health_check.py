@@ -9,18 +9,22 @@ Features:
 - Circuit breaker with configurable failure thresholds
 - Exponential backoff for retries
 - Health state caching
+- Adaptive (AIMD) concurrency limit per endpoint
 - Metrics for observability
 
 Pillar 2.6 - Ollama Circuit Breaker (Issue #7)
 """
 
 import asyncio
+import math
 import threading
 from enum import Enum
 from typing import Optional, Dict, Any
 from datetime import datetime, timezone
 from dataclasses import dataclass, field
 
+from src.config.config_manager import ConfigManager
+from src.llm_concurrency_limiter import AdaptiveConcurrencyLimiter
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -108,6 +112,7 @@ class LLMHealthChecker:
         self._check_thread: Optional[threading.Thread] = None
         self._running = False
         self._lock = threading.Lock()
+        self._limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
 
     def register_endpoint(
         self,
@@ -126,6 +131,26 @@ class LLMHealthChecker:
                 logger.info(f"[HEALTH] Registered endpoint: {endpoint}")
             return self.health_status[endpoint]
 
+    def get_limiter(self, endpoint: str) -> Optional[AdaptiveConcurrencyLimiter]:
+        """
+        Get the adaptive concurrency limiter for an endpoint.
+
+        Limiters are created on first use with LLM_CONCURRENCY_* settings.
+        Returns None if LLM_CONCURRENCY_LIMIT_ENABLED is false.
+        """
+        if not ConfigManager.get("LLM_CONCURRENCY_LIMIT_ENABLED"):
+            return None
+        with self._lock:
+            limiter = self._limiters.get(endpoint)
+            if limiter is None:
+                limiter = AdaptiveConcurrencyLimiter(
+                    endpoint,
+                    initial_limit=ConfigManager.get("LLM_CONCURRENCY_INITIAL_LIMIT"),
+                    max_limit=ConfigManager.get("LLM_CONCURRENCY_MAX_LIMIT"),
+                )
+                self._limiters[endpoint] = limiter
+            return limiter
+
     def get_health_status(self, endpoint: str) -> HealthMetrics:
         """Get current health status for endpoint."""
         with self._lock:
@@ -154,6 +179,37 @@ class LLMHealthChecker:
                 metrics.opened_at = None
                 logger.info(f"[CIRCUIT] {endpoint} recovered - CLOSED")
 
+    def record_latency(self, endpoint: str, response_time_ms: float):
+        """
+        Record a response time without touching circuit breaker state.
+
+        Used for endpoints that are not circuit-broken (e.g. cloud providers)
+        so their latency distribution is still available for hedging.
+        """
+        metrics = self.get_health_status(endpoint)
+        with self._lock:
+            if response_time_ms > 0:
+                metrics.response_times.append(response_time_ms)
+                if len(metrics.response_times) > metrics.max_response_time_history:
+                    metrics.response_times.pop(0)
+
+    def get_latency_percentile(
+        self, endpoint: str, percentile: float = 95, min_samples: int = 10
+    ) -> Optional[float]:
+        """
+        Get a response time percentile (in ms) for an endpoint.
+
+        Returns None until at least min_samples response times are recorded.
+        """
+        metrics = self.get_health_status(endpoint)
+        with self._lock:
+            samples = sorted(metrics.response_times)
+        if len(samples) < max(1, min_samples):
+            return None
+        # Nearest-rank percentile
+        index = math.ceil(percentile / 100 * len(samples)) - 1
+        return samples[min(len(samples) - 1, max(0, index))]
+
     def record_failure(self, endpoint: str, error: str = ""):
         """Record failed request."""
         metrics = self.get_health_status(endpoint)
@@ -208,6 +264,8 @@ class LLMHealthChecker:
                 metrics.response_times
             )
 
+        limiter = self._limiters.get(endpoint)
+
         return {
             "endpoint": endpoint,
             "state": metrics.state.value,
@@ -228,6 +286,7 @@ class LLMHealthChecker:
             "last_healthy_at": (
                 metrics.last_healthy_at.isoformat() if metrics.last_healthy_at else None
             ),
+            "concurrency": limiter.get_metrics() if limiter else None,
         }
 
     async def health_check(
@@ -0,0 +1,441 @@
+"""
+LLM Record/Replay Stand-in Server
+
+A local OpenAI-compatible server for benchmarking the pipeline
+(execute_task, MarketScanner.evaluate_post, the agent arena) without a
+live model.
+
+Modes:
+- record: Forwards /v1/chat/completions to an upstream endpoint and
+  appends each request/response pair to a JSONL cassette
+- replay: Serves responses from the cassette with synthetic latency
+  (time to first token) and token throughput, so runs are reproducible
+
+Features:
+- Streaming (SSE) and non-streaming chat completions
+- Requests are matched on model, messages, temperature, max_tokens and
+  response_format; repeated identical requests replay their recordings
+  in order
+- Unmatched requests in replay mode get a 404, or a fixed fallback reply
+- Answers Ollama's /api/generate so model warm-up succeeds
+- GET /stats reports hits, misses and recordings
+
+Point the application at it with LLM_STANDIN_URL, which ModelConfig.from_env
+uses as the base URL for both local and cloud models:
+
+    python -m src.llm_replay_server record --cassette perf.jsonl \\
+        --upstream http://localhost:11434/v1
+    python -m src.llm_replay_server replay --cassette perf.jsonl \\
+        --latency-ms 300 --tokens-per-second 40
+    LLM_STANDIN_URL=http://127.0.0.1:8765/v1 uvicorn src.api.main:app
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+DEFAULT_PORT = 8765
+
+# Request fields that decide which recording answers a request
+MATCH_FIELDS = ("model", "messages", "temperature", "max_tokens", "response_format")
+
+# Characters per streamed token, used when a recording has no usage counts
+CHARS_PER_TOKEN = 4
+
+
+def request_key(body: Dict[str, Any]) -> str:
+    """Stable identity of a chat completion request for cassette lookup."""
+    matched = {field: body.get(field) for field in MATCH_FIELDS}
+    encoded = json.dumps(matched, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LLMReplayServer:
+    """
+    Records or replays chat completions behind an OpenAI-compatible API.
+
+    Usage:
+        server = LLMReplayServer("perf.jsonl", mode="replay", latency_ms=200)
+        uvicorn.run(server.create_app(), port=8765)
+    """
+
+    def __init__(
+        self,
+        cassette_path: str,
+        mode: str = MODE_REPLAY,
+        upstream_url: Optional[str] = None,
+        upstream_api_key: Optional[str] = None,
+        latency_ms: float = 0.0,
+        tokens_per_second: Optional[float] = None,
+        chunk_tokens: int = 4,
+        fallback_content: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            cassette_path: JSONL file of recordings (appended to in record mode)
+            mode: "record" or "replay"
+            upstream_url: OpenAI-compatible base URL to record from
+            upstream_api_key: API key for the upstream endpoint
+            latency_ms: Synthetic time to first token in replay mode
+            tokens_per_second: Synthetic generation speed in replay mode
+                               (None to return completions immediately)
+            chunk_tokens: Tokens per streamed chunk
+            fallback_content: Reply for unmatched requests (None for a 404)
+            http_client: Optional httpx client for upstream requests
+        """
+        if mode not in (MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"Unknown mode: {mode}")
+        if mode == MODE_RECORD and not upstream_url:
+            raise ValueError("Record mode needs an upstream_url")
+
+        self.cassette_path = cassette_path
+        self.mode = mode
+        self.upstream_url = upstream_url.rstrip("/") if upstream_url else None
+        self.upstream_api_key = upstream_api_key or "not-needed"
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.chunk_tokens = max(1, chunk_tokens)
+        self.fallback_content = fallback_content
+        self._http_client = http_client
+
+        self._recordings: Dict[str, List[Dict[str, Any]]] = {}
+        self._next_index: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "hits": 0, "misses": 0, "recorded": 0}
+
+        self._load()
+
+    def _load(self):
+        """Read existing recordings from the cassette."""
+        if not os.path.exists(self.cassette_path):
+            return
+        with open(self.cassette_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self._recordings.setdefault(entry["key"], []).append(entry["response"])
+        logger.info(
+            f"[LLM_REPLAY] Loaded {sum(len(r) for r in self._recordings.values())} "
+            f"recordings from {self.cassette_path}"
+        )
+
+    def _save(
+        self,
+        key: str,
+        body: Dict[str, Any],
+        response: Dict[str, Any],
+        elapsed_ms: float,
+    ):
+        """Append a recording to the cassette."""
+        entry = {
+            "key": key,
+            "request": {field: body.get(field) for field in MATCH_FIELDS},
+            "response": response,
+            "elapsed_ms": round(elapsed_ms, 1),
+        }
+        with self._lock:
+            self._recordings.setdefault(key, []).append(response)
+            directory = os.path.dirname(self.cassette_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.cassette_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self.stats["recorded"] += 1
+
+    def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Next recording for key, cycling through repeats of the request."""
+        with self._lock:
+            recordings = self._recordings.get(key)
+            if not recordings:
+                return None
+            index = self._next_index.get(key, 0)
+            self._next_index[key] = index + 1
+            return recordings[index % len(recordings)]
+
+    def _fallback_response(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Synthetic reply for a request that was never recorded."""
+        content = self.fallback_content or ""
+        completion_tokens = math.ceil(len(content) / CHARS_PER_TOKEN)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stand-in"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": 0,
+                "completion_tokens": completion_tokens,
+                "total_tokens": completion_tokens,
+            },
+        }
+
+    async def _record(self, key: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Forward a request upstream and store the response."""
+        upstream_body = {
+            k: v for k, v in body.items() if k not in ("stream", "stream_options")
+        }
+        client = self._http_client or httpx.AsyncClient(timeout=600)
+        start = time.monotonic()
+        try:
+            response = await client.post(
+                f"{self.upstream_url}/chat/completions",
+                json=upstream_body,
+                headers={"Authorization": f"Bearer {self.upstream_api_key}"},
+            )
+            response.raise_for_status()
+        finally:
+            if self._http_client is None:
+                await client.aclose()
+        elapsed_ms = (time.monotonic() - start) * 1000
+
+        result = response.json()
+        self._save(key, body, result, elapsed_ms)
+        return result
+
+    async def complete(self, body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Resolve a chat completion request to a full (non-streamed) response.
+
+        Returns:
+            The recorded or upstream response, or None for a replay miss
+            without a fallback
+        """
+        key = request_key(body)
+        self.stats["requests"] += 1
+
+        if self.mode == MODE_RECORD:
+            return await self._record(key, body)
+
+        response = self._lookup(key)
+        if response is not None:
+            self.stats["hits"] += 1
+            return response
+
+        self.stats["misses"] += 1
+        logger.warning(
+            f"[LLM_REPLAY] No recording for {body.get('model')} request {key[:12]}"
+        )
+        if self.fallback_content is None:
+            return None
+        return self._fallback_response(body)
+
+    @staticmethod
+    def _content(response: Dict[str, Any]) -> str:
+        """Assistant text of a chat completion response."""
+        try:
+            return response["choices"][0]["message"].get("content") or ""
+        except (KeyError, IndexError, TypeError):
+            return ""
+
+    @staticmethod
+    def _completion_tokens(response: Dict[str, Any]) -> int:
+        """Completion token count, estimated when the recording has no usage."""
+        usage = response.get("usage") or {}
+        if usage.get("completion_tokens") is not None:
+            return int(usage["completion_tokens"])
+        return math.ceil(len(LLMReplayServer._content(response)) / CHARS_PER_TOKEN)
+
+    def generation_seconds(self, completion_tokens: int) -> float:
+        """Synthetic time to generate completion_tokens after the first token."""
+        if not self.tokens_per_second:
+            return 0.0
+        return completion_tokens / self.tokens_per_second
+
+    async def _replay_delay(self, response: Dict[str, Any]):
+        """Wait as long as the synthetic model would take for response."""
+        if self.mode != MODE_REPLAY:
+            return
+        delay = self.latency_ms / 1000 + self.generation_seconds(
+            self._completion_tokens(response)
+        )
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def stream_chunks(self, response: Dict[str, Any]):
+        """
+        Yield a response as OpenAI server-sent events.
+
+        In replay mode the first chunk arrives after latency_ms and the rest
+        at tokens_per_second.
+        """
+        content = self._content(response)
+        model = response.get("model", "stand-in")
+        chunk_id = response.get("id") or f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = response.get("created") or int(time.time())
+
+        total_tokens = max(1, self._completion_tokens(response))
+        chars_per_token = max(1, math.ceil(len(content) / total_tokens))
+        step = chars_per_token * self.chunk_tokens
+        pieces = [content[i : i + step] for i in range(0, len(content), step)] or [""]
+        replaying = self.mode == MODE_REPLAY
+        per_chunk = self.generation_seconds(self.chunk_tokens) if replaying else 0.0
+
+        def event(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+            chunk = {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+            return f"data: {json.dumps(chunk)}\n\n"
+
+        if replaying and self.latency_ms > 0:
+            await asyncio.sleep(self.latency_ms / 1000)
+        for i, piece in enumerate(pieces):
+            if i and per_chunk > 0:
+                await asyncio.sleep(per_chunk)
+            delta = {"content": piece}
+            if i == 0:
+                delta["role"] = "assistant"
+            yield event(delta)
+        yield event({}, finish_reason="stop")
+        yield "data: [DONE]\n\n"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus the active mode and cassette."""
+        with self._lock:
+            recordings = sum(len(r) for r in self._recordings.values())
+        return {
+            "mode": self.mode,
+            "cassette": self.cassette_path,
+            "recordings": recordings,
+            **self.stats,
+        }
+
+    def create_app(self):
+        """Build the FastAPI app serving the OpenAI-compatible endpoints."""
+        from fastapi import FastAPI, Request
+        from fastapi.responses import JSONResponse, StreamingResponse
+
+        app = FastAPI(title="LLM Record/Replay Stand-in")
+
+        @app.post("/v1/chat/completions")
+        async def chat_completions(request: Request):
+            body = await request.json()
+            try:
+                response = await self.complete(body)
+            except httpx.HTTPError as e:
+                logger.error(f"[LLM_REPLAY] Upstream request failed: {e}")
+                return JSONResponse(
+                    status_code=502,
+                    content={"error": {"message": str(e), "type": "upstream_error"}},
+                )
+            if response is None:
+                return JSONResponse(
+                    status_code=404,
+                    content={
+                        "error": {
+                            "message": "No recording matches this request",
+                            "type": "replay_miss",
+                            "key": request_key(body),
+                        }
+                    },
+                )
+
+            if body.get("stream"):
+                return StreamingResponse(
+                    self.stream_chunks(response), media_type="text/event-stream"
+                )
+            await self._replay_delay(response)
+            return response
+
+        @app.get("/v1/models")
+        async def list_models():
+            with self._lock:
+                models = sorted(
+                    {
+                        r.get("model")
+                        for recordings in self._recordings.values()
+                        for r in recordings
+                        if r.get("model")
+                    }
+                )
+            return {
+                "object": "list",
+                "data": [
+                    {"id": m, "object": "model", "owned_by": "replay"} for m in models
+                ],
+            }
+
+        @app.post("/api/generate")
+        async def ollama_generate(request: Request):
+            # Ollama's native preload/keep-alive call used by ModelWarmupManager
+            body = await request.json()
+            return {"model": body.get("model"), "response": "", "done": True}
+
+        @app.get("/stats")
+        async def stats():
+            return self.get_stats()
+
+        return app
+
+
+def main(argv: Optional[List[str]] = None):
+    """Run the stand-in server from the command line."""
+    parser = argparse.ArgumentParser(description="LLM record/replay stand-in server")
+    parser.add_argument("mode", choices=[MODE_RECORD, MODE_REPLAY])
+    parser.add_argument("--cassette", required=True, help="JSONL recordings file")
+    parser.add_argument("--upstream", help="Upstream base URL (record mode)")
+    parser.add_argument(
+        "--upstream-api-key", default=os.environ.get("API_KEY"), help="Upstream API key"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--chunk-tokens", type=int, default=4)
+    parser.add_argument(
+        "--fallback", default=None, help="Reply for unmatched requests instead of 404"
+    )
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    server = LLMReplayServer(
+        cassette_path=args.cassette,
+        mode=args.mode,
+        upstream_url=args.upstream,
+        upstream_api_key=args.upstream_api_key,
+        latency_ms=args.latency_ms,
+        tokens_per_second=args.tokens_per_second,
+        chunk_tokens=args.chunk_tokens,
+        fallback_content=args.fallback,
+    )
+    logger.info(
+        f"[LLM_REPLAY] {args.mode} mode on http://{args.host}:{args.port}/v1 "
+        f"(set LLM_STANDIN_URL to use it)"
+    )
+    uvicorn.run(server.create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,17 +8,39 @@ Features:
 - Task-type based model selection (e.g., use local models for "Basic Admin" tasks)
 - Automatic fallback from cloud to local when cloud fails
 - Configurable per-task model mappings
+- Native async completions over a shared AsyncOpenAI connection pool
+- Process-wide client registry: one OpenAI/AsyncOpenAI client and keep-alive
+  pool per (base_url, api_key), shared by every LLMService
+- Optional content-addressed response cache (see llm_cache.py)
+- Single-flight coalescing of concurrent identical requests (see llm_single_flight.py)
+- Optional hedged requests in complete_with_fallback to cut tail latency
+- Adaptive concurrency limit for local endpoints (see llm_concurrency_limiter.py)
+- Load balancing across several local endpoints (see llm_endpoint_pool.py)
 """
 
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
 from dotenv import load_dotenv
+import httpx
 import os
 import asyncio
+import contextvars
+import copy
 import random
+import threading
 import time
-from typing import Optional, Dict, Any
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait as wait_futures,
+)
+from typing import Optional, Dict, Any, AsyncIterator, Callable, Iterator, List, Tuple
 from .llm_health_check import get_health_checker, CircuitBreakerError
+from .llm_cache import LLMResponseCache, get_llm_cache
+from .llm_single_flight import SingleFlight, get_single_flight
+from .llm_endpoint_pool import get_endpoint_pool
 from .config.config_manager import ConfigManager
+from .utils.deadline import DeadlineExceeded, bound_timeout, current_deadline
 
 # Load environment variables from .env file
 # Create a .env file in your project root with the following variables:
@@ -45,6 +67,9 @@ TASK_TYPE_DISTILLED = "distilled"  # Tasks handled by fine-tuned local model
 # Loaded from ConfigManager - see src/config/config_manager.py for defaults
 MIN_CLOUD_REVENUE: int = ConfigManager.get("MIN_CLOUD_REVENUE")
 
+# Per-request timeout applied when the caller does not pass one (in seconds)
+DEFAULT_REQUEST_TIMEOUT_SECONDS = 30
+
 
 class ModelConfig:
     """
@@ -63,6 +88,8 @@ class ModelConfig:
         use_local_by_default: bool = False,
         task_model_map: Optional[Dict[str, str]] = None,
         task_use_local_map: Optional[Dict[str, bool]] = None,
+        local_base_urls: Optional[List[str]] = None,
+        cloud_base_url: Optional[str] = None,
     ):
         """
         Initialize model configuration.
@@ -78,14 +105,30 @@ class ModelConfig:
                            e.g., {"basic_admin": "llama3.2", "complex": "gpt-4o"}
             task_use_local_map: Optional dict mapping task types to local/cloud preference
                                e.g., {"basic_admin": True, "complex": False}
+            local_base_urls: Optional list of interchangeable local endpoints to
+                             load-balance across. Defaults to [local_base_url].
+            cloud_base_url: Base URL for cloud inference. If None, reads the
+                            BASE_URL env var or defaults to OpenAI
         """
         self.cloud_model = cloud_model
         self.local_model = local_model
-        self.local_base_url = local_base_url or ConfigManager.get("OLLAMA_URL")
+        self.local_base_url = (
+            local_base_url
+            or (local_base_urls[0] if local_base_urls else None)
+            or ConfigManager.get("OLLAMA_URL")
+        )
+        self.local_base_urls = list(local_base_urls or [self.local_base_url])
         self.local_api_key = local_api_key
         self.use_local_by_default = use_local_by_default
         self.task_model_map = task_model_map or {}
         self.task_use_local_map = task_use_local_map or {}
+        self.cloud_base_url = cloud_base_url
+
+    def get_cloud_base_url(self) -> str:
+        """Base URL for cloud models."""
+        return self.cloud_base_url or os.environ.get(
+            "BASE_URL", "https://api.openai.com/v1"
+        )
 
     @classmethod
     def from_env(cls) -> "ModelConfig":
@@ -96,9 +139,12 @@ class ModelConfig:
         - CLOUD_MODEL: Default cloud model
         - LOCAL_MODEL: Default local model
         - LOCAL_BASE_URL: Base URL for local inference (default: http://localhost:11434/v1)
+        - LOCAL_BASE_URLS: Comma-separated local endpoints to load-balance across
         - USE_LOCAL_BY_DEFAULT: Set to "true" to use local models by default
         - TASK_MODEL_MAP: JSON string mapping task types to models
         - TASK_USE_LOCAL_MAP: JSON string mapping task types to local preference
+        - LLM_STANDIN_URL: Send every model (local and cloud) to one endpoint,
+          e.g. the record/replay server in src/llm_replay_server.py
 
         Example .env:
             CLOUD_MODEL=gpt-4o-mini
@@ -106,6 +152,7 @@ class ModelConfig:
             USE_LOCAL_BY_DEFAULT=false
             TASK_MODEL_MAP={"basic_admin":"llama3.2","complex":"gpt-4o"}
             TASK_USE_LOCAL_MAP={"basic_admin":true,"complex":false}
+            LOCAL_BASE_URLS=http://localhost:11434/v1,http://localhost:11435/v1
         """
         import json
 
@@ -123,10 +170,22 @@ class ModelConfig:
         except json.JSONDecodeError:
             task_use_local_map = {}
 
+        local_base_urls = [
+            url.strip()
+            for url in os.environ.get("LOCAL_BASE_URLS", "").split(",")
+            if url.strip()
+        ]
+
+        # A stand-in server replaces every endpoint (benchmarks, offline runs)
+        standin_url = os.environ.get("LLM_STANDIN_URL")
+        if standin_url:
+            local_base_urls = [standin_url]
+
         return cls(
             cloud_model=os.environ.get("CLOUD_MODEL", DEFAULT_CLOUD_MODEL),
             local_model=os.environ.get("LOCAL_MODEL", DEFAULT_LOCAL_MODEL),
-            local_base_url=os.environ.get(
+            local_base_url=standin_url
+            or os.environ.get(
                 "LOCAL_BASE_URL"
             ),  # Will use get_ollama_url() via __init__ if None
             local_api_key=os.environ.get("LOCAL_API_KEY", "not-needed"),
@@ -134,6 +193,8 @@ class ModelConfig:
             == "true",
             task_model_map=task_model_map,
             task_use_local_map=task_use_local_map,
+            local_base_urls=local_base_urls or None,
+            cloud_base_url=standin_url,
         )
 
     def get_model_for_task(
@@ -171,7 +232,7 @@ class ModelConfig:
         else:
             return (
                 model,
-                os.environ.get("BASE_URL", "https://api.openai.com/v1"),
+                self.get_cloud_base_url(),
                 os.environ.get("API_KEY", "dummy-key-for-local"),
                 False,
             )
@@ -195,6 +256,168 @@ def set_default_model_config(config: ModelConfig):
     _default_model_config = config
 
 
+# =============================================================================
+# SHARED CLIENTS
+# =============================================================================
+
+# One OpenAI and one AsyncOpenAI client per (base_url, api_key). Each client
+# owns an httpx connection pool, so every LLMService pointed at the same
+# endpoint reuses the same keep-alive connections (and TLS sessions) instead
+# of opening its own. Pool sizes come from the LLM_HTTP_* settings.
+_clients: Dict[Tuple[str, str], OpenAI] = {}
+_async_clients: Dict[Tuple[str, str], AsyncOpenAI] = {}
+_clients_lock = threading.Lock()
+
+
+def _http_limits() -> httpx.Limits:
+    """Connection pool limits for shared LLM clients."""
+    return httpx.Limits(
+        max_connections=ConfigManager.get("LLM_HTTP_MAX_CONNECTIONS"),
+        max_keepalive_connections=ConfigManager.get(
+            "LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS"
+        ),
+        keepalive_expiry=ConfigManager.get("LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS"),
+    )
+
+
+def get_client(base_url: str, api_key: str) -> OpenAI:
+    """Get or create the shared OpenAI client for an endpoint."""
+    key = (base_url, api_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = OpenAI(
+                base_url=base_url,
+                api_key=api_key,
+                http_client=DefaultHttpxClient(limits=_http_limits()),
+            )
+            _clients[key] = client
+        return client
+
+
+def get_async_client(base_url: str, api_key: str) -> AsyncOpenAI:
+    """Get or create the shared AsyncOpenAI client for an endpoint."""
+    key = (base_url, api_key)
+    with _clients_lock:
+        client = _async_clients.get(key)
+        if client is None:
+            client = AsyncOpenAI(
+                base_url=base_url,
+                api_key=api_key,
+                http_client=DefaultAsyncHttpxClient(limits=_http_limits()),
+            )
+            _async_clients[key] = client
+        return client
+
+
+def close_clients():
+    """Close all shared sync clients and release their connection pools."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+async def close_async_clients():
+    """Close all shared async clients and release their connection pools."""
+    with _clients_lock:
+        clients = list(_async_clients.values())
+        _async_clients.clear()
+    for client in clients:
+        await client.close()
+
+
+# =============================================================================
+# HEDGED REQUESTS
+# =============================================================================
+
+
+class HedgeBudget:
+    """
+    Process-wide cap on hedge requests in flight.
+
+    A hedge is a second (local) request started because the primary is
+    slower than usual. Capping them bounds the extra load hedging adds
+    when the primary endpoint is slow for everyone at once.
+    """
+
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max_in_flight
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._metrics = {"started": 0, "won": 0, "skipped": 0}
+
+    def try_acquire(self) -> bool:
+        """Reserve a hedge slot without blocking. Returns False if exhausted."""
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                self._metrics["skipped"] += 1
+                return False
+            self._in_flight += 1
+            self._metrics["started"] += 1
+            return True
+
+    def release(self):
+        """Release a hedge slot once the hedge request has finished."""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def record_win(self):
+        """Record that a hedge answered before the primary."""
+        with self._lock:
+            self._metrics["won"] += 1
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Get hedge metrics (started, won, skipped, in flight)."""
+        with self._lock:
+            return {**self._metrics, "in_flight": self._in_flight}
+
+
+_hedge_budget: Optional[HedgeBudget] = None
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_hedge_budget() -> HedgeBudget:
+    """Get or create the global hedge budget (LLM_HEDGE_MAX_IN_FLIGHT)."""
+    global _hedge_budget
+    if _hedge_budget is None:
+        _hedge_budget = HedgeBudget(ConfigManager.get("LLM_HEDGE_MAX_IN_FLIGHT"))
+    return _hedge_budget
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    """Get the thread pool running hedged sync requests."""
+    global _hedge_executor
+    if _hedge_executor is None:
+        _hedge_executor = ThreadPoolExecutor(thread_name_prefix="llm-hedge")
+    return _hedge_executor
+
+
+def _submit_in_context(
+    executor: ThreadPoolExecutor, fn: Callable[..., Any], *args, **kwargs
+) -> Future:
+    """Submit fn with a copy of the caller's context (task deadline etc.)."""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+# Time a fallback attempt needs after its backoff to be worth trying
+FALLBACK_MIN_ATTEMPT_SECONDS = 5.0
+
+
+def _fallback_backoff_seconds(seconds: float) -> float:
+    """
+    Backoff before a fallback attempt, skipped when the task deadline
+    cannot spare it on top of the attempt itself.
+    """
+    deadline = current_deadline()
+    if deadline is not None and not deadline.allows(
+        seconds + FALLBACK_MIN_ATTEMPT_SECONDS
+    ):
+        return 0.0
+    return seconds
+
+
 class LLMService:
     """
     A wrapper class for the OpenAI client that supports configurable base URLs.
@@ -218,6 +441,9 @@ class LLMService:
         model_config: Optional[ModelConfig] = None,
         enable_fallback: bool = True,
         enable_circuit_breaker: bool = True,
+        cache: Optional[LLMResponseCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        local_endpoints: Optional[List[str]] = None,
     ):
         """
         Initialize the LLM Service.
@@ -259,6 +485,15 @@ class LLMService:
             model_config: Optional ModelConfig for task-based model selection.
             enable_fallback: Whether to automatically try local if cloud fails.
             enable_circuit_breaker: Whether to use circuit breaker for Ollama (default: True).
+            cache: Optional response cache. Defaults to the global cache when
+                   LLM_CACHE_ENABLED is set, otherwise no caching.
+            single_flight: Optional single-flight group for coalescing identical
+                           in-flight requests. Defaults to the global group
+                           unless LLM_SINGLE_FLIGHT_ENABLED is false.
+            local_endpoints: Optional list of interchangeable local endpoints.
+                             With more than one, each request is routed to the
+                             least loaded healthy endpoint (see llm_endpoint_pool.py)
+                             and base_url defaults to the first of them.
         """
         """
         Initialize the LLM Service.
@@ -302,8 +537,10 @@ class LLMService:
             enable_circuit_breaker: Whether to use circuit breaker for Ollama (default: True).
         """
         # Get base_url from parameter, environment, or .env file
-        self.base_url = base_url or os.environ.get(
-            "BASE_URL", "https://api.openai.com/v1"
+        self.base_url = (
+            base_url
+            or (local_endpoints[0] if local_endpoints else None)
+            or (model_config or get_default_model_config()).get_cloud_base_url()
         )
 
         # Get api_key from parameter, environment, or .env file
@@ -317,21 +554,195 @@ class LLMService:
         self.model_config = model_config or get_default_model_config()
         self.enable_fallback = enable_fallback
         self.enable_circuit_breaker = enable_circuit_breaker
+        self.cache = cache if cache is not None else get_llm_cache()
+        self.single_flight = (
+            single_flight if single_flight is not None else get_single_flight()
+        )
 
         # Track if we're currently using local
         self._is_local = "localhost" in self.base_url or "127.0.0.1" in self.base_url
 
         # Initialize health checker for circuit breaker (only for local endpoints)
         self._health_checker = None
+        self._limiter = None
         if self._is_local and enable_circuit_breaker:
             self._health_checker = get_health_checker()
             # Register this endpoint for monitoring
             self._health_checker.register_endpoint(
                 self.base_url, failure_threshold=3, recovery_timeout_seconds=60
             )
+            # Shared adaptive concurrency limit for this endpoint
+            self._limiter = self._health_checker.get_limiter(self.base_url)
+
+        # Shared OpenAI client for this endpoint (see get_client)
+        self.client = get_client(self.base_url, self.api_key)
+
+        # Shared async client - its connection pool is reused by every
+        # LLMService pointed at the same endpoint
+        self.async_client = get_async_client(self.base_url, self.api_key)
+
+        # Per-request routing across several local endpoints. Each endpoint is
+        # served by its own single-endpoint LLMService (created lazily).
+        self._endpoint_pool = None
+        self._endpoint_services: Dict[str, "LLMService"] = {}
+        if local_endpoints and len(set(local_endpoints)) > 1:
+            self._endpoint_pool = get_endpoint_pool(local_endpoints)
+
+    def _endpoint_service(self, endpoint: str) -> "LLMService":
+        """Get the single-endpoint service used for requests routed to endpoint."""
+        service = self._endpoint_services.get(endpoint)
+        if service is None:
+            service = LLMService(
+                base_url=endpoint,
+                api_key=self.api_key,
+                model=self.model,
+                default_temperature=self.default_temperature,
+                default_max_tokens=self.default_max_tokens,
+                model_config=self.model_config,
+                enable_fallback=False,
+                enable_circuit_breaker=self.enable_circuit_breaker,
+            )
+            self._endpoint_services[endpoint] = service
+        # Follow set_model() on the pooled service
+        service.model = self.model
+        return service
 
-        # Initialize the OpenAI client with custom base URL
-        self.client = OpenAI(base_url=self.base_url, api_key=self.api_key)
+    def _check_circuit_breaker(self):
+        """Raise CircuitBreakerError if the circuit is OPEN for this endpoint."""
+        if self._health_checker:
+            if not self._health_checker.should_allow_request(self.base_url):
+                raise CircuitBreakerError(
+                    f"Circuit breaker is OPEN for {self.base_url}. "
+                    f"Service appears to be unavailable."
+                )
+
+    def _record_success(
+        self, response_time_ms: float, output_tokens: Optional[int] = None
+    ):
+        """
+        Record a successful request's latency.
+
+        Circuit-broken (local) endpoints record a full success; other endpoints
+        only contribute latency samples, which drive the hedging delay. The
+        limiter also gets the output length, so it can tell long completions
+        from congestion.
+        """
+        if self._health_checker:
+            self._health_checker.record_success(self.base_url, response_time_ms)
+        else:
+            get_health_checker().record_latency(self.base_url, response_time_ms)
+        if self._limiter:
+            self._limiter.on_success(response_time_ms, output_tokens)
+
+    def _record_failure(self, error: Exception):
+        """Record a failed request against the circuit breaker and limiter."""
+        if self._health_checker:
+            self._health_checker.record_failure(self.base_url, str(error))
+        if self._limiter:
+            self._limiter.on_failure()
+
+    def _request_key(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        extra: Dict[str, Any],
+    ) -> str:
+        """Content-addressed identity of a request on this endpoint and model."""
+        return LLMResponseCache.make_key(
+            self.base_url,
+            self.model,
+            system_prompt,
+            prompt,
+            temperature,
+            max_tokens,
+            extra=extra,
+        )
+
+    def _cache_key_for(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        use_cache: Optional[bool],
+        extra: Dict[str, Any],
+    ) -> Optional[str]:
+        """
+        Get the cache key for a request, or None if it should not be cached.
+
+        With use_cache=None only deterministic (temperature 0) requests are
+        cached; True forces caching and False bypasses the cache.
+        """
+        if self.cache is None:
+            return None
+        if use_cache is None:
+            use_cache = temperature == 0
+        if not use_cache:
+            return None
+        return self._request_key(
+            prompt, system_prompt, temperature, max_tokens, extra
+        )
+
+    def _get_cached(self, cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return the cached result for a key, marked as a cache hit."""
+        if cache_key is None:
+            return None
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            cached["cache_hit"] = True
+        return cached
+
+    @staticmethod
+    def _build_messages(prompt: str, system_prompt: Optional[str] = None) -> list:
+        """Build the chat messages list for a prompt and optional system prompt."""
+        messages = []
+
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    @staticmethod
+    def _completion_tokens(response) -> Optional[int]:
+        """Completion token count reported by the endpoint, if any."""
+        usage = getattr(response, "usage", None)
+        tokens = getattr(usage, "completion_tokens", None)
+        return tokens if isinstance(tokens, int) else None
+
+    @staticmethod
+    def _format_response(
+        response, stealth_mode: bool, response_time_ms: float
+    ) -> Dict[str, Any]:
+        """Convert a chat completion response into the service result dict."""
+        return {
+            "content": response.choices[0].message.content,
+            "model": response.model,
+            "usage": {
+                "prompt_tokens": response.usage.prompt_tokens,
+                "completion_tokens": response.usage.completion_tokens,
+                "total_tokens": response.usage.total_tokens,
+            },
+            "stealth_mode_used": stealth_mode,
+            "response_time_ms": response_time_ms,
+            "cache_hit": False,
+            "coalesced": False,
+        }
+
+    @staticmethod
+    def _unshare(result: Dict[str, Any], shared: bool) -> Dict[str, Any]:
+        """
+        Give each caller of a coalesced request its own copy of the result.
+
+        The single-flight result object is never handed out directly, so
+        callers that annotate their result (e.g. complete_with_fallback)
+        cannot race with each other.
+        """
+        result = copy.deepcopy(result)
+        result["coalesced"] = shared
+        return result
 
     def complete(
         self,
@@ -340,6 +751,8 @@ class LLMService:
         max_tokens: Optional[int] = None,
         system_prompt: Optional[str] = None,
         stealth_mode: bool = False,
+        use_cache: Optional[bool] = None,
+        coalesce: bool = True,
         **kwargs,
     ) -> Dict[str, Any]:
         """
@@ -351,6 +764,10 @@ class LLMService:
             max_tokens: Maximum tokens to generate
             system_prompt: Optional system prompt to set context
             stealth_mode: If True, adds random delay (2-5 seconds) to mimic human typing
+            use_cache: Response cache policy (None = cache only temperature 0,
+                       True = always cache, False = bypass)
+            coalesce: Share one upstream call with concurrent identical requests.
+                      Pass False when independent samples are wanted.
             **kwargs: Additional parameters passed to the API
 
         Returns:
@@ -359,13 +776,86 @@ class LLMService:
         Raises:
             CircuitBreakerError: If circuit breaker is OPEN for this endpoint
         """
-        # Check circuit breaker before making request
-        if self._health_checker:
-            if not self._health_checker.should_allow_request(self.base_url):
-                raise CircuitBreakerError(
-                    f"Circuit breaker is OPEN for {self.base_url}. "
-                    f"Service appears to be unavailable."
+        temperature = (
+            temperature if temperature is not None else self.default_temperature
+        )
+        max_tokens = max_tokens or self.default_max_tokens
+        request_timeout = kwargs.pop("timeout", DEFAULT_REQUEST_TIMEOUT_SECONDS)
+
+        # Serve from cache before touching the endpoint
+        cache_key = self._cache_key_for(
+            prompt, system_prompt, temperature, max_tokens, use_cache, kwargs
+        )
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+
+        if coalesce and self.single_flight is not None:
+            flight_key = self._request_key(
+                prompt, system_prompt, temperature, max_tokens, kwargs
+            )
+            result, shared = self.single_flight.do(
+                flight_key,
+                lambda: self._complete_uncached(
+                    prompt,
+                    temperature,
+                    max_tokens,
+                    system_prompt,
+                    stealth_mode,
+                    request_timeout,
+                    cache_key,
+                    kwargs,
+                ),
+            )
+            return self._unshare(result, shared)
+
+        return self._complete_uncached(
+            prompt,
+            temperature,
+            max_tokens,
+            system_prompt,
+            stealth_mode,
+            request_timeout,
+            cache_key,
+            kwargs,
+        )
+
+    def _complete_uncached(
+        self,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        system_prompt: Optional[str],
+        stealth_mode: bool,
+        request_timeout: float,
+        cache_key: Optional[str],
+        kwargs: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Make the upstream request for complete() and store it in the cache."""
+        # Never wait past the task's deadline
+        request_timeout = bound_timeout(request_timeout, stage="LLM call")
+
+        if self._endpoint_pool is not None:
+            endpoint = self._endpoint_pool.acquire(self.model)
+            try:
+                result = self._endpoint_service(endpoint)._complete_uncached(
+                    prompt,
+                    temperature,
+                    max_tokens,
+                    system_prompt,
+                    stealth_mode,
+                    request_timeout,
+                    None,
+                    kwargs,
                 )
+            finally:
+                self._endpoint_pool.release(endpoint)
+            if cache_key:
+                self.cache.set(cache_key, result)
+            return result
+
+        # Check circuit breaker before making request
+        self._check_circuit_breaker()
 
         # Stealth mode: add random delay to mimic human typing speed
         if stealth_mode:
@@ -390,45 +880,43 @@ class LLMService:
 
             time.sleep(delay)
 
-        messages = []
-
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
+        messages = self._build_messages(prompt, system_prompt)
 
-        messages.append({"role": "user", "content": prompt})
+        # Wait for a slot if the endpoint is at its concurrency limit
+        if self._limiter:
+            self._limiter.acquire(
+                timeout=bound_timeout(
+                    ConfigManager.get("LLM_CONCURRENCY_QUEUE_TIMEOUT_SECONDS"),
+                    stage="LLM queue",
+                )
+            )
 
         try:
             start_time = time.time()
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
-                temperature=temperature or self.default_temperature,
-                max_tokens=max_tokens or self.default_max_tokens,
-                timeout=30,  # Per-request timeout
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=request_timeout,  # Per-request timeout
                 **kwargs,
             )
             response_time_ms = (time.time() - start_time) * 1000
 
             # Record success in health checker
-            if self._health_checker:
-                self._health_checker.record_success(self.base_url, response_time_ms)
-
-            return {
-                "content": response.choices[0].message.content,
-                "model": response.model,
-                "usage": {
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_tokens": response.usage.total_tokens,
-                },
-                "stealth_mode_used": stealth_mode,
-                "response_time_ms": response_time_ms,
-            }
+            self._record_success(response_time_ms, self._completion_tokens(response))
+
+            result = self._format_response(response, stealth_mode, response_time_ms)
+            if cache_key:
+                self.cache.set(cache_key, result)
+            return result
         except Exception as e:
             # Record failure in health checker
-            if self._health_checker:
-                self._health_checker.record_failure(self.base_url, str(e))
+            self._record_failure(e)
             raise
+        finally:
+            if self._limiter:
+                self._limiter.release()
 
     async def complete_async(
         self,
@@ -437,10 +925,15 @@ class LLMService:
         max_tokens: Optional[int] = None,
         system_prompt: Optional[str] = None,
         stealth_mode: bool = False,
+        use_cache: Optional[bool] = None,
+        coalesce: bool = True,
         **kwargs,
     ) -> Dict[str, Any]:
         """
-        Async version of complete() - uses asyncio.sleep instead of blocking.
+        Native async version of complete().
+
+        Uses the shared AsyncOpenAI client, so the event loop is never blocked
+        while waiting on the endpoint and many requests can be in flight at once.
 
         Args:
             prompt: The user prompt/input
@@ -448,25 +941,138 @@ class LLMService:
             max_tokens: Maximum tokens to generate
             system_prompt: Optional system prompt to set context
             stealth_mode: If True, adds random delay (2-5 seconds) to mimic human typing
+            use_cache: Response cache policy (see complete())
+            coalesce: Share one upstream call with concurrent identical requests
             **kwargs: Additional parameters passed to the API
 
         Returns:
             Dictionary containing the response text and metadata
+
+        Raises:
+            CircuitBreakerError: If circuit breaker is OPEN for this endpoint
         """
+        temperature = (
+            temperature if temperature is not None else self.default_temperature
+        )
+        max_tokens = max_tokens or self.default_max_tokens
+        request_timeout = kwargs.pop("timeout", DEFAULT_REQUEST_TIMEOUT_SECONDS)
+
+        cache_key = self._cache_key_for(
+            prompt, system_prompt, temperature, max_tokens, use_cache, kwargs
+        )
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+
+        if coalesce and self.single_flight is not None:
+            flight_key = self._request_key(
+                prompt, system_prompt, temperature, max_tokens, kwargs
+            )
+            result, shared = await self.single_flight.do_async(
+                flight_key,
+                lambda: self._complete_uncached_async(
+                    prompt,
+                    temperature,
+                    max_tokens,
+                    system_prompt,
+                    stealth_mode,
+                    request_timeout,
+                    cache_key,
+                    kwargs,
+                ),
+            )
+            return self._unshare(result, shared)
+
+        return await self._complete_uncached_async(
+            prompt,
+            temperature,
+            max_tokens,
+            system_prompt,
+            stealth_mode,
+            request_timeout,
+            cache_key,
+            kwargs,
+        )
+
+    async def _complete_uncached_async(
+        self,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        system_prompt: Optional[str],
+        stealth_mode: bool,
+        request_timeout: float,
+        cache_key: Optional[str],
+        kwargs: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Make the upstream request for complete_async() and store it in the cache."""
+        # Never wait past the task's deadline
+        request_timeout = bound_timeout(request_timeout, stage="LLM call")
+
+        if self._endpoint_pool is not None:
+            endpoint = self._endpoint_pool.acquire(self.model)
+            try:
+                service = self._endpoint_service(endpoint)
+                result = await service._complete_uncached_async(
+                    prompt,
+                    temperature,
+                    max_tokens,
+                    system_prompt,
+                    stealth_mode,
+                    request_timeout,
+                    None,
+                    kwargs,
+                )
+            finally:
+                self._endpoint_pool.release(endpoint)
+            if cache_key:
+                self.cache.set(cache_key, result)
+            return result
+
+        self._check_circuit_breaker()
+
         # Stealth mode: add random delay to mimic human typing speed
         if stealth_mode:
             delay = random.uniform(2.0, 5.0)
             await asyncio.sleep(delay)
 
-        # Use sync complete method (OpenAI client handles the I/O)
-        return self.complete(
-            prompt=prompt,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            system_prompt=system_prompt,
-            stealth_mode=False,  # We already handled the delay above
-            **kwargs,
-        )
+        messages = self._build_messages(prompt, system_prompt)
+
+        if self._limiter:
+            await self._limiter.acquire_async(
+                timeout=bound_timeout(
+                    ConfigManager.get("LLM_CONCURRENCY_QUEUE_TIMEOUT_SECONDS"),
+                    stage="LLM queue",
+                )
+            )
+
+        try:
+            start_time = time.time()
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=request_timeout,
+                **kwargs,
+            )
+            response_time_ms = (time.time() - start_time) * 1000
+
+            self._record_success(response_time_ms, self._completion_tokens(response))
+
+            result = self._format_response(response, stealth_mode, response_time_ms)
+            if cache_key:
+                self.cache.set(cache_key, result)
+            return result
+        except asyncio.CancelledError:
+            # Cancellation is the caller's decision, not an endpoint failure
+            raise
+        except Exception as e:
+            self._record_failure(e)
+            raise
+        finally:
+            if self._limiter:
+                self._limiter.release()
 
     def complete_streaming(
         self,
@@ -488,26 +1094,244 @@ class LLMService:
 
         Yields:
             Chunks of the response text
+
+        Closing the generator early (e.g. breaking out of the loop) closes the
+        underlying HTTP stream so no further tokens are generated.
         """
-        messages = []
+        if self._endpoint_pool is not None:
+            endpoint = self._endpoint_pool.acquire(self.model)
+            try:
+                yield from self._endpoint_service(endpoint).complete_streaming(
+                    prompt, temperature, max_tokens, system_prompt, **kwargs
+                )
+            finally:
+                self._endpoint_pool.release(endpoint)
+            return
+
+        # Streams are cut off at the task's deadline, not only bounded per read
+        deadline = current_deadline()
+        if deadline is not None:
+            kwargs.setdefault(
+                "timeout",
+                deadline.timeout(DEFAULT_REQUEST_TIMEOUT_SECONDS, stage="LLM stream"),
+            )
+        else:
+            kwargs.setdefault("timeout", DEFAULT_REQUEST_TIMEOUT_SECONDS)
 
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
+        self._check_circuit_breaker()
 
-        messages.append({"role": "user", "content": prompt})
+        messages = self._build_messages(prompt, system_prompt)
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=temperature or self.default_temperature,
-            max_tokens=max_tokens or self.default_max_tokens,
-            stream=True,
-            **kwargs,
+        # Hold a concurrency slot for the whole stream, not just the first byte
+        if self._limiter:
+            self._limiter.acquire(
+                timeout=bound_timeout(
+                    ConfigManager.get("LLM_CONCURRENCY_QUEUE_TIMEOUT_SECONDS"),
+                    stage="LLM queue",
+                )
+            )
+
+        response = None
+        try:
+            start_time = time.time()
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=(
+                    temperature
+                    if temperature is not None
+                    else self.default_temperature
+                ),
+                max_tokens=max_tokens or self.default_max_tokens,
+                stream=True,
+                **kwargs,
+            )
+
+            # Content chunks stand in for output tokens
+            chunk_count = 0
+            for chunk in response:
+                if deadline is not None:
+                    deadline.check("the rest of the LLM stream")
+                if chunk.choices and chunk.choices[0].delta.content:
+                    chunk_count += 1
+                    yield chunk.choices[0].delta.content
+
+            # Only full streams are timed; an early stop would skew latency
+            self._record_success((time.time() - start_time) * 1000, chunk_count)
+        except (GeneratorExit, DeadlineExceeded):
+            raise
+        except Exception as e:
+            self._record_failure(e)
+            raise
+        finally:
+            close = getattr(response, "close", None)
+            if close is not None:
+                close()
+            if self._limiter:
+                self._limiter.release()
+
+    def complete_streaming_collected(
+        self,
+        prompt: str,
+        collect: Callable[[Iterator[str]], str],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_prompt: Optional[str] = None,
+        use_cache: Optional[bool] = None,
+        coalesce: bool = True,
+    ) -> str:
+        """
+        Stream a completion through collect(), behind the cache and single-flight.
+
+        collect() reads complete_streaming() and may stop early (e.g. at a
+        closing code fence). Its text is cached and shared with concurrent
+        identical requests, the same way complete() shares whole responses.
+
+        Args:
+            prompt: The user prompt/input
+            collect: Reads the chunk stream and returns the text to keep
+            temperature: Sampling temperature (0.0 to 2.0)
+            max_tokens: Maximum tokens to generate
+            system_prompt: Optional system prompt
+            use_cache: Response cache policy (see complete())
+            coalesce: Share one upstream stream with concurrent identical requests
+
+        Returns:
+            The text returned by collect()
+        """
+        temperature = (
+            temperature if temperature is not None else self.default_temperature
         )
+        max_tokens = max_tokens or self.default_max_tokens
+
+        # Collected streams may be cut short, so they never share keys with
+        # complete() results
+        extra = {"stream": True}
+        cache_key = self._cache_key_for(
+            prompt, system_prompt, temperature, max_tokens, use_cache, extra
+        )
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached["content"]
+
+        def stream() -> str:
+            text = collect(
+                self.complete_streaming(
+                    prompt, temperature, max_tokens, system_prompt
+                )
+            )
+            if cache_key:
+                self.cache.set(
+                    cache_key,
+                    {"content": text, "model": self.model, "cache_hit": False},
+                )
+            return text
+
+        if coalesce and self.single_flight is not None:
+            flight_key = self._request_key(
+                prompt, system_prompt, temperature, max_tokens, extra
+            )
+            text, _ = self.single_flight.do(flight_key, stream)
+            return text
+        return stream()
+
+    async def complete_streaming_async(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        """
+        Async version of complete_streaming().
 
-        for chunk in response:
-            if chunk.choices[0].delta.content:
-                yield chunk.choices[0].delta.content
+        Closing the generator early (e.g. breaking out of ``async for``) closes
+        the underlying HTTP stream so no further tokens are generated.
+
+        Args:
+            prompt: The user prompt/input
+            temperature: Sampling temperature (0.0 to 2.0)
+            max_tokens: Maximum tokens to generate
+            system_prompt: Optional system prompt
+            **kwargs: Additional parameters
+
+        Yields:
+            Chunks of the response text
+        """
+        if self._endpoint_pool is not None:
+            endpoint = self._endpoint_pool.acquire(self.model)
+            try:
+                service = self._endpoint_service(endpoint)
+                async for chunk in service.complete_streaming_async(
+                    prompt, temperature, max_tokens, system_prompt, **kwargs
+                ):
+                    yield chunk
+            finally:
+                self._endpoint_pool.release(endpoint)
+            return
+
+        # Streams are cut off at the task's deadline, not only bounded per read
+        deadline = current_deadline()
+        if deadline is not None:
+            kwargs.setdefault(
+                "timeout",
+                deadline.timeout(DEFAULT_REQUEST_TIMEOUT_SECONDS, stage="LLM stream"),
+            )
+        else:
+            kwargs.setdefault("timeout", DEFAULT_REQUEST_TIMEOUT_SECONDS)
+
+        self._check_circuit_breaker()
+
+        messages = self._build_messages(prompt, system_prompt)
+
+        # Hold a concurrency slot for the whole stream, not just the first byte
+        if self._limiter:
+            await self._limiter.acquire_async(
+                timeout=bound_timeout(
+                    ConfigManager.get("LLM_CONCURRENCY_QUEUE_TIMEOUT_SECONDS"),
+                    stage="LLM queue",
+                )
+            )
+
+        response = None
+        try:
+            start_time = time.time()
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=(
+                    temperature
+                    if temperature is not None
+                    else self.default_temperature
+                ),
+                max_tokens=max_tokens or self.default_max_tokens,
+                stream=True,
+                **kwargs,
+            )
+
+            # Content chunks stand in for output tokens
+            chunk_count = 0
+            async for chunk in response:
+                if deadline is not None:
+                    deadline.check("the rest of the LLM stream")
+                if chunk.choices and chunk.choices[0].delta.content:
+                    chunk_count += 1
+                    yield chunk.choices[0].delta.content
+
+            # Only full streams are timed; an early stop would skew latency
+            self._record_success((time.time() - start_time) * 1000, chunk_count)
+        except (GeneratorExit, asyncio.CancelledError, DeadlineExceeded):
+            raise
+        except Exception as e:
+            self._record_failure(e)
+            raise
+        finally:
+            close = getattr(response, "close", None)
+            if close is not None:
+                await close()
+            if self._limiter:
+                self._limiter.release()
 
     def set_model(self, model: str):
         """Update the default model."""
@@ -526,6 +1350,11 @@ class LLMService:
             "max_tokens": self.default_max_tokens,
             "is_local": self._is_local,
             "enable_fallback": self.enable_fallback,
+            "cache_enabled": self.cache is not None,
+            "single_flight_enabled": self.single_flight is not None,
+            "local_endpoints": (
+                self._endpoint_pool.endpoints if self._endpoint_pool else None
+            ),
         }
 
     def is_local(self) -> bool:
@@ -538,7 +1367,11 @@ class LLMService:
 
     @classmethod
     def for_task(
-        cls, task_type: str, model_config: Optional[ModelConfig] = None, **kwargs
+        cls,
+        task_type: str,
+        model_config: Optional[ModelConfig] = None,
+        local_endpoints: Optional[List[str]] = None,
+        **kwargs,
     ) -> "LLMService":
         """
         Create an LLMService instance configured for a specific task type.
@@ -546,6 +1379,8 @@ class LLMService:
         Args:
             task_type: The type of task (e.g., "basic_admin", "complex")
             model_config: Optional ModelConfig, uses default if not provided
+            local_endpoints: Local endpoints to load-balance across when the
+                             task runs locally (default: config.local_base_urls)
             **kwargs: Additional arguments passed to LLMService constructor
 
         Returns:
@@ -554,6 +1389,11 @@ class LLMService:
         config = model_config or get_default_model_config()
         model, base_url, api_key, is_local = config.get_model_for_task(task_type)
 
+        if is_local:
+            local_endpoints = local_endpoints or config.local_base_urls
+            base_url = local_endpoints[0]
+            kwargs["local_endpoints"] = local_endpoints
+
         return cls(
             base_url=base_url,
             api_key=api_key,
@@ -623,27 +1463,37 @@ class LLMService:
             api_key=config.local_api_key,
             model=distilled_model,
             model_config=config,
+            local_endpoints=config.local_base_urls,
             **kwargs,
         )
 
     @classmethod
-    def with_local(cls, model: Optional[str] = None, **kwargs) -> "LLMService":
+    def with_local(
+        cls,
+        model: Optional[str] = None,
+        local_endpoints: Optional[List[str]] = None,
+        **kwargs,
+    ) -> "LLMService":
         """
         Create an LLMService configured for local inference.
 
         Args:
             model: Optional model name (defaults to config's local_model)
+            local_endpoints: Local endpoints to load-balance across
+                             (defaults to config's local_base_urls)
             **kwargs: Additional arguments passed to LLMService constructor
 
         Returns:
             LLMService configured for local inference
         """
         config = get_default_model_config()
+        local_endpoints = local_endpoints or config.local_base_urls
         return cls(
-            base_url=config.local_base_url,
+            base_url=local_endpoints[0],
             api_key=config.local_api_key,
             model=model or config.local_model,
             model_config=config,
+            local_endpoints=local_endpoints,
             **kwargs,
         )
 
@@ -661,7 +1511,7 @@ class LLMService:
         """
         config = get_default_model_config()
         return cls(
-            base_url=os.environ.get("BASE_URL", "https://api.openai.com/v1"),
+            base_url=config.get_cloud_base_url(),
             api_key=os.environ.get("API_KEY", "dummy-key-for-local"),
             model=model or config.cloud_model,
             model_config=config,
@@ -716,6 +1566,7 @@ class LLMService:
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         system_prompt: Optional[str] = None,
+        hedge: Optional[bool] = None,
         **kwargs,
     ) -> Dict[str, Any]:
         """
@@ -728,16 +1579,30 @@ class LLMService:
 
         Max total latency: ~35 seconds (significantly improved from 90+ seconds).
 
+        With hedging enabled the schedule is replaced by a race: see
+        _complete_hedged().
+
         Args:
             prompt: The user prompt/input
             temperature: Sampling temperature
             max_tokens: Maximum tokens to generate
             system_prompt: Optional system prompt
+            hedge: Race a local hedge against a slow primary
+                   (default: LLM_HEDGING_ENABLED)
             **kwargs: Additional parameters
 
         Returns:
             Dictionary containing the response text and metadata
         """
+        if self._should_hedge(hedge):
+            return self._complete_hedged(
+                prompt=prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                system_prompt=system_prompt,
+                **kwargs,
+            )
+
         from .llm_health_check import ExponentialBackoff
 
         # Exponential backoff configuration for fallback chain
@@ -756,29 +1621,25 @@ class LLMService:
                 # Add backoff delay between attempts
                 if attempt > 0:
                     delay_ms = attempt * 2000  # 0s for attempt 0, 2s for attempt 1
-                    time.sleep(delay_ms / 1000.0)
+                    time.sleep(_fallback_backoff_seconds(delay_ms / 1000.0))
 
-                # Temporarily override timeout for this request
-                orig_client = self.client
-                self.client = OpenAI(
-                    base_url=self.base_url,
-                    api_key=self.api_key,
+                # Per-request timeout for this attempt (the shared client
+                # is left untouched)
+                result = self.complete(
+                    prompt=prompt,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    system_prompt=system_prompt,
                     timeout=timeouts[attempt],
+                    **kwargs,
                 )
-                try:
-                    result = self.complete(
-                        prompt=prompt,
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                        system_prompt=system_prompt,
-                        **kwargs,
-                    )
-                    result["fallback_used"] = False
-                    result["attempt"] = attempt
-                    return result
-                finally:
-                    self.client = orig_client
+                result["fallback_used"] = False
+                result["attempt"] = attempt
+                return result
 
+            except DeadlineExceeded:
+                # No budget left for this task; more attempts can't help
+                raise
             except CircuitBreakerError as e:
                 # Circuit breaker is open, skip to local
                 last_error = e
@@ -800,7 +1661,8 @@ class LLMService:
 
             try:
                 # Attempt 2: Local with 30s timeout and 5s backoff
-                time.sleep(5.0)  # 5s backoff before fallback
+                # 5s backoff before fallback
+                time.sleep(_fallback_backoff_seconds(5.0))
 
                 result = local_service.complete(
                     prompt=prompt,
@@ -824,6 +1686,287 @@ class LLMService:
             else Exception("Unknown error in complete_with_fallback")
         )
 
+    async def complete_with_fallback_async(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_prompt: Optional[str] = None,
+        hedge: Optional[bool] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Async version of complete_with_fallback().
+
+        Follows the same attempt schedule (cloud 10s, cloud retry 20s after a
+        2s backoff, local 30s after a 5s backoff) but awaits the backoff delays
+        and requests, so the event loop keeps serving other work meanwhile.
+
+        Args:
+            prompt: The user prompt/input
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            system_prompt: Optional system prompt
+            hedge: Race a local hedge against a slow primary
+                   (default: LLM_HEDGING_ENABLED)
+            **kwargs: Additional parameters
+
+        Returns:
+            Dictionary containing the response text and metadata
+        """
+        if self._should_hedge(hedge):
+            return await self._complete_hedged_async(
+                prompt=prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                system_prompt=system_prompt,
+                **kwargs,
+            )
+
+        timeouts = [10, 20, 30]
+        last_error = None
+
+        for attempt in range(2):
+            try:
+                if attempt > 0:
+                    await asyncio.sleep(_fallback_backoff_seconds(attempt * 2.0))
+
+                result = await self.complete_async(
+                    prompt=prompt,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    system_prompt=system_prompt,
+                    timeout=timeouts[attempt],
+                    **kwargs,
+                )
+                result["fallback_used"] = False
+                result["attempt"] = attempt
+                return result
+
+            except DeadlineExceeded:
+                raise
+            except CircuitBreakerError as e:
+                last_error = e
+                break
+            except Exception as e:
+                last_error = e
+                if attempt == 1:
+                    break
+
+        if self.enable_fallback and not self._is_local:
+            print(f"Cloud inference failed: {last_error}")
+            print("Attempting fallback to local model...")
+
+            local_service = self.with_local(
+                enable_circuit_breaker=self.enable_circuit_breaker
+            )
+
+            try:
+                await asyncio.sleep(_fallback_backoff_seconds(5.0))
+
+                result = await local_service.complete_async(
+                    prompt=prompt,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    system_prompt=system_prompt,
+                    timeout=timeouts[2],
+                    **kwargs,
+                )
+                result["fallback_used"] = True
+                result["original_error"] = str(last_error)
+                result["attempt"] = 2
+                return result
+            except Exception as local_error:
+                raise last_error if last_error else local_error
+
+        raise (
+            last_error
+            if last_error
+            else Exception("Unknown error in complete_with_fallback_async")
+        )
+
+    # =========================================================================
+    # HEDGED REQUESTS
+    # =========================================================================
+
+    def _should_hedge(self, hedge: Optional[bool]) -> bool:
+        """Whether a fallback call should hedge (needs a local fallback target)."""
+        if hedge is None:
+            hedge = ConfigManager.get("LLM_HEDGING_ENABLED")
+        return bool(hedge) and self.enable_fallback and not self._is_local
+
+    def _hedge_delay_seconds(self) -> float:
+        """
+        How long to wait on the primary before starting a hedge.
+
+        Uses the primary endpoint's observed p95 latency, or
+        LLM_HEDGE_DEFAULT_DELAY_MS until enough samples exist.
+        """
+        p95_ms = get_health_checker().get_latency_percentile(self.base_url, 95)
+        if p95_ms is None:
+            p95_ms = ConfigManager.get("LLM_HEDGE_DEFAULT_DELAY_MS")
+        return p95_ms / 1000.0
+
+    @staticmethod
+    def _hedge_result(
+        result: Dict[str, Any],
+        from_fallback: bool,
+        hedged: bool,
+        primary_error: Optional[BaseException],
+    ) -> Dict[str, Any]:
+        """Annotate the winning result of a hedged call."""
+        result["fallback_used"] = from_fallback
+        result["attempt"] = 2 if from_fallback else 0
+        result["hedged"] = hedged
+        if primary_error is not None:
+            result["original_error"] = str(primary_error)
+        return result
+
+    def _complete_hedged(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Race the primary endpoint against a local hedge.
+
+        The primary gets its p95 latency to answer. After that a local
+        request is started in parallel (if the hedge budget allows) and the
+        first success wins. A failed primary starts the local request
+        immediately, without using the hedge budget. Sync requests cannot be
+        interrupted, so the losing request is abandoned and bounded by its
+        own timeout.
+        """
+        executor = _get_hedge_executor()
+        budget = get_hedge_budget()
+        primary_timeout = kwargs.pop("timeout", 20)
+        request = dict(
+            prompt=prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            system_prompt=system_prompt,
+            **kwargs,
+        )
+
+        primary = _submit_in_context(
+            executor, self.complete, timeout=primary_timeout, **request
+        )
+        wait_futures([primary], timeout=self._hedge_delay_seconds())
+
+        secondary: Optional[Future] = None
+        hedged = False
+        if not primary.done() and budget.try_acquire():
+            hedged = True
+            secondary = _submit_in_context(executor, self._complete_local, request)
+            secondary.add_done_callback(lambda _: budget.release())
+
+        primary_error: Optional[BaseException] = None
+        pending = {primary} | ({secondary} if secondary else set())
+        while pending:
+            done, pending = wait_futures(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    for loser in pending:
+                        loser.cancel()
+                    if future is secondary and hedged:
+                        budget.record_win()
+                    return self._hedge_result(
+                        future.result(), future is secondary, hedged, primary_error
+                    )
+                if future is primary:
+                    primary_error = error
+                    if secondary is None:
+                        # Plain fallback after a failure, not a hedge
+                        secondary = _submit_in_context(
+                            executor, self._complete_local, request
+                        )
+                        pending.add(secondary)
+
+        raise primary_error if primary_error else secondary.exception()
+
+    async def _complete_hedged_async(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Async version of _complete_hedged().
+
+        The losing request is cancelled, which closes its HTTP request.
+        """
+        budget = get_hedge_budget()
+        primary_timeout = kwargs.pop("timeout", 20)
+        request = dict(
+            prompt=prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            system_prompt=system_prompt,
+            **kwargs,
+        )
+
+        primary = asyncio.ensure_future(
+            self.complete_async(timeout=primary_timeout, **request)
+        )
+        secondary: Optional[asyncio.Future] = None
+        try:
+            await asyncio.wait({primary}, timeout=self._hedge_delay_seconds())
+
+            hedged = False
+            if not primary.done() and budget.try_acquire():
+                hedged = True
+                secondary = asyncio.ensure_future(self._complete_local_async(request))
+                secondary.add_done_callback(lambda _: budget.release())
+
+            primary_error: Optional[BaseException] = None
+            pending = {primary} | ({secondary} if secondary else set())
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        if task is secondary and hedged:
+                            budget.record_win()
+                        return self._hedge_result(
+                            task.result(), task is secondary, hedged, primary_error
+                        )
+                    if task is primary:
+                        primary_error = error
+                        if secondary is None:
+                            secondary = asyncio.ensure_future(
+                                self._complete_local_async(request)
+                            )
+                            pending.add(secondary)
+
+            raise primary_error if primary_error else secondary.exception()
+        finally:
+            # Cancel the loser (or both, if the caller was cancelled)
+            for task in (primary, secondary):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def _complete_local(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a request against the local fallback model."""
+        local_service = self.with_local(
+            enable_circuit_breaker=self.enable_circuit_breaker
+        )
+        return local_service.complete(timeout=30, **request)
+
+    async def _complete_local_async(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Async version of _complete_local()."""
+        local_service = self.with_local(
+            enable_circuit_breaker=self.enable_circuit_breaker
+        )
+        return await local_service.complete_async(timeout=30, **request)
+
 
 # =============================================================================
 # USAGE EXAMPLES
@@ -0,0 +1,191 @@
+"""
+LLM Single-Flight Coalescing
+
+Collapses concurrent identical LLM requests into one upstream call. The
+first caller for a key (the leader) makes the request; callers that arrive
+while it is in flight wait for and share its result or exception.
+
+Features:
+- Thread-based coalescing for the sync complete() path
+- Event-loop based coalescing for complete_async(), where cancelling one
+  waiter never cancels the shared call while other waiters remain
+- Leader/coalesced metrics for observability
+
+Enabled by default; set LLM_SINGLE_FLIGHT_ENABLED=false to disable.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.config.config_manager import ConfigManager
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _Call:
+    """An in-flight sync call shared by every caller with the same key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _AsyncCall:
+    """An in-flight async call and the number of callers awaiting it."""
+
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share a key.
+
+    Only calls that overlap in time are coalesced: once the leader finishes,
+    the key is forgotten and the next call starts a new flight. Results are
+    not cached here (see llm_cache.py for that).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._async_calls: Dict[Tuple[int, str], _AsyncCall] = {}
+        self._metrics = {"leaders": 0, "coalesced": 0, "errors": 0}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the request
+            fn: Zero-argument callable making the upstream call
+
+        Returns:
+            Tuple of (result, shared) where shared is True for callers that
+            received another caller's result
+
+        Raises:
+            Whatever fn raised, in the leader and every waiting caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self._metrics["leaders"] += 1
+                leader = True
+            else:
+                self._metrics["coalesced"] += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._metrics["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+        return call.result, False
+
+    async def do_async(
+        self, key: str, coro_fn: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """
+        Async version of do().
+
+        The shared call runs as its own task. A waiter that is cancelled only
+        stops waiting; the task is cancelled once no waiters remain.
+
+        Args:
+            key: Identity of the request
+            coro_fn: Zero-argument callable returning the upstream coroutine
+
+        Returns:
+            Tuple of (result, shared) as for do()
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+
+        with self._lock:
+            call = self._async_calls.get(flight_key)
+            if call is None:
+                call = _AsyncCall(loop.create_task(coro_fn()))
+                self._async_calls[flight_key] = call
+                call.task.add_done_callback(
+                    lambda task: self._forget_async(flight_key, task)
+                )
+                self._metrics["leaders"] += 1
+                shared = False
+            else:
+                self._metrics["coalesced"] += 1
+                shared = True
+            call.waiters += 1
+
+        try:
+            result = await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            with self._lock:
+                call.waiters -= 1
+                abandoned = call.waiters == 0
+            if abandoned and not call.task.done():
+                call.task.cancel()
+            raise
+        except Exception:
+            with self._lock:
+                call.waiters -= 1
+            raise
+
+        with self._lock:
+            call.waiters -= 1
+        return result, shared
+
+    def _forget_async(self, flight_key: Tuple[int, str], task: "asyncio.Task"):
+        """Drop a finished async call so the next request starts a new flight."""
+        with self._lock:
+            call = self._async_calls.get(flight_key)
+            if call is not None and call.task is task:
+                del self._async_calls[flight_key]
+            if not task.cancelled() and task.exception() is not None:
+                self._metrics["errors"] += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get coalescing metrics (leaders, coalesced, errors, in flight)."""
+        with self._lock:
+            return {
+                **self._metrics,
+                "in_flight": len(self._calls) + len(self._async_calls),
+            }
+
+
+# Global single-flight instance
+_global_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """
+    Get the global single-flight group, or None if coalescing is disabled.
+
+    Configured via LLM_SINGLE_FLIGHT_ENABLED.
+    """
+    global _global_single_flight
+    if not ConfigManager.get("LLM_SINGLE_FLIGHT_ENABLED"):
+        return None
+    if _global_single_flight is None:
+        _global_single_flight = SingleFlight()
+        logger.info("[LLM_SINGLE_FLIGHT] Coalescing of identical requests enabled")
+    return _global_single_flight
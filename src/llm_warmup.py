@@ -0,0 +1,324 @@
+"""
+Local Model Warm-up & Keep-alive
+
+Preloads the local models the service depends on when the API starts, and
+keeps them resident afterwards. Ollama loads a model on its first request,
+which can take longer than the 30 second per-request timeout in
+LLMService.complete(), and unloads it again after a few idle minutes.
+
+Features:
+- Concurrent preload of every configured model on every local endpoint
+- Keep-alive pings that reset Ollama's unload timer
+- Per-model status, load time and last ping for the health endpoint
+- wait_until_ready() so background work does not start on a cold model
+- Falls back to a 1-token completion for servers without Ollama's native API
+
+Models default to LOCAL_MODEL, the market scanner's EVALUATION_MODEL and,
+when DISTILLED_MODEL_NAME is set, the distilled model. They can also be
+listed explicitly with LLM_WARMUP_MODELS (comma-separated).
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from src.config.config_manager import ConfigManager
+from src.llm_service import get_async_client, get_default_model_config
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_LOADING = "loading"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+
+def _native_api_root(base_url: str) -> str:
+    """Strip the OpenAI-compatible /v1 suffix to reach Ollama's native API."""
+    root = base_url.rstrip("/")
+    if root.endswith("/v1"):
+        root = root[: -len("/v1")]
+    return root
+
+
+def default_warmup_models() -> List[str]:
+    """Models warmed when LLM_WARMUP_MODELS is not set."""
+    configured = ConfigManager.get("LLM_WARMUP_MODELS")
+    if configured:
+        models = [m.strip() for m in str(configured).split(",") if m.strip()]
+    else:
+        # Imported here: the scanner pulls in the database and browser stack
+        from src.agent_execution import market_scanner
+
+        config = get_default_model_config()
+        models = [config.local_model, market_scanner.EVALUATION_MODEL]
+        # Only installs that deploy a distilled model name it; warming the
+        # built-in default elsewhere would fail and never report ready
+        distilled = os.environ.get("DISTILLED_MODEL_NAME")
+        if distilled:
+            models.append(distilled)
+    return list(dict.fromkeys(models))
+
+
+class ModelWarmupManager:
+    """
+    Warms a set of local models and keeps them loaded.
+
+    Call start() once from the application lifespan and stop() on shutdown.
+    Work that needs a warm model awaits wait_until_ready() first.
+    """
+
+    def __init__(
+        self,
+        models: Sequence[str],
+        endpoints: Sequence[str],
+        api_key: str = "not-needed",
+        keep_alive: str = "30m",
+        keepalive_interval_seconds: float = 240,
+        load_timeout_seconds: float = 300,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        """
+        Initialize the manager.
+
+        Args:
+            models: Model names to preload
+            endpoints: OpenAI-compatible base URLs of the local servers
+            api_key: API key for the OpenAI-compatible fallback
+            keep_alive: How long Ollama should keep each model loaded
+                        after a request (Ollama duration string)
+            keepalive_interval_seconds: Seconds between keep-alive pings
+            load_timeout_seconds: Per-model load timeout
+            http_client: Optional client for the native API (for testing)
+        """
+        self.models: List[str] = list(dict.fromkeys(models))
+        self.endpoints: List[str] = list(dict.fromkeys(endpoints))
+        self.api_key = api_key
+        self.keep_alive = keep_alive
+        self.keepalive_interval_seconds = keepalive_interval_seconds
+        self.load_timeout_seconds = load_timeout_seconds
+        self._http_client = http_client
+        self._owns_http_client = http_client is None
+
+        self._status: Dict[Tuple[str, str], Dict[str, Any]] = {
+            (model, endpoint): {
+                "status": STATUS_PENDING,
+                "load_time_ms": None,
+                "last_ping_at": None,
+                "error": None,
+            }
+            for model in self.models
+            for endpoint in self.endpoints
+        }
+        self._warmed = asyncio.Event()
+        self._warmup_task: Optional[asyncio.Task] = None
+        self._keepalive_task: Optional[asyncio.Task] = None
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(timeout=self.load_timeout_seconds)
+        return self._http_client
+
+    async def _ping(self, model: str, endpoint: str):
+        """
+        Ask the endpoint to load the model (a no-op if already resident).
+
+        Uses Ollama's /api/generate with no prompt, which loads the model and
+        resets its keep_alive timer. Servers without that API get a 1-token
+        chat completion instead.
+        """
+        try:
+            response = await self._client().post(
+                f"{_native_api_root(endpoint)}/api/generate",
+                json={"model": model, "keep_alive": self.keep_alive},
+                timeout=self.load_timeout_seconds,
+            )
+            response.raise_for_status()
+            return
+        except httpx.HTTPStatusError as e:
+            logger.debug(
+                f"[WARMUP] Native load of {model} on {endpoint} failed "
+                f"({e.response.status_code}), trying a completion"
+            )
+
+        await get_async_client(endpoint, self.api_key).chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": "ok"}],
+            max_tokens=1,
+            timeout=self.load_timeout_seconds,
+        )
+
+    async def _load(self, model: str, endpoint: str):
+        """Load one model on one endpoint and record the outcome."""
+        entry = self._status[(model, endpoint)]
+        entry["status"] = STATUS_LOADING
+        start = time.monotonic()
+        try:
+            await self._ping(model, endpoint)
+        except Exception as e:
+            entry["status"] = STATUS_FAILED
+            entry["error"] = str(e)
+            logger.warning(f"[WARMUP] Could not load {model} on {endpoint}: {e}")
+            return
+
+        entry["status"] = STATUS_READY
+        entry["error"] = None
+        entry["load_time_ms"] = round((time.monotonic() - start) * 1000, 1)
+        entry["last_ping_at"] = datetime.now(timezone.utc).isoformat()
+        logger.info(
+            f"[WARMUP] {model} ready on {endpoint} in {entry['load_time_ms']}ms"
+        )
+
+    async def warm_up(self):
+        """Load every model on every endpoint concurrently."""
+        try:
+            await asyncio.gather(
+                *(self._load(model, endpoint) for model, endpoint in self._status)
+            )
+        finally:
+            self._warmed.set()
+
+    async def _keepalive_loop(self):
+        """Re-ping loaded models so Ollama does not unload them."""
+        await self._warmed.wait()
+        while True:
+            await asyncio.sleep(self.keepalive_interval_seconds)
+            for (model, endpoint), entry in self._status.items():
+                try:
+                    await self._ping(model, endpoint)
+                except Exception as e:
+                    logger.warning(
+                        f"[WARMUP] Keep-alive for {model} on {endpoint} failed: {e}"
+                    )
+                    entry["status"] = STATUS_FAILED
+                    entry["error"] = str(e)
+                    continue
+                if entry["status"] != STATUS_READY:
+                    logger.info(f"[WARMUP] {model} reloaded on {endpoint}")
+                entry["status"] = STATUS_READY
+                entry["error"] = None
+                entry["last_ping_at"] = datetime.now(timezone.utc).isoformat()
+
+    def start(self):
+        """Start warm-up and the keep-alive loop in the background."""
+        if self._warmup_task is not None:
+            return
+        logger.info(
+            f"[WARMUP] Warming {', '.join(self.models)} on "
+            f"{len(self.endpoints)} endpoint(s)"
+        )
+        self._warmup_task = asyncio.create_task(self.warm_up())
+        if self.keepalive_interval_seconds > 0:
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+
+    async def stop(self):
+        """Cancel background work and close the HTTP client."""
+        for task in (self._warmup_task, self._keepalive_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._warmup_task = None
+        self._keepalive_task = None
+        if self._owns_http_client and self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    @property
+    def started(self) -> bool:
+        """True once start() has been called."""
+        return self._warmup_task is not None
+
+    def is_ready(self) -> bool:
+        """True once warm-up has finished and every model loaded."""
+        return self._warmed.is_set() and all(
+            entry["status"] == STATUS_READY for entry in self._status.values()
+        )
+
+    async def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for warm-up to finish.
+
+        Args:
+            timeout: Seconds to wait (None waits until warm-up is done)
+
+        Returns:
+            True if every model loaded; False on timeout or if any model
+            failed to load (callers then proceed and rely on fallback)
+        """
+        if (
+            self._warmup_task is not None
+            and self._warmup_task.get_loop() is not asyncio.get_running_loop()
+        ):
+            # Warm-up runs on the API's loop; other loops can only poll
+            return self.is_ready()
+        try:
+            await asyncio.wait_for(self._warmed.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"[WARMUP] Models still loading after {timeout}s")
+            return False
+        return self.is_ready()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get readiness plus per-model status, load time and last ping."""
+        return {
+            "ready": self.is_ready(),
+            "warmup_complete": self._warmed.is_set(),
+            "models": [
+                {"model": model, "endpoint": endpoint, **entry}
+                for (model, endpoint), entry in self._status.items()
+            ],
+        }
+
+
+# Global warm-up manager (started by the API lifespan)
+_global_warmup_manager: Optional[ModelWarmupManager] = None
+
+
+def get_warmup_manager() -> Optional[ModelWarmupManager]:
+    """
+    Get the global warm-up manager.
+
+    Returns:
+        ModelWarmupManager, or None when LLM_WARMUP_ENABLED is false
+    """
+    global _global_warmup_manager
+    if not ConfigManager.get("LLM_WARMUP_ENABLED", True):
+        return None
+    if _global_warmup_manager is None:
+        config = get_default_model_config()
+        _global_warmup_manager = ModelWarmupManager(
+            models=default_warmup_models(),
+            endpoints=config.local_base_urls,
+            api_key=config.local_api_key,
+            keep_alive=ConfigManager.get("LLM_WARMUP_KEEP_ALIVE", "30m"),
+            keepalive_interval_seconds=ConfigManager.get(
+                "LLM_WARMUP_KEEPALIVE_INTERVAL_SECONDS", 240
+            ),
+            load_timeout_seconds=ConfigManager.get(
+                "LLM_WARMUP_LOAD_TIMEOUT_SECONDS", 300
+            ),
+        )
+    return _global_warmup_manager
+
+
+async def wait_for_warm_models() -> bool:
+    """
+    Block background work until local models are warm.
+
+    Waits at most LLM_WARMUP_READY_TIMEOUT_SECONDS. Returns True if no
+    warm-up is configured or every model loaded.
+    """
+    manager = get_warmup_manager()
+    if manager is None or not manager.started:
+        return True
+    return await manager.wait_until_ready(
+        ConfigManager.get("LLM_WARMUP_READY_TIMEOUT_SECONDS", 600)
+    )
@@ -69,25 +69,13 @@ class BaseDocumentTemplate:
         Returns:
             Dictionary with generation results including file data
         """
-        self.content_json = content_json
-        self.csv_data = csv_data
-
         try:
-            # Parse CSV data
-            self.df = pd.read_csv(io.StringIO(csv_data))
-
-            # Create the document
-            self.document = Document()
-
-            # Apply base styling
-            self._apply_base_styling()
-
-            # Build document content
-            self._build_document_content()
+            file_data = self.render(content_json, csv_data)
 
             # Save to file
             output_filename = f"output.{output_format}"
-            self.document.save(output_filename)
+            with open(output_filename, "wb") as f:
+                f.write(file_data)
 
             # Return result
             return self._generate_result(output_filename, output_format)
@@ -100,6 +88,29 @@ class BaseDocumentTemplate:
                 "document_type": "document",
             }
 
+    def render(self, content_json: Dict[str, Any], csv_data: str) -> bytes:
+        """
+        Render the document in memory, without writing any file.
+
+        Args:
+            content_json: Structured JSON content
+            csv_data: CSV data as string
+
+        Returns:
+            DOCX file bytes
+        """
+        self.content_json = content_json
+        self.csv_data = csv_data
+        self.df = pd.read_csv(io.StringIO(csv_data))
+
+        self.document = Document()
+        self._apply_base_styling()
+        self._build_document_content()
+
+        buffer = io.BytesIO()
+        self.document.save(buffer)
+        return buffer.getvalue()
+
     def _apply_base_styling(self):
         """Apply base document styling (margins, fonts, etc.)."""
         # Set page margins
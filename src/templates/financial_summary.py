@@ -65,25 +65,13 @@ class FinancialSummaryTemplate:
         Returns:
             Dictionary with generation results
         """
-        self.content_json = content_json
-        self.csv_data = csv_data
-
         try:
-            # Parse CSV data
-            self.df = pd.read_csv(io.StringIO(csv_data))
-
-            # Create the document
-            self.document = Document()
-
-            # Apply financial formatting
-            self._apply_financial_styling()
-
-            # Build financial document
-            self._build_financial_document()
+            file_data = self.render(content_json, csv_data)
 
             # Save to file
             output_filename = f"output.{output_format}"
-            self.document.save(output_filename)
+            with open(output_filename, "wb") as f:
+                f.write(file_data)
 
             # Return result
             return self._generate_result(output_filename, output_format)
@@ -96,6 +84,29 @@ class FinancialSummaryTemplate:
                 "document_type": "financial_summary",
             }
 
+    def render(self, content_json: Dict[str, Any], csv_data: str) -> bytes:
+        """
+        Render the financial document in memory, without writing any file.
+
+        Args:
+            content_json: Structured JSON content
+            csv_data: CSV data as string
+
+        Returns:
+            DOCX file bytes
+        """
+        self.content_json = content_json
+        self.csv_data = csv_data
+        self.df = pd.read_csv(io.StringIO(csv_data))
+
+        self.document = Document()
+        self._apply_financial_styling()
+        self._build_financial_document()
+
+        buffer = io.BytesIO()
+        self.document.save(buffer)
+        return buffer.getvalue()
+
     def _apply_financial_styling(self):
         """Apply financial document styling."""
         # Set page margins
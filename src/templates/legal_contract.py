@@ -78,25 +78,13 @@ class LegalContractTemplate:
         Returns:
             Dictionary with generation results
         """
-        self.content_json = content_json
-        self.csv_data = csv_data
-
         try:
-            # Parse CSV data
-            self.df = pd.read_csv(io.StringIO(csv_data))
-
-            # Create the document
-            self.document = Document()
-
-            # Apply legal formatting
-            self._apply_legal_styling()
-
-            # Build legal document
-            self._build_legal_document()
+            file_data = self.render(content_json, csv_data)
 
             # Save to file
             output_filename = f"output.{output_format}"
-            self.document.save(output_filename)
+            with open(output_filename, "wb") as f:
+                f.write(file_data)
 
             # Return result
             return self._generate_result(output_filename, output_format)
@@ -109,6 +97,29 @@ class LegalContractTemplate:
                 "document_type": "legal_contract",
             }
 
+    def render(self, content_json: Dict[str, Any], csv_data: str) -> bytes:
+        """
+        Render the legal document in memory, without writing any file.
+
+        Args:
+            content_json: Structured JSON content
+            csv_data: CSV data as string
+
+        Returns:
+            DOCX file bytes
+        """
+        self.content_json = content_json
+        self.csv_data = csv_data
+        self.df = pd.read_csv(io.StringIO(csv_data))
+
+        self.document = Document()
+        self._apply_legal_styling()
+        self._build_legal_document()
+
+        buffer = io.BytesIO()
+        self.document.save(buffer)
+        return buffer.getvalue()
+
     def _apply_legal_styling(self):
         """Apply legal document styling (Times New Roman, proper margins, etc.)."""
         # Set page margins
@@ -0,0 +1,320 @@
+"""
+In-Process Template Rendering
+
+The JSON template path still round-trips through the sandbox: the template
+code is generated as a string, shipped to a container and executed there.
+The templates are pre-tested, so that round trip buys no isolation.
+
+This module renders the registered templates directly in the worker process:
+- render_document() fills a template with content JSON and returns DOCX bytes
+- extract_content() builds the content JSON for common document orders
+  (financial summaries, data summaries) straight from the task's CSV data
+- render_fast_path() combines both, so those orders need neither the LLM
+  nor the sandbox (opt-in via TEMPLATE_FAST_PATH_ENABLED)
+
+Free-form requests (contracts, narrative analysis) return None here and
+keep using LLM content generation and the sandbox.
+"""
+
+import io
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from src.templates import TemplateRegistry
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Requests that name one of these documents are filled from the data alone
+FAST_PATH_TRIGGERS = {
+    "financial_summary": (
+        "financial summary",
+        "financial statement",
+        "income statement",
+        "profit and loss",
+        "p&l",
+        "revenue summary",
+        "expense summary",
+        "budget summary",
+    ),
+    "base": (
+        "data summary",
+        "summary of the data",
+        "summary table",
+        "table document",
+    ),
+}
+
+# Word stems that signal the request wants written prose the data cannot
+# supply; "recommend" also matches "recommendations", "compar" "comparison"
+FREE_FORM_CUES = (
+    "detail",
+    "analy",
+    "explain",
+    "why",
+    "recommend",
+    "suggest",
+    "advi",
+    "discuss",
+    "narrat",
+    "insight",
+    "trend",
+    "forecast",
+    "predict",
+    "compar",
+    "versus",
+    "strateg",
+    "contract",
+    "agreement",
+    "letter",
+    "memo",
+)
+
+# Column names that hold identifiers or years rather than amounts
+_NON_MEASURE_COLUMN = re.compile(
+    r"(^|[\s_])(id|no|number|code|year|yr|fy)$|[a-z]Id$|^(index|zip|postcode)$",
+)
+
+# Leading words stripped from a request to turn it into a title
+_TITLE_PREFIX = re.compile(
+    r"^(please\s+)?(create|generate|write|prepare|make|produce|draft|build)"
+    r"(\s+(me|us))?\s+(an?\s+|the\s+)?",
+    re.IGNORECASE,
+)
+
+MAX_TABLE_ROWS = 50
+MAX_METRIC_COLUMNS = 6
+
+
+def match_template(domain: str, user_request: str) -> Optional[str]:
+    """
+    Pick the template that can be filled from data alone for a request.
+
+    Args:
+        domain: The domain (legal, accounting, data_analysis)
+        user_request: The user's request
+
+    Returns:
+        Template name, or None for free-form requests
+    """
+    request = user_request.lower()
+    words = re.findall(r"[a-z&]+", request)
+    if any(word.startswith(FREE_FORM_CUES) for word in words):
+        return None
+
+    for template_type, triggers in FAST_PATH_TRIGGERS.items():
+        if any(trigger in request for trigger in triggers):
+            return template_type
+
+    if domain.lower() == "accounting" and "summary" in request:
+        return "financial_summary"
+    return None
+
+
+def _title(user_request: str, default: str) -> str:
+    """Turn a request like 'Create a revenue summary for Q3' into a title."""
+    text = _TITLE_PREFIX.sub("", user_request.strip())
+    text = re.split(r"[.\n]", text, maxsplit=1)[0].strip()
+    if not text or len(text) > 80:
+        return default
+    return text[0].upper() + text[1:]
+
+
+def _label_column(df: pd.DataFrame) -> Optional[str]:
+    """First non-numeric column, used to name rows in highlights."""
+    for column in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[column]):
+            return column
+    return None
+
+
+def _is_measure(series: pd.Series) -> bool:
+    """Whether a numeric column holds amounts worth summing and averaging."""
+    name = str(series.name).strip()
+    if _NON_MEASURE_COLUMN.search(name) or _NON_MEASURE_COLUMN.search(
+        name.lower()
+    ):
+        return False
+    values = series.dropna()
+    if pd.api.types.is_integer_dtype(series) and not values.empty:
+        # Whole numbers that all fall in 1900-2100 are years, not amounts
+        return not values.between(1900, 2100).all()
+    return True
+
+
+def _records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Table rows for the template, capped at MAX_TABLE_ROWS."""
+    return df.head(MAX_TABLE_ROWS).fillna("").to_dict(orient="records")
+
+
+def _number(value: float) -> float:
+    """Round a statistic for display, keeping integers whole."""
+    value = float(value)
+    return int(value) if value.is_integer() else round(value, 2)
+
+
+def _financial_content(df: pd.DataFrame, user_request: str) -> Optional[dict]:
+    numeric = [
+        column
+        for column in df.select_dtypes("number").columns
+        if _is_measure(df[column])
+    ][:MAX_METRIC_COLUMNS]
+    if not numeric:
+        return None
+
+    label = _label_column(df)
+    metrics = {}
+    highlights = []
+    for column in numeric:
+        values = df[column].dropna()
+        if values.empty:
+            continue
+        metrics[f"{column} (sum)"] = _number(values.sum())
+        metrics[f"{column} (average)"] = _number(values.mean())
+        if label is not None:
+            top = df.loc[values.idxmax()]
+            highlights.append(
+                {
+                    "title": f"Highest {column}",
+                    "value": str(top[label]),
+                    "description": (
+                        f"{top[label]} recorded the highest {column} "
+                        f"({_number(top[column])})."
+                    ),
+                }
+            )
+
+    content = {
+        "title": _title(user_request, "Financial Summary Report"),
+        "subtitle": f"Report Date: {datetime.now().strftime('%B %d, %Y')}",
+        "executive_summary": (
+            f"This summary covers {len(df)} records across "
+            f"{len(numeric)} financial measures: {', '.join(map(str, numeric))}."
+        ),
+        "key_metrics": metrics,
+        "tables": [{"title": "Detailed Data", "data": _records(df)}],
+    }
+    if highlights:
+        content["highlights"] = highlights
+    return content
+
+
+def _base_content(df: pd.DataFrame, user_request: str) -> Optional[dict]:
+    numeric = list(df.select_dtypes("number").columns)
+    sections = [
+        {
+            "heading": "Overview",
+            "content": [
+                f"The data contains {len(df)} rows and {len(df.columns)} "
+                f"columns: {', '.join(map(str, df.columns))}."
+            ],
+        }
+    ]
+    if numeric:
+        stats = df[numeric].describe().loc[["mean", "min", "max"]]
+        sections.append(
+            {
+                "heading": "Summary Statistics",
+                "table": [
+                    {
+                        "Column": str(column),
+                        "Mean": _number(stats.at["mean", column]),
+                        "Min": _number(stats.at["min", column]),
+                        "Max": _number(stats.at["max", column]),
+                    }
+                    for column in numeric
+                ],
+            }
+        )
+    sections.append({"heading": "Data", "table": _records(df)})
+    return {"title": _title(user_request, "Data Summary"), "sections": sections}
+
+
+_CONTENT_BUILDERS = {
+    "financial_summary": _financial_content,
+    "base": _base_content,
+}
+
+
+def extract_content(
+    template_type: str, user_request: str, csv_data: str
+) -> Optional[dict]:
+    """
+    Build template content JSON from the task's CSV data.
+
+    Args:
+        template_type: Template name (financial_summary, base)
+        user_request: The user's request (used for the title)
+        csv_data: CSV data as string
+
+    Returns:
+        Content JSON, or None if the template needs LLM-written content
+        or the data is not usable
+    """
+    builder = _CONTENT_BUILDERS.get(template_type)
+    if builder is None:
+        return None
+    try:
+        df = pd.read_csv(io.StringIO(csv_data))
+    except (ValueError, pd.errors.ParserError):
+        return None
+    if df.empty:
+        return None
+    return builder(df, user_request)
+
+
+def render_document(
+    template_type: str, content_json: Dict[str, Any], csv_data: str
+) -> bytes:
+    """
+    Fill a registered template in-process.
+
+    Args:
+        template_type: Template name from TemplateRegistry
+        content_json: Structured JSON content
+        csv_data: CSV data as string
+
+    Returns:
+        DOCX file bytes
+
+    Raises:
+        ValueError: If the template is not registered
+    """
+    template_class = TemplateRegistry.get_template(template_type)
+    if template_class is None:
+        raise ValueError(f"Template '{template_type}' not found")
+    return template_class().render(content_json, csv_data)
+
+
+def render_fast_path(
+    domain: str, user_request: str, csv_data: str
+) -> Optional[dict]:
+    """
+    Render a common document order without the LLM or the sandbox.
+
+    Args:
+        domain: The domain
+        user_request: The user's request
+        csv_data: CSV data as string
+
+    Returns:
+        Dictionary with template_type and DOCX bytes under "data", or None
+        if the request needs the regular generation path
+    """
+    template_type = match_template(domain, user_request)
+    if template_type is None:
+        return None
+
+    content_json = extract_content(template_type, user_request, csv_data)
+    if content_json is None:
+        return None
+
+    try:
+        data = render_document(template_type, content_json, csv_data)
+    except Exception as e:
+        logger.warning(f"[TEMPLATE] In-process {template_type} render failed: {e}")
+        return None
+    return {"template_type": template_type, "data": data}
@@ -0,0 +1,152 @@
+"""
+Task Deadlines
+
+A Deadline is created once per task (process_task_async / execute_task)
+and bounds everything the task does: LLM calls, sandbox runs, and the
+retry and review loops. Each stage sizes its timeout from the remaining
+budget instead of its own fixed default, and stops retrying once the
+budget is spent, so a task finishes on a predictable schedule.
+
+The active deadline is carried in a context variable, so inner layers
+(LLMService, sandbox execution) pick it up without every signature in
+between passing it along. Context variables follow asyncio tasks and
+asyncio.to_thread().
+
+Usage:
+    deadline = Deadline(ConfigManager.get("TASK_DEADLINE_SECONDS"))
+    with deadline_scope(deadline):
+        ...
+        timeout = bound_timeout(30, stage="LLM call")
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a stage starts after the task's deadline has passed."""
+
+    pass
+
+
+class Deadline:
+    """A point in (monotonic) time by which a task must finish."""
+
+    def __init__(self, seconds: float):
+        """
+        Initialize the deadline.
+
+        Args:
+            seconds: Budget from now, in seconds
+        """
+        self.budget_seconds = seconds
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + seconds
+
+    def remaining(self) -> float:
+        """Seconds left (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def elapsed(self) -> float:
+        """Seconds since the deadline was created."""
+        return time.monotonic() - self.started_at
+
+    @property
+    def expired(self) -> bool:
+        """True once the budget is spent."""
+        return self.remaining() <= 0
+
+    def check(self, stage: str = "task"):
+        """
+        Fail fast if the budget is spent.
+
+        Raises:
+            DeadlineExceeded: If the deadline has passed
+        """
+        if self.expired:
+            raise DeadlineExceeded(
+                f"Deadline of {self.budget_seconds:.0f}s exceeded before {stage}"
+            )
+
+    def timeout(self, default: float, stage: str = "task") -> float:
+        """
+        Size a stage's timeout from the remaining budget.
+
+        Args:
+            default: The stage's own timeout
+            stage: Stage name for the error message
+
+        Returns:
+            min(default, remaining)
+
+        Raises:
+            DeadlineExceeded: If the deadline has passed
+        """
+        self.check(stage)
+        return min(default, self.remaining())
+
+    def allows(self, expected_seconds: float) -> bool:
+        """Whether a step expected to take expected_seconds still fits."""
+        return self.remaining() >= expected_seconds
+
+    def __repr__(self):
+        return f"Deadline(remaining={self.remaining():.1f}s of {self.budget_seconds}s)"
+
+
+_current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar(
+    "current_deadline", default=None
+)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Get the deadline of the task running in this context, if any."""
+    return _current_deadline.get()
+
+
+def activate_deadline(deadline: Deadline) -> contextvars.Token:
+    """
+    Make deadline current until reset_deadline(token) is called.
+
+    For long functions where a with-block is impractical; prefer
+    deadline_scope() elsewhere.
+    """
+    return _current_deadline.set(deadline)
+
+
+def reset_deadline(token: contextvars.Token):
+    """Restore the deadline that was current before activate_deadline()."""
+    _current_deadline.reset(token)
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """
+    Make deadline the current deadline for the enclosed block.
+
+    With deadline=None the enclosing deadline (if any) stays in effect.
+    """
+    if deadline is None:
+        yield current_deadline()
+        return
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def bound_timeout(default: float, stage: str = "task") -> float:
+    """
+    Clamp a timeout to the current deadline.
+
+    Returns default unchanged when no deadline is active.
+
+    Raises:
+        DeadlineExceeded: If the current deadline has passed
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return default
+    return deadline.timeout(default, stage)
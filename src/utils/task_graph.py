@@ -0,0 +1,107 @@
+"""
+Task Graphs
+
+Runs a small dependency graph of blocking steps (LLM calls, sandbox runs)
+on a thread pool: each step starts as soon as the steps it depends on have
+finished, so independent steps overlap and the total latency follows the
+longest chain instead of the sum of all steps.
+
+Steps run in copies of the caller's context, so the task deadline, sandbox
+client and output listener apply inside them; the global LLM and sandbox
+limits (LLM concurrency limiter, sandbox admission) still bound how many
+actually run at once.
+
+Usage:
+    results = run_task_graph([
+        GraphStep("chart", lambda deps: render_chart()),
+        GraphStep("code", lambda deps: generate_code()),
+        GraphStep("report", lambda deps: assemble(deps["chart"], deps["code"]),
+                  depends_on=("chart", "code")),
+    ])
+"""
+
+import concurrent.futures
+import contextvars
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class GraphStep:
+    """A step of a task graph and the steps whose results it needs."""
+
+    name: str
+    run: Callable[[Dict[str, Any]], Any]  # Called with {dependency: result}
+    depends_on: Tuple[str, ...] = ()
+
+
+def _check_graph(steps: List[GraphStep]):
+    """Reject duplicate names, unknown dependencies and cycles."""
+    names = [step.name for step in steps]
+    if len(set(names)) != len(names):
+        raise ValueError("Task graph step names must be unique")
+    by_name = {step.name: step for step in steps}
+    for step in steps:
+        unknown = [dep for dep in step.depends_on if dep not in by_name]
+        if unknown:
+            raise ValueError(f"Step {step.name} depends on unknown {unknown}")
+
+    done: set = set()
+    remaining = list(steps)
+    while remaining:
+        ready = [s for s in remaining if all(d in done for d in s.depends_on)]
+        if not ready:
+            raise ValueError(
+                f"Task graph has a cycle among {[s.name for s in remaining]}"
+            )
+        done.update(s.name for s in ready)
+        remaining = [s for s in remaining if s.name not in done]
+
+
+def run_task_graph(
+    steps: List[GraphStep], max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Run the steps of a task graph, each as soon as its dependencies finish.
+
+    Args:
+        steps: Steps of the graph
+        max_workers: Steps running at once (default: all that are ready)
+
+    Returns:
+        Step name -> result
+
+    Raises:
+        ValueError: If the graph is invalid
+        Exception: The first exception a step raised; steps not yet started
+            are skipped
+    """
+    _check_graph(steps)
+    results: Dict[str, Any] = {}
+    pending = list(steps)
+    running: Dict[concurrent.futures.Future, str] = {}
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers or max(1, len(steps)),
+        thread_name_prefix="task-graph",
+    ) as pool:
+        while pending or running:
+            for step in [s for s in pending if all(d in results for d in s.depends_on)]:
+                pending.remove(step)
+                inputs = {dep: results[dep] for dep in step.depends_on}
+                future = pool.submit(contextvars.copy_context().run, step.run, inputs)
+                running[future] = step.name
+
+            finished, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in finished:
+                name = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    for other in running:
+                        other.cancel()
+                    raise error
+                results[name] = future.result()
+
+    return results
@@ -173,6 +173,25 @@ def mock_openai_client(mock_openai_response):
         yield mock_instance
 
 
+@pytest.fixture(autouse=True)
+def reset_llm_clients():
+    """
+    Drop the shared LLM client registry around each test.
+
+    LLMService reuses one client per endpoint, so without this a client built
+    while one test patched src.llm_service.OpenAI would leak into the next.
+    """
+    llm_service = sys.modules.get("src.llm_service")
+    if llm_service is not None:
+        llm_service._clients.clear()
+        llm_service._async_clients.clear()
+    yield
+    llm_service = sys.modules.get("src.llm_service")
+    if llm_service is not None:
+        llm_service._clients.clear()
+        llm_service._async_clients.clear()
+
+
 # =============================================================================
 # DATABASE FIXTURES
 # =============================================================================
@@ -0,0 +1,220 @@
+"""
+Tests for the local artifact pre-checks.
+"""
+
+import base64
+import io
+import random
+import struct
+import zipfile
+import zlib
+from unittest.mock import MagicMock, patch
+
+import openpyxl
+import pytest
+from openpyxl.chart import BarChart, Reference
+
+from src.agent_execution.artifact_checks import (
+    PNG_SIGNATURE,
+    check_artifact,
+    check_docx,
+    check_image,
+    check_xlsx,
+    expected_chart_count,
+    high_value_task_scope,
+    skips_review,
+)
+from src.agent_execution import executor
+from src.agent_execution.executor import ArtifactReviewer, DocumentGenerator
+from src.config.config_manager import ConfigManager
+
+
+def _png(width, height, pixel):
+    """Encode an RGB PNG whose pixels come from pixel(x, y)."""
+    rows = b"".join(
+        b"\0" + b"".join(bytes(pixel(x, y)) for x in range(width))
+        for y in range(height)
+    )
+
+    def chunk(kind, payload):
+        body = kind + payload
+        return struct.pack(">I", len(payload)) + body + struct.pack(
+            ">I", zlib.crc32(body)
+        )
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        PNG_SIGNATURE
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _chart_png(width=400, height=300):
+    noise = random.Random(0)
+    return _png(width, height, lambda x, y: [noise.randrange(256)] * 3)
+
+
+def _docx(body):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr(
+            "word/document.xml",
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/'
+            f'wordprocessingml/2006/main"><w:body>{body}</w:body></w:document>',
+        )
+    return buffer.getvalue()
+
+
+def _xlsx(rows, chart=False):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    if chart:
+        bar = BarChart()
+        bar.add_data(Reference(sheet, min_col=2, min_row=1, max_row=len(rows)))
+        sheet.add_chart(bar, "D2")
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+class TestCheckImage:
+    def test_detailed_chart_is_fine(self):
+        assert check_image(_chart_png()).fine
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            b"",
+            b"GIF89a" + b"\0" * 100,
+            _png(400, 300, lambda x, y: (255, 255, 255)),
+            _png(20, 20, lambda x, y: (x * 10, y * 10, 0)),
+        ],
+        ids=["empty", "not-png", "blank", "tiny"],
+    )
+    def test_broken_images(self, data):
+        assert check_image(data).broken
+
+    def test_several_requested_charts_need_a_review(self):
+        check = check_image(_chart_png(), expected_charts=3)
+
+        assert check.verdict == "uncertain"
+
+
+class TestCheckDocuments:
+    def test_docx_without_content_is_broken(self):
+        assert check_docx(_docx("<w:p></w:p>")).broken
+        assert check_docx(b"not a zip").broken
+
+    def test_docx_with_text_is_fine(self):
+        text = "Quarterly revenue grew in every region. " * 10
+
+        assert check_docx(_docx(f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>")).fine
+
+    def test_docx_missing_requested_charts_needs_a_review(self):
+        text = "<w:p><w:r><w:t>Summary</w:t></w:r></w:p>"
+
+        assert check_docx(_docx(text), expected_charts=2).verdict == "uncertain"
+
+    def test_request_with_a_year_is_not_a_chart_count(self):
+        text = "Quarterly revenue grew in every region. " * 10
+        data = _docx(f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>")
+
+        check = check_artifact(
+            "docx", data, "Write a report with the 2023 revenue chart"
+        )
+
+        assert check.fine
+
+    def test_xlsx_rows_and_charts(self):
+        rows = [["region", "sales"], ["north", 10], ["south", 20]]
+
+        assert check_xlsx(_xlsx([])).broken
+        assert check_xlsx(_xlsx(rows)).fine
+        assert check_xlsx(_xlsx(rows), expected_charts=2).verdict == "uncertain"
+        assert check_xlsx(_xlsx(rows, chart=True), expected_charts=1).fine
+
+    def test_unsupported_format_is_uncertain(self):
+        assert check_artifact("pptx", b"data").verdict == "uncertain"
+
+
+@pytest.mark.parametrize(
+    "request_text, count",
+    [
+        ("Create three bar charts of sales", 3),
+        ("Make 2 line graphs", 2),
+        ("Plot sales by region", None),
+        ("Write a report with the 2023 revenue chart", None),
+        ("Compare 2023 and 2024 sales in charts", None),
+        ("Summarize the top 10 sales charts", None),
+    ],
+)
+def test_expected_chart_count(request_text, count):
+    assert expected_chart_count(request_text) == count
+
+
+class TestReviewArtifact:
+    def _review(self, image):
+        llm = MagicMock()
+        llm.complete.return_value = {"content": '{"approved": true}'}
+        reviewer = ArtifactReviewer(llm)
+        result = reviewer.review_artifact(
+            base64.b64encode(image).decode(), "Plot sales", "bar", "code"
+        )
+        return result, llm
+
+    def test_broken_chart_is_rejected_without_the_llm(self):
+        result, llm = self._review(_png(400, 300, lambda x, y: (255, 255, 255)))
+
+        assert not result["approved"]
+        assert "blank" in result["feedback"]
+        llm.complete.assert_not_called()
+
+    def test_fine_chart_of_low_value_task_skips_the_llm(self):
+        result, llm = self._review(_chart_png())
+
+        assert result["approved"]
+        assert result["precheck"] == "fine"
+        llm.complete.assert_not_called()
+
+    def test_high_value_task_is_still_reviewed(self):
+        with high_value_task_scope():
+            result, llm = self._review(_chart_png())
+
+        assert "precheck" not in result
+        llm.complete.assert_called_once()
+
+    def test_skip_can_be_disabled(self, monkeypatch):
+        monkeypatch.setitem(
+            ConfigManager._config_cache, "ARTIFACT_PRECHECK_SKIP_REVIEW", False
+        )
+
+        assert not skips_review(check_image(_chart_png()))
+
+
+class TestBrokenDocumentRegeneration:
+    def test_broken_document_is_regenerated_once_with_the_issues(self):
+        llm = MagicMock()
+        llm.complete.return_value = {"content": "print('doc')"}
+        generator = DocumentGenerator(llm_service=llm)
+        good = _docx(
+            "<w:p><w:r><w:t>" + "Revenue grew. " * 20 + "</w:t></w:r></w:p>"
+        )
+        outputs = [_docx("<w:p></w:p>"), good]
+
+        def sandbox(*args, **kwargs):
+            artifact = MagicMock(data=outputs.pop(0))
+            artifact.name = "output.docx"
+            return True, MagicMock(logs=[]), None, [artifact]
+
+        with patch.object(executor, "_execute_code_in_sandbox", side_effect=sandbox):
+            result = generator.generate_document("Sales summary", "a,b\n1,2\n")
+
+        assert result["success"]
+        assert "precheck_error" not in result
+        assert llm.complete.call_count == 2
+        retry_prompt = llm.complete.call_args.kwargs["prompt"]
+        assert "no paragraphs, tables or charts" in retry_prompt
@@ -0,0 +1,153 @@
+"""
+Tests for per-task deadline propagation.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from src.agent_execution import executor
+from src.agent_execution.planning import ResearchAndPlanOrchestrator
+from src.llm_service import LLMService
+from src.utils.deadline import (
+    Deadline,
+    DeadlineExceeded,
+    bound_timeout,
+    current_deadline,
+    deadline_scope,
+)
+
+
+def _expired():
+    deadline = Deadline(10)
+    deadline.expires_at = deadline.started_at
+    return deadline
+
+
+def _cloud_service():
+    service = LLMService(
+        base_url="https://api.openai.com/v1", api_key="sk-test", model="gpt-4o"
+    )
+    service.client = MagicMock()
+    response = MagicMock()
+    response.choices[0].message.content = "ok"
+    service.client.chat.completions.create.return_value = response
+    return service
+
+
+class TestDeadline:
+    def test_timeout_is_capped_by_remaining_budget(self):
+        deadline = Deadline(5)
+
+        assert deadline.timeout(60) <= 5
+        assert deadline.timeout(1) == 1
+        assert deadline.allows(1)
+        assert not deadline.allows(60)
+
+    def test_expired_deadline_raises(self):
+        with pytest.raises(DeadlineExceeded, match="before LLM call"):
+            _expired().timeout(30, stage="LLM call")
+
+    def test_scope_nests_and_restores(self):
+        outer, inner = Deadline(100), Deadline(10)
+
+        with deadline_scope(outer):
+            with deadline_scope(None):
+                assert current_deadline() is outer
+            with deadline_scope(inner):
+                assert current_deadline() is inner
+            assert current_deadline() is outer
+        assert current_deadline() is None
+        assert bound_timeout(30) == 30
+
+    @pytest.mark.asyncio
+    async def test_deadline_follows_to_thread(self):
+        deadline = Deadline(100)
+
+        with deadline_scope(deadline):
+            seen = await asyncio.to_thread(current_deadline)
+
+        assert seen is deadline
+
+
+class TestLLMService:
+    def test_request_timeout_is_bounded_by_deadline(self):
+        service = _cloud_service()
+
+        with deadline_scope(Deadline(3)):
+            service.complete("deadline prompt", use_cache=False)
+
+        timeout = service.client.chat.completions.create.call_args.kwargs["timeout"]
+        assert 0 < timeout <= 3
+
+    def test_expired_deadline_skips_the_call(self):
+        service = _cloud_service()
+        service._record_failure = MagicMock()
+
+        with deadline_scope(_expired()):
+            with pytest.raises(DeadlineExceeded):
+                service.complete("late prompt", use_cache=False)
+
+        service.client.chat.completions.create.assert_not_called()
+        service._record_failure.assert_not_called()
+
+
+class TestSandboxAndRetries:
+    def test_sandbox_not_started_after_deadline(self):
+        with deadline_scope(_expired()):
+            success, error, _, _ = executor._execute_code_in_sandbox(
+                "print(1)", None, 120
+            )
+
+        assert success is False
+        assert error.startswith("DEADLINE_EXCEEDED")
+
+    def test_sandbox_timeout_is_capped(self):
+        with patch.object(executor, "USE_DOCKER_SANDBOX", True), patch.object(
+            executor, "DOCKER_SANDBOX_AVAILABLE", True
+        ), patch.object(
+            executor, "_execute_code_in_docker", return_value=(True, "{}", None, None)
+        ) as run:
+            with deadline_scope(Deadline(30)):
+                executor._execute_code_in_sandbox("print(1)", None, 120)
+
+        assert run.call_args.args[1] <= 30
+
+    def test_retries_stop_when_next_attempt_would_not_fit(self):
+        fixer = MagicMock()
+        deadline = Deadline(100)
+        deadline.allows = MagicMock(return_value=False)
+
+        with patch.object(
+            executor,
+            "_execute_code_in_sandbox",
+            return_value=(False, "NameError: name 'x' is not defined", None, None),
+        ) as run, patch.object(executor, "CodeFixer", fixer):
+            with deadline_scope(deadline):
+                result = executor.execute_data_visualization(
+                    csv_data="a,b\n1,2\n",
+                    user_request="bar chart",
+                    llm_service=MagicMock(),
+                )
+
+        assert run.call_count == 1
+        fixer.assert_not_called()
+        assert result["last_error"].startswith("DEADLINE_EXCEEDED")
+
+
+class TestOrchestrator:
+    def test_workflow_stops_before_plan_when_deadline_passed(self):
+        orchestrator = ResearchAndPlanOrchestrator(llm_service=MagicMock())
+        orchestrator.context_extractor = MagicMock()
+        orchestrator.context_extractor.extract_context.return_value = {}
+        orchestrator.plan_generator = MagicMock()
+
+        result = orchestrator.execute_workflow(
+            user_request="chart", domain="data_analysis", deadline=_expired()
+        )
+
+        assert result["failed_at"] == "plan_generation"
+        assert "Deadline exceeded" in result["error"]
+        orchestrator.plan_generator.create_work_plan.assert_not_called()
+        assert current_deadline() is None
@@ -0,0 +1,168 @@
+"""
+Tests for the error-signature fix cache.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.agent_execution import fix_cache
+from src.agent_execution.executor import CodeFixer
+from src.agent_execution.fix_cache import (
+    FixCache,
+    apply_patch,
+    error_signature,
+    extract_patch,
+    fix_missing_column,
+)
+from src.config.config_manager import ConfigManager
+
+FAILED = """import seaborn as sns
+df = pd.read_csv(data_path)
+sns.distplot(df["sales"])
+"""
+
+FIXED = """import seaborn as sns
+df = pd.read_csv(data_path)
+sns.histplot(df["sales"])
+"""
+
+OTHER_TASK = """import seaborn as sns
+frame = pd.read_csv(data_path)
+sns.distplot(frame["revenue"], bins=20)
+"""
+
+DISTPLOT_ERROR = """Traceback (most recent call last):
+  File "/workspace/script.py", line 3, in <module>
+AttributeError: module 'seaborn' has no attribute 'distplot'"""
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = FixCache()
+    monkeypatch.setattr(fix_cache, "_global_fix_cache", cache)
+    yield cache
+    cache.close()
+
+
+class TestSignatures:
+    def test_uses_the_final_exception_line(self):
+        assert error_signature(DISTPLOT_ERROR) == (
+            "AttributeError: module 'seaborn' has no attribute 'distplot'"
+        )
+
+    def test_drops_numbers_and_paths(self):
+        message = (
+            "ValueError: x and y must have same first dimension, "
+            "but have shapes ({},) and ({},)"
+        )
+        first = error_signature(message.format(3, 4))
+        second = error_signature(message.format(7, 9))
+
+        assert first == second
+        assert "<path>" in error_signature("FileNotFoundError: /tmp/a/b.csv")
+
+
+class TestPatches:
+    def test_patch_generalizes_to_other_code(self):
+        patch = extract_patch(FAILED, FIXED)
+
+        assert patch == [["distplot", "histplot"]]
+        assert 'sns.histplot(frame["revenue"], bins=20)' in apply_patch(
+            OTHER_TASK, patch
+        )
+
+    def test_patch_does_not_apply_without_its_fragment(self):
+        assert apply_patch("print(1)\n", [["distplot", "histplot"]]) is None
+
+    def test_rewrites_are_not_reusable(self):
+        assert extract_patch(FAILED, FIXED + "plt.show()\n") is None
+
+    def test_fixes_a_column_close_to_a_header(self):
+        fixed = fix_missing_column(
+            "df.plot(x='revenue', y=\"Units\")",
+            "KeyError: 'revenue'",
+            ["Region", "Revenue ", "Units"],
+        )
+
+        assert fixed == "df.plot(x='Revenue ', y=\"Units\")"
+        assert fix_missing_column("df['x']", "KeyError: 'x'", ["Region"]) is None
+
+
+class TestFixCache:
+    def test_learns_and_reuses_a_fix(self, cache):
+        assert cache.learn(DISTPLOT_ERROR, FAILED, FIXED)
+
+        known = cache.lookup(OTHER_TASK, DISTPLOT_ERROR.replace("3", "8"), [])
+
+        assert "sns.histplot(" in known.code
+        metrics = cache.get_metrics()
+        assert metrics["hits"] == 1
+        assert metrics["hit_rate"] == 1.0
+
+    def test_failing_fixes_are_retired(self, cache):
+        cache.learn(DISTPLOT_ERROR, FAILED, FIXED)
+
+        for _ in range(3):
+            known = cache.lookup(OTHER_TASK, DISTPLOT_ERROR, [])
+            cache.record_outcome(known, fixed=False)
+
+        assert cache.lookup(OTHER_TASK, DISTPLOT_ERROR, []) is None
+        assert cache.get_metrics()["retired"] == 1
+
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "fixes.db")
+        first = FixCache(path)
+        first.learn(DISTPLOT_ERROR, FAILED, FIXED)
+        first.close()
+
+        second = FixCache(path)
+        assert second.lookup(OTHER_TASK, DISTPLOT_ERROR, []) is not None
+        second.close()
+
+
+class TestCodeFixer:
+    def _fixer(self, fixed_code):
+        llm = MagicMock()
+        llm.complete_streaming_collected.side_effect = lambda **kwargs: fixed_code
+        return CodeFixer(llm), llm
+
+    def test_working_llm_fix_is_learned_then_reused(self, cache):
+        fixer, llm = self._fixer(FIXED)
+
+        first = fixer.fix_code(FAILED, DISTPLOT_ERROR, ["sales"], "Plot sales")
+        fixer.record_outcome(first, FAILED, DISTPLOT_ERROR, new_error=None)
+        second = fixer.fix_code(OTHER_TASK, DISTPLOT_ERROR, ["revenue"], "Plot")
+
+        assert first["source"] == "llm"
+        assert second["source"] == "fix_cache"
+        assert llm.complete_streaming_collected.call_count == 1
+
+    def test_fix_that_keeps_failing_is_not_learned(self, cache):
+        fixer, _ = self._fixer(FIXED)
+
+        result = fixer.fix_code(FAILED, DISTPLOT_ERROR, ["sales"], "Plot sales")
+        fixer.record_outcome(result, FAILED, DISTPLOT_ERROR, DISTPLOT_ERROR)
+
+        assert cache.get_metrics()["patches"] == 0
+
+    def test_disabled_cache_always_asks_the_llm(self, cache, monkeypatch):
+        monkeypatch.setitem(ConfigManager._config_cache, "FIX_CACHE_ENABLED", False)
+        cache.learn(DISTPLOT_ERROR, FAILED, FIXED)
+        fixer, _ = self._fixer(FIXED)
+
+        result = fixer.fix_code(OTHER_TASK, DISTPLOT_ERROR, ["revenue"], "Plot")
+
+        assert result["source"] == "llm"
+
+    def test_known_fix_that_keeps_failing_falls_through_to_the_llm(self, cache):
+        cache.learn(DISTPLOT_ERROR, FAILED, FIXED)
+        fixer, llm = self._fixer(FIXED)
+
+        first = fixer.fix_code(OTHER_TASK, DISTPLOT_ERROR, ["revenue"], "Plot")
+        fixer.record_outcome(first, OTHER_TASK, DISTPLOT_ERROR, DISTPLOT_ERROR)
+        second = fixer.fix_code(OTHER_TASK, DISTPLOT_ERROR, ["revenue"], "Plot")
+
+        assert first["source"] == "fix_cache"
+        assert second["source"] == "llm"
+        assert llm.complete_streaming_collected.call_count == 1
@@ -0,0 +1,154 @@
+"""
+Tests for the LLM response cache and its LLMService integration.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.llm_cache import LLMResponseCache, get_llm_cache
+from src.llm_service import LLMService
+
+
+def _mock_response(content="Cached response"):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    response.model = "gpt-4o-mini"
+    response.usage.prompt_tokens = 10
+    response.usage.completion_tokens = 20
+    response.usage.total_tokens = 30
+    return response
+
+
+def _key(prompt="hello", temperature=0.0):
+    return LLMResponseCache.make_key(
+        "https://api.openai.com/v1", "gpt-4o-mini", None, prompt, temperature, 100
+    )
+
+
+class TestLLMResponseCache:
+    def test_key_is_stable_and_parameter_sensitive(self):
+        assert _key() == _key()
+        assert _key() != _key(prompt="other")
+        assert _key() != _key(temperature=0.5)
+
+    def test_miss_then_hit(self):
+        cache = LLMResponseCache()
+
+        assert cache.get(_key()) is None
+        cache.set(_key(), {"content": "hi"})
+
+        assert cache.get(_key()) == {"content": "hi"}
+        metrics = cache.get_metrics()
+        assert metrics["hits"] == 1
+        assert metrics["misses"] == 1
+        assert metrics["bytes_served"] > 0
+        assert metrics["hit_rate"] == 0.5
+
+    def test_lru_eviction(self):
+        cache = LLMResponseCache(max_entries=2)
+        cache.set("a", {"v": 1})
+        cache.set("b", {"v": 2})
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", {"v": 3})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": 1}
+        assert cache.get_metrics()["evictions"] == 1
+        assert cache.get_metrics()["entries"] == 2
+
+    def test_ttl_expiry(self):
+        cache = LLMResponseCache(ttl_seconds=10)
+        with patch("src.llm_cache.time.time", return_value=1000.0):
+            cache.set("a", {"v": 1})
+        with patch("src.llm_cache.time.time", return_value=1011.0):
+            assert cache.get("a") is None
+        assert cache.get_metrics()["expirations"] == 1
+        assert cache.get_metrics()["memory_bytes"] == 0
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        path = str(tmp_path / "llm_cache.db")
+        cache = LLMResponseCache(disk_path=path)
+        cache.set("a", {"content": "persisted"})
+        cache.close()
+
+        restarted = LLMResponseCache(disk_path=path)
+        assert restarted.get("a") == {"content": "persisted"}
+        assert restarted.get_metrics()["disk_hits"] == 1
+        # Promoted into memory on read
+        assert restarted.get("a") == {"content": "persisted"}
+        assert restarted.get_metrics()["memory_hits"] == 1
+        restarted.close()
+
+    def test_global_cache_disabled_by_default(self):
+        assert get_llm_cache() is None
+
+
+class TestLLMServiceCaching:
+    def _service(self, **kwargs):
+        service = LLMService.with_cloud(cache=LLMResponseCache(), **kwargs)
+        service.client = MagicMock()
+        service.client.chat.completions.create.return_value = _mock_response()
+        return service
+
+    def test_deterministic_calls_cached_by_default(self):
+        service = self._service()
+
+        first = service.complete("prompt", temperature=0)
+        second = service.complete("prompt", temperature=0)
+
+        assert first["cache_hit"] is False
+        assert second["cache_hit"] is True
+        assert second["content"] == "Cached response"
+        assert service.client.chat.completions.create.call_count == 1
+
+    def test_temperature_zero_reaches_api(self):
+        service = self._service()
+
+        service.complete("prompt", temperature=0)
+
+        call_kwargs = service.client.chat.completions.create.call_args.kwargs
+        assert call_kwargs["temperature"] == 0
+
+    def test_sampled_calls_not_cached_unless_requested(self):
+        service = self._service()
+
+        service.complete("prompt", temperature=0.7)
+        service.complete("prompt", temperature=0.7)
+        assert service.client.chat.completions.create.call_count == 2
+
+        service.complete("prompt", temperature=0.7, use_cache=True)
+        service.complete("prompt", temperature=0.7, use_cache=True)
+        assert service.client.chat.completions.create.call_count == 3
+
+    def test_per_call_bypass(self):
+        service = self._service()
+
+        service.complete("prompt", temperature=0)
+        service.complete("prompt", temperature=0, use_cache=False)
+
+        assert service.client.chat.completions.create.call_count == 2
+
+    def test_failures_are_not_cached(self):
+        service = self._service()
+        service.client.chat.completions.create.side_effect = [
+            Exception("boom"),
+            _mock_response(),
+        ]
+
+        with pytest.raises(Exception):
+            service.complete("prompt", temperature=0)
+        result = service.complete("prompt", temperature=0)
+
+        assert result["cache_hit"] is False
+
+    @pytest.mark.asyncio
+    async def test_async_path_shares_cache(self):
+        service = self._service()
+        service.async_client = MagicMock()
+        service.async_client.chat.completions.create = AsyncMock()
+
+        service.complete("prompt", temperature=0)
+        result = await service.complete_async("prompt", temperature=0)
+
+        assert result["cache_hit"] is True
+        service.async_client.chat.completions.create.assert_not_called()
@@ -0,0 +1,203 @@
+"""
+Tests for the adaptive (AIMD) concurrency limiter on LLM endpoints.
+"""
+
+import asyncio
+import threading
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.llm_concurrency_limiter import (
+    AdaptiveConcurrencyLimiter,
+    ConcurrencyLimitTimeout,
+)
+from src.llm_health_check import LLMHealthChecker
+
+ENDPOINT = "http://localhost:11434/v1"
+
+
+def _mock_response():
+    response = MagicMock()
+    response.choices[0].message.content = "Local response"
+    response.model = "llama3.2"
+    response.usage.prompt_tokens = 10
+    response.usage.completion_tokens = 20
+    response.usage.total_tokens = 30
+    return response
+
+
+class TestAIMD:
+    def test_additive_increase_when_latency_is_flat(self):
+        limiter = AdaptiveConcurrencyLimiter(ENDPOINT, initial_limit=2, max_limit=4)
+
+        for _ in range(20):
+            limiter.acquire()
+            limiter.acquire()
+            limiter.on_success(100)
+            limiter.release()
+            limiter.on_success(100)
+            limiter.release()
+
+        assert limiter.limit == 4
+        assert limiter.get_metrics()["increases"] >= 2
+
+    def test_multiplicative_decrease_on_latency_inflation(self):
+        limiter = AdaptiveConcurrencyLimiter(ENDPOINT, initial_limit=10)
+        for _ in range(5):
+            limiter.on_success(100, output_tokens=10)
+
+        limiter.on_success(500, output_tokens=10)
+
+        assert limiter.limit == 9
+
+    def test_long_completions_are_not_congestion(self):
+        limiter = AdaptiveConcurrencyLimiter(ENDPOINT, initial_limit=10)
+        for _ in range(5):
+            limiter.on_success(200, output_tokens=5)
+
+        # 2,500 tokens take far longer end to end, but not per token
+        for _ in range(10):
+            limiter.on_success(50_000, output_tokens=2500)
+
+        assert limiter.limit == 10
+
+    def test_new_request_class_needs_a_baseline_first(self):
+        limiter = AdaptiveConcurrencyLimiter(ENDPOINT, initial_limit=10)
+        for _ in range(5):
+            limiter.on_success(100, output_tokens=10)
+
+        limiter.on_success(5_000, output_tokens=3)
+
+        assert limiter.limit == 10
+
+    def test_baseline_ignores_a_single_fast_outlier(self):
+        limiter = AdaptiveConcurrencyLimiter(ENDPOINT, initial_limit=10)
+        for _ in range(20):
+            limiter.on_success(100, output_tokens=10)
+        limiter.on_success(10, output_tokens=10)
+        for _ in range(20):
+            limiter.on_success(100, output_tokens=10)
+
+        assert limiter.limit == 10
+
+    def test_errors_halve_the_limit_down_to_minimum(self):
+        limiter = AdaptiveConcurrencyLimiter(ENDPOINT, initial_limit=8, min_limit=1)
+
+        limiter.on_failure()
+        assert limiter.limit == 4
+
+        for _ in range(5):
+            limiter.on_failure()
+        assert limiter.limit == 1
+
+    def test_no_increase_while_limit_is_unused(self):
+        limiter = AdaptiveConcurrencyLimiter(ENDPOINT, initial_limit=4)
+
+        for _ in range(50):
+            limiter.on_success(100)
+
+        assert limiter.limit == 4
+
+
+class TestQueueing:
+    def test_excess_caller_waits_for_release(self):
+        limiter = AdaptiveConcurrencyLimiter(ENDPOINT, initial_limit=1)
+        limiter.acquire()
+        admitted = threading.Event()
+
+        def waiter():
+            limiter.acquire(timeout=2)
+            admitted.set()
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        while limiter.get_metrics()["queue_depth"] == 0:
+            pass
+        assert not admitted.is_set()
+
+        limiter.release()
+        thread.join()
+
+        assert admitted.is_set()
+        metrics = limiter.get_metrics()
+        assert metrics["in_flight"] == 1
+        assert metrics["queue_depth"] == 0
+
+    def test_deadline_raises_and_leaves_queue(self):
+        limiter = AdaptiveConcurrencyLimiter(ENDPOINT, initial_limit=1)
+        limiter.acquire()
+
+        with pytest.raises(ConcurrencyLimitTimeout):
+            limiter.acquire(timeout=0.01)
+
+        metrics = limiter.get_metrics()
+        assert metrics["timeouts"] == 1
+        assert metrics["queue_depth"] == 0
+
+    @pytest.mark.asyncio
+    async def test_async_waiters_are_admitted_in_order(self):
+        limiter = AdaptiveConcurrencyLimiter(ENDPOINT, initial_limit=1)
+        await limiter.acquire_async()
+        order = []
+
+        async def waiter(name):
+            await limiter.acquire_async(timeout=1)
+            order.append(name)
+            limiter.release()
+
+        tasks = [asyncio.create_task(waiter(n)) for n in ("a", "b", "c")]
+        await asyncio.sleep(0)
+        assert limiter.get_metrics()["queue_depth"] == 3
+
+        limiter.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["a", "b", "c"]
+        assert limiter.get_metrics()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_async_deadline(self):
+        limiter = AdaptiveConcurrencyLimiter(ENDPOINT, initial_limit=1)
+        await limiter.acquire_async()
+
+        with pytest.raises(ConcurrencyLimitTimeout):
+            await limiter.acquire_async(timeout=0.01)
+        assert limiter.get_metrics()["queue_depth"] == 0
+
+
+class TestHealthCheckerIntegration:
+    def test_limiter_per_endpoint_in_metrics_summary(self):
+        checker = LLMHealthChecker()
+        checker.register_endpoint(ENDPOINT)
+
+        limiter = checker.get_limiter(ENDPOINT)
+
+        assert checker.get_limiter(ENDPOINT) is limiter
+        assert checker.get_limiter("http://localhost:11435/v1") is not limiter
+        summary = checker.get_metrics_summary(ENDPOINT)
+        assert summary["concurrency"]["limit"] == limiter.limit
+
+    @pytest.mark.asyncio
+    async def test_local_service_holds_slot_during_request(self):
+        from src import llm_health_check
+        from src.llm_service import LLMService
+
+        llm_health_check._global_health_checker = None
+        service = LLMService(
+            base_url=ENDPOINT, api_key="not-needed", model="llama3.2"
+        )
+        observed = []
+
+        async def create(**kwargs):
+            observed.append(service._limiter.get_metrics()["in_flight"])
+            return _mock_response()
+
+        service.async_client = MagicMock()
+        service.async_client.chat.completions.create = AsyncMock(side_effect=create)
+
+        await service.complete_async("test")
+
+        assert observed == [1]
+        assert service._limiter.get_metrics()["in_flight"] == 0
+        llm_health_check._global_health_checker = None
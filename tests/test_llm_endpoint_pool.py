@@ -0,0 +1,140 @@
+"""
+Tests for load balancing across multiple local inference endpoints.
+"""
+
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src import llm_endpoint_pool, llm_health_check
+from src.llm_endpoint_pool import LocalEndpointPool, get_endpoint_pool
+from src.llm_health_check import CircuitState, get_health_checker
+from src.llm_service import LLMService, ModelConfig
+
+PORT_A = "http://localhost:11434/v1"
+PORT_B = "http://localhost:11435/v1"
+
+
+@pytest.fixture(autouse=True)
+def reset_pool_state():
+    """Fresh health checker and pool registry for every test."""
+    llm_health_check._global_health_checker = None
+    llm_endpoint_pool._endpoint_pools.clear()
+    yield
+    llm_health_check._global_health_checker = None
+    llm_endpoint_pool._endpoint_pools.clear()
+
+
+def _mock_response():
+    response = MagicMock()
+    response.choices[0].message.content = "Local response"
+    response.model = "llama3.2"
+    response.usage.prompt_tokens = 10
+    response.usage.completion_tokens = 20
+    response.usage.total_tokens = 30
+    return response
+
+
+class TestLocalEndpointPool:
+    def test_least_outstanding_spreads_concurrent_requests(self):
+        pool = LocalEndpointPool([PORT_A, PORT_B], sticky_tolerance=1.0)
+
+        first = pool.acquire("llama3.2")
+        second = pool.acquire("llama3.2")
+
+        assert {first, second} == {PORT_A, PORT_B}
+
+    def test_sticky_routing_keeps_model_on_one_endpoint(self):
+        pool = LocalEndpointPool([PORT_A, PORT_B])
+
+        for _ in range(5):
+            endpoint = pool.acquire("llama3.2")
+            pool.release(endpoint)
+
+        metrics = pool.get_metrics()
+        assert sorted(m["routed"] for m in metrics.values()) == [0, 5]
+
+    def test_sticky_model_spills_over_under_load(self):
+        pool = LocalEndpointPool([PORT_A, PORT_B])
+
+        chosen = [pool.acquire("llama3.2") for _ in range(4)]
+
+        assert set(chosen) == {PORT_A, PORT_B}
+
+    def test_latency_weighting_prefers_faster_endpoint(self):
+        checker = get_health_checker()
+        for _ in range(5):
+            checker.record_success(PORT_A, 4000)
+            checker.record_success(PORT_B, 500)
+        pool = LocalEndpointPool([PORT_A, PORT_B])
+
+        assert pool.acquire("llama3.2") == PORT_B
+
+    def test_open_circuit_endpoint_is_skipped(self):
+        pool = LocalEndpointPool([PORT_A, PORT_B])
+        metrics = get_health_checker().get_health_status(PORT_A)
+        metrics.state = CircuitState.OPEN
+        metrics.opened_at = datetime.now(timezone.utc)
+
+        for _ in range(3):
+            assert pool.acquire("llama3.2") == PORT_B
+
+    def test_registry_shares_pool_per_endpoint_set(self):
+        assert get_endpoint_pool([PORT_A, PORT_B]) is get_endpoint_pool(
+            [PORT_A, PORT_B]
+        )
+
+
+class TestModelConfigEndpoints:
+    def test_from_env_parses_local_base_urls(self):
+        with patch.dict(
+            "os.environ", {"LOCAL_BASE_URLS": f"{PORT_A}, {PORT_B}"}, clear=False
+        ):
+            config = ModelConfig.from_env()
+
+        assert config.local_base_urls == [PORT_A, PORT_B]
+        assert config.local_base_url == PORT_A
+
+    def test_single_endpoint_default(self):
+        config = ModelConfig(local_base_url=PORT_A)
+
+        assert config.local_base_urls == [PORT_A]
+
+
+class TestPooledLLMService:
+    def test_with_local_single_endpoint_is_not_pooled(self):
+        service = LLMService.with_local(local_endpoints=[PORT_A])
+
+        assert service._endpoint_pool is None
+
+    def test_for_task_local_accepts_endpoint_list(self):
+        config = ModelConfig(task_use_local_map={"basic_admin": True})
+
+        service = LLMService.for_task(
+            "basic_admin", model_config=config, local_endpoints=[PORT_A, PORT_B]
+        )
+
+        assert service.get_config()["local_endpoints"] == [PORT_A, PORT_B]
+
+    @pytest.mark.asyncio
+    async def test_requests_are_routed_to_endpoint_clients(self):
+        service = LLMService.with_local(
+            model="llama3.2", local_endpoints=[PORT_A, PORT_B]
+        )
+        used = []
+        for endpoint in (PORT_A, PORT_B):
+            child = service._endpoint_service(endpoint)
+            child.async_client = MagicMock()
+            child.async_client.chat.completions.create = AsyncMock(
+                side_effect=lambda endpoint=endpoint, **kw: (
+                    used.append(endpoint) or _mock_response()
+                )
+            )
+
+        result = await service.complete_async("test", coalesce=False)
+
+        assert result["content"] == "Local response"
+        assert len(used) == 1
+        pool_metrics = service._endpoint_pool.get_metrics()
+        assert pool_metrics[used[0]]["routed"] == 1
+        assert pool_metrics[used[0]]["outstanding"] == 0
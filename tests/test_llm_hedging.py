@@ -0,0 +1,244 @@
+"""
+Tests for hedged requests in complete_with_fallback.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src import llm_service
+from src.llm_health_check import LLMHealthChecker
+from src.llm_service import HedgeBudget, LLMService
+
+
+@pytest.fixture(autouse=True)
+def reset_hedge_state():
+    """Give every test a fresh hedge budget and health checker."""
+    from src import llm_health_check
+
+    llm_service._hedge_budget = HedgeBudget(max_in_flight=4)
+    llm_health_check._global_health_checker = None
+    yield
+    llm_service._hedge_budget = None
+    llm_health_check._global_health_checker = None
+
+
+def _cloud_service():
+    service = LLMService.with_cloud()
+    service._hedge_delay_seconds = lambda: 0.05
+    return service
+
+
+class TestLatencyPercentile:
+    def test_none_until_enough_samples(self):
+        checker = LLMHealthChecker()
+        for ms in range(1, 5):
+            checker.record_latency("http://cloud", ms)
+
+        assert checker.get_latency_percentile("http://cloud", 95) is None
+
+    def test_nearest_rank_p95(self):
+        checker = LLMHealthChecker()
+        for ms in range(1, 101):
+            checker.record_latency("http://cloud", ms)
+
+        assert checker.get_latency_percentile("http://cloud", 95) == 95
+        # Latency samples never affect circuit state
+        assert checker.get_health_status("http://cloud").total_requests == 0
+
+
+class TestHedgeBudget:
+    def test_exhausted_budget_refuses_hedges(self):
+        budget = HedgeBudget(max_in_flight=1)
+
+        assert budget.try_acquire() is True
+        assert budget.try_acquire() is False
+        budget.release()
+        assert budget.try_acquire() is True
+        assert budget.get_metrics()["skipped"] == 1
+
+
+class TestHedgedFallbackAsync:
+    @pytest.mark.asyncio
+    async def test_fast_primary_does_not_hedge(self):
+        service = _cloud_service()
+        service.complete_async = AsyncMock(return_value={"content": "cloud"})
+        local = MagicMock()
+        local.complete_async = AsyncMock()
+
+        with patch("src.llm_service.LLMService.with_local", return_value=local):
+            result = await service.complete_with_fallback_async("test", hedge=True)
+
+        assert result["content"] == "cloud"
+        assert result["fallback_used"] is False
+        assert result["hedged"] is False
+        local.complete_async.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_loses_to_hedge_and_is_cancelled(self):
+        service = _cloud_service()
+        primary_cancelled = asyncio.Event()
+
+        async def slow_primary(**kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                primary_cancelled.set()
+                raise
+
+        service.complete_async = slow_primary
+        local = MagicMock()
+        local.complete_async = AsyncMock(return_value={"content": "local"})
+
+        with patch("src.llm_service.LLMService.with_local", return_value=local):
+            result = await service.complete_with_fallback_async("test", hedge=True)
+
+        assert result["content"] == "local"
+        assert result["fallback_used"] is True
+        assert result["hedged"] is True
+        await asyncio.wait_for(primary_cancelled.wait(), timeout=1)
+        metrics = llm_service.get_hedge_budget().get_metrics()
+        assert metrics["won"] == 1
+        assert metrics["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_primary_falls_back_without_backoff(self):
+        service = _cloud_service()
+        service.complete_async = AsyncMock(side_effect=Exception("Cloud API error"))
+        local = MagicMock()
+        local.complete_async = AsyncMock(return_value={"content": "local"})
+
+        with patch("src.llm_service.LLMService.with_local", return_value=local):
+            result = await service.complete_with_fallback_async("test", hedge=True)
+
+        assert result["fallback_used"] is True
+        assert result["hedged"] is False
+        assert result["original_error"] == "Cloud API error"
+
+    @pytest.mark.asyncio
+    async def test_both_failing_raises_primary_error(self):
+        service = _cloud_service()
+        service.complete_async = AsyncMock(side_effect=Exception("Cloud API error"))
+        local = MagicMock()
+        local.complete_async = AsyncMock(side_effect=Exception("Local error"))
+
+        with patch("src.llm_service.LLMService.with_local", return_value=local):
+            with pytest.raises(Exception, match="Cloud API error"):
+                await service.complete_with_fallback_async("test", hedge=True)
+
+    @pytest.mark.asyncio
+    async def test_exhausted_budget_waits_for_primary(self):
+        llm_service._hedge_budget = HedgeBudget(max_in_flight=0)
+        service = _cloud_service()
+
+        async def slow_primary(**kwargs):
+            await asyncio.sleep(0.1)
+            return {"content": "cloud"}
+
+        service.complete_async = slow_primary
+        local = MagicMock()
+        local.complete_async = AsyncMock()
+
+        with patch("src.llm_service.LLMService.with_local", return_value=local):
+            result = await service.complete_with_fallback_async("test", hedge=True)
+
+        assert result["content"] == "cloud"
+        local.complete_async.assert_not_called()
+
+
+class TestHedgedFallbackSync:
+    def test_slow_primary_loses_to_hedge(self):
+        service = _cloud_service()
+        release = threading.Event()
+
+        def slow_primary(**kwargs):
+            release.wait(timeout=2)
+            return {"content": "cloud"}
+
+        service.complete = slow_primary
+        local = MagicMock()
+        local.complete.return_value = {"content": "local"}
+
+        start = time.time()
+        with patch("src.llm_service.LLMService.with_local", return_value=local):
+            result = service.complete_with_fallback("test", hedge=True)
+        release.set()
+
+        assert result["content"] == "local"
+        assert result["hedged"] is True
+        assert time.time() - start < 1
+
+    def test_hedging_off_keeps_sequential_schedule(self):
+        service = _cloud_service()
+        service.complete = MagicMock(return_value={"content": "cloud"})
+
+        with patch.object(service, "_complete_hedged") as hedged:
+            result = service.complete_with_fallback("test", hedge=False)
+
+        hedged.assert_not_called()
+        assert result["attempt"] == 0
+
+    def test_hedged_requests_keep_the_task_deadline(self):
+        from src.utils.deadline import Deadline, current_deadline, deadline_scope
+
+        service = _cloud_service()
+        seen = {}
+
+        def slow_primary(**kwargs):
+            seen["primary"] = current_deadline()
+            time.sleep(0.5)
+            return {"content": "cloud"}
+
+        def local_complete(**kwargs):
+            seen["hedge"] = current_deadline()
+            return {"content": "local"}
+
+        service.complete = slow_primary
+        local = MagicMock()
+        local.complete.side_effect = local_complete
+        deadline = Deadline(60)
+
+        with (
+            deadline_scope(deadline),
+            patch("src.llm_service.LLMService.with_local", return_value=local),
+        ):
+            service.complete_with_fallback("test", hedge=True)
+
+        assert seen == {"primary": deadline, "hedge": deadline}
+
+
+class TestFallbackBackoff:
+    def test_backoff_is_skipped_when_the_deadline_is_tight(self):
+        from src.utils.deadline import Deadline, deadline_scope
+
+        service = _cloud_service()
+        service.complete = MagicMock(side_effect=ConnectionError("cloud down"))
+        local = MagicMock()
+        local.complete.return_value = {"content": "local"}
+
+        with (
+            deadline_scope(Deadline(3)),
+            patch("src.llm_service.LLMService.with_local", return_value=local),
+            patch("src.llm_service.time.sleep") as sleep,
+        ):
+            result = service.complete_with_fallback("test", hedge=False)
+
+        assert result["fallback_used"] is True
+        assert [c.args[0] for c in sleep.call_args_list] == [0.0, 0.0]
+
+    def test_backoff_is_kept_without_a_deadline(self):
+        service = _cloud_service()
+        service.complete = MagicMock(side_effect=ConnectionError("cloud down"))
+        local = MagicMock()
+        local.complete.return_value = {"content": "local"}
+
+        with (
+            patch("src.llm_service.LLMService.with_local", return_value=local),
+            patch("src.llm_service.time.sleep") as sleep,
+        ):
+            service.complete_with_fallback("test", hedge=False)
+
+        assert [c.args[0] for c in sleep.call_args_list] == [2.0, 5.0]
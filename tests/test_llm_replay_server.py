@@ -0,0 +1,171 @@
+"""
+Tests for the LLM record/replay stand-in server.
+"""
+
+import json
+import time
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+from unittest.mock import patch
+
+from src.llm_replay_server import LLMReplayServer, request_key
+from src.llm_service import ModelConfig
+
+MESSAGES = [{"role": "user", "content": "Is this job a good fit?"}]
+
+
+def _upstream_reply(content="Yes, bid on it.", completion_tokens=5):
+    return {
+        "id": "chatcmpl-upstream",
+        "object": "chat.completion",
+        "created": 1700000000,
+        "model": "llama3.2",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": 10,
+            "completion_tokens": completion_tokens,
+            "total_tokens": 10 + completion_tokens,
+        },
+    }
+
+
+def _client(server):
+    """AsyncOpenAI client talking to the server's app in-process."""
+    transport = httpx.ASGITransport(app=server.create_app())
+    return AsyncOpenAI(
+        base_url="http://standin/v1",
+        api_key="not-needed",
+        http_client=httpx.AsyncClient(transport=transport, base_url="http://standin"),
+    )
+
+
+def _write_cassette(path, *responses):
+    key = request_key({"model": "llama3.2", "messages": MESSAGES})
+    with open(path, "w") as f:
+        for response in responses:
+            f.write(json.dumps({"key": key, "response": response}) + "\n")
+
+
+class TestRecord:
+    @pytest.mark.asyncio
+    async def test_records_upstream_responses(self, tmp_path):
+        cassette = tmp_path / "perf.jsonl"
+        upstream_bodies = []
+
+        def upstream(request):
+            upstream_bodies.append(json.loads(request.content))
+            return httpx.Response(200, json=_upstream_reply())
+
+        server = LLMReplayServer(
+            str(cassette),
+            mode="record",
+            upstream_url="http://upstream/v1",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(upstream)),
+        )
+
+        response = await _client(server).chat.completions.create(
+            model="llama3.2", messages=MESSAGES
+        )
+
+        assert response.choices[0].message.content == "Yes, bid on it."
+        assert "stream" not in upstream_bodies[0]
+        entry = json.loads(cassette.read_text())
+        assert entry["key"] == request_key({"model": "llama3.2", "messages": MESSAGES})
+        assert entry["response"]["usage"]["completion_tokens"] == 5
+
+        replay = LLMReplayServer(str(cassette))
+        assert replay.get_stats()["recordings"] == 1
+
+
+class TestReplay:
+    @pytest.mark.asyncio
+    async def test_replays_matching_request(self, tmp_path):
+        cassette = tmp_path / "perf.jsonl"
+        _write_cassette(cassette, _upstream_reply())
+        server = LLMReplayServer(str(cassette))
+
+        response = await _client(server).chat.completions.create(
+            model="llama3.2", messages=MESSAGES
+        )
+
+        assert response.choices[0].message.content == "Yes, bid on it."
+        assert server.get_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_repeated_requests_cycle_through_recordings(self, tmp_path):
+        cassette = tmp_path / "perf.jsonl"
+        _write_cassette(cassette, _upstream_reply("first"), _upstream_reply("second"))
+        client = _client(LLMReplayServer(str(cassette)))
+
+        replies = [
+            (await client.chat.completions.create(model="llama3.2", messages=MESSAGES))
+            .choices[0]
+            .message.content
+            for _ in range(3)
+        ]
+
+        assert replies == ["first", "second", "first"]
+
+    @pytest.mark.asyncio
+    async def test_miss_returns_404_or_fallback(self, tmp_path):
+        from openai import NotFoundError
+
+        strict = _client(LLMReplayServer(str(tmp_path / "empty.jsonl")))
+        with pytest.raises(NotFoundError):
+            await strict.chat.completions.create(model="llama3.2", messages=MESSAGES)
+
+        lenient = _client(
+            LLMReplayServer(str(tmp_path / "empty.jsonl"), fallback_content="{}")
+        )
+        response = await lenient.chat.completions.create(
+            model="llama3.2", messages=MESSAGES
+        )
+        assert response.choices[0].message.content == "{}"
+
+    @pytest.mark.asyncio
+    async def test_synthetic_latency_and_throughput(self, tmp_path):
+        cassette = tmp_path / "perf.jsonl"
+        _write_cassette(cassette, _upstream_reply(completion_tokens=10))
+        server = LLMReplayServer(str(cassette), latency_ms=50, tokens_per_second=100)
+
+        start = time.monotonic()
+        await _client(server).chat.completions.create(
+            model="llama3.2", messages=MESSAGES
+        )
+
+        # 50ms to first token + 10 tokens at 100 tokens/s
+        assert time.monotonic() - start >= 0.15
+
+    @pytest.mark.asyncio
+    async def test_streams_openai_chunks(self, tmp_path):
+        content = "import json\nprint(json.dumps({'success': True}))\n"
+        cassette = tmp_path / "perf.jsonl"
+        _write_cassette(cassette, _upstream_reply(content, completion_tokens=12))
+        server = LLMReplayServer(str(cassette), chunk_tokens=2)
+
+        stream = await _client(server).chat.completions.create(
+            model="llama3.2", messages=MESSAGES, stream=True
+        )
+        pieces = [chunk.choices[0].delta.content async for chunk in stream]
+
+        assert len(pieces) > 3
+        assert "".join(p or "" for p in pieces) == content
+
+
+class TestModelConfig:
+    def test_standin_url_replaces_local_and_cloud_endpoints(self):
+        url = "http://127.0.0.1:8765/v1"
+        with patch.dict("os.environ", {"LLM_STANDIN_URL": url}):
+            config = ModelConfig.from_env()
+
+        assert config.local_base_urls == [url]
+        assert config.get_model_for_task("complex", prefer_local=False)[1] == url
+        assert config.get_model_for_task("basic_admin", prefer_local=True)[1] == url
@@ -0,0 +1,308 @@
+"""
+Tests for the native async LLMService path.
+
+Covers the shared AsyncOpenAI client registry, complete_async,
+complete_streaming_async and complete_with_fallback_async.
+"""
+
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src import llm_service
+from src.llm_service import LLMService, get_async_client
+from src.llm_health_check import CircuitBreakerError, CircuitState
+from src.config.config_manager import ConfigManager
+
+
+def _mock_response(content="Async response", model="llama3.2"):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    response.model = model
+    response.usage.prompt_tokens = 10
+    response.usage.completion_tokens = 20
+    response.usage.total_tokens = 30
+    return response
+
+
+def _mock_chunk(text):
+    chunk = MagicMock()
+    chunk.choices = [MagicMock()]
+    chunk.choices[0].delta.content = text
+    return chunk
+
+
+class _FakeStream:
+    """Minimal stand-in for openai.AsyncStream."""
+
+    def __init__(self, chunks):
+        self._chunks = list(chunks)
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._chunks:
+            raise StopAsyncIteration
+        return self._chunks.pop(0)
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_state():
+    """Reset shared async clients and health checker between tests."""
+    from src import llm_health_check
+
+    llm_service._async_clients.clear()
+    llm_health_check._global_health_checker = None
+    yield
+    llm_service._async_clients.clear()
+    llm_health_check._global_health_checker = None
+
+
+def _local_service(**kwargs):
+    return LLMService(
+        base_url="http://localhost:11434/v1",
+        api_key="not-needed",
+        model="llama3.2",
+        **kwargs,
+    )
+
+
+class TestSharedAsyncClient:
+    def test_same_endpoint_shares_client(self):
+        service_a = _local_service()
+        service_b = _local_service()
+
+        assert service_a.async_client is service_b.async_client
+
+    def test_different_endpoints_get_different_clients(self):
+        client_a = get_async_client("http://localhost:11434/v1", "not-needed")
+        client_b = get_async_client("http://localhost:11435/v1", "not-needed")
+
+        assert client_a is not client_b
+
+    @pytest.mark.asyncio
+    async def test_close_async_clients_empties_registry(self):
+        get_async_client("http://localhost:11434/v1", "not-needed")
+
+        await llm_service.close_async_clients()
+
+        assert llm_service._async_clients == {}
+
+
+class TestCompleteAsync:
+    @pytest.mark.asyncio
+    async def test_uses_async_client_not_sync_client(self):
+        service = _local_service()
+        service.client = MagicMock()
+        service.async_client = MagicMock()
+        service.async_client.chat.completions.create = AsyncMock(
+            return_value=_mock_response()
+        )
+
+        result = await service.complete_async("test prompt", system_prompt="sys")
+
+        assert result["content"] == "Async response"
+        assert result["usage"]["total_tokens"] == 30
+        service.client.chat.completions.create.assert_not_called()
+        messages = service.async_client.chat.completions.create.call_args.kwargs[
+            "messages"
+        ]
+        assert messages[0] == {"role": "system", "content": "sys"}
+
+    @pytest.mark.asyncio
+    async def test_records_success_and_failure(self):
+        service = _local_service()
+        metrics = service._health_checker.get_health_status(service.base_url)
+        service.async_client = MagicMock()
+        service.async_client.chat.completions.create = AsyncMock(
+            side_effect=[Exception("boom"), _mock_response()]
+        )
+
+        with pytest.raises(Exception, match="boom"):
+            await service.complete_async("test")
+        assert metrics.consecutive_failures == 1
+
+        await service.complete_async("test")
+        assert metrics.consecutive_failures == 0
+        assert metrics.total_requests == 2
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_blocks_request(self):
+        service = _local_service()
+        metrics = service._health_checker.get_health_status(service.base_url)
+        metrics.state = CircuitState.OPEN
+        metrics.opened_at = datetime.now(timezone.utc)
+        service.async_client = MagicMock()
+        service.async_client.chat.completions.create = AsyncMock()
+
+        with pytest.raises(CircuitBreakerError):
+            await service.complete_async("test")
+        service.async_client.chat.completions.create.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_custom_timeout_is_forwarded(self):
+        service = _local_service()
+        service.async_client = MagicMock()
+        service.async_client.chat.completions.create = AsyncMock(
+            return_value=_mock_response()
+        )
+
+        await service.complete_async("test", timeout=5)
+
+        call_kwargs = service.async_client.chat.completions.create.call_args.kwargs
+        assert call_kwargs["timeout"] == 5
+
+
+class TestCompleteStreamingAsync:
+    @pytest.mark.asyncio
+    async def test_yields_chunks_and_closes_stream(self):
+        service = _local_service()
+        stream = _FakeStream(
+            [_mock_chunk("Hello"), _mock_chunk(None), _mock_chunk(" world")]
+        )
+        service.async_client = MagicMock()
+        service.async_client.chat.completions.create = AsyncMock(return_value=stream)
+
+        chunks = [chunk async for chunk in service.complete_streaming_async("hi")]
+
+        assert chunks == ["Hello", " world"]
+        assert stream.closed is True
+
+    @pytest.mark.asyncio
+    async def test_holds_a_limiter_slot_and_records_failures(self):
+        service = _local_service()
+        assert service._limiter is not None
+        observed = []
+
+        async def create(**kwargs):
+            observed.append(service._limiter.get_metrics()["in_flight"])
+            raise ConnectionError("endpoint down")
+
+        service.async_client = MagicMock()
+        service.async_client.chat.completions.create = create
+
+        with patch.object(service, "_record_failure") as record_failure:
+            with pytest.raises(ConnectionError):
+                async for _ in service.complete_streaming_async("hi"):
+                    pass
+
+        assert observed == [1]
+        assert service._limiter.get_metrics()["in_flight"] == 0
+        record_failure.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_timeout_is_bounded_by_the_deadline(self):
+        from src.utils.deadline import Deadline, deadline_scope
+
+        service = _local_service()
+        service.async_client = MagicMock()
+        service.async_client.chat.completions.create = AsyncMock(
+            return_value=_FakeStream([_mock_chunk("Hi")])
+        )
+
+        with deadline_scope(Deadline(2)):
+            chunks = [chunk async for chunk in service.complete_streaming_async("hi")]
+
+        assert chunks == ["Hi"]
+        call_kwargs = service.async_client.chat.completions.create.call_args.kwargs
+        assert call_kwargs["timeout"] <= 2
+
+
+class TestCompleteWithFallbackAsync:
+    @pytest.mark.asyncio
+    async def test_falls_back_to_local(self):
+        cloud_service = LLMService.with_cloud()
+        cloud_service.async_client = MagicMock()
+        cloud_service.async_client.chat.completions.create = AsyncMock(
+            side_effect=Exception("Cloud API error")
+        )
+
+        local_service = MagicMock()
+        local_service.complete_async = AsyncMock(
+            return_value={"content": "Local response", "model": "llama3.2"}
+        )
+
+        with patch("src.llm_service.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+            with patch(
+                "src.llm_service.LLMService.with_local", return_value=local_service
+            ):
+                result = await cloud_service.complete_with_fallback_async("test")
+
+        assert result["fallback_used"] is True
+        assert result["content"] == "Local response"
+        assert result["attempt"] == 2
+        assert cloud_service.async_client.chat.completions.create.await_count == 2
+        sleep_delays = [call.args[0] for call in mock_sleep.await_args_list]
+        assert sleep_delays == [2.0, 5.0]
+
+    @pytest.mark.asyncio
+    async def test_first_attempt_success(self):
+        cloud_service = LLMService.with_cloud()
+        cloud_service.async_client = MagicMock()
+        cloud_service.async_client.chat.completions.create = AsyncMock(
+            return_value=_mock_response("Cloud response", "gpt-4o-mini")
+        )
+
+        result = await cloud_service.complete_with_fallback_async("test")
+
+        assert result["fallback_used"] is False
+        assert result["attempt"] == 0
+        call_kwargs = (
+            cloud_service.async_client.chat.completions.create.call_args.kwargs
+        )
+        assert call_kwargs["timeout"] == 10
+
+    @pytest.mark.asyncio
+    async def test_fallback_disabled_raises(self):
+        cloud_service = LLMService.with_cloud(enable_fallback=False)
+        cloud_service.async_client = MagicMock()
+        cloud_service.async_client.chat.completions.create = AsyncMock(
+            side_effect=Exception("Cloud API error")
+        )
+
+        with patch("src.llm_service.asyncio.sleep", new=AsyncMock()):
+            with pytest.raises(Exception, match="Cloud API error"):
+                await cloud_service.complete_with_fallback_async("test")
+
+
+class TestSharedSyncClient:
+    def test_services_on_same_endpoint_share_client(self):
+        service_a = _local_service()
+        service_b = _local_service()
+
+        assert service_a.client is service_b.client
+        assert llm_service.get_client(
+            "http://localhost:11434/v1", "not-needed"
+        ) is service_a.client
+
+    def test_pool_limits_come_from_config(self):
+        ConfigManager.reset_instance()
+        try:
+            with patch.dict("os.environ", {"LLM_HTTP_MAX_CONNECTIONS": "7"}):
+                limits = llm_service._http_limits()
+        finally:
+            ConfigManager.reset_instance()
+
+        assert limits.max_connections == 7
+
+    def test_close_clients_empties_registry(self):
+        llm_service.get_client("http://localhost:11434/v1", "not-needed")
+
+        llm_service.close_clients()
+
+        assert llm_service._clients == {}
+
+    def test_fallback_passes_per_attempt_timeout(self):
+        cloud_service = LLMService.with_cloud()
+        shared_client = cloud_service.client
+        cloud_service.complete = MagicMock(return_value={"content": "ok"})
+
+        cloud_service.complete_with_fallback("test")
+
+        assert cloud_service.complete.call_args.kwargs["timeout"] == 10
+        assert cloud_service.client is shared_client
@@ -0,0 +1,208 @@
+"""
+Tests for single-flight coalescing of identical LLM requests.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.llm_single_flight import SingleFlight
+
+
+def _mock_response(content="Shared response"):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    response.model = "gpt-4o-mini"
+    response.usage.prompt_tokens = 10
+    response.usage.completion_tokens = 20
+    response.usage.total_tokens = 30
+    return response
+
+
+class TestSingleFlightSync:
+    def test_concurrent_callers_share_one_call(self):
+        group = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def fn():
+            calls.append(1)
+            release.wait(timeout=2)
+            return "result"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(group.do("k", fn)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        # Let every thread join the flight before the leader finishes
+        while group.get_metrics()["coalesced"] < 3:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert sorted(shared for _, shared in results) == [False, True, True, True]
+        assert all(result == "result" for result, _ in results)
+        assert group.get_metrics()["in_flight"] == 0
+
+    def test_error_propagates_to_waiters(self):
+        group = SingleFlight()
+        release = threading.Event()
+
+        def fn():
+            release.wait(timeout=2)
+            raise ValueError("upstream failed")
+
+        errors = []
+
+        def call():
+            try:
+                group.do("k", fn)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        while group.get_metrics()["coalesced"] < 2:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 3
+        assert group.get_metrics()["errors"] == 1
+
+    def test_sequential_calls_are_not_coalesced(self):
+        group = SingleFlight()
+
+        assert group.do("k", lambda: 1) == (1, False)
+        assert group.do("k", lambda: 2) == (2, False)
+
+
+class TestSingleFlightAsync:
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        group = SingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(
+            *(group.do_async("k", fn) for _ in range(5))
+        )
+
+        assert len(calls) == 1
+        assert [shared for _, shared in results].count(False) == 1
+        assert group.get_metrics()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_shared_call(self):
+        group = SingleFlight()
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            return "result"
+
+        leader = asyncio.create_task(group.do_async("k", fn))
+        follower = asyncio.create_task(group.do_async("k", fn))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        release.set()
+
+        assert await follower == ("result", True)
+
+    @pytest.mark.asyncio
+    async def test_last_waiter_cancelling_cancels_call(self):
+        group = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def fn():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiter = asyncio.create_task(group.do_async("k", fn))
+        await started.wait()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_error_propagates_to_waiters(self):
+        group = SingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream failed")
+
+        results = await asyncio.gather(
+            group.do_async("k", fn), group.do_async("k", fn), return_exceptions=True
+        )
+
+        assert all(isinstance(r, ValueError) for r in results)
+
+
+class TestLLMServiceCoalescing:
+    def _service(self):
+        from src.llm_service import LLMService
+
+        service = LLMService.with_cloud(single_flight=SingleFlight())
+        service.async_client = MagicMock()
+        return service
+
+    @pytest.mark.asyncio
+    async def test_identical_async_requests_share_upstream_call(self):
+        service = self._service()
+
+        async def slow_create(**kwargs):
+            await asyncio.sleep(0.01)
+            return _mock_response()
+
+        service.async_client.chat.completions.create = AsyncMock(
+            side_effect=slow_create
+        )
+
+        first, second = await asyncio.gather(
+            service.complete_async("prompt"), service.complete_async("prompt")
+        )
+
+        assert service.async_client.chat.completions.create.call_count == 1
+        assert first["content"] == second["content"] == "Shared response"
+        assert {first["coalesced"], second["coalesced"]} == {True, False}
+        # Each caller owns its result dict
+        assert first is not second
+
+    @pytest.mark.asyncio
+    async def test_coalesce_false_makes_independent_calls(self):
+        service = self._service()
+        service.async_client.chat.completions.create = AsyncMock(
+            return_value=_mock_response()
+        )
+
+        await asyncio.gather(
+            service.complete_async("prompt", coalesce=False),
+            service.complete_async("prompt", coalesce=False),
+        )
+
+        assert service.async_client.chat.completions.create.call_count == 2
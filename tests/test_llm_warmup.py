@@ -0,0 +1,201 @@
+"""
+Tests for local model warm-up and keep-alive.
+"""
+
+import asyncio
+import json
+import os
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src import llm_warmup
+from src.config.config_manager import ConfigManager
+from src.llm_service import DEFAULT_DISTILLED_MODEL
+from src.llm_warmup import ModelWarmupManager, default_warmup_models
+
+ENDPOINT = "http://localhost:11434/v1"
+
+
+@pytest.fixture(autouse=True)
+def reset_warmup_manager():
+    """Fresh global manager and config for every test."""
+    llm_warmup._global_warmup_manager = None
+    ConfigManager.reset_instance()
+    yield
+    llm_warmup._global_warmup_manager = None
+    ConfigManager.reset_instance()
+
+
+def _ollama(handler):
+    """httpx client whose requests are answered by handler(request)."""
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestWarmUp:
+    @pytest.mark.asyncio
+    async def test_preloads_every_model_with_keep_alive(self):
+        requests = []
+
+        def handler(request):
+            requests.append((str(request.url), json.loads(request.content)))
+            return httpx.Response(200, json={"done": True})
+
+        manager = ModelWarmupManager(
+            ["llama3.2", "distilled-llama3.2"],
+            [ENDPOINT],
+            keep_alive="10m",
+            http_client=_ollama(handler),
+        )
+
+        await manager.warm_up()
+
+        assert sorted(body["model"] for _, body in requests) == [
+            "distilled-llama3.2",
+            "llama3.2",
+        ]
+        assert all(url == "http://localhost:11434/api/generate" for url, _ in requests)
+        assert all(body["keep_alive"] == "10m" for _, body in requests)
+        status = manager.get_status()
+        assert status["ready"] is True
+        assert all(m["load_time_ms"] is not None for m in status["models"])
+
+    @pytest.mark.asyncio
+    async def test_failed_model_is_reported_not_ready(self):
+        def handler(request):
+            raise httpx.ConnectError("connection refused")
+
+        manager = ModelWarmupManager(
+            ["llama3.2"], [ENDPOINT], http_client=_ollama(handler)
+        )
+
+        await manager.warm_up()
+
+        status = manager.get_status()
+        assert status["warmup_complete"] is True
+        assert status["ready"] is False
+        assert status["models"][0]["status"] == "failed"
+        assert "connection refused" in status["models"][0]["error"]
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_completion_without_native_api(self):
+        client = MagicMock()
+        client.chat.completions.create = AsyncMock(return_value=MagicMock())
+        manager = ModelWarmupManager(
+            ["llama3.2"],
+            [ENDPOINT],
+            http_client=_ollama(lambda request: httpx.Response(404)),
+        )
+
+        with patch("src.llm_warmup.get_async_client", return_value=client):
+            await manager.warm_up()
+
+        assert manager.is_ready()
+        assert client.chat.completions.create.call_args.kwargs["max_tokens"] == 1
+
+
+class TestReadiness:
+    @pytest.mark.asyncio
+    async def test_wait_until_ready_blocks_on_loading_model(self):
+        release = asyncio.Event()
+
+        async def slow_ping(model, endpoint):
+            await release.wait()
+
+        manager = ModelWarmupManager(
+            ["llama3.2"], [ENDPOINT], keepalive_interval_seconds=0
+        )
+        manager._ping = slow_ping
+        manager.start()
+
+        assert await manager.wait_until_ready(timeout=0.01) is False
+        assert manager.get_status()["models"][0]["status"] == "loading"
+
+        release.set()
+        assert await manager.wait_until_ready(timeout=1) is True
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_keepalive_loop_repings_and_recovers(self):
+        pings = []
+
+        async def ping(model, endpoint):
+            pings.append(model)
+            if len(pings) == 1:
+                raise RuntimeError("still loading")
+
+        manager = ModelWarmupManager(
+            ["llama3.2"], [ENDPOINT], keepalive_interval_seconds=0.01
+        )
+        manager._ping = ping
+        manager.start()
+        await manager.wait_until_ready(timeout=1)
+        assert not manager.is_ready()
+
+        while len(pings) < 3:
+            await asyncio.sleep(0.01)
+        await manager.stop()
+
+        assert manager.get_status()["models"][0]["status"] == "ready"
+
+    @pytest.mark.asyncio
+    async def test_wait_for_warm_models_without_warmup(self):
+        with patch.dict("os.environ", {"LLM_WARMUP_ENABLED": "false"}):
+            ConfigManager.reset_instance()
+            assert llm_warmup.get_warmup_manager() is None
+            assert await llm_warmup.wait_for_warm_models() is True
+
+
+class TestDefaults:
+    def test_default_models_include_distilled_and_scanner(self):
+        env = {"DISTILLED_MODEL_NAME": "my-distilled"}
+        with (
+            patch.dict("os.environ", env),
+            patch(
+                "src.agent_execution.market_scanner.EVALUATION_MODEL", "qwen2.5"
+            ),
+        ):
+            models = default_warmup_models()
+
+        assert "my-distilled" in models
+        assert "qwen2.5" in models
+        assert len(models) == len(set(models))
+
+    def test_distilled_model_only_when_configured(self):
+        with patch.dict("os.environ", {"LLM_WARMUP_MODELS": ""}):
+            os.environ.pop("DISTILLED_MODEL_NAME", None)
+            ConfigManager.reset_instance()
+            models = default_warmup_models()
+
+        assert DEFAULT_DISTILLED_MODEL not in models
+
+    def test_scanner_model_uses_the_scanners_default(self):
+        from src.agent_execution.market_scanner import EVALUATION_MODEL
+
+        with patch.dict("os.environ", {"LLM_WARMUP_MODELS": ""}):
+            ConfigManager.reset_instance()
+            assert EVALUATION_MODEL in default_warmup_models()
+
+    def test_explicit_model_list(self):
+        with patch.dict("os.environ", {"LLM_WARMUP_MODELS": "a, b,a"}):
+            ConfigManager.reset_instance()
+            assert default_warmup_models() == ["a", "b"]
+
+
+class TestReadinessEndpoint:
+    def test_reports_model_status(self):
+        from fastapi.testclient import TestClient
+        from src.api.main import app
+
+        manager = ModelWarmupManager(["llama3.2"], [ENDPOINT])
+        llm_warmup._global_warmup_manager = manager
+
+        response = TestClient(app).get("/api/v1/system/models")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["enabled"] is True
+        assert body["ready"] is False
+        assert body["models"][0]["model"] == "llama3.2"
+        assert body["models"][0]["status"] == "pending"
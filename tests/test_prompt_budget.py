@@ -0,0 +1,145 @@
+"""
+Tests for prompt token budgeting and compact data profiles.
+"""
+
+import json
+
+import pandas as pd
+from unittest.mock import MagicMock
+
+from src.agent_execution.planning import ContextExtractor, WorkPlanGenerator
+from src.agent_execution.prompt_budget import (
+    PromptBudgeter,
+    build_data_profile,
+    estimate_tokens,
+    format_data_profile,
+    profile_csv,
+)
+
+
+def _sales_frame(rows=300):
+    return pd.DataFrame(
+        {
+            "region": ["North", "South", "East"] * (rows // 3),
+            "amount": [float(i) for i in range(rows)],
+            "note": [None if i % 10 == 0 else f"order {i}" for i in range(rows)],
+        }
+    )
+
+
+class TestDataProfile:
+    def test_profile_has_types_nulls_ranges_and_categories(self):
+        profile = build_data_profile(_sales_frame())
+
+        assert profile["row_count"] == 300
+        amount = profile["columns"]["amount"]
+        assert (amount["min"], amount["max"]) == (0.0, 299.0)
+        assert profile["columns"]["note"]["nulls"] == 30
+        assert profile["columns"]["region"]["top"] == {
+            "North": 100,
+            "South": 100,
+            "East": 100,
+        }
+
+    def test_sample_is_stratified_across_categories(self):
+        profile = build_data_profile(_sales_frame(), sample_rows=3)
+
+        assert {row["region"] for row in profile["sample"]} == {
+            "North",
+            "South",
+            "East",
+        }
+
+    def test_sample_without_categories_spans_the_file(self):
+        df = pd.DataFrame({"x": range(100)})
+
+        sample = build_data_profile(df, sample_rows=3)["sample"]
+
+        assert [row["x"] for row in sample] == [0, 50, 99]
+
+    def test_profile_is_json_serializable(self):
+        df = _sales_frame()
+        df["when"] = pd.date_range("2024-01-01", periods=len(df))
+
+        profile = build_data_profile(df)
+
+        json.dumps(profile)
+        assert profile["columns"]["when"]["min"].startswith("2024-01-01")
+
+    def test_profile_csv_handles_bad_input(self):
+        assert profile_csv("a,b\n1,2\n")["row_count"] == 1
+        assert profile_csv("") is None
+
+
+class TestPromptBudgeter:
+    def test_small_data_passes_through_raw(self):
+        csv_data = "region,amount\nNorth,1\nSouth,2\n"
+
+        assert PromptBudgeter(100).fit(csv_data=csv_data) == csv_data.strip()
+
+    def test_large_data_becomes_profile_within_budget(self):
+        csv_data = _sales_frame(3000).to_csv(index=False)
+        budgeter = PromptBudgeter(300)
+
+        text = budgeter.fit(csv_data=csv_data)
+
+        assert text.startswith("Data profile: 3000 rows x 3 columns")
+        assert estimate_tokens(text) <= 300
+
+    def test_profile_detail_is_dropped_to_fit(self):
+        wide = pd.DataFrame({f"col_{i}": ["a", "b"] * 5 for i in range(60)})
+        profile = build_data_profile(wide)
+        full = format_data_profile(profile)
+
+        text = PromptBudgeter(150).fit_profile(profile)
+
+        assert estimate_tokens(full) > 150
+        assert estimate_tokens(text) <= 150
+        assert "more columns" in text
+
+    def test_local_models_use_local_budget(self):
+        llm = MagicMock()
+        llm.is_local.return_value = True
+
+        budgeter = PromptBudgeter.for_llm(llm)
+
+        assert budgeter.is_local is True
+        assert budgeter.budget_tokens == 1000
+
+
+class TestPlanningUsesProfiles:
+    def test_context_extractor_stores_profile_and_budgets_prompt(self):
+        llm = MagicMock()
+        llm.is_local.return_value = False
+        llm.complete.return_value = {"content": "{}"}
+        csv_data = _sales_frame(3000).to_csv(index=False)
+
+        context = ContextExtractor(llm).extract_context(csv_data=csv_data)
+
+        assert context["data_summary"]["profile"]["row_count"] == 3000
+        prompt = llm.complete.call_args.kwargs["prompt"]
+        assert "Data profile: 3000 rows" in prompt
+        assert len(prompt) < len(csv_data) / 10
+
+    def test_context_extractor_sends_small_data_raw(self):
+        llm = MagicMock()
+        llm.is_local.return_value = False
+        llm.complete.return_value = {"content": "{}"}
+        csv_data = _sales_frame(6).to_csv(index=False)
+
+        context = ContextExtractor(llm).extract_context(csv_data=csv_data)
+
+        assert context["data_summary"]["profile"]["row_count"] == 6
+        prompt = llm.complete.call_args.kwargs["prompt"]
+        assert csv_data.strip() in prompt
+        assert "Data profile" not in prompt
+
+    def test_work_plan_context_summary_includes_profile(self):
+        context = ContextExtractor().extract_context(
+            csv_data=_sales_frame().to_csv(index=False)
+        )
+
+        summary = WorkPlanGenerator(MagicMock())._build_context_summary(context)
+
+        assert "Data profile: 300 rows" in summary
+        assert "amount: float64" in summary
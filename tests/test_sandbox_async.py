@@ -0,0 +1,151 @@
+"""
+Tests for the non-blocking async sandbox API.
+"""
+
+import asyncio
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.agent_execution import docker_sandbox
+from src.agent_execution.docker_sandbox import (
+    LocalDockerSandbox,
+    SandboxResult,
+    shutdown_async_executor,
+)
+from src.utils.deadline import Deadline, current_deadline, deadline_scope
+
+
+class BlockingContainer:
+    """Stand-in docker container whose wait() blocks until it is removed."""
+
+    def __init__(self):
+        self.removed = threading.Event()
+
+    def wait(self, timeout=None):
+        if not self.removed.wait(timeout):
+            raise Exception("Read timed out")
+        raise Exception("container not found")
+
+    def logs(self):
+        return b""
+
+    def remove(self, force=False):
+        self.removed.set()
+
+
+@pytest.fixture(autouse=True)
+def fresh_executor():
+    shutdown_async_executor()
+    yield
+    shutdown_async_executor()
+
+
+def _cold_sandbox(container):
+    sandbox = LocalDockerSandbox(use_pool=False)
+    sandbox._ensure_image_exists = MagicMock(return_value=True)
+    client = MagicMock()
+    client.containers.run.return_value = container
+    sandbox._get_docker_client = MagicMock(return_value=client)
+    return sandbox
+
+
+class TestRunCodeAsync:
+    @pytest.mark.asyncio
+    async def test_runs_in_sandbox_slot_with_callers_deadline(self):
+        seen = {}
+
+        def run_code(code, timeout, output_format, input_files):
+            seen["thread"] = threading.current_thread().name
+            seen["deadline"] = current_deadline()
+            return SandboxResult(logs=[], artifacts=[])
+
+        sandbox = LocalDockerSandbox()
+        sandbox.run_code = run_code
+        deadline = Deadline(60)
+        with deadline_scope(deadline):
+            result = await sandbox.run_code_async("print(1)")
+
+        assert result.success
+        assert seen["thread"].startswith("sandbox-slot")
+        assert seen["deadline"] is deadline
+
+    @pytest.mark.asyncio
+    async def test_runs_concurrently_up_to_the_slot_count(self, monkeypatch):
+        monkeypatch.setitem(
+            docker_sandbox.ConfigManager._config_cache, "SANDBOX_ASYNC_SLOTS", 2
+        )
+        running = []
+        peak = []
+        release = threading.Event()
+
+        def run_code(code, timeout, output_format, input_files):
+            running.append(code)
+            peak.append(len(running))
+            release.wait(5)
+            running.remove(code)
+            return SandboxResult(logs=[], artifacts=[])
+
+        sandbox = LocalDockerSandbox()
+        sandbox.run_code = run_code
+        tasks = [
+            asyncio.create_task(sandbox.run_code_async(f"print({i})"))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0.2)
+        # The event loop stays free while the runs block their slots
+        assert len(running) == 2
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert all(r.success for r in results)
+        assert max(peak) == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelling_kills_the_container(self):
+        container = BlockingContainer()
+        sandbox = _cold_sandbox(container)
+
+        task = asyncio.create_task(sandbox.run_code_async("while True: pass"))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert container.removed.wait(5)
+        assert sandbox.cancelled
+
+    @pytest.mark.asyncio
+    async def test_deadline_passing_kills_the_container(self, monkeypatch):
+        monkeypatch.setattr(docker_sandbox, "ASYNC_DEADLINE_GRACE_SECONDS", 0)
+        container = BlockingContainer()
+        sandbox = _cold_sandbox(container)
+
+        with deadline_scope(Deadline(0.3)):
+            result = await sandbox.run_code_async("while True: pass", timeout=60)
+
+        assert "DEADLINE_EXCEEDED" in result.error
+        assert container.removed.wait(5)
+
+
+class TestCancel:
+    def test_cancel_stops_a_running_cold_run(self):
+        container = BlockingContainer()
+        sandbox = _cold_sandbox(container)
+
+        threading.Timer(0.2, sandbox.cancel).start()
+        result = sandbox.run_code("while True: pass", timeout=30)
+
+        assert result.error.startswith("CANCELLED")
+        assert container.removed.is_set()
+
+    def test_cancelled_sandbox_does_not_start_runs(self):
+        sandbox = LocalDockerSandbox()
+        sandbox.cancel()
+
+        with patch.object(docker_sandbox, "get_sandbox_pool") as get_pool:
+            result = sandbox.run_code("print(1)")
+
+        assert result.error.startswith("CANCELLED")
+        get_pool.assert_not_called()
@@ -0,0 +1,135 @@
+"""
+Tests for the sandbox result cache and its executor integration.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.agent_execution import executor, sandbox_cache
+from src.agent_execution.docker_sandbox import (
+    SandboxArtifact,
+    SandboxLog,
+    SandboxResult,
+)
+from src.agent_execution.sandbox_cache import SandboxResultCache
+from src.config.config_manager import ConfigManager
+
+CODE = """
+import pandas as pd  # load the data
+df = pd.DataFrame({'a': [1, 2]})
+
+print(df.sum())
+"""
+
+
+def _result(error=None, timed_out=False):
+    return SandboxResult(
+        logs=[SandboxLog(text="a    3\n")],
+        artifacts=[SandboxArtifact(name="chart.png", data=b"\x89PNG", mime_type="image/png")],
+        error=error,
+        timed_out=timed_out,
+    )
+
+
+def _key(code=CODE, image="sha256:1", inputs=None):
+    return SandboxResultCache.make_key(code, image, "image", inputs)
+
+
+class TestKeys:
+    def test_comments_and_blank_lines_do_not_change_the_key(self):
+        reformatted = CODE.replace("  # load the data", "").replace("\n\n", "\n")
+
+        assert _key(reformatted) == _key()
+
+    def test_code_image_and_inputs_change_the_key(self):
+        assert _key(CODE.replace("2]", "3]")) != _key()
+        assert _key(image="sha256:2") != _key()
+        assert _key(inputs=sandbox_cache.digest_inputs({"data.csv": b"a\n1"})) != _key()
+
+    def test_untokenizable_code_still_gets_a_key(self):
+        assert _key("print('unterminated") == _key("print('unterminated   ")
+
+
+class TestSandboxResultCache:
+    def test_round_trips_logs_artifacts_and_exit_status(self):
+        cache = SandboxResultCache()
+        cache.set(_key(), _result(error="Process exited with code 1"))
+
+        hit = cache.get(_key())
+
+        assert hit.logs[0].text == "a    3\n"
+        assert hit.artifacts[0].data == b"\x89PNG"
+        assert hit.error == "Process exited with code 1"
+
+    @pytest.mark.parametrize(
+        "result",
+        [
+            _result(timed_out=True),
+            _result(error="CANCELLED: Sandbox execution was cancelled"),
+            _result(error="DEADLINE_EXCEEDED: Task deadline passed"),
+            _result(error="Docker error: connection refused"),
+            _result(error="Process exited with code 137"),
+            _result(error="Stopped on fatal error: KeyError: 'sales'"),
+        ],
+    )
+    def test_does_not_store_unreproducible_outcomes(self, result):
+        cache = SandboxResultCache()
+
+        assert not cache.set(_key(), result)
+        assert cache.get(_key()) is None
+
+    def test_evicts_least_recently_used_beyond_max_bytes(self):
+        size = len(sandbox_cache._serialize(_result()))
+        cache = SandboxResultCache(max_bytes=size * 2)
+        for name in ("a", "b"):
+            cache.set(_key(name), _result())
+        cache.get(_key("a"))
+        cache.set(_key("c"), _result())
+
+        assert cache.get(_key("b")) is None
+        assert cache.get(_key("a")) is not None
+        assert cache.get_metrics()["memory_bytes"] <= size * 2
+
+    def test_disk_tier_survives_restart_and_is_bounded(self, tmp_path):
+        path = str(tmp_path / "sandbox_cache.db")
+        size = len(sandbox_cache._serialize(_result()))
+        cache = SandboxResultCache(max_bytes=size * 2, disk_path=path)
+        for name in ("a", "b", "c"):
+            cache.set(_key(name), _result())
+        cache.close()
+
+        reopened = SandboxResultCache(max_bytes=size * 2, disk_path=path)
+
+        assert reopened.get(_key("c")).artifacts[0].name == "chart.png"
+        assert reopened.get(_key("a")) is None
+        assert reopened.get_metrics()["disk_hits"] == 1
+        reopened.close()
+
+
+class TestExecutorIntegration:
+    def test_identical_run_skips_the_container(self, monkeypatch):
+        monkeypatch.setattr(sandbox_cache, "_global_sandbox_cache", None)
+        monkeypatch.setitem(ConfigManager._config_cache, "SANDBOX_CACHE_ENABLED", True)
+        monkeypatch.setattr(executor, "image_version", lambda image: "sha256:1")
+
+        with patch.object(
+            executor.LocalDockerSandbox, "execute", return_value=_result()
+        ) as execute:
+            first = executor._execute_code_in_docker(CODE, 30)
+            second = executor._execute_code_in_docker(CODE + "# rerun\n", 30)
+
+        assert execute.call_count == 1
+        assert first[0] and second[0]
+        assert second[3][0].data == b"\x89PNG"
+
+    def test_disabled_cache_always_runs(self, monkeypatch):
+        monkeypatch.setitem(ConfigManager._config_cache, "SANDBOX_CACHE_ENABLED", False)
+
+        with patch.object(
+            executor.LocalDockerSandbox, "execute", return_value=_result()
+        ) as execute:
+            executor._execute_code_in_docker(CODE, 30)
+            executor._execute_code_in_docker(CODE, 30)
+
+        assert execute.call_count == 2
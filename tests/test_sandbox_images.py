@@ -0,0 +1,113 @@
+"""
+Tests for the prebuilt per-format sandbox images.
+"""
+
+import re
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.agent_execution import sandbox_images
+from src.agent_execution.executor import OutputFormat, TaskRouter
+from src.agent_execution.sandbox_images import (
+    GENERIC_IMAGE,
+    SANDBOX_IMAGES,
+    build_images,
+    e2b_template,
+    select_image,
+)
+from src.config.config_manager import ConfigManager
+
+
+def _built(*tags):
+    return lambda image: f"sha256:{image}" if image in tags else None
+
+
+class TestSpecs:
+    def test_every_router_format_has_an_image(self):
+        router = TaskRouter()
+        formats = {
+            router.detect_output_format(domain, task_type)
+            for domain in ("legal", "accounting", "data_analysis")
+            for task_type in ("visualization", "document", "spreadsheet")
+        }
+
+        assert formats | {OutputFormat.PPTX} <= set(SANDBOX_IMAGES)
+
+    @pytest.mark.parametrize(
+        "spec", list(SANDBOX_IMAGES.values()) + [GENERIC_IMAGE], ids=lambda s: s.tag
+    )
+    def test_requirements_are_pinned(self, spec):
+        with open(spec.requirements_path) as f:
+            lines = [line.strip() for line in f if line.strip()]
+        packages = [line for line in lines if not line.startswith(("#", "-r "))]
+
+        assert all(re.fullmatch(r"[\w.-]+==[\w.]+", p) for p in packages)
+
+
+class TestSelectImage:
+    def test_uses_the_formats_image_when_built(self, monkeypatch):
+        monkeypatch.setattr(sandbox_images, "image_digest", _built("ai-sandbox-docx"))
+
+        assert select_image("docx", "generic") == "ai-sandbox-docx"
+
+    def test_falls_back_while_the_image_is_not_built(self, monkeypatch):
+        monkeypatch.setattr(sandbox_images, "image_digest", _built())
+
+        assert select_image("docx", "generic") == "generic"
+        assert select_image("unknown", "generic") == "generic"
+
+    def test_disabled_always_uses_the_generic_image(self, monkeypatch):
+        monkeypatch.setattr(sandbox_images, "image_digest", _built("ai-sandbox-docx"))
+        monkeypatch.setitem(
+            ConfigManager._config_cache, "SANDBOX_FORMAT_IMAGES_ENABLED", False
+        )
+
+        assert select_image("docx", "generic") == "generic"
+
+    def test_e2b_templates_are_opt_in(self, monkeypatch):
+        assert e2b_template("xlsx") is None
+
+        monkeypatch.setitem(
+            ConfigManager._config_cache, "SANDBOX_E2B_TEMPLATES_ENABLED", True
+        )
+        assert e2b_template("xlsx") == "ai-sandbox-xlsx"
+
+
+class TestBuild:
+    def test_builds_each_format_from_its_profile(self, monkeypatch):
+        client = MagicMock()
+        client.images.build.return_value = (MagicMock(id="sha256:abc"), [])
+        monkeypatch.setattr(sandbox_images.docker, "from_env", lambda: client)
+
+        built = build_images(["pdf"])
+
+        assert built == {"ai-sandbox-pdf": "sha256:abc"}
+        kwargs = client.images.build.call_args.kwargs
+        assert kwargs["buildargs"] == {"SANDBOX_PROFILE": "pdf"}
+        assert kwargs["dockerfile"] == "Dockerfile.sandbox"
+
+    def test_rejects_unknown_formats(self):
+        with pytest.raises(ValueError, match="gif"):
+            build_images(["gif"])
+
+
+class TestE2BTemplate:
+    def test_template_skips_pip_install(self, monkeypatch):
+        from src.agent_execution import executor
+
+        monkeypatch.setitem(
+            ConfigManager._config_cache, "SANDBOX_E2B_TEMPLATES_ENABLED", True
+        )
+        sandbox = MagicMock()
+        sandbox_cls = MagicMock()
+        sandbox_cls.return_value.__enter__.return_value = sandbox
+
+        with (
+            patch.object(executor, "Sandbox", sandbox_cls, create=True),
+            patch.object(executor, "E2B_AVAILABLE", True),
+        ):
+            executor._execute_code_in_e2b("print(1)", "key", 30, "docx")
+
+        assert sandbox_cls.call_args.kwargs["template"] == "ai-sandbox-docx"
+        sandbox.commands.run.assert_not_called()
@@ -0,0 +1,534 @@
+"""
+Tests for the warm sandbox container pool.
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from src.agent_execution import docker_sandbox
+from src.agent_execution.docker_sandbox import LocalDockerSandbox, SandboxSession
+from src.agent_execution.sandbox_pool import (
+    EXIT_STOPPED,
+    EXIT_TIMEOUT,
+    EXIT_WORKER_UNAVAILABLE,
+    WORKER_READY,
+    SandboxContainerPool,
+    FATAL_ERROR_PATTERN,
+    WORKER_CLIENT,
+    WarmContainer,
+    build_worker_server,
+    worker_socket,
+)
+
+
+class FakeContainer:
+    """Stand-in docker container whose exec runs a callback."""
+
+    def __init__(self, on_exec=None):
+        self.on_exec = on_exec or (lambda command: (0, (b"ok\n", b"")))
+        self.removed = False
+        self.status = "running"
+
+    def logs(self):
+        return f"{WORKER_READY}\n".encode()
+
+    def reload(self):
+        pass
+
+    def exec_run(self, command, demux, workdir):
+        return self.on_exec(command)
+
+    def remove(self, force=False):
+        self.removed = True
+
+
+def _fake_docker(containers):
+    client = MagicMock()
+    client.containers.run.side_effect = lambda *a, **k: (
+        containers.append(FakeContainer()) or containers[-1]
+    )
+    return client
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+@pytest.mark.skipif(
+    not hasattr(socket, "send_fds") or sys.platform != "linux",
+    reason="fork server needs Linux and socket.send_fds",
+)
+class TestForkServer:
+    """Runs the in-container worker protocol directly on the host."""
+
+    @pytest.fixture
+    def worker(self, tmp_path):
+        worker_dir = tmp_path / "w"
+        scratch = tmp_path / "scratch"
+        workspace = tmp_path / "workspace"
+        scratch.mkdir()
+        workspace.mkdir()
+        server = subprocess.Popen(
+            [sys.executable, "-c", build_worker_server(str(worker_dir), str(scratch))],
+            stdout=subprocess.PIPE,
+        )
+        assert WORKER_READY in server.stdout.readline().decode()
+        sessions = []
+
+        def send(socket_path, request):
+            return subprocess.run(
+                [
+                    sys.executable,
+                    "-S",
+                    "-c",
+                    WORKER_CLIENT,
+                    socket_path,
+                    json.dumps(request),
+                ],
+                capture_output=True,
+                text=True,
+                timeout=30,
+            )
+
+        def run(code, timeout=10, session=None, script="script.py", fatal_grace=None):
+            (workspace / script).write_text(code)
+            request = {"script": script, "cwd": str(workspace), "timeout": timeout}
+            if fatal_grace is not None:
+                request["fatal"] = {"pattern": FATAL_ERROR_PATTERN, "grace": fatal_grace}
+            return send(session or worker_socket(str(worker_dir)), request)
+
+        def start_session(code, timeout=10):
+            (workspace / "setup.py").write_text(code)
+            session = str(worker_dir / "session.sock")
+            request = {
+                "op": "session",
+                "script": "setup.py",
+                "cwd": str(workspace),
+                "timeout": timeout,
+                "session_socket": session,
+            }
+            sessions.append(session)
+            return send(worker_socket(str(worker_dir)), request), session
+
+        run.send = send
+        run.start_session = start_session
+        run.scratch = scratch
+        run.workspace = workspace
+        yield run
+        # Session workers call setsid(), so killing the server misses them
+        for session in sessions:
+            if os.path.exists(session):
+                send(session, {"op": "close"})
+        server.kill()
+        server.wait()
+
+    def test_runs_script_with_output_and_files(self, worker):
+        result = worker("print('hello')\nopen('output.png', 'w').write('x')\n")
+
+        assert result.returncode == 0
+        assert result.stdout == "hello\n"
+        assert (worker.workspace / "output.png").exists()
+
+    def test_errors_exit_nonzero_with_traceback(self, worker):
+        result = worker("raise ValueError('boom')\n")
+
+        assert result.returncode == 1
+        assert "ValueError: boom" in result.stderr
+
+    def test_runs_do_not_share_interpreter_state(self, worker):
+        worker("import json\njson.LEAKED = True\n")
+
+        result = worker("import json\nprint(hasattr(json, 'LEAKED'))\n")
+
+        assert result.stdout == "False\n"
+
+    def test_timeout_kills_run_and_resets_scratch(self, worker):
+        result = worker(
+            f"open({str(worker.scratch / 'junk')!r}, 'w').write('x')\n"
+            "import time\ntime.sleep(30)\n",
+            timeout=0.5,
+        )
+
+        assert result.returncode == EXIT_TIMEOUT
+        assert os.listdir(worker.scratch) == []
+        assert worker("print(1)").stdout == "1\n"
+
+    def test_stops_run_that_outlives_a_fatal_traceback(self, worker):
+        code = (
+            "import time, traceback\n"
+            "print('started', flush=True)\n"
+            "try:\n"
+            "    raise ValueError('bad column')\n"
+            "except ValueError:\n"
+            "    traceback.print_exc()\n"
+            "time.sleep(30)\n"
+        )
+        start = time.monotonic()
+        result = worker(code, timeout=20, fatal_grace=0.2)
+
+        assert result.returncode == EXIT_STOPPED
+        assert time.monotonic() - start < 10
+        assert result.stdout == "started\n"
+        assert "ValueError: bad column" in result.stderr
+        assert worker("print(1)").stdout == "1\n"
+
+    def test_uncaught_error_keeps_its_full_traceback(self, worker):
+        code = (
+            "try:\n"
+            "    {}['a']\n"
+            "except KeyError:\n"
+            "    raise ValueError('no column a')\n"
+        )
+        result = worker(code, fatal_grace=5)
+
+        assert result.returncode == 1
+        assert "KeyError" in result.stderr
+        assert "ValueError: no column a" in result.stderr
+
+    def test_relayed_run_passes_output_and_exit_code(self, worker):
+        result = worker("print('a')\nimport sys\nsys.exit(3)", fatal_grace=1)
+
+        assert result.returncode == 3
+        assert result.stdout == "a\n"
+
+    def test_session_runs_start_from_setup_state(self, worker):
+        setup, session = worker.start_session("rows = [1, 2, 3]\nprint('loaded')\n")
+        assert setup.returncode == 0
+        assert setup.stdout == "loaded\n"
+
+        first = worker("rows.append(4)\nprint(len(rows))\n", session=session)
+        second = worker("print(len(rows))\n", session=session)
+
+        assert first.stdout == "4\n"
+        assert second.stdout == "3\n"
+
+    def test_session_timeout_keeps_session(self, worker):
+        _, session = worker.start_session("x = 1\n")
+
+        result = worker("import time\ntime.sleep(30)\n", timeout=0.5, session=session)
+
+        assert result.returncode == EXIT_TIMEOUT
+        assert worker("print(x)\n", session=session).stdout == "1\n"
+
+    def test_failed_setup_reports_error(self, worker):
+        setup, session = worker.start_session("raise ValueError('bad data')\n")
+
+        assert setup.returncode == 1
+        assert "bad data" in setup.stderr
+        assert worker("print(1)", session=session).returncode == EXIT_WORKER_UNAVAILABLE
+
+    def test_close_ends_session(self, worker):
+        _, session = worker.start_session("x = 1\n")
+
+        assert worker.send(session, {"op": "close"}).returncode == 0
+        _wait_for(lambda: not os.path.exists(session))
+        assert (
+            worker("print(x)\n", session=session).returncode == EXIT_WORKER_UNAVAILABLE
+        )
+        assert worker("print(2)").stdout == "2\n"
+
+    def test_client_reports_missing_worker(self, tmp_path):
+        result = subprocess.run(
+            [sys.executable, "-S", "-c", WORKER_CLIENT, str(tmp_path / "none"), "{}"],
+            capture_output=True,
+        )
+
+        assert result.returncode == EXIT_WORKER_UNAVAILABLE
+
+
+class TestPool:
+    def test_fills_to_size_and_hands_out_containers(self):
+        containers = []
+        pool = SandboxContainerPool("img", size=2, client=_fake_docker(containers))
+
+        assert pool.acquire() is None
+        pool.start()
+        _wait_for(lambda: pool.get_stats()["idle"] == 2)
+
+        warm = pool.acquire()
+        assert isinstance(warm, WarmContainer)
+        assert pool.acquire() is not None
+        assert pool.acquire() is None
+        assert len(containers) == 2
+        pool.shutdown()
+
+    def test_release_reuses_then_recycles_worn_out_container(self):
+        containers = []
+        pool = SandboxContainerPool(
+            "img", size=1, max_uses=2, client=_fake_docker(containers)
+        )
+        pool.start()
+        _wait_for(lambda: pool.get_stats()["idle"] == 1)
+
+        warm = pool.acquire()
+        warm.run_script("print(1)", timeout=5)
+        open(os.path.join(warm.workspace, "output.png"), "w").close()
+        pool.release(warm)
+        assert pool.acquire() is warm
+        assert os.listdir(warm.workspace) == []
+
+        warm.run_script("print(1)", timeout=5)
+        pool.release(warm)
+        _wait_for(lambda: warm.container.removed)
+        _wait_for(lambda: pool.get_stats()["idle"] == 1)
+        assert pool.acquire() is not warm
+        assert pool.get_stats()["recycled"] == 1
+        pool.shutdown()
+
+    def test_contaminated_container_is_recycled(self):
+        containers = []
+        pool = SandboxContainerPool("img", size=1, client=_fake_docker(containers))
+        pool.start()
+        _wait_for(lambda: pool.get_stats()["idle"] == 1)
+        warm = pool.acquire()
+        warm.container.on_exec = lambda command: (EXIT_TIMEOUT, (b"", b""))
+
+        result = warm.run_script("while True: pass", timeout=1)
+        pool.release(warm, contaminated=result.contaminated)
+
+        assert result.timed_out
+        _wait_for(lambda: warm.container.removed)
+        pool.shutdown()
+
+
+class TestLocalDockerSandboxUsesPool:
+    def _pool_with(self, container, tmp_path):
+        warm = WarmContainer(container, str(tmp_path))
+        pool = MagicMock()
+        pool.acquire.return_value = warm
+        return pool, warm
+
+    def test_runs_in_warm_container(self, tmp_path):
+        def exec_run(command):
+            (tmp_path / "output.png").write_bytes(b"png")
+            return 0, (b'{"success": true}\n', b"a warning\n")
+
+        pool, warm = self._pool_with(FakeContainer(exec_run), tmp_path)
+        sandbox = LocalDockerSandbox()
+        sandbox._get_docker_client = MagicMock()
+
+        with patch.object(docker_sandbox, "get_sandbox_pool", return_value=pool):
+            result = sandbox.run_code("print('x')", timeout=10)
+
+        assert result.success
+        assert [log.stream for log in result.logs] == ["stdout", "stderr"]
+        assert result.artifacts[0].name == "output.png"
+        pool.release.assert_called_once_with(warm, contaminated=False)
+        sandbox._get_docker_client.assert_not_called()
+
+    def test_falls_back_to_cold_run_when_worker_is_gone(self, tmp_path):
+        container = FakeContainer(
+            lambda command: (EXIT_WORKER_UNAVAILABLE, (b"", b"no socket"))
+        )
+        pool, warm = self._pool_with(container, tmp_path)
+        sandbox = LocalDockerSandbox()
+        sandbox._ensure_image_exists = MagicMock(return_value=False)
+
+        with patch.object(docker_sandbox, "get_sandbox_pool", return_value=pool):
+            result = sandbox.run_code("print('x')", timeout=10)
+
+        sandbox._ensure_image_exists.assert_called_once()
+        assert "not available" in result.error
+        pool.release.assert_called_once_with(warm, contaminated=True)
+
+
+class TestSandboxSession:
+    PREAMBLE = 'csv_data = """a,b\n1,2\n"""\n\n'
+
+    def _session(self, container, tmp_path):
+        warm = WarmContainer(container, str(tmp_path))
+        pool = MagicMock()
+        pool.acquire.return_value = warm
+        sandbox = LocalDockerSandbox()
+        with patch.object(docker_sandbox, "get_sandbox_pool", return_value=pool):
+            session = sandbox.open_session(self.PREAMBLE)
+        return session, sandbox, pool, warm
+
+    def test_runs_only_the_code_after_the_setup(self, tmp_path):
+        requests = []
+
+        def exec_run(command):
+            requests.append((command[-2], json.loads(command[-1])))
+            return 0, (b"ok\n", b"")
+
+        session, _, pool, warm = self._session(FakeContainer(exec_run), tmp_path)
+        assert session.persistent
+        assert requests[0][1]["op"] == "session"
+        assert (tmp_path / "setup.py").read_text() == self.PREAMBLE
+
+        (tmp_path / "output.png").write_bytes(b"stale")
+        result = session.run_code(self.PREAMBLE + "print('ok')", timeout=10)
+
+        assert result.success
+        assert (tmp_path / "script.py").read_text() == "print('ok')"
+        assert not (tmp_path / "output.png").exists()
+        assert requests[1][0] == requests[0][1]["session_socket"]
+        pool.release.assert_not_called()
+
+        session.close()
+        assert requests[2] == (requests[0][1]["session_socket"], {"op": "close"})
+        pool.release.assert_called_once_with(warm, contaminated=False)
+
+    def test_failed_setup_falls_back_to_full_runs(self, tmp_path):
+        container = FakeContainer(lambda command: (1, (b"", b"Traceback")))
+        session, sandbox, pool, warm = self._session(container, tmp_path)
+        sandbox.run_code = MagicMock()
+
+        session.run_code(self.PREAMBLE + "print(1)", timeout=10)
+
+        assert not session.persistent
+        pool.release.assert_called_once_with(warm, contaminated=True)
+        sandbox.run_code.assert_called_once_with(
+            self.PREAMBLE + "print(1)",
+            timeout=10,
+            output_format="image",
+            input_files=None,
+        )
+
+    def test_lost_worker_ends_session_and_reruns_in_full(self, tmp_path):
+        replies = iter([(0, (b"", b"")), (EXIT_WORKER_UNAVAILABLE, (b"", b""))])
+        container = FakeContainer(lambda command: next(replies))
+        session, sandbox, pool, warm = self._session(container, tmp_path)
+        sandbox.run_code = MagicMock()
+
+        session.run_code(self.PREAMBLE + "print(1)", timeout=10)
+        session.close()
+
+        assert not session.persistent
+        pool.release.assert_called_once_with(warm, contaminated=True)
+        sandbox.run_code.assert_called_once()
+
+    def test_without_warm_container_runs_in_full(self):
+        sandbox = LocalDockerSandbox()
+        sandbox.run_code = MagicMock()
+        with patch.object(docker_sandbox, "get_sandbox_pool", return_value=None):
+            session = sandbox.open_session(self.PREAMBLE)
+
+        with session:
+            session.run_code(self.PREAMBLE + "print(1)")
+
+        assert isinstance(session, SandboxSession)
+        assert not session.persistent
+        sandbox.run_code.assert_called_once()
+
+
+class TestExecutorSession:
+    def test_visualization_attempts_share_one_session(self):
+        from src.agent_execution import executor
+
+        session = MagicMock()
+        fixer = MagicMock()
+        fixer.return_value.fix_code.return_value = {"success": True, "code": "x = 2"}
+
+        with (
+            patch.object(
+                executor, "_open_sandbox_session", return_value=session
+            ) as open_session,
+            patch.object(
+                executor,
+                "_execute_code_in_sandbox",
+                return_value=(False, "NameError: name 'x' is not defined", None, None),
+            ) as run,
+            patch.object(executor, "CodeFixer", fixer),
+        ):
+            executor.execute_data_visualization(
+                csv_data="a,b\n1,2\n",
+                user_request="bar chart",
+                llm_service=MagicMock(),
+                max_retries=2,
+            )
+
+        open_session.assert_called_once_with(
+            executor.DATA_PREAMBLE, {"data.csv": b"a,b\n1,2\n"}
+        )
+        assert run.call_count == 3
+        assert all(call.kwargs["session"] is session for call in run.call_args_list)
+        session.close.assert_called_once()
+
+
+class TestInputFiles:
+    INPUTS = {"data.csv": b"a,b\n1,2\n"}
+
+    def test_warm_run_reads_inputs_from_the_workspace(self, tmp_path):
+        staged = []
+
+        def exec_run(command):
+            staged.append((tmp_path / "input" / "data.csv").read_bytes())
+            return 0, (b"ok\n", b"")
+
+        pool = MagicMock()
+        pool.acquire.return_value = WarmContainer(FakeContainer(exec_run), str(tmp_path))
+        sandbox = LocalDockerSandbox()
+        with patch.object(docker_sandbox, "get_sandbox_pool", return_value=pool):
+            result = sandbox.run_code("print(1)", timeout=10, input_files=self.INPUTS)
+
+        assert result.success
+        assert staged == [self.INPUTS["data.csv"]]
+
+    def test_cold_run_mounts_inputs_read_only(self):
+        mounts = {}
+
+        def run(image, **kwargs):
+            for source, mount in kwargs["volumes"].items():
+                if mount["bind"] == "/workspace/input":
+                    mounts[mount["mode"]] = os.listdir(source)
+            raise RuntimeError("stop here")
+
+        sandbox = LocalDockerSandbox(use_pool=False)
+        sandbox._ensure_image_exists = MagicMock(return_value=True)
+        sandbox._get_docker_client = MagicMock()
+        sandbox._get_docker_client.return_value.containers.run.side_effect = run
+
+        sandbox.run_code("print(1)", timeout=10, input_files=self.INPUTS)
+
+        assert mounts == {"ro": ["data.csv"]}
+
+    def test_session_restages_inputs_after_each_reset(self, tmp_path):
+        seen = []
+
+        def exec_run(command):
+            seen.append(sorted(os.listdir(tmp_path / "input")))
+            return 0, (b"", b"")
+
+        pool = MagicMock()
+        pool.acquire.return_value = WarmContainer(FakeContainer(exec_run), str(tmp_path))
+        sandbox = LocalDockerSandbox()
+        with patch.object(docker_sandbox, "get_sandbox_pool", return_value=pool):
+            session = sandbox.open_session("setup\n", self.INPUTS)
+        session.run_code("setup\nprint(1)", timeout=10)
+        session.run_code("setup\nprint(2)", timeout=10)
+
+        assert seen == [["data.csv"]] * 3
+
+    def test_visualization_script_does_not_inline_the_data(self):
+        from src.agent_execution import executor
+
+        csv_data = "a,b\n" + "1,2\n" * 10000
+        llm = MagicMock()
+        llm.complete.return_value = {"content": "print(1)"}
+
+        with (
+            patch.object(executor, "_open_sandbox_session", return_value=None),
+            patch.object(
+                executor, "_execute_code_in_sandbox", return_value=(False, "x", None, None)
+            ) as run,
+            patch.object(executor, "_should_retry_execution", return_value=False),
+        ):
+            executor.execute_data_visualization(
+                csv_data=csv_data, user_request="bar chart", llm_service=llm
+            )
+
+        code = run.call_args.args[0]
+        assert code.startswith(executor.DATA_PREAMBLE)
+        assert "1,2" not in code
+        assert run.call_args.kwargs["input_files"] == {"data.csv": csv_data.encode()}
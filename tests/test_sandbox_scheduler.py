@@ -0,0 +1,169 @@
+"""
+Tests for the sandbox admission controller.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.agent_execution import sandbox_scheduler
+from src.agent_execution.docker_sandbox import SandboxResult
+from src.agent_execution.sandbox_scheduler import (
+    SandboxScheduler,
+    admit_sandbox_run,
+    parse_memory_mb,
+    sandbox_client_scope,
+)
+from src.config.config_manager import ConfigManager
+from src.utils.deadline import Deadline, deadline_scope
+
+
+def _queue_behind_blocker(scheduler, requests):
+    """
+    Queue requests behind one running run, then release it.
+
+    Returns:
+        Clients in the order they were admitted
+    """
+    assert scheduler.acquire("blocker")
+    order = []
+    lock = threading.Lock()
+
+    def run(client, weight):
+        scheduler.acquire(client, weight)
+        with lock:
+            order.append(client)
+        scheduler.release()
+
+    threads = []
+    for client, weight in requests:
+        thread = threading.Thread(target=run, args=(client, weight))
+        thread.start()
+        threads.append(thread)
+        # Fix the arrival order
+        deadline = time.monotonic() + 5
+        while scheduler.get_metrics()["waiting"] < len(threads):
+            assert time.monotonic() < deadline
+            time.sleep(0.005)
+
+    scheduler.release()
+    for thread in threads:
+        thread.join(5)
+    return order
+
+
+class TestSandboxScheduler:
+    def test_admits_within_the_cpu_budget(self):
+        scheduler = SandboxScheduler(cpu_budget=2, memory_budget_mb=10_000)
+
+        assert scheduler.acquire("a")
+        assert scheduler.acquire("b")
+        assert not scheduler.acquire("c", timeout=0.05)
+        scheduler.release()
+        assert scheduler.acquire("c", timeout=0.05)
+
+        metrics = scheduler.get_metrics()
+        assert metrics["running"] == 2
+        assert metrics["timeouts"] == 1
+
+    def test_memory_budget_limits_admission(self):
+        scheduler = SandboxScheduler(cpu_budget=8, memory_budget_mb=1500)
+
+        assert scheduler.acquire("a", memory_mb=1024)
+        assert not scheduler.acquire("b", memory_mb=1024, timeout=0.05)
+
+    def test_oversized_run_still_runs_alone(self):
+        scheduler = SandboxScheduler(cpu_budget=1, memory_budget_mb=512)
+
+        assert scheduler.acquire("a", cpu=4, memory_mb=4096, timeout=0.05)
+
+    def test_interleaves_clients_instead_of_first_come_first_served(self):
+        scheduler = SandboxScheduler(cpu_budget=1, memory_budget_mb=10_000)
+
+        order = _queue_behind_blocker(
+            scheduler, [("arena", 1.0)] * 3 + [("small", 1.0)]
+        )
+
+        # The lone run of the second client does not wait for all three
+        assert order.index("small") == 1
+
+    def test_weights_give_proportional_shares(self):
+        scheduler = SandboxScheduler(cpu_budget=1, memory_budget_mb=10_000)
+
+        order = _queue_behind_blocker(
+            scheduler, [("low", 1.0)] * 4 + [("high", 2.0)] * 4
+        )
+
+        assert order[:6].count("high") == 4
+
+    def test_records_queue_wait_percentiles(self):
+        scheduler = SandboxScheduler(cpu_budget=1, memory_budget_mb=10_000)
+        _queue_behind_blocker(scheduler, [("a", 1.0)])
+
+        metrics = scheduler.get_metrics()
+        assert metrics["admitted"] == 2
+        assert metrics["queued"] == 1
+        assert metrics["wait_p99_seconds"] > 0
+        assert metrics["admitted_by_client"] == {"blocker": 1, "a": 1}
+
+
+class TestAdmitSandboxRun:
+    @pytest.fixture(autouse=True)
+    def small_scheduler(self, monkeypatch):
+        scheduler = SandboxScheduler(cpu_budget=1, memory_budget_mb=10_000)
+        monkeypatch.setattr(sandbox_scheduler, "_global_scheduler", scheduler)
+        return scheduler
+
+    def test_charges_the_scoped_client(self, small_scheduler):
+        with sandbox_client_scope("client@example.com", weight=2.0):
+            with admit_sandbox_run() as admitted:
+                assert admitted
+
+        assert small_scheduler.get_metrics()["admitted_by_client"] == {
+            "client@example.com": 1
+        }
+
+    def test_wait_ends_with_the_task_deadline(self, small_scheduler):
+        small_scheduler.acquire("other")
+
+        with deadline_scope(Deadline(0.1)):
+            with admit_sandbox_run() as admitted:
+                assert not admitted
+
+    def test_disabled_admits_everything(self, monkeypatch, small_scheduler):
+        monkeypatch.setitem(
+            ConfigManager._config_cache, "SANDBOX_SCHEDULER_ENABLED", False
+        )
+        small_scheduler.acquire("other")
+
+        with admit_sandbox_run() as admitted:
+            assert admitted
+
+    def test_executor_reports_a_busy_sandbox(self, monkeypatch, small_scheduler):
+        from src.agent_execution import executor
+
+        monkeypatch.setitem(ConfigManager._config_cache, "SANDBOX_CACHE_ENABLED", False)
+        monkeypatch.setitem(
+            ConfigManager._config_cache, "SANDBOX_SCHEDULER_MAX_WAIT_SECONDS", 0.05
+        )
+        small_scheduler.acquire("other")
+
+        with patch.object(
+            executor.LocalDockerSandbox,
+            "execute",
+            return_value=SandboxResult(logs=[], artifacts=[]),
+        ) as execute:
+            success, error, _, _ = executor._execute_code_in_docker("print(1)", 30)
+
+        assert not success
+        assert error.startswith("SANDBOX_BUSY")
+        execute.assert_not_called()
+
+
+def test_parse_memory_mb():
+    assert parse_memory_mb("1g") == 1024
+    assert parse_memory_mb("512m") == 512
+    assert parse_memory_mb("2GB") == 2048
+    assert parse_memory_mb(str(256 * 1024 * 1024)) == 256
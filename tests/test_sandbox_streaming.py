@@ -0,0 +1,166 @@
+"""
+Tests for streamed sandbox output and the early stop on fatal errors.
+"""
+
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.agent_execution.docker_sandbox import LocalDockerSandbox, sandbox_output_scope
+from src.agent_execution.sandbox_pool import (
+    EXIT_STOPPED,
+    FatalErrorDetector,
+    WarmContainer,
+)
+from src.api.websocket_manager import TaskStatus, WebSocketManager
+from src.config.config_manager import ConfigManager
+
+TRACEBACK = [
+    "Traceback (most recent call last):",
+    '  File "script.py", line 3, in <module>',
+    "    df['price']",
+    "KeyError: 'price'",
+]
+
+
+class StreamingContainer:
+    """Stand-in cold container that streams logs and then keeps running."""
+
+    def __init__(self, lines, exit_on_its_own=False):
+        self.lines = lines
+        self.exit_on_its_own = exit_on_its_own
+        self.exited = threading.Event()
+        self.status = "running"
+        self.killed = False
+
+    def logs(self, stream=False, follow=False):
+        if not stream:
+            return "".join(line + "\n" for line in self.lines).encode()
+        return self._stream()
+
+    def _stream(self):
+        for line in self.lines:
+            yield (line + "\n").encode()
+        if self.exit_on_its_own:
+            self.exited.set()
+        self.exited.wait(10)
+
+    def wait(self, timeout=None):
+        if not self.exited.wait(timeout):
+            raise Exception("Read timed out")
+        return {"StatusCode": 137 if self.killed else 1}
+
+    def reload(self):
+        self.status = "exited" if self.exited.is_set() else "running"
+
+    def kill(self):
+        self.killed = True
+        self.exited.set()
+
+    def remove(self, force=False):
+        self.exited.set()
+
+
+def _cold_sandbox(container):
+    sandbox = LocalDockerSandbox(use_pool=False)
+    sandbox._ensure_image_exists = MagicMock(return_value=True)
+    client = MagicMock()
+    client.containers.run.return_value = container
+    sandbox._get_docker_client = MagicMock(return_value=client)
+    return sandbox
+
+
+class TestFatalErrorDetector:
+    def test_finds_the_exception_line_closing_a_traceback(self):
+        assert FatalErrorDetector.find("\n".join(TRACEBACK)) == "KeyError: 'price'"
+
+    def test_ignores_error_text_outside_a_traceback(self):
+        output = "ValueError: shown as a warning\nFileNotFoundError is handled\n"
+
+        assert FatalErrorDetector.find(output) is None
+
+    def test_reports_only_the_first_fatal_line(self):
+        detector = FatalErrorDetector()
+        hits = [detector.feed(line) for line in TRACEBACK + TRACEBACK]
+
+        assert hits.count(True) == 1
+
+
+class TestColdRunStreaming:
+    def test_stops_container_that_outlives_a_fatal_traceback(self, monkeypatch):
+        monkeypatch.setitem(
+            ConfigManager._config_cache, "SANDBOX_FATAL_STOP_GRACE_SECONDS", 0.1
+        )
+        container = StreamingContainer(["loading"] + TRACEBACK)
+        sandbox = _cold_sandbox(container)
+
+        result = sandbox.run_code("...", timeout=30)
+
+        assert container.killed
+        assert result.error == "Stopped on fatal error: KeyError: 'price'"
+        assert any("KeyError" in log.text for log in result.logs)
+
+    def test_streams_lines_to_the_output_listener(self):
+        container = StreamingContainer(["step 1", "step 2"], exit_on_its_own=True)
+        sandbox = _cold_sandbox(container)
+        seen = []
+
+        with sandbox_output_scope(seen.append):
+            result = sandbox.run_code("...", timeout=30)
+
+        assert [log.text for log in seen] == ["step 1\n", "step 2\n"]
+        assert not container.killed
+        assert result.error == "Process exited with code 1"
+
+
+class TestWarmRunStreaming:
+    def test_streams_exec_output_line_by_line(self, tmp_path):
+        api = MagicMock()
+        api.exec_create.return_value = {"Id": "exec-1"}
+        api.exec_start.return_value = iter(
+            [(b"step 1\nst", None), (b"ep 2\n", b"Traceback"), (None, b" here\n")]
+        )
+        api.exec_inspect.return_value = {"ExitCode": EXIT_STOPPED}
+        container = MagicMock()
+        container.client.api = api
+        warm = WarmContainer(container, str(tmp_path))
+        seen = []
+
+        run = warm.run_script(
+            "print(1)",
+            timeout=10,
+            fatal_grace=1.0,
+            on_output=lambda line, stream: seen.append((stream, line)),
+        )
+
+        assert seen == [
+            ("stdout", "step 1"),
+            ("stdout", "step 2"),
+            ("stderr", "Traceback here"),
+        ]
+        assert run.stopped and not run.contaminated
+        assert run.stdout == "step 1\nstep 2\n"
+        assert '"fatal"' in api.exec_create.call_args.args[1][-1]
+
+
+class TestWebSocketForwarding:
+    @pytest.mark.asyncio
+    async def test_forwards_lines_from_worker_threads(self):
+        manager = WebSocketManager.__new__(WebSocketManager)
+        manager.task_subscriptions = {"task-1": {"client-1"}}
+        sent = asyncio.Event()
+        updates = []
+
+        async def send_task_update(task_id, status, message):
+            updates.append((task_id, status, message))
+            sent.set()
+
+        manager.send_task_update = send_task_update
+        forward = manager.task_output_forwarder("task-1")
+
+        await asyncio.to_thread(forward, "rendering chart\n")
+        await asyncio.wait_for(sent.wait(), 5)
+
+        assert updates == [("task-1", TaskStatus.PROCESSING, "rendering chart")]
@@ -0,0 +1,242 @@
+"""
+Tests for speculative visualization candidates and sandbox cancel groups.
+"""
+
+import base64
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.agent_execution import docker_sandbox, executor
+from src.agent_execution.docker_sandbox import (
+    SandboxArtifact,
+    SandboxCancelGroup,
+    SandboxResult,
+    sandbox_cancel_scope,
+)
+from src.agent_execution.executor import (
+    PNG_SIGNATURE,
+    _is_acceptable_visualization,
+    _run_speculative_candidates,
+)
+
+CHART = PNG_SIGNATURE + b"\0" * 2048
+
+
+def _chart_result(data=CHART):
+    return SandboxResult(
+        logs=[], artifacts=[SandboxArtifact(name="chart.png", data=data)]
+    )
+
+
+def _generator():
+    generator = MagicMock()
+    generator.generate_visualization_code.side_effect = lambda *args, **kwargs: {
+        "code": f"# temperature {kwargs['temperature']}",
+        "chart_type": "bar",
+    }
+    return generator
+
+
+def _speculate(generator, candidates=3):
+    return _run_speculative_candidates(
+        generator,
+        ["a", "b"],
+        "Plot a by b",
+        None,
+        "csv",
+        {},
+        {"data.csv": b"a,b\n1,2\n"},
+        None,
+        30,
+        candidates,
+    )
+
+
+class TestAcceptableVisualization:
+    def test_accepts_a_real_png(self):
+        image_url = "data:image/png;base64," + base64.b64encode(CHART).decode()
+
+        assert _is_acceptable_visualization({"success": True, "image_url": image_url})
+
+    @pytest.mark.parametrize(
+        "image_url",
+        [
+            "",
+            "data:image/png;base64,not base64!",
+            "data:image/png;base64," + base64.b64encode(b"GIF89a" * 500).decode(),
+            "data:image/png;base64," + base64.b64encode(PNG_SIGNATURE).decode(),
+        ],
+        ids=["missing", "undecodable", "not-png", "tiny"],
+    )
+    def test_rejects_missing_or_broken_charts(self, image_url):
+        assert not _is_acceptable_visualization(
+            {"success": True, "image_url": image_url}
+        )
+
+
+class TestSpeculativeCandidates:
+    def test_first_acceptable_candidate_wins_and_losers_are_cancelled(self):
+        cancelled = []
+        all_started = threading.Barrier(3, timeout=5)
+
+        def run(code, api_key, timeout, input_files=None):
+            all_started.wait()
+            if "0.7" in code:
+                return True, _chart_result(), None, None
+            # Losers run until their group is cancelled
+            group = docker_sandbox._cancel_group.get()
+            for _ in range(500):
+                if group.cancelled:
+                    cancelled.append(code)
+                    break
+                threading.Event().wait(0.01)
+            return False, "Execution cancelled", None, None
+
+        with patch.object(executor, "_execute_code_in_sandbox", side_effect=run):
+            winner = _speculate(_generator())
+
+            # Losers notice the cancellation on their own threads
+            for _ in range(500):
+                if len(cancelled) == 2:
+                    break
+                threading.Event().wait(0.01)
+
+        assert winner.index == 1
+        assert winner.acceptable
+        assert len(cancelled) == 2
+
+    def test_candidates_use_diverse_prompts(self):
+        generator = _generator()
+
+        with patch.object(
+            executor,
+            "_execute_code_in_sandbox",
+            return_value=(True, _chart_result(), None, None),
+        ):
+            _speculate(generator, candidates=3)
+
+        calls = generator.generate_visualization_code.call_args_list
+        assert len({call.kwargs["temperature"] for call in calls}) == 3
+        assert len({call.kwargs["prompt_hint"] for call in calls}) == 3
+
+    def test_without_a_winner_returns_the_first_candidate(self):
+        with patch.object(
+            executor,
+            "_execute_code_in_sandbox",
+            return_value=(False, "NameError: name 'x' is not defined", None, None),
+        ):
+            candidate = _speculate(_generator())
+
+        assert candidate.index == 0
+        assert not candidate.acceptable
+        assert candidate.result_or_error.startswith("NameError")
+
+    def test_no_code_returns_none(self):
+        generator = MagicMock()
+        generator.generate_visualization_code.return_value = {"code": ""}
+
+        with patch.object(executor, "_execute_code_in_sandbox") as run:
+            assert _speculate(generator) is None
+
+        run.assert_not_called()
+
+
+class TestExecuteDataVisualization:
+    def test_failed_candidate_continues_in_the_fix_loop(self):
+        candidate = executor._SpeculativeCandidate(
+            index=0,
+            code="broken()",
+            chart_type="bar",
+            success=False,
+            result_or_error="NameError: name 'broken' is not defined",
+            seconds=1.0,
+        )
+        fixer = MagicMock()
+        fixer.return_value.fix_code.return_value = {"success": True, "code": "fixed()"}
+
+        with (
+            patch.object(
+                executor, "_run_speculative_candidates", return_value=candidate
+            ),
+            patch.object(executor, "_open_sandbox_session", return_value=None),
+            patch.object(executor, "_get_llm_for_task", return_value=MagicMock()),
+            patch.object(executor, "CodeFixer", fixer),
+            patch.object(
+                executor,
+                "_execute_code_in_sandbox",
+                return_value=(True, _chart_result(), None, None),
+            ) as run,
+        ):
+            result = executor.execute_data_visualization(
+                "a,b\n1,2\n",
+                "Plot a by b",
+                enable_pre_submission_review=False,
+                speculative=True,
+            )
+
+        assert result["success"]
+        # Only the fixed code ran again; the candidate's run was reused
+        assert run.call_count == 1
+        assert run.call_args.args[0].endswith("fixed()")
+
+
+    def test_review_sees_the_regenerated_code(self):
+        reviewer = MagicMock()
+        reviewer.return_value.regenerate_with_feedback.return_value = {
+            "success": True,
+            "code": "regenerated()",
+        }
+        review = MagicMock(
+            side_effect=[(False, "Wrong chart type", []), (True, "", [])]
+        )
+
+        with (
+            patch.object(executor, "_run_speculative_candidates", return_value=None),
+            patch.object(executor, "_open_sandbox_session", return_value=None),
+            patch.object(executor, "_get_llm_for_task", return_value=MagicMock()),
+            patch.object(
+                executor.AIResponseGenerator,
+                "generate_visualization_code",
+                return_value={"code": "first()", "chart_type": "bar"},
+            ),
+            patch.object(executor, "ArtifactReviewer", reviewer),
+            patch.object(executor, "_perform_pre_submission_review", review),
+            patch.object(
+                executor,
+                "_execute_code_in_sandbox",
+                return_value=(True, _chart_result(), None, None),
+            ),
+        ):
+            result = executor.execute_data_visualization(
+                "a,b\n1,2\n", "Plot a by b", speculative=False
+            )
+
+        assert result["success"]
+        reviewed = [call.args[2] for call in review.call_args_list]
+        assert reviewed == ["first()", "regenerated()"]
+
+
+class TestSandboxCancelGroup:
+    def test_runs_inside_the_scope_join_the_group(self):
+        group = SandboxCancelGroup()
+        sandbox = docker_sandbox.LocalDockerSandbox(use_pool=False)
+        sandbox._ensure_image_exists = MagicMock(return_value=False)
+
+        with sandbox_cancel_scope(group):
+            sandbox.run_code("print(1)")
+        group.cancel()
+
+        assert sandbox.cancelled
+
+    def test_sandbox_joining_a_cancelled_group_is_cancelled(self):
+        group = SandboxCancelGroup()
+        group.cancel()
+        sandbox = docker_sandbox.LocalDockerSandbox(use_pool=False)
+
+        with sandbox_cancel_scope(group):
+            result = sandbox.run_code("print(1)")
+
+        assert sandbox.cancelled
+        assert not result.success
@@ -0,0 +1,212 @@
+"""
+Tests for streamed code generation with early stop in the executor.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.agent_execution.executor import (
+    AIResponseGenerator,
+    ArtifactReviewer,
+    CodeFixer,
+    CodeGenerationAborted,
+    _stream_code_completion,
+)
+from src.llm_cache import LLMResponseCache
+from src.llm_service import LLMService
+from src.llm_single_flight import SingleFlight
+
+
+class StreamingLLM:
+    """Stand-in LLM that streams fixed chunks and records what was consumed."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.consumed = 0
+        self.closed = False
+
+    def complete_streaming(self, **kwargs):
+        try:
+            for chunk in self.chunks:
+                self.consumed += 1
+                yield chunk
+        finally:
+            self.closed = True
+
+    def complete_streaming_collected(self, collect, **kwargs):
+        return collect(self.complete_streaming(**kwargs))
+
+
+CODE_CHUNKS = [
+    "```python\n",
+    "import json\n",
+    "print(json.dumps({'success': True}))\n",
+    "```",
+    "\n\nThis code reads the data ",
+    "and prints the result.",
+]
+
+
+class TestStreamCodeCompletion:
+    def test_stops_at_closing_fence(self):
+        llm = StreamingLLM(CODE_CHUNKS)
+
+        text = _stream_code_completion(llm, "p", 0.3, 2000, "s")
+
+        assert text.endswith("```")
+        assert "This code reads" not in text
+        assert llm.consumed == 4
+        assert llm.closed
+
+    def test_unfenced_code_streams_to_the_end(self):
+        chunks = ["import json\n", "print('ok')\n"]
+        llm = StreamingLLM(chunks)
+
+        text = _stream_code_completion(llm, "p", 0.3, 2000, "s")
+
+        assert text == "import json\nprint('ok')\n"
+        assert llm.consumed == 2
+
+    def test_refusal_aborts_early(self):
+        chunks = ["I'm sorry, but I can't help with generating that code. "] + [
+            "More explanation. "
+        ] * 50
+        llm = StreamingLLM(chunks)
+
+        with pytest.raises(CodeGenerationAborted):
+            _stream_code_completion(llm, "p", 0.3, 2000, "s")
+
+        assert llm.consumed < 5
+        assert llm.closed
+
+    def test_short_refusal_is_detected_at_end_of_stream(self):
+        with pytest.raises(CodeGenerationAborted):
+            _stream_code_completion(StreamingLLM(["I cannot do that."]), "p", 0, 1, "")
+
+    def test_empty_output_aborts(self):
+        with pytest.raises(CodeGenerationAborted):
+            _stream_code_completion(StreamingLLM(["", "  \n"]), "p", 0.3, 2000, "s")
+
+
+class TestCodegenCallers:
+    def test_fix_code_extracts_streamed_code(self):
+        fixer = CodeFixer(llm_service=StreamingLLM(CODE_CHUNKS))
+
+        result = fixer.fix_code("bad", "SyntaxError", ["a"], "chart")
+
+        assert result["success"] is True
+        assert result["code"] == (
+            "import json\nprint(json.dumps({'success': True}))"
+        )
+
+    def test_fix_code_reports_refusal(self):
+        fixer = CodeFixer(llm_service=StreamingLLM(["I cannot help with this."]))
+
+        result = fixer.fix_code("bad", "SyntaxError", ["a"], "chart")
+
+        assert result["success"] is False
+        assert "refused" in result["error"]
+
+    def test_regenerate_with_feedback_streams(self):
+        reviewer = ArtifactReviewer(llm_service=StreamingLLM(CODE_CHUNKS))
+
+        result = reviewer.regenerate_with_feedback(["a"], "chart", "wrong", "bar")
+
+        assert result["success"] is True
+        assert "print(json.dumps" in result["code"]
+
+    def test_generate_visualization_code_falls_back_on_empty_stream(self):
+        generator = AIResponseGenerator(llm_service=StreamingLLM([""]))
+        generator.enable_few_shot = False
+
+        result = generator.generate_visualization_code(["category", "value"], "bar")
+
+        assert result["code"]
+        assert result["description"].startswith("Fallback")
+
+
+class TestLLMServiceStreaming:
+    def test_breaking_out_closes_stream_and_releases_slot(self):
+        service = LLMService(
+            base_url="http://localhost:11434/v1", api_key="not-needed", model="m"
+        )
+        response = MagicMock()
+        chunks = []
+        for text in ("a", "b", "c"):
+            chunk = MagicMock()
+            chunk.choices[0].delta.content = text
+            chunks.append(chunk)
+        response.__iter__.return_value = iter(chunks)
+        service.client = MagicMock()
+        service.client.chat.completions.create.return_value = response
+
+        stream = service.complete_streaming("hi")
+        assert next(stream) == "a"
+        stream.close()
+
+        response.close.assert_called_once()
+        if service._limiter:
+            assert service._limiter.get_metrics()["in_flight"] == 0
+
+    def test_no_deadline_still_gets_the_default_timeout(self):
+        from src.llm_service import DEFAULT_REQUEST_TIMEOUT_SECONDS
+
+        service = LLMService(
+            base_url="http://localhost:11434/v1", api_key="not-needed", model="m"
+        )
+        service.client = MagicMock()
+        service.client.chat.completions.create.return_value = iter([])
+
+        list(service.complete_streaming("hi"))
+
+        call_kwargs = service.client.chat.completions.create.call_args.kwargs
+        assert call_kwargs["timeout"] == DEFAULT_REQUEST_TIMEOUT_SECONDS
+
+
+class TestCollectedStreaming:
+    def _service(self, chunks):
+        service = LLMService(
+            base_url="http://localhost:11434/v1", api_key="not-needed", model="m"
+        )
+        service.single_flight = SingleFlight()
+        service.cache = LLMResponseCache()
+        service.complete_streaming = MagicMock(
+            side_effect=lambda *args, **kwargs: iter(chunks)
+        )
+        return service
+
+    def test_concurrent_identical_requests_share_one_stream(self):
+        service = self._service(CODE_CHUNKS)
+        release = threading.Event()
+
+        def slow_stream(*args, **kwargs):
+            release.wait(5)
+            return iter(CODE_CHUNKS)
+
+        service.complete_streaming.side_effect = slow_stream
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [
+                pool.submit(_stream_code_completion, service, "p", 0.3, 2000, "s")
+                for _ in range(3)
+            ]
+            time.sleep(0.2)
+            release.set()
+            texts = [future.result() for future in futures]
+
+        assert len(set(texts)) == 1
+        assert texts[0].endswith("```")
+        assert service.complete_streaming.call_count == 1
+
+    def test_deterministic_requests_are_cached(self):
+        service = self._service(CODE_CHUNKS)
+
+        first = _stream_code_completion(service, "p", 0, 2000, "s")
+        second = _stream_code_completion(service, "p", 0, 2000, "s")
+
+        assert first == second
+        assert service.complete_streaming.call_count == 1
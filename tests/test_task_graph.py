@@ -0,0 +1,151 @@
+"""
+Tests for task graphs and the concurrent combined report.
+"""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.agent_execution import executor
+from src.agent_execution.executor import ReportGenerator
+from src.config.config_manager import ConfigManager
+from src.utils.deadline import Deadline, current_deadline, deadline_scope
+from src.utils.task_graph import GraphStep, run_task_graph
+
+
+class TestRunTaskGraph:
+    def test_independent_steps_overlap(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def meet(_):
+            # Deadlocks unless both steps run at the same time
+            barrier.wait()
+            return 1
+
+        results = run_task_graph(
+            [
+                GraphStep("a", meet),
+                GraphStep("b", meet),
+                GraphStep("sum", lambda deps: deps["a"] + deps["b"], ("a", "b")),
+            ]
+        )
+
+        assert results == {"a": 1, "b": 1, "sum": 2}
+
+    def test_steps_keep_the_callers_context(self):
+        deadline = Deadline(60)
+
+        with deadline_scope(deadline):
+            results = run_task_graph([GraphStep("a", lambda _: current_deadline())])
+
+        assert results["a"] is deadline
+
+    def test_failing_step_skips_its_dependents(self):
+        dependent = MagicMock()
+
+        def fail(_):
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            run_task_graph(
+                [GraphStep("a", fail), GraphStep("b", dependent, ("a",))]
+            )
+
+        dependent.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "steps",
+        [
+            [GraphStep("a", print), GraphStep("a", print)],
+            [GraphStep("a", print, ("missing",))],
+            [GraphStep("a", print, ("b",)), GraphStep("b", print, ("a",))],
+        ],
+        ids=["duplicate", "unknown", "cycle"],
+    )
+    def test_rejects_invalid_graphs(self, steps):
+        with pytest.raises(ValueError):
+            run_task_graph(steps)
+
+
+class TestCombinedReport:
+    def _report(self, step_seconds=0.3, figure_ok=True):
+        def slow_figure(**kwargs):
+            time.sleep(step_seconds)
+            return {
+                "success": figure_ok,
+                "image_url": f"data:image/png;base64,{kwargs['user_request']}",
+            }
+
+        def slow_code(*args):
+            time.sleep(step_seconds)
+            return "print('report')"
+
+        generator = ReportGenerator(llm_service=MagicMock(), report_type="combined")
+        with (
+            patch.object(
+                executor, "execute_data_visualization", side_effect=slow_figure
+            ),
+            patch.object(generator, "_generate_combined_code", side_effect=slow_code),
+            patch.object(
+                generator, "_execute_combined_code", return_value={"success": True}
+            ) as assemble,
+        ):
+            started = time.monotonic()
+            result = generator.generate_report(
+                "Sales report", "region,sales\nnorth,10\n"
+            )
+            elapsed = time.monotonic() - started
+        return result, assemble, elapsed
+
+    def test_figure_and_code_are_generated_concurrently(self):
+        result, assemble, elapsed = self._report()
+
+        assert result["success"]
+        # Two 0.3s steps overlap instead of adding up to 0.6s
+        assert elapsed < 0.5
+        code, _, visualizations = assemble.call_args.args
+        assert code == "print('report')"
+        assert visualizations == ["data:image/png;base64,Sales report"]
+
+    def test_failed_figure_is_left_out(self):
+        result, assemble, _ = self._report(step_seconds=0, figure_ok=False)
+
+        assert result["success"]
+        _, _, visualizations = assemble.call_args.args
+        assert visualizations == []
+
+    def test_code_prompt_does_not_assume_the_figure_count(self):
+        generator = ReportGenerator(llm_service=MagicMock(), report_type="combined")
+        generator.llm.complete.return_value = {"content": "print('report')"}
+
+        generator._generate_combined_code("Sales report", ["region", "sales"], 3)
+
+        prompt = generator.llm.complete.call_args.kwargs["prompt"]
+        assert "up to 3 charts" in prompt
+        assert "for viz in visualizations" in prompt
+
+    def test_serial_when_disabled(self, monkeypatch):
+        monkeypatch.setitem(
+            ConfigManager._config_cache, "REPORT_PARALLEL_ENABLED", False
+        )
+
+        result, _, elapsed = self._report(step_seconds=0.2)
+
+        assert result["success"]
+        assert elapsed >= 0.4
+
+    def test_step_error_becomes_a_failed_report(self):
+        generator = ReportGenerator(llm_service=MagicMock(), report_type="combined")
+        generator.llm.complete.side_effect = RuntimeError("LLM down")
+
+        with patch.object(
+            executor,
+            "execute_data_visualization",
+            return_value={"success": False},
+        ):
+            result = generator.generate_report("Sales report", "a,b\n1,2\n")
+
+        assert not result["success"]
+        assert "LLM down" in result["message"]
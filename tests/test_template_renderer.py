@@ -0,0 +1,194 @@
+"""
+Tests for in-process template rendering and the document fast path.
+"""
+
+import base64
+import io
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+docx = pytest.importorskip("docx")
+
+from src.agent_execution import executor  # noqa: E402
+from src.agent_execution.executor import TaskRouter  # noqa: E402
+from src.config.config_manager import ConfigManager  # noqa: E402
+from src.templates.renderer import (  # noqa: E402
+    extract_content,
+    match_template,
+    render_document,
+    render_fast_path,
+)
+
+CSV = "region,revenue,units\nnorth,1200.5,10\nsouth,900,7\neast,1500,12\n"
+
+
+def _text(data):
+    document = docx.Document(io.BytesIO(data))
+    cells = [
+        cell.text
+        for table in document.tables
+        for row in table.rows
+        for cell in row.cells
+    ]
+    return "\n".join([p.text for p in document.paragraphs] + cells)
+
+
+@pytest.mark.parametrize(
+    "domain, request_text, template",
+    [
+        ("accounting", "Create a financial summary for Q3", "financial_summary"),
+        ("data_analysis", "Prepare a P&L document", "financial_summary"),
+        ("accounting", "Write a summary of expenses", "financial_summary"),
+        ("data_analysis", "Generate a data summary document", "base"),
+        ("accounting", "Explain why revenue fell in the summary", None),
+        ("accounting", "Create a detailed financial report", None),
+        (
+            "accounting",
+            "Create a financial summary with recommendations to cut costs",
+            None,
+        ),
+        (
+            "accounting",
+            "Write a P&L summary and a comparison against last year",
+            None,
+        ),
+        ("accounting", "Financial summary including key insights and trends", None),
+        ("legal", "Draft a service agreement", None),
+        ("data_analysis", "Write a memo to the team", None),
+    ],
+)
+def test_match_template(domain, request_text, template):
+    assert match_template(domain, request_text) == template
+
+
+class TestExtractContent:
+    def test_financial_summary_comes_from_the_data(self):
+        content = extract_content(
+            "financial_summary", "Create a financial summary for Q3", CSV
+        )
+
+        assert content["title"] == "Financial summary for Q3"
+        assert content["key_metrics"]["revenue (sum)"] == 3600.5
+        assert content["key_metrics"]["units (average)"] == pytest.approx(9.67)
+        assert content["highlights"][0]["value"] == "east"
+        assert len(content["tables"][0]["data"]) == 3
+
+    def test_identifier_and_year_columns_are_not_measures(self):
+        csv_data = (
+            "invoice_id,customerId,year,region,revenue\n"
+            "101,7,2023,north,1200\n"
+            "102,8,2024,south,900\n"
+        )
+
+        content = extract_content("financial_summary", "P&L summary", csv_data)
+
+        assert list(content["key_metrics"]) == ["revenue (sum)", "revenue (average)"]
+        assert [h["title"] for h in content["highlights"]] == ["Highest revenue"]
+
+    def test_unusable_data_needs_the_llm(self):
+        assert extract_content("financial_summary", "summary", "a,b\nx,y\n") is None
+        assert extract_content("financial_summary", "summary", "") is None
+        assert extract_content("legal_contract", "contract", CSV) is None
+
+
+class TestRender:
+    def test_renders_template_to_docx_bytes(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+
+        data = render_document(
+            "base", {"title": "Sales", "sections": [{"content": "Body"}]}, CSV
+        )
+
+        assert "Sales" in _text(data)
+        # Nothing is written to disk
+        assert list(tmp_path.iterdir()) == []
+
+    def test_unknown_template_is_an_error(self):
+        with pytest.raises(ValueError):
+            render_document("missing", {}, CSV)
+
+    def test_fast_path_returns_none_for_free_form_requests(self):
+        assert render_fast_path("legal", "Draft an NDA contract", CSV) is None
+
+
+class TestRouterFastPath:
+    @pytest.fixture
+    def fast_path(self, monkeypatch):
+        monkeypatch.setitem(
+            ConfigManager._config_cache, "TEMPLATE_FAST_PATH_ENABLED", True
+        )
+
+    def test_financial_summary_skips_llm_and_sandbox(self, fast_path):
+        llm = MagicMock()
+        router = TaskRouter(llm_service=llm)
+
+        with patch.object(executor, "_execute_code_in_sandbox") as sandbox:
+            started = time.monotonic()
+            result = router.route(
+                "accounting",
+                "Create a financial summary for Q3",
+                CSV,
+                output_format="docx",
+            )
+            elapsed = time.monotonic() - started
+
+        assert result["success"]
+        assert result["generation_method"] == "template_fast_path"
+        assert elapsed < 1.0
+        sandbox.assert_not_called()
+        assert not llm.method_calls
+
+        data = base64.b64decode(result["file_url"].split(",", 1)[1])
+        text = _text(data)
+        assert "Key Financial Metrics" in text
+        assert "$3,600.50" in text
+
+    def test_free_form_request_uses_regular_generation(self, fast_path):
+        router = TaskRouter(llm_service=MagicMock())
+
+        with patch.object(
+            router, "_handle_document_generation", return_value={"success": True}
+        ) as regular:
+            router.route(
+                "legal", "Draft a consulting contract", CSV, output_format="docx"
+            )
+
+        regular.assert_called_once()
+
+    def test_fast_path_is_off_by_default(self):
+        router = TaskRouter(llm_service=MagicMock())
+
+        with patch.object(
+            router, "_handle_report_generation", return_value={"success": True}
+        ) as report:
+            router.route(
+                "accounting",
+                "Create a financial summary for Q3",
+                CSV,
+                output_format="docx",
+            )
+
+        report.assert_called_once()
+
+    def test_llm_content_is_rendered_without_the_sandbox(self):
+        router = TaskRouter(llm_service=MagicMock())
+        content = {"title": "Consulting Agreement", "parties": [{"name": "Acme"}]}
+
+        with (
+            patch.object(
+                router,
+                "generate_json_content",
+                return_value={"success": True, "content_json": content},
+            ),
+            patch.object(executor, "_execute_code_in_sandbox") as sandbox,
+        ):
+            result = router._handle_document_generation_with_template(
+                "legal", "Draft a consulting agreement", CSV
+            )
+
+        assert result["success"]
+        sandbox.assert_not_called()
+        data = base64.b64decode(result["file_url"].split(",", 1)[1])
+        assert "Consulting Agreement" in _text(data)